@@ -0,0 +1,79 @@
+import os
+import sys
+import argparse
+
+from . import harness
+from .cases import CASES, WORKDIR_ENV
+
+DEFAULT_SIZES = '10000,100000'
+CASES_MODULE = 'benchmarks.cases'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark MySpot against synthetic music libraries')
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help=f"Comma-separated cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='Comma-separated library sizes in tracks, up to 1000000 (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (default: %(default)s)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against an earlier results file')
+    parser.add_argument('--threshold', type=float, default=harness.DEFAULT_THRESHOLD,
+                        help='Relative increase counted as a regression (default: %(default)s)')
+    parser.add_argument('--workdir', help='Where synthetic trees are generated and reused')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Run every case in this process (faster, but peak RSS is shared)')
+    return parser.parse_args(argv)
+
+
+def print_results(results):
+    print(f"{'case':<20} {'size':>8} {'median':>10} {'per op':>10} {'peak rss':>10} {'alloc peak':>10}")
+    for r in results:
+        if 'skipped' in r:
+            print(f"{r['case']:<20} {r['size']:>8} skipped: {r['skipped']}")
+            continue
+        print(f"{r['case']:<20} {r['size']:>8} "
+              f"{harness.format_value('median_seconds', r['median_seconds']):>10} "
+              f"{harness.format_value('per_op_seconds', r['per_op_seconds']):>10} "
+              f"{harness.format_value('peak_rss_bytes', r['peak_rss_bytes']):>10} "
+              f"{harness.format_value('alloc_peak_bytes', r['alloc_peak_bytes']):>10}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [name.strip() for name in args.cases.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if args.workdir:
+        # Children started by measure_isolated() inherit the environment
+        os.environ[WORKDIR_ENV] = os.path.abspath(args.workdir)
+
+    results = []
+    for name in names:
+        for size in sizes:
+            print(f"Running {name} ({size} tracks)...", file=sys.stderr)
+            if args.in_process:
+                results.append(harness.measure(CASES[name], size, args.repeat))
+            else:
+                results.append(harness.measure_isolated(CASES_MODULE, name, size, args.repeat))
+    print_results(results)
+
+    current = {'meta': harness.environment(), 'results': results}
+    if args.output:
+        harness.save_results(args.output, results, current['meta'])
+    if args.compare:
+        rows, regressions = harness.compare(harness.load_results(args.compare), current, args.threshold)
+        print()
+        harness.print_comparison(rows, regressions)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
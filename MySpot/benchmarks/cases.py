@@ -0,0 +1,179 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from myspot.playlist import utils as playlist_utils
+from myspot.playlist.playlist import PlaylistManager
+
+from .harness import Case, SkipCase
+from .synthetic import generate_tree, synthetic_paths
+
+# Where synthetic trees are generated and reused between runs
+WORKDIR_ENV = 'MYSPOT_BENCH_WORKDIR'
+NEXT_TRACK_CALLS = 10000
+TRACKS_PAGE_SIZE = 200
+# Exact words, a misspelling, a long query of common words and a word with no match
+RESOLVE_QUERIES = ('blue shadow light', 'electrik ghost', 'summer ocean road star heart', 'wild river 42')
+SIMILAR_QUERIES = 20
+SIMILAR_COUNT = 10
+# The analysis and duplicate backfills would decode and hash the library while requests are measured
+SERVER_SETTINGS = {'replaygain': False, 'trim_silence': False, 'radio': False, 'collapse_duplicates': False,
+                   'order_mode': 'shuffle'}
+# Seconds to wait for the jobs a freshly loaded library starts (the title index)
+SERVER_JOB_TIMEOUT = 300
+
+
+def workdir():
+    path = os.environ.get(WORKDIR_ENV) or os.path.join(tempfile.gettempdir(), 'myspot-bench')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _setup_scan(size):
+    root = os.path.join(workdir(), f"tree-{size}")
+    generate_tree(root, size)
+    return root
+
+
+def _run_scan(root):
+    playlist_utils.scan_audio_files(root, PlaylistManager.SUPPORTED_FORMATS)
+
+
+def _setup_playlist(size):
+    playlist = PlaylistManager()
+    playlist.load_tracks('/music', synthetic_paths(size))
+    return playlist
+
+
+def _run_next_track(playlist):
+    for _ in range(NEXT_TRACK_CALLS):
+        playlist.next_track()
+
+
+def _setup_resolver(size):
+    from myspot.playlist.resolver import TrackResolver
+    try:
+        return TrackResolver(synthetic_paths(size), '/music')
+    except RuntimeError as e:
+        raise SkipCase(str(e))
+
+
+def _run_resolve(resolver):
+    for query in RESOLVE_QUERIES:
+        resolver.resolve(query)
+
+
+def _setup_similar(size, partitioned=False):
+    import numpy as np
+    from myspot.analysis.similarity import SimilarityIndex
+    from myspot.analysis.features import TIMBRE_BANDS
+    index = SimilarityIndex()
+    index.store_path = os.path.join(workdir(), f"vectors-{size}.bin")
+    if len(index) != size:
+        # Start over rather than add to a run that was cut short
+        for path in (index.store_path, index.paths_path):
+            if os.path.exists(path):
+                os.remove(path)
+        index = SimilarityIndex()
+        index.store_path = os.path.join(workdir(), f"vectors-{size}.bin")
+        # Spectral shapes around a few hundred "styles", like a real library's genres
+        rng = np.random.default_rng(size)
+        centers = rng.normal(0, 6, (256, TIMBRE_BANDS))
+        paths = synthetic_paths(size)
+        for start in range(0, size, 50000):
+            chunk = paths[start:start + 50000]
+            timbres = centers[rng.integers(0, len(centers), len(chunk))] + rng.normal(0, 1, (len(chunk), TIMBRE_BANDS))
+            index.put_many([(path, 1, 1.0, {'timbre': timbre, 'tempo': float(rng.uniform(70, 180)),
+                                            'energy': float(rng.uniform(-30, -8)),
+                                            'centroid': float(rng.uniform(500, 5000))})
+                            for path, timbre in zip(chunk, timbres)])
+    if partitioned and not index.build_partitions(min_tracks=1):
+        raise SkipCase('no vectors to partition')
+    return index, synthetic_paths(size)[::max(1, size // SIMILAR_QUERIES)][:SIMILAR_QUERIES]
+
+
+def _run_similar(state):
+    index, seeds = state
+    for seed in seeds:
+        index.nearest(seed, SIMILAR_COUNT)
+
+
+class _ServerState:
+    def __init__(self, server, size):
+        self.server = server
+        self.client = server.app.test_client()
+        self.size = size
+
+
+def load_server(server, directory, tracks):
+    """Load ``tracks`` into the imported web ``server`` with its files in the work directory and no backfills."""
+    # Never let the benchmark library reach the user's session or settings
+    scratch = workdir()
+    server.session_store.session_path = os.path.join(scratch, 'session.bin')
+    server.config.config_path = os.path.join(scratch, 'settings.json')
+    server.analysis_store.store_path = os.path.join(scratch, 'analysis.bin')
+    server.similarity.store_path = os.path.join(scratch, 'vectors.bin')
+    server.fingerprint_store.store_path = os.path.join(scratch, 'fingerprints.bin')
+    server.history.store_path = os.path.join(scratch, 'history.bin')
+    server.config.update(SERVER_SETTINGS)
+    server.playlist.collapse_duplicates = False
+    server.playlist.order_mode = 'shuffle'
+    server.jobs.cancel_all()
+    with server.state_lock:
+        server.playlist.load_tracks(directory, tracks)
+    # The library index builds in the background; let it finish before measuring
+    for job in server.jobs.list(active_only=True):
+        if not job.wait(SERVER_JOB_TIMEOUT):
+            server.jobs.cancel_all()
+            raise RuntimeError(f"{job.kind} job still running after {SERVER_JOB_TIMEOUT} seconds")
+
+
+def _setup_server(size):
+    try:
+        from myspot.web import server
+    except ImportError as e:
+        raise SkipCase(f"web server unavailable: {e}")
+    load_server(server, '/music', synthetic_paths(size))
+    return _ServerState(server, size)
+
+
+def _get(state, url):
+    response = state.client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return response.get_data()
+
+
+def _run_tracks_full(state):
+    _get(state, '/api/tracks')
+
+
+def _run_tracks_page(state):
+    _get(state, f'/api/tracks?offset={state.size // 2}&limit={TRACKS_PAGE_SIZE}')
+
+
+def _run_status(state):
+    # Invalidate the cached body so every call pays for building the snapshot
+    state.server._touch_server_state()
+    _get(state, '/api/status')
+
+
+def _run_status_cached(state):
+    _get(state, '/api/status')
+
+
+CASES = {case.name: case for case in (
+    Case('scan', _setup_scan, _run_scan),
+    Case('shuffle', _setup_playlist, lambda playlist: playlist.shuffle()),
+    Case('next_track', _setup_playlist, _run_next_track, ops=NEXT_TRACK_CALLS),
+    Case('resolve', _setup_resolver, _run_resolve, ops=len(RESOLVE_QUERIES)),
+    Case('similar', _setup_similar, _run_similar, ops=SIMILAR_QUERIES),
+    Case('similar_ivf', lambda size: _setup_similar(size, partitioned=True), _run_similar, ops=SIMILAR_QUERIES),
+    Case('api_tracks_full', _setup_server, _run_tracks_full),
+    Case('api_tracks_page', _setup_server, _run_tracks_page),
+    Case('api_status', _setup_server, _run_status),
+    Case('api_status_cached', _setup_server, _run_status_cached),
+)}
@@ -0,0 +1,193 @@
+import gc
+import sys
+import json
+import time
+import platform
+import statistics
+import tracemalloc
+import multiprocessing
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Metrics compared between runs; lower is better for all of them
+COMPARED_METRICS = ('median_seconds', 'peak_rss_bytes', 'alloc_peak_bytes')
+DEFAULT_THRESHOLD = 0.10
+# Memory differences below this are page-level noise, not regressions
+MIN_BYTES_CHANGE = 256 * 1024
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unavailable."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+
+class SkipCase(Exception):
+    """Raised by a setup function when the case cannot run here (e.g. a missing dependency)."""
+
+
+class Case:
+    """A benchmark: ``setup(size)`` builds the state, ``run(state)`` is the measured operation.
+
+    ``ops`` is how many logical operations one ``run`` performs, so results
+    can also be reported per operation (e.g. per ``next_track`` call).
+    """
+
+    def __init__(self, name, setup, run, ops=1, teardown=None):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.ops = ops
+        self.teardown = teardown
+
+
+def measure(case, size, repeat=5):
+    """Run ``case`` at ``size`` in this process and return its result record."""
+    try:
+        state = case.setup(size)
+    except SkipCase as e:
+        return {'case': case.name, 'size': size, 'skipped': str(e)}
+    try:
+        gc.collect()
+        rss_before = peak_rss()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            case.run(state)
+            timings.append(time.perf_counter() - start)
+        rss_after = peak_rss()
+
+        # Allocation tracing slows the code down, so it gets its own untimed run
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            case.run(state)
+            current, peak = tracemalloc.get_traced_memory()
+            blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        finally:
+            tracemalloc.stop()
+    finally:
+        if case.teardown:
+            case.teardown(state)
+
+    median = statistics.median(timings)
+    return {
+        'case': case.name,
+        'size': size,
+        'repeat': repeat,
+        'ops': case.ops,
+        'min_seconds': min(timings),
+        'median_seconds': median,
+        'mean_seconds': statistics.mean(timings),
+        'per_op_seconds': median / case.ops,
+        # Growth of the process peak during the timed runs, i.e. beyond what setup needed
+        'peak_rss_bytes': None if rss_before is None else rss_after - rss_before,
+        'peak_rss_total_bytes': rss_after,
+        'alloc_peak_bytes': peak - before,
+        'alloc_retained_bytes': current - before,
+        'alloc_blocks': blocks
+    }
+
+
+def _measure_in_child(cases_module, case_name, size, repeat):
+    module = __import__(cases_module, fromlist=['CASES'])
+    return measure(module.CASES[case_name], size, repeat)
+
+
+def measure_isolated(cases_module, case_name, size, repeat=5):
+    """Like measure(), but in a fresh process so peak RSS is not skewed by earlier cases."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(_measure_in_child, (cases_module, case_name, size, repeat))
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+
+def save_results(path, results, meta=None):
+    data = {'meta': meta or environment(), 'results': results}
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Compare two result sets; returns (rows, regressions).
+
+    Each row is (case, size, metric, old, new, change) where change is the
+    relative difference; a regression is a row whose change exceeds
+    ``threshold`` (and, for memory, MIN_BYTES_CHANGE). Cases missing or
+    skipped on either side are ignored.
+    """
+    old_results = {(r['case'], r['size']): r for r in baseline['results']}
+    rows = []
+    regressions = []
+    for result in current['results']:
+        old = old_results.get((result['case'], result['size']))
+        if old is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            if before > 0:
+                change = (after - before) / before
+            else:
+                change = 0.0 if after <= 0 else float('inf')
+            row = (result['case'], result['size'], metric, before, after, change)
+            rows.append(row)
+            if change > threshold and (not metric.endswith('_bytes') or after - before >= MIN_BYTES_CHANGE):
+                regressions.append(row)
+    return rows, regressions
+
+
+def format_value(metric, value):
+    if value is None:
+        return '-'
+    if metric.endswith('_seconds'):
+        if value < 1e-3:
+            return f"{value * 1e6:.1f} us"
+        if value < 1:
+            return f"{value * 1e3:.2f} ms"
+        return f"{value:.2f} s"
+    if metric.endswith('_bytes'):
+        for unit in ('B', 'KB', 'MB'):
+            if abs(value) < 1024:
+                return f"{value:.0f} {unit}"
+            value /= 1024
+        return f"{value:.1f} GB"
+    return str(value)
+
+
+def print_comparison(rows, regressions):
+    flagged = set(regressions)
+    for row in rows:
+        case, size, metric, before, after, change = row
+        mark = 'REGRESSION' if row in flagged else ''
+        print(f"{case:<32} {size:>8} {metric:<18} {format_value(metric, before):>10} -> "
+              f"{format_value(metric, after):>10} {change:+7.1%} {mark}")
@@ -0,0 +1,351 @@
+"""Concurrent HTTP load test for the web API.
+
+Starts the Flask app on a local threaded server with a stand-in audio
+backend and a synthetic library, then runs N simulated browser clients
+that follow app.js: an initial status/track/directory load, a status poll
+every second, occasional track-page fetches (scrolling) and occasional
+control clicks through /api/batch. Reports throughput and p50/p95/p99
+latency per endpoint.
+
+    python -m benchmarks.load_test --clients 50 --duration 30 --output load.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import threading
+import http.client
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from . import harness
+from .cases import load_server, workdir, WORKDIR_ENV
+from .synthetic import generate_tree
+
+STATUS_POLL_INTERVAL = 1.0
+TRACK_PAGE_SIZE = 200
+# Mean seconds between a client's scrolls and control clicks
+SCROLL_INTERVAL = 5.0
+CONTROL_INTERVAL = 10.0
+CONTROL_ACTIONS = ('toggle', 'next', 'previous', 'play', 'volume', 'mute')
+STAND_IN_TRACK_SECONDS = 180.0
+
+
+class StandInMusic:
+    """Replacement for pygame.mixer.music that keeps time instead of making sound."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._started = None
+        self._paused_at = None
+        self._volume = 1.0
+
+    def load(self, source, namehint=None):
+        with self._lock:
+            self._loaded = source
+            self._started = None
+            self._paused_at = None
+
+    def play(self, start=0.0):
+        with self._lock:
+            self._started = time.monotonic() - start
+            self._paused_at = None
+
+    def pause(self):
+        with self._lock:
+            if self._started is not None and self._paused_at is None:
+                self._paused_at = time.monotonic()
+
+    def unpause(self):
+        with self._lock:
+            if self._paused_at is not None:
+                self._started += time.monotonic() - self._paused_at
+                self._paused_at = None
+
+    def stop(self):
+        with self._lock:
+            self._started = None
+            self._paused_at = None
+
+    def _elapsed(self):
+        if self._started is None:
+            return None
+        return (self._paused_at or time.monotonic()) - self._started
+
+    def get_busy(self):
+        with self._lock:
+            elapsed = self._elapsed()
+            return self._paused_at is None and elapsed is not None and elapsed < STAND_IN_TRACK_SECONDS
+
+    def get_pos(self):
+        with self._lock:
+            elapsed = self._elapsed()
+            return -1 if elapsed is None else int(elapsed * 1000)
+
+    def set_volume(self, volume):
+        self._volume = volume
+
+    def get_volume(self):
+        return self._volume
+
+
+class StandInMixer:
+    def __init__(self):
+        self.music = StandInMusic()
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def quit(self):
+        pass
+
+
+class StandInPygame:
+    """The subset of pygame used by AudioPlayer."""
+    error = RuntimeError
+
+    def __init__(self):
+        self.mixer = StandInMixer()
+
+
+def start_server(tracks, host='127.0.0.1', port=0):
+    """Import the app with the stand-in backend, load ``tracks`` and serve it; returns (server, url)."""
+    from werkzeug.serving import make_server
+    from myspot.audio import player as player_module
+    player_module.pygame = StandInPygame()
+    from myspot.web import server
+    load_server(server, os.path.dirname(os.path.commonpath(tracks)), tracks)
+
+    # Per-request access logging would dominate the measured latency
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    http_server = make_server(host, port, server.app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    return http_server, f"http://{host}:{http_server.server_port}"
+
+
+class Recorder:
+    """Thread-safe per-endpoint latency and error log."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            if ok:
+                self.latencies[endpoint].append(seconds)
+            else:
+                self.errors[endpoint] += 1
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    # Nearest-rank method: the smallest value with at least ``fraction`` of the samples at or below it
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class BrowserClient(threading.Thread):
+    """One simulated browser tab running the app.js request pattern."""
+
+    def __init__(self, host, port, recorder, deadline, seed):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.recorder = recorder
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.connection = None
+        self.version = 0
+        self.total_tracks = 0
+
+    def request(self, method, path, body=None, endpoint=None):
+        endpoint = endpoint or f"{method} {path.split('?')[0]}"
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            # Browsers reconnect transparently; so do we, but the request counts as failed
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            self.recorder.record(endpoint, time.perf_counter() - start, False)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - start, ok)
+        if ok and response.status == 200 and data:
+            return json.loads(data)
+        return None
+
+    def fetch_status(self):
+        data = self.request('GET', f'/api/status?since={self.version}')
+        if data:
+            self.version = data.get('version', self.version)
+            self.total_tracks = data.get('total_tracks', self.total_tracks)
+
+    def fetch_page(self, page):
+        self.request('GET', f'/api/tracks?offset={page * TRACK_PAGE_SIZE}&limit={TRACK_PAGE_SIZE}')
+
+    def click(self):
+        action = self.rng.choice(CONTROL_ACTIONS)
+        command = {'action': action}
+        if action == 'play':
+            command['index'] = self.rng.randrange(max(self.total_tracks, 1))
+        elif action == 'volume':
+            command['volume'] = round(self.rng.random(), 2)
+        data = self.request('POST', '/api/batch', {'commands': [command]}, endpoint=f"POST /api/batch ({action})")
+        if data and data.get('status'):
+            self.version = data['status'].get('version', self.version)
+
+    def run(self):
+        self.fetch_status()
+        self.fetch_page(0)
+        self.request('GET', '/api/directory')
+        now = time.monotonic()
+        next_poll = now + STATUS_POLL_INTERVAL
+        next_scroll = now + self.rng.expovariate(1 / SCROLL_INTERVAL)
+        next_click = now + self.rng.expovariate(1 / CONTROL_INTERVAL)
+        while True:
+            wake = min(next_poll, next_scroll, next_click)
+            if wake >= self.deadline:
+                break
+            time.sleep(max(0.0, wake - time.monotonic()))
+            now = time.monotonic()
+            if now >= next_poll:
+                self.fetch_status()
+                next_poll += STATUS_POLL_INTERVAL
+            if now >= next_scroll:
+                pages = max(1, -(-self.total_tracks // TRACK_PAGE_SIZE))
+                self.fetch_page(self.rng.randrange(pages))
+                next_scroll = now + self.rng.expovariate(1 / SCROLL_INTERVAL)
+            if now >= next_click:
+                self.click()
+                next_click = now + self.rng.expovariate(1 / CONTROL_INTERVAL)
+        if self.connection is not None:
+            self.connection.close()
+
+
+def run_load(url, clients, duration, ramp_up=1.0, seed=0):
+    """Drive ``clients`` simulated browsers against ``url`` for ``duration`` seconds."""
+    address = url.split('://', 1)[-1].rstrip('/')
+    host, _, port = address.partition(':')
+    recorder = Recorder()
+    start = time.monotonic()
+    deadline = start + duration
+    threads = []
+    for i in range(clients):
+        client = BrowserClient(host, int(port or 80), recorder, deadline, seed + i)
+        threads.append(client)
+        client.start()
+        # Stagger start-up like tabs opened one after another
+        time.sleep(ramp_up / clients)
+    for client in threads:
+        client.join()
+    return summarize(recorder, time.monotonic() - start, clients)
+
+
+def summarize(recorder, elapsed, clients):
+    results = []
+    for endpoint in sorted(set(recorder.latencies) | set(recorder.errors)):
+        latencies = sorted(recorder.latencies.get(endpoint, []))
+        count = len(latencies)
+        results.append({
+            'case': endpoint,
+            'size': clients,
+            'requests': count,
+            'errors': recorder.errors.get(endpoint, 0),
+            'throughput': count / elapsed if elapsed > 0 else 0.0,
+            'mean_seconds': sum(latencies) / count if count else None,
+            # median_seconds makes the records comparable with harness.compare()
+            'median_seconds': percentile(latencies, 0.50),
+            'p95_seconds': percentile(latencies, 0.95),
+            'p99_seconds': percentile(latencies, 0.99),
+            'max_seconds': latencies[-1] if latencies else None
+        })
+    return results
+
+
+def print_summary(results, elapsed):
+    total = sum(r['requests'] for r in results)
+    errors = sum(r['errors'] for r in results)
+    print(f"{'endpoint':<32} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for r in results:
+        print(f"{r['case']:<32} {r['requests']:>7} {r['errors']:>5} {r['throughput']:>8.1f} "
+              f"{harness.format_value('p50_seconds', r['median_seconds']):>10} "
+              f"{harness.format_value('p95_seconds', r['p95_seconds']):>10} "
+              f"{harness.format_value('p99_seconds', r['p99_seconds']):>10}")
+    print(f"{'total':<32} {total:>7} {errors:>5} {total / elapsed:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load_test',
+                                     description='Simulate concurrent browser clients against the web API')
+    parser.add_argument('--clients', type=int, default=20, help='Simulated browser tabs (default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds to run (default: %(default)s)')
+    parser.add_argument('--tracks', type=int, default=5000,
+                        help='Files in the synthetic library the server loads (default: %(default)s)')
+    parser.add_argument('--ramp-up', type=float, default=1.0, help='Seconds over which clients start')
+    parser.add_argument('--url', help='Target an already running server instead of starting one')
+    parser.add_argument('--workdir', help='Where the synthetic library is generated and reused')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against an earlier results file')
+    parser.add_argument('--threshold', type=float, default=harness.DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.workdir:
+        os.environ[WORKDIR_ENV] = os.path.abspath(args.workdir)
+    http_server = None
+    url = args.url
+    if url is None:
+        from myspot.playlist import utils as playlist_utils
+        from myspot.playlist.playlist import PlaylistManager
+        root = os.path.join(workdir(), f"tree-{args.tracks}")
+        generate_tree(root, args.tracks)
+        tracks = playlist_utils.scan_audio_files(root, PlaylistManager.SUPPORTED_FORMATS)
+        try:
+            http_server, url = start_server(tracks)
+        except ImportError as e:
+            print(f"Cannot start the web server: {e}", file=sys.stderr)
+            return 2
+        print(f"Serving {len(tracks)} tracks at {url}", file=sys.stderr)
+
+    print(f"Running {args.clients} clients for {args.duration:.0f}s...", file=sys.stderr)
+    start = time.monotonic()
+    try:
+        results = run_load(url, args.clients, args.duration, args.ramp_up, args.seed)
+    finally:
+        if http_server is not None:
+            http_server.shutdown()
+    print_summary(results, time.monotonic() - start)
+
+    current = {'meta': dict(harness.environment(), clients=args.clients, duration=args.duration,
+                            tracks=args.tracks), 'results': results}
+    if args.output:
+        harness.save_results(args.output, results, current['meta'])
+    if args.compare:
+        rows, regressions = harness.compare(harness.load_results(args.compare), current, args.threshold)
+        print()
+        harness.print_comparison(rows, regressions)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
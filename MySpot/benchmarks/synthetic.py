@@ -0,0 +1,97 @@
+"""Synthetic music libraries for the benchmarks.
+
+``generate_tree`` writes a directory tree of empty stub files (what the
+scanner sees is only names, so content does not matter); ``synthetic_paths``
+produces the same kind of paths in memory for benchmarks that never touch
+the disk.
+"""
+import os
+import json
+import random
+import argparse
+
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.ogg', '.m4a', '.wav')
+OTHER_EXTENSIONS = ('.jpg', '.txt', '.cue')
+MARKER_FILE = '.myspot-synthetic.json'
+WORDS = ('love', 'night', 'blue', 'fire', 'dream', 'city', 'heart', 'rain', 'summer', 'light',
+         'shadow', 'river', 'gold', 'stone', 'wild', 'electric', 'ghost', 'ocean', 'road', 'star')
+
+
+def _name(rng, words=3):
+    return ' '.join(rng.choice(WORDS).capitalize() for _ in range(words))
+
+
+def _leaf_dirs(root, depth, fanout, rng):
+    """Relative leaf directories of a tree ``depth`` levels deep with ``fanout`` children each."""
+    dirs = ['']
+    for level in range(depth):
+        dirs = [os.path.join(parent, f"{_name(rng, 2)} {level}-{i}") for parent in dirs for i in range(fanout)]
+    return [os.path.join(root, d) for d in dirs]
+
+
+def _file_names(count, rng, other_ratio):
+    for i in range(count):
+        if rng.random() < other_ratio:
+            ext = rng.choice(OTHER_EXTENSIONS)
+        else:
+            ext = rng.choice(AUDIO_EXTENSIONS)
+        yield f"{i % 100:02d} {_name(rng)}{ext}"
+
+
+def synthetic_paths(count, root='/music', depth=3, fanout=10, seed=0):
+    """Return ``count`` audio file paths spread over a synthetic tree, without touching disk."""
+    rng = random.Random(seed)
+    leaves = _leaf_dirs(root, depth, fanout, rng)
+    return [os.path.join(leaves[i % len(leaves)], name)
+            for i, name in enumerate(_file_names(count, rng, other_ratio=0.0))]
+
+
+def generate_tree(root, files, depth=3, fanout=10, other_ratio=0.1, seed=0):
+    """Create ``files`` empty stub files under ``root``; reuses a tree made with the same parameters.
+
+    Returns the number of audio files in the tree.
+    """
+    params = {'files': files, 'depth': depth, 'fanout': fanout, 'other_ratio': other_ratio, 'seed': seed}
+    marker = os.path.join(root, MARKER_FILE)
+    if os.path.exists(marker):
+        with open(marker) as f:
+            existing = json.load(f)
+        if existing.get('params') == params:
+            return existing['audio_files']
+        raise ValueError(f"{root} holds a synthetic tree with different parameters: {existing.get('params')}")
+    if os.path.isdir(root) and os.listdir(root):
+        raise ValueError(f"Refusing to generate a synthetic tree in non-empty directory {root}")
+
+    rng = random.Random(seed)
+    leaves = _leaf_dirs(root, depth, fanout, rng)
+    audio_files = 0
+    created = set()
+    for i, name in enumerate(_file_names(files, rng, other_ratio)):
+        directory = leaves[i % len(leaves)]
+        if directory not in created:
+            os.makedirs(directory, exist_ok=True)
+            created.add(directory)
+        open(os.path.join(directory, name), 'wb').close()
+        if name.endswith(AUDIO_EXTENSIONS):
+            audio_files += 1
+
+    with open(marker, 'w') as f:
+        json.dump({'params': params, 'audio_files': audio_files}, f)
+    return audio_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic music tree of empty stub files')
+    parser.add_argument('root', help='Directory to create the tree in (must be empty or absent)')
+    parser.add_argument('--files', type=int, default=10000, help='Number of files (up to 1M)')
+    parser.add_argument('--depth', type=int, default=3, help='Directory levels below the root')
+    parser.add_argument('--fanout', type=int, default=10, help='Subdirectories per directory')
+    parser.add_argument('--other-ratio', type=float, default=0.1, help='Share of non-audio files')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    audio_files = generate_tree(args.root, args.files, args.depth, args.fanout, args.other_ratio, args.seed)
+    print(f"{args.root}: {args.files} files, {audio_files} audio")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Wake-word stage benchmark on WAV fixtures.
+
+Streams every clip of a fixture directory through WakeWordDetector in the
+batches the recognizer worker uses, once per CPU budget, and reports the
+detection rate on clips containing the wake word, false alarms per hour
+on clips without it, the processing share of one core and the per-batch
+latency. A fixture directory holds recordings in three subdirectories:
+
+    templates/   a few recordings of the wake word alone
+    positive/    clips that contain the wake word
+    negative/    clips that do not (other speech, music, room noise)
+
+Without --fixtures a synthetic set is generated (and reused) in the
+benchmark workdir: formant-shaped harmonic "syllables" with varying
+tempo, pitch and noise, which exercises the same code paths.
+
+    python -m benchmarks.wakeword --fixtures recordings/ --budgets 0.02,0.05,0.2
+"""
+import os
+import sys
+import time
+import wave
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from . import harness
+from .cases import workdir, WORKDIR_ENV
+from myspot.voice.recognizer import read_wav, VoiceRecognizer
+from myspot.voice.wakeword import WakeWordDetector
+
+SAMPLE_RATE = 16000
+BATCH_SECONDS = VoiceRecognizer.POLL_SECONDS
+DEFAULT_BUDGETS = (0.01, 0.05, 0.25)
+# (F1, F2, seconds) per syllable
+WAKE_WORD = ((700, 1200, 0.16), (300, 2300, 0.12), (500, 900, 0.2))
+OTHER_SYLLABLES = ((800, 1300), (400, 2000), (300, 900), (600, 1700), (350, 2600), (700, 1100))
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.asarray(samples, dtype='<i2').tobytes())
+
+
+def syllable(f1, f2, seconds, pitch, rng, sample_rate=SAMPLE_RATE):
+    """A voiced vowel-like sound: harmonics of ``pitch`` weighted by two formant peaks."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    harmonics = np.arange(pitch, sample_rate / 2, pitch)
+    weights = np.exp(-((harmonics - f1) / 150.0) ** 2) + 0.6 * np.exp(-((harmonics - f2) / 200.0) ** 2)
+    phases = rng.uniform(0, 2 * np.pi, len(harmonics))
+    sound = (weights[:, None] * np.sin(2 * np.pi * harmonics[:, None] * t + phases[:, None])).sum(axis=0)
+    envelope = np.minimum(1.0, np.minimum(t, t[-1] - t) / 0.02)
+    return sound * envelope / max(np.abs(sound).max(), 1e-9)
+
+
+def utterance(syllables, rng, tempo=1.0, pitch=None):
+    pitch = pitch or rng.uniform(100, 220)
+    parts = [syllable(f1, f2, seconds * tempo, pitch * rng.uniform(0.97, 1.03), rng) for f1, f2, seconds in syllables]
+    return np.concatenate(parts)
+
+
+def clip(speech, rng, seconds=2.5, level=0.3, noise_db=-60.0):
+    """Place ``speech`` at a random offset in ``seconds`` of background noise; int16."""
+    total = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0.0, 10 ** (noise_db / 20.0), total)
+    start = int(rng.integers(SAMPLE_RATE // 4, max(SAMPLE_RATE // 4 + 1, total - len(speech) - SAMPLE_RATE // 4)))
+    audio[start:start + len(speech)] += speech[:total - start] * level
+    return np.clip(audio * 32767, -32768, 32767).astype(np.int16)
+
+
+def generate_fixtures(root, templates=3, positives=20, negatives=20, seed=0):
+    """Write a synthetic fixture set to ``root`` unless one is already there."""
+    if os.path.isdir(os.path.join(root, 'negative')):
+        return root
+    rng = np.random.default_rng(seed)
+    for name in ('templates', 'positive', 'negative'):
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+    for i in range(templates):
+        speech = utterance(WAKE_WORD, rng, tempo=rng.uniform(0.9, 1.1))
+        write_wav(os.path.join(root, 'templates', f"wake-{i:02d}.wav"), clip(speech, rng, seconds=1.2))
+    for i in range(positives):
+        speech = utterance(WAKE_WORD, rng, tempo=rng.uniform(0.8, 1.2))
+        write_wav(os.path.join(root, 'positive', f"positive-{i:03d}.wav"),
+                  clip(speech, rng, level=rng.uniform(0.1, 0.6), noise_db=rng.uniform(-65, -40)))
+    for i in range(negatives):
+        count = int(rng.integers(2, 5))
+        picks = rng.choice(len(OTHER_SYLLABLES), count)
+        other = [(*OTHER_SYLLABLES[p], rng.uniform(0.1, 0.25)) for p in picks]
+        write_wav(os.path.join(root, 'negative', f"negative-{i:03d}.wav"),
+                  clip(utterance(other, rng), rng, level=rng.uniform(0.1, 0.6), noise_db=rng.uniform(-65, -40)))
+    return root
+
+
+def wav_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith('.wav'))
+
+
+def stream(detector, samples, batch_seconds=BATCH_SECONDS):
+    """Feed a clip in worker-sized batches of 30 ms frames; returns (detections, batch times)."""
+    frame_size = SAMPLE_RATE * VoiceRecognizer.FRAME_MS // 1000
+    frames = samples[:len(samples) - len(samples) % frame_size].reshape(-1, frame_size)
+    per_batch = max(1, int(batch_seconds * 1000) // VoiceRecognizer.FRAME_MS)
+    detections = 0
+    times = []
+    for start in range(0, len(frames), per_batch):
+        began = time.perf_counter()
+        detections += bool(detector.feed(frames[start:start + per_batch]))
+        times.append(time.perf_counter() - began)
+    return detections, times
+
+
+def run_budget(fixtures, budget, threshold=None):
+    detector = WakeWordDetector.from_wavs([os.path.join(fixtures, 'templates')], SAMPLE_RATE,
+                                          threshold=threshold, cpu_budget=budget)
+    outcome = {}
+    times = []
+    for kind in ('positive', 'negative'):
+        clips = wav_files(os.path.join(fixtures, kind))
+        hits = 0
+        seconds = 0.0
+        for path in clips:
+            samples = read_wav(path, SAMPLE_RATE)
+            # Each clip stands alone
+            detector.reset()
+            detections, clip_times = stream(detector, samples)
+            hits += detections if kind == 'negative' else min(detections, 1)
+            seconds += len(samples) / SAMPLE_RATE
+            times.extend(clip_times)
+        outcome[kind] = (hits, len(clips), seconds)
+    times.sort()
+    hits, clips, _ = outcome['positive']
+    false_alarms, _, negative_seconds = outcome['negative']
+    return {
+        'case': 'wakeword',
+        'size': budget,
+        'threshold': detector.threshold,
+        'detection_rate': hits / clips if clips else None,
+        'false_alarms': false_alarms,
+        'false_alarms_per_hour': false_alarms * 3600.0 / negative_seconds if negative_seconds else None,
+        'cpu_share': detector.cpu_share(),
+        'final_stride': detector.stride,
+        # median_seconds (per batch) makes the records comparable with harness.compare()
+        'median_seconds': times[len(times) // 2] if times else None,
+        'max_seconds': times[-1] if times else None
+    }
+
+
+def print_summary(results):
+    print(f"{'budget':>8} {'threshold':>10} {'detect':>8} {'FA/hour':>9} {'cpu':>8} {'stride':>7} "
+          f"{'p50 batch':>10} {'max batch':>10}")
+    for r in results:
+        rate = '-' if r['detection_rate'] is None else f"{r['detection_rate']:.0%}"
+        alarms = '-' if r['false_alarms_per_hour'] is None else f"{r['false_alarms_per_hour']:.1f}"
+        print(f"{r['size']:>8} {r['threshold']:>10.2f} {rate:>8} {alarms:>9} {r['cpu_share']:>8.2%} "
+              f"{r['final_stride']:>7} {harness.format_value('median_seconds', r['median_seconds']):>10} "
+              f"{harness.format_value('max_seconds', r['max_seconds']):>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.wakeword',
+                                     description='Measure accuracy and CPU cost of the wake-word stage')
+    parser.add_argument('--fixtures', help='Directory with templates/, positive/ and negative/ WAV files '
+                                           '(default: a generated synthetic set)')
+    parser.add_argument('--budgets', default=','.join(str(b) for b in DEFAULT_BUDGETS),
+                        help='Comma-separated CPU budgets to try (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, help='Fixed match threshold instead of calibrating it')
+    parser.add_argument('--workdir', help='Where the synthetic fixtures are generated and reused')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against an earlier results file')
+    parser.add_argument('--threshold-regression', type=float, default=harness.DEFAULT_THRESHOLD,
+                        help='Relative slowdown reported as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.workdir:
+        os.environ[WORKDIR_ENV] = os.path.abspath(args.workdir)
+    fixtures = args.fixtures or generate_fixtures(os.path.join(workdir(), f"wakeword-{args.seed}"), seed=args.seed)
+    if not wav_files(os.path.join(fixtures, 'templates')):
+        print(f"No wake word templates in {os.path.join(fixtures, 'templates')}", file=sys.stderr)
+        return 2
+    budgets = [float(b) for b in args.budgets.split(',') if b.strip()]
+
+    results = [run_budget(fixtures, budget, args.threshold) for budget in budgets]
+    print_summary(results)
+
+    current = {'meta': dict(harness.environment(), fixtures=os.path.abspath(fixtures)), 'results': results}
+    if args.output:
+        harness.save_results(args.output, results, current['meta'])
+    if args.compare:
+        rows, regressions = harness.compare(harness.load_results(args.compare), current, args.threshold_regression)
+        print()
+        harness.print_comparison(rows, regressions)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+from .decoder import DecodeError, open_audio, iter_chunks
+from .loudness import LoudnessMeter, track_gain
+from .silence import SilenceMeter
+from .features import FeatureMeter
+from .pipeline import analyze_track, analyze_paths
+from .store import AnalysisStore
+from .peaks import PeakMeter, PeaksCache, compute_peaks
+from .similarity import SimilarityIndex, feature_vector
+
+__all__ = ['DecodeError', 'open_audio', 'iter_chunks', 'LoudnessMeter', 'track_gain', 'SilenceMeter',
+           'FeatureMeter', 'analyze_track', 'analyze_paths', 'AnalysisStore', 'PeakMeter', 'PeaksCache', 'compute_peaks',
+           'SimilarityIndex', 'feature_vector']
\ No newline at end of file
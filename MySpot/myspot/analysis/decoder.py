@@ -0,0 +1,125 @@
+import os
+import wave
+import shutil
+import logging
+import subprocess
+import numpy as np
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+logger = logging.getLogger(__name__)
+CHUNK_SECONDS = 10.0
+FFMPEG_SAMPLE_RATE = 48000
+FFMPEG_CHANNELS = 2
+class DecodeError(Exception):
+    pass
+class WavStream:
+    """PCM WAV files through the standard library."""
+    def __init__(self, path):
+        try:
+            self._wav = wave.open(path, 'rb')
+        except (wave.Error, EOFError) as e:
+            raise DecodeError(f"Not a readable WAV file: {e}")
+        self.sample_rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self._width = self._wav.getsampwidth()
+        if self._width not in (1, 2, 3, 4):
+            self._wav.close()
+            raise DecodeError(f"Unsupported WAV sample width: {self._width} bytes")
+    def chunks(self, frames):
+        while True:
+            data = self._wav.readframes(frames)
+            if not data:
+                return
+            yield self._to_float(data)
+    def _to_float(self, data):
+        if self._width == 1:
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif self._width == 2:
+            samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+        elif self._width == 3:
+            # Widen each little-endian 24-bit sample to 32 bits (low byte zero)
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+            padded = np.zeros((len(raw), 4), dtype=np.uint8)
+            padded[:, 1:] = raw
+            samples = padded.view('<i4').reshape(-1).astype(np.float32) / 2147483648.0
+        else:
+            samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648.0
+        return samples.reshape(-1, self.channels)
+    def close(self):
+        self._wav.close()
+class SoundFileStream:
+    """FLAC, OGG, WAV and (with libsndfile 1.1+) MP3 through the optional soundfile package."""
+    def __init__(self, path):
+        try:
+            self._file = soundfile.SoundFile(path)
+        except RuntimeError as e:
+            raise DecodeError(str(e))
+        self.sample_rate = self._file.samplerate
+        self.channels = self._file.channels
+    def chunks(self, frames):
+        return self._file.blocks(blocksize=frames, dtype='float32', always_2d=True)
+    def close(self):
+        self._file.close()
+class FFmpegStream:
+    """Anything ffmpeg can read, streamed as raw float PCM from a subprocess."""
+    def __init__(self, path, executable):
+        self.sample_rate = FFMPEG_SAMPLE_RATE
+        self.channels = FFMPEG_CHANNELS
+        command = [executable, '-v', 'error', '-nostdin', '-i', path, '-f', 'f32le',
+                   '-ac', str(self.channels), '-ar', str(self.sample_rate), '-']
+        try:
+            self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            raise DecodeError(f"Cannot run ffmpeg: {e}")
+    def chunks(self, frames):
+        size = frames * self.channels * 4
+        while True:
+            data = self._process.stdout.read(size)
+            if not data:
+                break
+            usable = len(data) - len(data) % (self.channels * 4)
+            yield np.frombuffer(data[:usable], dtype='<f4').reshape(-1, self.channels)
+        if self._process.wait() != 0:
+            raise DecodeError(self._process.stderr.read().decode('utf-8', 'replace').strip() or "ffmpeg failed")
+    def close(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process.stdout.close()
+        self._process.stderr.close()
+def open_audio(path):
+    """Open ``path`` for chunked decoding with the first backend that can read it.
+
+    WAV needs nothing extra; other formats use soundfile when it is
+    installed and fall back to an ffmpeg executable on the PATH.
+    """
+    if not os.path.isfile(path):
+        raise DecodeError(f"File not found: {path}")
+    errors = []
+    if path.lower().endswith('.wav'):
+        try:
+            return WavStream(path)
+        except DecodeError as e:
+            errors.append(str(e))
+    if soundfile is not None:
+        try:
+            return SoundFileStream(path)
+        except DecodeError as e:
+            errors.append(str(e))
+    executable = shutil.which('ffmpeg')
+    if executable:
+        return FFmpegStream(path, executable)
+    if not errors:
+        errors.append("no decoder available (install soundfile or ffmpeg)")
+    raise DecodeError(f"Cannot decode {path}: {'; '.join(errors)}")
+def iter_chunks(path, chunk_seconds=CHUNK_SECONDS):
+    """Yield (sample_rate, float32 (frames, channels) chunk) pairs covering the whole file."""
+    stream = open_audio(path)
+    try:
+        frames = max(1, int(stream.sample_rate * chunk_seconds))
+        for chunk in stream.chunks(frames):
+            yield stream.sample_rate, chunk
+    finally:
+        stream.close()
@@ -0,0 +1,122 @@
+import math
+import numpy as np
+# ~23 ms frames at 44.1/48 kHz with 50% overlap
+FRAME_SECONDS = 0.023
+MIN_BPM = 60.0
+MAX_BPM = 200.0
+# Tempo prior: log-normal around 120 BPM, one octave wide, against double/half-tempo picks
+PRIOR_BPM = 120.0
+PRIOR_OCTAVES = 1.0
+# Onset frames per autocorrelation window (~24 s); windows are summed, not kept
+TEMPO_WINDOW = 2048
+# Log-spaced bands of the spectral envelope that describes timbre
+TIMBRE_BANDS = 16
+TIMBRE_LOW = 50.0
+TIMBRE_HIGH = 16000.0
+class FeatureMeter:
+    """Tempo, RMS energy, spectral centroid and timbre of a stream of float PCM chunks.
+
+    Every chunk is cut into overlapping Hann-windowed frames of the mono
+    mix that go through one batched real FFT. The magnitudes feed the
+    centroid sums, per-band log power sums and a spectral-flux onset envelope; the envelope is
+    autocorrelated per fixed window and only the summed autocorrelation is
+    kept, so memory stays bounded however long the track is.
+    """
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.frame = 2 ** max(6, int(round(math.log2(sample_rate * FRAME_SECONDS))))
+        self.hop = self.frame // 2
+        self.rate = sample_rate / self.hop
+        self.min_lag = max(1, int(math.floor(self.rate * 60 / MAX_BPM)))
+        self.max_lag = int(math.ceil(self.rate * 60 / MIN_BPM))
+        self._window = np.hanning(self.frame).astype(np.float32)
+        self._frequencies = np.fft.rfftfreq(self.frame, 1 / sample_rate)
+        edges = np.geomspace(TIMBRE_LOW, min(TIMBRE_HIGH, sample_rate / 2), TIMBRE_BANDS + 1)
+        band = np.searchsorted(edges, self._frequencies, side='right') - 1
+        # One-hot bin-to-band matrix; bins outside the covered range belong to no band
+        self._bands = (band[:, None] == np.arange(TIMBRE_BANDS)).astype(np.float32)
+        self._band_log_sum = np.zeros(TIMBRE_BANDS)
+        self._frames = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._previous = None
+        self._onsets = []
+        self._onset_count = 0
+        self._autocorrelation = np.zeros(2 * self.max_lag + 3)
+        self._square_sum = 0.0
+        self._samples = 0
+        self._weighted_frequency = 0.0
+        self._magnitude = 0.0
+    def feed(self, chunk):
+        self._square_sum += float(np.einsum('ij,ij->', chunk, chunk, dtype=np.float64)) / chunk.shape[1]
+        self._samples += len(chunk)
+        samples = np.concatenate((self._pending, chunk.mean(axis=1)))
+        count = (len(samples) - self.frame) // self.hop + 1 if len(samples) >= self.frame else 0
+        if count:
+            frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame)[::self.hop][:count]
+            magnitudes = np.abs(np.fft.rfft(frames * self._window, axis=1))
+            self._weighted_frequency += float((magnitudes @ self._frequencies).sum())
+            self._magnitude += float(magnitudes.sum())
+            band_power = (magnitudes.astype(np.float32) ** 2) @ self._bands
+            self._band_log_sum += np.log10(band_power + 1e-10).sum(axis=0)
+            self._frames += count
+            compressed = np.log1p(100.0 * magnitudes)
+            previous = compressed[:1] if self._previous is None else self._previous
+            flux = np.maximum(np.diff(np.concatenate((previous, compressed)), axis=0), 0.0).sum(axis=1)
+            self._previous = compressed[-1:]
+            self._add_onsets(flux)
+        self._pending = samples[count * self.hop:]
+    def _add_onsets(self, flux):
+        self._onsets.append(flux)
+        self._onset_count += len(flux)
+        if self._onset_count < TEMPO_WINDOW:
+            return
+        onsets = np.concatenate(self._onsets)
+        full = len(onsets) // TEMPO_WINDOW * TEMPO_WINDOW
+        for start in range(0, full, TEMPO_WINDOW):
+            self._correlate(onsets[start:start + TEMPO_WINDOW])
+        self._onsets = [onsets[full:]]
+        self._onset_count = len(onsets) - full
+    def _correlate(self, envelope):
+        if len(envelope) <= 4 * self.max_lag:
+            return
+        envelope = envelope - envelope.mean()
+        spectrum = np.fft.rfft(envelope, 2 * len(envelope))
+        self._autocorrelation += np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2)[:len(self._autocorrelation)]
+    def tempo(self):
+        """Beats per minute from the strongest (prior-weighted) onset periodicity, or None."""
+        if self._onset_count:
+            self._correlate(np.concatenate(self._onsets))
+            self._onsets = []
+            self._onset_count = 0
+        # Summing neighbours keeps beat periods that fall between two lags from being split
+        correlation = np.convolve(self._autocorrelation, np.ones(3), mode='same')
+        lags = np.arange(self.min_lag, self.max_lag + 1)
+        prior = np.exp(-0.5 * (np.log2(60 * self.rate / lags / PRIOR_BPM) / PRIOR_OCTAVES) ** 2)
+        # A true beat period also repeats at twice its lag, which half-tempo candidates lack
+        scores = (correlation[lags] + 0.5 * correlation[2 * lags]) * prior
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            return None
+        # Parabolic interpolation between neighbouring lags
+        lag = float(lags[best])
+        left, middle, right = correlation[lags[best] - 1], correlation[lags[best]], correlation[lags[best] + 1]
+        curvature = left - 2 * middle + right
+        if curvature < 0:
+            lag += 0.5 * (left - right) / curvature
+        return 60 * self.rate / lag
+    def energy(self):
+        """RMS level in dBFS averaged over channels, or None for digital silence."""
+        if not self._samples or self._square_sum <= 0:
+            return None
+        return 10 * math.log10(self._square_sum / self._samples)
+    def centroid(self):
+        """Magnitude-weighted mean frequency in Hz, or None."""
+        if self._magnitude <= 0:
+            return None
+        return self._weighted_frequency / self._magnitude
+    def timbre(self):
+        """Mean power per band in dB relative to the average band (the spectral shape), or None."""
+        if not self._frames or self._magnitude <= 0:
+            return None
+        levels = 10 * self._band_log_sum / self._frames
+        return (levels - levels.mean()).astype(np.float32)
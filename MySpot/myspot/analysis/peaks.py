@@ -0,0 +1,137 @@
+import os
+import struct
+import hashlib
+import logging
+import threading
+import numpy as np
+from .decoder import iter_chunks
+logger = logging.getLogger(__name__)
+PEAK_BUCKETS = 1000
+# Resolution of the single streaming pass; buckets are merged from these blocks
+BLOCK_SECONDS = 0.01
+class PeakMeter:
+    """Running min/max over fixed 10 ms blocks of a stream of float PCM chunks, all channels merged."""
+    def __init__(self, sample_rate, channels):
+        self.sample_rate = sample_rate
+        self.block = max(1, int(round(sample_rate * BLOCK_SECONDS)))
+        self.frames = 0
+        self._pending = np.zeros((0, channels), dtype=np.float32)
+        self._mins = []
+        self._maxs = []
+    def feed(self, chunk):
+        self.frames += len(chunk)
+        if len(self._pending):
+            chunk = np.concatenate((self._pending, chunk))
+        count = len(chunk) // self.block
+        if count:
+            blocks = chunk[:count * self.block].reshape(count, -1)
+            self._mins.append(blocks.min(axis=1))
+            self._maxs.append(blocks.max(axis=1))
+        self._pending = chunk[count * self.block:]
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+    def peaks(self, buckets=PEAK_BUCKETS):
+        """(mins, maxs) over at most ``buckets`` equal slices of the stream."""
+        mins, maxs = list(self._mins), list(self._maxs)
+        if len(self._pending):
+            mins.append(np.array([self._pending.min()]))
+            maxs.append(np.array([self._pending.max()]))
+        if not mins:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        mins, maxs = np.concatenate(mins), np.concatenate(maxs)
+        buckets = min(buckets, len(mins))
+        starts = np.linspace(0, len(mins), buckets, endpoint=False).astype(np.intp)
+        return np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+def compute_peaks(path, buckets=PEAK_BUCKETS):
+    """Decode ``path`` once: (duration in seconds, mins, maxs) with at most ``buckets`` entries."""
+    meter = None
+    for sample_rate, chunk in iter_chunks(path):
+        if meter is None:
+            meter = PeakMeter(sample_rate, chunk.shape[1])
+        meter.feed(chunk)
+    if meter is None:
+        return 0.0, np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    mins, maxs = meter.peaks(buckets)
+    return meter.duration, mins, maxs
+class PeaksCache:
+    """Waveform peaks per track, one small binary file each under config/peaks/.
+
+    A file is the 32-byte header (little endian: magic, format version,
+    reserved, bucket count, duration as float32, and the source file's size
+    and mtime) followed by one signed byte pair (min, max) per bucket,
+    scaled so 127 is full scale. The same bytes are what the web API
+    serves. Files are written on first use and rewritten when the source
+    file's size or mtime changes.
+    """
+    MAGIC = b'MSPK'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<4sHHIfQd')
+    def __init__(self, cache_dir='peaks', buckets=PEAK_BUCKETS):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.cache_dir = os.path.join(base_dir, 'config', cache_dir)
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._generating = {}
+    def cache_file(self, path):
+        return os.path.join(self.cache_dir, hashlib.sha1(path.encode('utf-8', 'surrogateescape')).hexdigest() + '.peaks')
+    def etag(self, path):
+        """Validator for the peaks of ``path`` as it is now; raises OSError when it cannot be read."""
+        stat = os.stat(path)
+        key = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{self.FORMAT_VERSION}\0{self.buckets}"
+        return hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()[:20]
+    def load(self, path):
+        """Cached peak bytes for ``path``, or None when missing or out of date."""
+        try:
+            stat = os.stat(path)
+            with open(self.cache_file(path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < self.HEADER.size:
+            return None
+        magic, version, _, buckets, _, size, mtime = self.HEADER.unpack_from(data)
+        if (magic, version) != (self.MAGIC, self.FORMAT_VERSION) or (size, mtime) != (stat.st_size, stat.st_mtime):
+            return None
+        if len(data) != self.HEADER.size + 2 * buckets:
+            return None
+        return data
+    def get(self, path):
+        """Peak bytes for ``path``, generating and caching them first if needed.
+
+        Raises DecodeError or OSError when the track cannot be read.
+        Concurrent requests for the same track share one decode.
+        """
+        data = self.load(path)
+        if data is not None:
+            return data
+        with self._lock:
+            lock = self._generating.setdefault(path, threading.Lock())
+        try:
+            with lock:
+                data = self.load(path)
+                if data is None:
+                    data = self._generate(path)
+            return data
+        finally:
+            with self._lock:
+                self._generating.pop(path, None)
+    def _generate(self, path):
+        stat = os.stat(path)
+        duration, mins, maxs = compute_peaks(path, self.buckets)
+        pairs = np.empty(2 * len(mins), dtype=np.int8)
+        pairs[0::2] = np.clip(np.round(mins * 127), -127, 127)
+        pairs[1::2] = np.clip(np.round(maxs * 127), -127, 127)
+        data = self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, 0, len(mins), duration,
+                                stat.st_size, stat.st_mtime) + pairs.tobytes()
+        cache_file = self.cache_file(path)
+        tmp_path = f"{cache_file}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cache_file)
+        except OSError as e:
+            # Still usable for this request, just not cached
+            logger.error(f"Error caching waveform peaks for {path}: {e}")
+        return data
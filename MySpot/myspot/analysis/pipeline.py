@@ -0,0 +1,98 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .decoder import iter_chunks, DecodeError
+from .loudness import LoudnessMeter
+from .features import FeatureMeter
+from .silence import SilenceMeter
+logger = logging.getLogger(__name__)
+def analyze_track(path):
+    """Decode ``path`` once and run every meter over it: (path, size, mtime, {field: value}).
+
+    Decoding goes chunk by chunk and every meter keeps fixed-size state,
+    so a worker's memory does not depend on the length of the track.
+
+    Fields are the AnalysisStore.FIELDS plus 'timbre', the per-band
+    spectral shape used for similarity search; values are None when they
+    could not be measured (a silent track has no loudness and no bounds).
+    Size and modification time are taken before decoding, so a file
+    rewritten meanwhile is seen as stale on the next pass.
+    """
+    stat = os.stat(path)
+    loudness = silence = features = None
+    sample_rate = 0
+    for sample_rate, chunk in iter_chunks(path):
+        if loudness is None:
+            loudness = LoudnessMeter(sample_rate, chunk.shape[1])
+            silence = SilenceMeter(sample_rate)
+            features = FeatureMeter(sample_rate)
+        loudness.feed(chunk)
+        silence.feed(chunk)
+        features.feed(chunk)
+    if loudness is None:
+        return path, stat.st_size, stat.st_mtime, {'peak': 0.0}
+    start, end = silence.bounds()
+    analysis = {'loudness': loudness.integrated(), 'peak': loudness.peak, 'duration': silence.frames / sample_rate,
+                'start': start, 'end': end, 'tempo': features.tempo(), 'energy': features.energy(),
+                'centroid': features.centroid(), 'timbre': features.timbre()}
+    return path, stat.st_size, stat.st_mtime, analysis
+def _executor(workers):
+    # Workers come from a fork server that only imported this module: forking the
+    # multithreaded server itself could copy a lock some other thread holds, and
+    # spawn would re-run the application's main module (mixer, server threads).
+    # Where there is no fork server, threads still overlap decoding and the FFT work
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return ProcessPoolExecutor(workers, mp_context=context)
+    return ThreadPoolExecutor(workers)
+def analyze_paths(paths, workers=None, job=None):
+    """Analyze ``paths`` in a worker pool, yielding analyze_track() results as they finish.
+
+    Tracks that cannot be decoded yield an empty analysis so they are not
+    retried until the file changes. ``job`` (a jobs.Job) is checked for
+    cancellation between results.
+    """
+    if workers is None:
+        workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+    if workers <= 1:
+        for path in paths:
+            if job is not None:
+                job.check_cancelled()
+            yield _report(_analyze_safely(path))
+        return
+    pending = set()
+    remaining = iter(paths)
+    executor = _executor(workers)
+    try:
+        while True:
+            # Keep a bounded number of tracks in flight so cancellation is quick
+            for path in remaining:
+                pending.add(executor.submit(_analyze_safely, path))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if job is not None:
+                    job.check_cancelled()
+                yield _report(future.result())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+def _analyze_safely(path):
+    # Runs in the workers, which leave logging to the parent: (result, error message or None)
+    try:
+        return analyze_track(path), None
+    except (DecodeError, OSError, ValueError) as e:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return (path, 0, 0.0, {}), str(e)
+        return (path, stat.st_size, stat.st_mtime, {}), str(e)
+def _report(outcome):
+    result, error = outcome
+    if error is not None:
+        logger.warning(f"Cannot analyze {result[0]}: {error}")
+    return result
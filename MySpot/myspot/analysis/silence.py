@@ -0,0 +1,24 @@
+import numpy as np
+# -60 dBFS: below the noise floor of most rips, above dither and encoder noise
+SILENCE_THRESHOLD = 10 ** (-60 / 20)
+class SilenceMeter:
+    """First and last sample above ``threshold`` on any channel of a stream of float PCM chunks."""
+    def __init__(self, sample_rate, threshold=SILENCE_THRESHOLD):
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frames = 0
+        self.first = None
+        self.last = None
+    def feed(self, chunk):
+        loud = (np.abs(chunk) > self.threshold).any(axis=1)
+        # argmax finds the first True; on the reversed mask, the last one
+        if loud.any():
+            if self.first is None:
+                self.first = self.frames + int(np.argmax(loud))
+            self.last = self.frames + len(loud) - 1 - int(np.argmax(loud[::-1]))
+        self.frames += len(chunk)
+    def bounds(self):
+        """(start, end) in seconds of the audible part, or (None, None) for a silent stream."""
+        if self.first is None:
+            return None, None
+        return self.first / self.sample_rate, (self.last + 1) / self.sample_rate
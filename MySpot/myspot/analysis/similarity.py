@@ -0,0 +1,280 @@
+import os
+import math
+import struct
+import logging
+import threading
+import numpy as np
+from .features import TIMBRE_BANDS
+logger = logging.getLogger(__name__)
+# Scale of each feature in a vector, so one unit of distance is about one audible step
+TIMBRE_SCALE_DB = 6.0
+TEMPO_SCALE_OCTAVES = 0.25
+ENERGY_SCALE_DB = 6.0
+CENTROID_SCALE_OCTAVES = 0.5
+# Stand-ins for features a track lacks (no steady beat, say)
+NEUTRAL_TEMPO = 120.0
+NEUTRAL_ENERGY = -20.0
+NEUTRAL_CENTROID = 2000.0
+DIMENSIONS = TIMBRE_BANDS + 3
+# Below this many tracks a full scan is exact and takes a few milliseconds
+IVF_MIN_TRACKS = 50000
+# Inverted lists scanned per query, nearest centroid first
+IVF_PROBES = 8
+IVF_TRAINING_SAMPLE = 20000
+IVF_ITERATIONS = 8
+# Rows assigned to centroids per step while building, bounding the distance matrix
+ASSIGN_CHUNK = 8192
+def feature_vector(analysis):
+    """float32 vector of an analyze_track() result, or None when it has no timbre."""
+    timbre = analysis.get('timbre')
+    if timbre is None:
+        return None
+    vector = np.empty(DIMENSIONS, dtype=np.float32)
+    vector[:TIMBRE_BANDS] = np.asarray(timbre, dtype=np.float32) / TIMBRE_SCALE_DB
+    tempo = analysis.get('tempo') or NEUTRAL_TEMPO
+    energy = analysis.get('energy')
+    centroid = analysis.get('centroid') or NEUTRAL_CENTROID
+    vector[TIMBRE_BANDS] = math.log2(tempo / NEUTRAL_TEMPO) / TEMPO_SCALE_OCTAVES
+    vector[TIMBRE_BANDS + 1] = ((NEUTRAL_ENERGY if energy is None else energy) - NEUTRAL_ENERGY) / ENERGY_SCALE_DB
+    vector[TIMBRE_BANDS + 2] = math.log2(centroid / NEUTRAL_CENTROID) / CENTROID_SCALE_OCTAVES
+    return vector
+def _assign(vectors, centroids):
+    # Squared distances up to the per-row constant, which does not change the argmin
+    return np.argmin(np.einsum('ij,ij->i', centroids, centroids) - 2 * (vectors @ centroids.T), axis=1)
+class SimilarityIndex:
+    """Nearest-neighbour search over per-track feature vectors.
+
+    The vectors are one contiguous float32 matrix on disk (a small header,
+    then a row per track) that is memory-mapped rather than read, so a
+    large library costs page cache instead of heap. A side file holds the
+    rows' paths, NUL-terminated, in row order. Both are append-only: a
+    re-analyzed track gets a new row and its old one is skipped until the
+    next load compacts the files. Tracks that could not be analyzed get a
+    NaN row so they are not retried.
+
+    A query is one matrix-vector product over every row. Once partitions
+    are built (k-means centroids trained on a sample, with an inverted list
+    of rows per centroid), it only scans the lists of the IVF_PROBES
+    nearest centroids plus rows added since, which is approximate but
+    keeps lookups in the low milliseconds on very large libraries.
+    """
+    MAGIC = b'MSVC'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<4sHH')
+    def __init__(self, store_file='vectors.bin'):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.store_path = os.path.join(base_dir, 'config', store_file)
+        self._lock = threading.RLock()
+        self._loaded = False
+        # Whether the next write starts new files instead of appending
+        self._fresh = True
+        self._paths = []
+        self._rows = {}
+        self._matrix = None
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._partitions = None
+    @property
+    def paths_path(self):
+        return os.path.splitext(self.store_path)[0] + '.paths'
+    def __len__(self):
+        self._load()
+        return len(self._rows)
+    def __contains__(self, path):
+        self._load()
+        return path in self._rows
+    def missing(self, paths):
+        """The paths that have no row yet."""
+        self._load()
+        return [path for path in paths if path not in self._rows]
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.store_path, 'rb') as f:
+                    header = f.read(self.HEADER.size)
+                    rows = (os.fstat(f.fileno()).st_size - self.HEADER.size) // (4 * DIMENSIONS)
+                with open(self.paths_path, 'rb') as f:
+                    names = f.read().split(b'\0')[:-1]
+            except FileNotFoundError:
+                return
+            except OSError as e:
+                logger.error(f"Error reading similarity vectors: {e}")
+                return
+            if header != self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, DIMENSIONS):
+                logger.warning(f"Ignoring similarity vectors in an unknown format: {self.store_path}")
+                self._write([], np.zeros((0, DIMENSIONS), dtype=np.float32))
+                return
+            # Rows are written before their paths, so a crash can leave either one short
+            count = min(rows, len(names))
+            self._paths = [name.decode('utf-8', 'surrogateescape') for name in names[:count]]
+            self._rows = {path: row for row, path in enumerate(self._paths)}
+            if count != rows or count != len(names) or count > 2 * len(self._rows) + 100:
+                live = sorted(self._rows.values())
+                vectors = np.array(self._map(count)[live])
+                self._write([self._paths[row] for row in live], vectors)
+                return
+            self._fresh = False
+            self._remap(count)
+    def _map(self, count):
+        if not count:
+            return np.zeros((0, DIMENSIONS), dtype=np.float32)
+        return np.memmap(self.store_path, dtype=np.float32, mode='r', offset=self.HEADER.size,
+                         shape=(count, DIMENSIONS))
+    def _remap(self, count):
+        self._matrix = self._map(count)
+        self._norms = np.einsum('ij,ij->i', self._matrix, self._matrix)
+        self._live = np.zeros(count, dtype=bool)
+        self._live[list(self._rows.values())] = True
+        self._live &= ~np.isnan(self._norms)
+    def _write(self, paths, matrix):
+        # Compacted copies replace the files whole; the old mapping goes first
+        self._matrix = None
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            with open(self.store_path + '.tmp', 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, DIMENSIONS))
+                f.write(np.ascontiguousarray(matrix, dtype='<f4').tobytes())
+            with open(self.paths_path + '.tmp', 'wb') as f:
+                f.write(b''.join(path.encode('utf-8', 'surrogateescape') + b'\0' for path in paths))
+            os.replace(self.store_path + '.tmp', self.store_path)
+            os.replace(self.paths_path + '.tmp', self.paths_path)
+            self._fresh = False
+        except OSError as e:
+            logger.error(f"Error compacting similarity vectors: {e}")
+            self._fresh = True
+            paths = []
+        self._paths = list(paths)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self._remap(len(self._paths))
+    def put_many(self, results):
+        """Record the vectors of analyze_track() results; returns False if they could not be written."""
+        self._load()
+        paths = [result[0] for result in results]
+        if not paths:
+            return True
+        vectors = np.full((len(paths), DIMENSIONS), np.nan, dtype=np.float32)
+        for i, result in enumerate(results):
+            vector = feature_vector(result[3])
+            if vector is not None:
+                vectors[i] = vector
+        with self._lock:
+            mode = 'wb' if self._fresh else 'ab'
+            try:
+                os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+                with open(self.store_path, mode) as f:
+                    if self._fresh:
+                        f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, DIMENSIONS))
+                    f.write(vectors.astype('<f4').tobytes())
+                with open(self.paths_path, mode) as f:
+                    f.write(b''.join(path.encode('utf-8', 'surrogateescape') + b'\0' for path in paths))
+            except OSError as e:
+                logger.error(f"Error saving similarity vectors: {e}")
+                return False
+            self._fresh = False
+            norms = np.einsum('ij,ij->i', vectors, vectors)
+            self._norms = np.concatenate((self._norms, norms))
+            self._live = np.concatenate((self._live, ~np.isnan(norms)))
+            for row, path in enumerate(paths, len(self._paths)):
+                old = self._rows.get(path)
+                if old is not None:
+                    self._live[old] = False
+                self._rows[path] = row
+            self._paths.extend(paths)
+            # Appending only grows the file, so mapping it again is all it takes
+            self._matrix = self._map(len(self._paths))
+        return True
+    def nearest(self, path, count, exclude=()):
+        """Up to ``count`` paths most similar to ``path``, closest first, skipping ``exclude``.
+
+        Returns an empty list while ``path`` has no usable vector.
+        """
+        self._load()
+        with self._lock:
+            row = self._rows.get(path)
+            if row is None or not self._live[row] or count <= 0:
+                return []
+            matrix, norms = self._matrix, self._norms
+            query = np.array(matrix[row])
+            allowed = self._live.copy()
+            allowed[row] = False
+            for excluded in exclude:
+                excluded_row = self._rows.get(excluded)
+                if excluded_row is not None:
+                    allowed[excluded_row] = False
+            candidates = self._candidates(query)
+        if candidates is None:
+            candidates = np.flatnonzero(allowed)
+            distances = (norms - 2 * (matrix @ query))[candidates]
+        else:
+            candidates = candidates[allowed[candidates]]
+            distances = norms[candidates] - 2 * (matrix[candidates] @ query)
+        if not len(candidates):
+            return []
+        count = min(count, len(candidates))
+        best = np.argpartition(distances, count - 1)[:count]
+        best = best[np.argsort(distances[best], kind='stable')]
+        return [self._paths[candidates[i]] for i in best]
+    def _candidates(self, query):
+        # Rows to scan for ``query``: None for all of them
+        if self._partitions is None:
+            return None
+        centroids, rows, offsets, indexed = self._partitions
+        if indexed > len(self._paths):
+            return None
+        distances = np.einsum('ij,ij->i', centroids, centroids) - 2 * (centroids @ query)
+        probes = np.argpartition(distances, min(IVF_PROBES, len(distances)) - 1)[:IVF_PROBES]
+        parts = [rows[offsets[probe]:offsets[probe + 1]] for probe in probes]
+        parts.append(np.arange(indexed, len(self._paths)))
+        # Ascending rows read the mapped file front to back
+        return np.sort(np.concatenate(parts))
+    def partitions_stale(self, min_tracks=IVF_MIN_TRACKS):
+        """Whether build_partitions() would help: enough tracks, and no partitions or many rows added since."""
+        self._load()
+        if len(self._rows) < min_tracks:
+            return False
+        partitions = self._partitions
+        return partitions is None or len(self._paths) - partitions[3] > partitions[3] // 10
+    def build_partitions(self, min_tracks=IVF_MIN_TRACKS, job=None):
+        """Cluster the rows into inverted lists for faster approximate queries.
+
+        Below ``min_tracks`` live rows, partitions are dropped and queries
+        stay exact; returns whether partitions were built. ``job`` (a
+        jobs.Job) is checked for cancellation between steps.
+        """
+        self._load()
+        with self._lock:
+            indexed = len(self._paths)
+            matrix = self._matrix
+            live = np.flatnonzero(self._live)
+        if len(live) < min_tracks:
+            self._partitions = None
+            return False
+        rng = np.random.default_rng(len(live))
+        lists = max(1, int(math.sqrt(len(live))))
+        sample = np.asarray(matrix[np.sort(rng.choice(live, min(len(live), max(IVF_TRAINING_SAMPLE, 4 * lists)),
+                                                      replace=False))])
+        centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+        for _ in range(IVF_ITERATIONS):
+            if job is not None:
+                job.check_cancelled()
+            assignment = _assign(sample, centroids)
+            counts = np.bincount(assignment, minlength=lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+        assignment = np.empty(len(live), dtype=np.intp)
+        for start in range(0, len(live), ASSIGN_CHUNK):
+            if job is not None:
+                job.check_cancelled()
+            chunk = live[start:start + ASSIGN_CHUNK]
+            assignment[start:start + ASSIGN_CHUNK] = _assign(np.asarray(matrix[chunk]), centroids)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.searchsorted(assignment[order], np.arange(lists + 1))
+        self._partitions = (centroids, live[order], offsets, indexed)
+        return True
@@ -0,0 +1,68 @@
+import os
+import math
+import struct
+import numpy as np
+from ..config.records import RecordLog
+class AnalysisStore(RecordLog):
+    """Per-track analysis results, valid while the file's size and mtime are unchanged.
+
+    Kept in a RecordLog whose records hold one float32 per name in FIELDS
+    (NaN when unknown). Changing FIELDS needs a new FORMAT_VERSION, which
+    discards older logs.
+    """
+    MAGIC = b'MSAN'
+    FORMAT_VERSION = 2
+    # Loudness in LUFS, sample peak, length and first/last non-silent moment in seconds,
+    # tempo in BPM, RMS energy in dBFS and spectral centroid in Hz
+    FIELDS = ('loudness', 'peak', 'duration', 'start', 'end', 'tempo', 'energy', 'centroid')
+    RECORD = struct.Struct('<HQd' + 'f' * len(FIELDS))
+    DESCRIPTION = 'analysis store'
+    def __init__(self, store_file='analysis.bin'):
+        super().__init__(store_file)
+    def get(self, path):
+        """{field: value or None} for ``path`` if it was analyzed in its current state, else None."""
+        entry = self._load().get(path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        size, mtime, values = entry
+        if size != stat.st_size or mtime != stat.st_mtime:
+            return None
+        return {field: None if math.isnan(value) else value for field, value in zip(self.FIELDS, values)}
+    def values(self, paths, fields):
+        """float32 array of ``fields`` per path (one row each), NaN where unknown.
+
+        Unlike get() this does not stat the files, so it is cheap enough for
+        a whole library but may answer for files that changed since.
+        """
+        entries = self._load()
+        columns = [self.FIELDS.index(field) for field in fields]
+        unknown = (0, 0.0, (math.nan,) * len(self.FIELDS))
+        rows = np.array([entries.get(path, unknown)[2] for path in paths], dtype=np.float32)
+        return rows.reshape(len(paths), len(self.FIELDS))[:, columns]
+    def stale(self, paths):
+        """The paths with no analysis matching their current size and mtime."""
+        entries = self._load()
+        stale = []
+        for path in paths:
+            entry = entries.get(path)
+            if entry is None:
+                stale.append(path)
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if entry[0] != stat.st_size or entry[1] != stat.st_mtime:
+                stale.append(path)
+        return stale
+    def put_many(self, results):
+        """Record analyze_track() results; returns False if they could not be written."""
+        records = []
+        for path, size, mtime, analysis in results:
+            values = tuple(math.nan if analysis.get(field) is None else analysis[field] for field in self.FIELDS)
+            records.append((path, size, mtime, values))
+        return self._append(records)
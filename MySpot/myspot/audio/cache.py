@@ -0,0 +1,97 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+logger = logging.getLogger(__name__)
+class AudioCache:
+    """Raw bytes of recently played and upcoming tracks, up to ``budget`` bytes in total.
+
+    Entries are checked against their file's size and mtime on every
+    lookup, and the least recently used ones are evicted to make room.
+    Files larger than the whole budget are never kept, and a budget of 0
+    turns the cache off. put() takes bytes read elsewhere, e.g. by the
+    prefetcher, which paces its reads. hits, misses and evictions count
+    lookups since start.
+    """
+    def __init__(self, budget=0):
+        self.budget = max(0, int(budget))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    def __len__(self):
+        return len(self._entries)
+    def __contains__(self, path):
+        return path in self._entries
+    def _fresh(self, path, stat):
+        entry = self._entries.get(path)
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime):
+            self._entries.move_to_end(path)
+            return entry[2]
+        if entry is not None:
+            self._remove(path)
+        return None
+    def get(self, path):
+        """Cached bytes of ``path``, or None (counted as a miss) when absent or stale."""
+        if not self.budget:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            data = self._fresh(path, stat)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return data
+    def load(self, path):
+        """Read ``path`` into the cache unless it is there already; returns its bytes, or None if not kept."""
+        if not self.budget:
+            return None
+        try:
+            stat = os.stat(path)
+            with self._lock:
+                data = self._fresh(path, stat)
+            if data is not None or stat.st_size > self.budget:
+                return data
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            logger.warning(f"Cannot cache {path}: {e}")
+            return None
+        self.put(path, stat, data)
+        return data
+    def fits(self, size):
+        """Whether a file of ``size`` bytes would be kept."""
+        return 0 < size <= self.budget
+    def put(self, path, stat, data):
+        """Keep ``data``, the contents of ``path`` as of ``stat``; returns False if it does not fit."""
+        with self._lock:
+            if not self.fits(len(data)):
+                return False
+            if path in self._entries:
+                self._remove(path)
+            self._evict(self.budget - len(data))
+            self._entries[path] = (stat.st_size, stat.st_mtime, data)
+            self._size += len(data)
+            return True
+    def _remove(self, path):
+        self._size -= len(self._entries.pop(path)[2])
+    def _evict(self, limit):
+        while self._entries and self._size > limit:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    def set_budget(self, budget):
+        """Change the byte budget, evicting what no longer fits."""
+        with self._lock:
+            self.budget = max(0, int(budget))
+            self._evict(self.budget)
+    def stats(self):
+        """Counters and current size of the cache."""
+        with self._lock:
+            return {'budget': self.budget, 'bytes': self._size, 'tracks': len(self._entries),
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
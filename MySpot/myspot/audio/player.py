@@ -1,90 +1,213 @@
-import pygame
-import os
-from pathlib import Path
-import logging
-logger = logging.getLogger(__name__)
-class AudioPlayer:
-    def __init__(self, volume=0.5):
-        pygame.mixer.init()
-        self._volume = 0.0
-        self._is_muted = False
-        self._muted_volume = 0.0
-        self.set_volume(volume)
-        self.current_track = None
-        self.is_paused = False
-        logger.info("AudioPlayer initialized with volume %.2f", volume)
-    def play(self, file_path):
-        if not os.path.exists(file_path):
-            logger.error(f"File not found: {file_path}")
-            return False
-        try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
-            self.current_track = Path(file_path).name
-            logger.info(f"Playing: {self.current_track}")
-            return True
-        except pygame.error as e:
-            logger.error(f"Cannot play file {file_path}: {e}")
-            return False
-    def pause(self):
-        if pygame.mixer.music.get_busy():
-            pygame.mixer.music.pause()
-            self.is_paused = True
-            logger.info("Playback paused")
-            return True
-        return False
-    def unpause(self):
-        try:
-            pygame.mixer.music.unpause()
-            self.is_paused = False
-            logger.info("Playback resumed")
-            return True
-        except:
-            logger.error("Cannot unpause - no music loaded or playing")
-            return False
-    def toggle_play_pause(self):
-        if pygame.mixer.music.get_busy():
-            self.pause()
-            return "paused"
-        else:
-            if self.current_track:
-                self.unpause()
-                return "playing"
-            return "no track loaded"
-    def stop(self):
-        pygame.mixer.music.stop()
-        logger.info("Playback stopped")
-    def is_playing(self):
-        return pygame.mixer.music.get_busy()
-    def set_volume(self, volume):
-        volume = max(0.0, min(1.0, volume))
-        self._volume = volume
-        if not self._is_muted:
-            pygame.mixer.music.set_volume(volume)
-            logger.debug(f"Volume set to {volume:.2f}")
-        return volume
-    def get_volume(self):
-        return self._volume
-    def increase_volume(self, increment=0.05):
-        return self.set_volume(self._volume + increment)
-    def decrease_volume(self, decrement=0.05):
-        return self.set_volume(self._volume - decrement)
-    def toggle_mute(self):
-        if self._is_muted:
-            pygame.mixer.music.set_volume(self._muted_volume)
-            self._is_muted = False
-            logger.info(f"Audio unmuted, volume restored to {self._muted_volume:.2f}")
-            return False
-        else:
-            self._muted_volume = self._volume
-            pygame.mixer.music.set_volume(0)
-            self._is_muted = True
-            logger.info("Audio muted")
-            return True
-    def is_muted(self):
-        return self._is_muted
-    def __del__(self):
-        try:
-            pygame.mixer.quit()
-        except Exception:
+import pygame
+import io
+import os
+from pathlib import Path
+import logging
+from .cache import AudioCache
+logger = logging.getLogger(__name__)
+class AudioPlayer:
+    def __init__(self, volume=0.5, cache_bytes=0):
+        self._version = 0
+        self._listeners = []
+        pygame.mixer.init()
+        self._volume = 0.0
+        self._is_muted = False
+        self._muted_volume = 0.0
+        # Optional callable(path) -> linear gain or None, applied on top of the volume per track
+        self.gain_provider = None
+        self._gain = 1.0
+        # Optional callable(path) -> (start, end) seconds to play, either may be None; skips silence
+        self.trim_provider = None
+        self._end = None
+        # Bytes of recently played and upcoming tracks, so replays and jumps back skip the disk
+        self.cache = AudioCache(cache_bytes)
+        self.set_volume(volume)
+        self.current_track = None
+        self.current_path = None
+        self.is_paused = False
+        self._busy = False
+        self._start_offset = 0.0
+        logger.info("AudioPlayer initialized with volume %.2f", volume)
+    @property
+    def version(self):
+        """Counter bumped on every observable state change."""
+        return self._version
+    def add_listener(self, callback):
+        """Register ``callback(event, player)``, called after each state change."""
+        self._listeners.append(callback)
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    def _changed(self, event):
+        self._version += 1
+        for callback in list(self._listeners):
+            try:
+                callback(event, self)
+            except Exception as e:
+                logger.error(f"Player listener failed on {event}: {e}")
+    def play(self, file_path, start=0.0):
+        if not os.path.exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            return False
+        try:
+            self._load(file_path)
+            self._set_gain(file_path)
+            start = self._set_trim(file_path, start)
+            self._start_offset = 0.0
+            if start > 0:
+                try:
+                    pygame.mixer.music.play(start=start)
+                    self._start_offset = start
+                except pygame.error:
+                    # Not every format supports seeking; fall back to the beginning
+                    pygame.mixer.music.play()
+            else:
+                pygame.mixer.music.play()
+            self.current_track = Path(file_path).name
+            self.current_path = file_path
+            self.is_paused = False
+            self._busy = True
+            logger.info(f"Playing: {self.current_track}")
+            self._changed('play')
+            return True
+        except pygame.error as e:
+            logger.error(f"Cannot play file {file_path}: {e}")
+            return False
+    def _load(self, file_path):
+        data = self.cache.get(file_path)
+        if data is not None:
+            try:
+                # The extension helps SDL_mixer pick a decoder for the buffer
+                pygame.mixer.music.load(io.BytesIO(data), Path(file_path).suffix.lstrip('.'))
+                return
+            except pygame.error as e:
+                logger.debug(f"Cannot play {file_path} from memory: {e}")
+        # SDL reads a miss from disk itself; upcoming tracks reach the cache through the prefetcher
+        pygame.mixer.music.load(file_path)
+    def pause(self):
+        if pygame.mixer.music.get_busy():
+            pygame.mixer.music.pause()
+            self.is_paused = True
+            self._busy = False
+            logger.info("Playback paused")
+            self._changed('pause')
+            return True
+        return False
+    def unpause(self):
+        try:
+            pygame.mixer.music.unpause()
+            self.is_paused = False
+            self._busy = True
+            logger.info("Playback resumed")
+            self._changed('unpause')
+            return True
+        except:
+            logger.error("Cannot unpause - no music loaded or playing")
+            return False
+    def toggle_play_pause(self):
+        if pygame.mixer.music.get_busy():
+            self.pause()
+            return "paused"
+        else:
+            if self.current_track:
+                self.unpause()
+                return "playing"
+            return "no track loaded"
+    def stop(self):
+        pygame.mixer.music.stop()
+        self._busy = False
+        logger.info("Playback stopped")
+        self._changed('stop')
+    def get_position(self):
+        """Seconds into the current track."""
+        if not self.current_track:
+            return 0.0
+        elapsed = pygame.mixer.music.get_pos()
+        return self._start_offset + max(elapsed, 0) / 1000.0
+    def is_playing(self):
+        busy = pygame.mixer.music.get_busy()
+        if busy and self._end is not None and self.get_position() >= self._end:
+            # Only trailing silence is left: end the track here
+            pygame.mixer.music.stop()
+            busy = False
+        if busy != self._busy:
+            # Tracks ending on their own are only noticed here
+            self._busy = busy
+            self._changed('busy')
+        return busy
+    def set_volume(self, volume):
+        volume = max(0.0, min(1.0, volume))
+        self._volume = volume
+        if not self._is_muted:
+            self._apply_volume(volume)
+            logger.debug(f"Volume set to {volume:.2f}")
+        self._changed('volume')
+        return volume
+    def _apply_volume(self, volume):
+        pygame.mixer.music.set_volume(min(1.0, volume * self._gain))
+    def _set_gain(self, file_path):
+        gain = None
+        if self.gain_provider is not None:
+            try:
+                gain = self.gain_provider(file_path)
+            except Exception as e:
+                logger.error(f"Cannot get track gain for {file_path}: {e}")
+        gain = 1.0 if gain is None else gain
+        if gain != self._gain:
+            self._gain = gain
+            logger.debug(f"Track gain {gain:.2f}")
+            if not self._is_muted:
+                self._apply_volume(self._volume)
+    def get_gain(self):
+        """Linear gain of the current track (1.0 when it has not been analyzed)."""
+        return self._gain
+    def _set_trim(self, file_path, start):
+        self._end = None
+        trim = None
+        if self.trim_provider is not None:
+            try:
+                trim = self.trim_provider(file_path)
+            except Exception as e:
+                logger.error(f"Cannot get trim points for {file_path}: {e}")
+        if not trim:
+            return start
+        begin, end = trim
+        if end is not None and end > max(start, begin or 0.0):
+            self._end = end
+        # Resuming at a saved position wins over skipping leading silence
+        if start <= 0 and begin:
+            logger.debug(f"Skipping {begin:.2f}s of leading silence")
+            return begin
+        return start
+    def poll_delay(self, interval=0.5):
+        """Seconds a playback poller may sleep without overshooting the end of a trimmed track."""
+        if self._end is None or not self._busy:
+            return interval
+        return max(0.01, min(interval, self._end - self.get_position()))
+    def get_volume(self):
+        return self._volume
+    def increase_volume(self, increment=0.05):
+        return self.set_volume(self._volume + increment)
+    def decrease_volume(self, decrement=0.05):
+        return self.set_volume(self._volume - decrement)
+    def toggle_mute(self):
+        if self._is_muted:
+            self._apply_volume(self._muted_volume)
+            self._is_muted = False
+            logger.info(f"Audio unmuted, volume restored to {self._muted_volume:.2f}")
+            self._changed('mute')
+            return False
+        else:
+            self._muted_volume = self._volume
+            pygame.mixer.music.set_volume(0)
+            self._is_muted = True
+            logger.info("Audio muted")
+            self._changed('mute')
+            return True
+    def is_muted(self):
+        return self._is_muted
+    def __del__(self):
+        try:
+            pygame.mixer.quit()
+        except Exception:
             pass
\ No newline at end of file
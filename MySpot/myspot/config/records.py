@@ -0,0 +1,97 @@
+import os
+import struct
+import logging
+import threading
+logger = logging.getLogger(__name__)
+class RecordLog:
+    """Values per file, kept in an append-only binary log under config/.
+
+    Layout (little endian): HEADER with the subclass's MAGIC and
+    FORMAT_VERSION, then one record per file: RECORD (path length, file
+    size, mtime, then the subclass's values) followed by the UTF-8 path.
+    Later records win; the log is rewritten compactly on load once most of
+    it is superseded. Entries map each path to (size, mtime, values), so a
+    subclass can tell whether they still describe the file. A log with
+    another magic or version is ignored.
+    """
+    MAGIC = None
+    FORMAT_VERSION = None
+    HEADER = struct.Struct('<4sH')
+    RECORD = None
+    # What the log holds, for log messages
+    DESCRIPTION = 'record log'
+    def __init__(self, store_file):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.store_path = os.path.join(base_dir, 'config', store_file)
+        self._entries = None
+        self._lock = threading.Lock()
+    def __len__(self):
+        return len(self._load())
+    def _load(self):
+        if self._entries is not None:
+            return self._entries
+        with self._lock:
+            if self._entries is None:
+                self._entries, records = self._read()
+                if records > 2 * len(self._entries) + 100:
+                    self._rewrite()
+        return self._entries
+    def _read(self):
+        entries = {}
+        records = 0
+        try:
+            with open(self.store_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return entries, records
+        except OSError as e:
+            logger.error(f"Error reading {self.DESCRIPTION}: {e}")
+            return entries, records
+        if len(data) < self.HEADER.size or self.HEADER.unpack_from(data) != (self.MAGIC, self.FORMAT_VERSION):
+            logger.warning(f"Ignoring {self.DESCRIPTION} in an unknown format: {self.store_path}")
+            return entries, records
+        offset = self.HEADER.size
+        # A record cut short by a crash ends the log
+        while offset + self.RECORD.size <= len(data):
+            length, size, mtime, *values = self.RECORD.unpack_from(data, offset)
+            offset += self.RECORD.size
+            if offset + length > len(data):
+                break
+            path = data[offset:offset + length].decode('utf-8', 'surrogateescape')
+            offset += length
+            entries[path] = (size, mtime, tuple(values))
+            records += 1
+        return entries, records
+    def _pack(self, path, size, mtime, values):
+        encoded = path.encode('utf-8', 'surrogateescape')
+        return self.RECORD.pack(len(encoded), size, mtime, *values) + encoded
+    def _rewrite(self):
+        tmp_path = self.store_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION))
+                for path, entry in self._entries.items():
+                    f.write(self._pack(path, *entry))
+            os.replace(tmp_path, self.store_path)
+        except OSError as e:
+            logger.error(f"Error compacting {self.DESCRIPTION}: {e}")
+    def _append(self, records):
+        """Record (path, size, mtime, values) tuples; returns False if they could not be written."""
+        entries = self._load()
+        chunks = []
+        with self._lock:
+            for path, size, mtime, values in records:
+                entries[path] = (size, mtime, values)
+                chunks.append(self._pack(path, size, mtime, values))
+            if not chunks:
+                return True
+            try:
+                new_file = not os.path.exists(self.store_path)
+                with open(self.store_path, 'ab') as f:
+                    if new_file:
+                        f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION))
+                    f.write(b''.join(chunks))
+                return True
+            except OSError as e:
+                logger.error(f"Error saving {self.DESCRIPTION}: {e}")
+                return False
@@ -0,0 +1,104 @@
+import os
+import sys
+import mmap
+import struct
+import logging
+from array import array
+logger = logging.getLogger(__name__)
+class Session:
+    def __init__(self, directory, tracks, order, current_index, position, volume, playing, paused):
+        self.directory = directory
+        self.tracks = tracks
+        self.order = order
+        self.current_index = current_index
+        self.position = position
+        self.volume = volume
+        self.playing = playing
+        self.paused = paused
+    def current_track(self):
+        if not self.order or not 0 <= self.current_index < len(self.order):
+            return None
+        return self.tracks[self.order[self.current_index]]
+class SessionStore:
+    """Binary snapshot of the playback session for instant resume.
+
+    Layout (little endian): a fixed header, the music directory (UTF-8),
+    the shuffle order as uint32 indexes into the track list, and the
+    NUL-separated track paths in library order. When only the position,
+    index or volume changed, save() rewrites the header in place.
+    """
+    MAGIC = b'MSPS'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<4sHHIIIIdf')
+    FLAG_PLAYING = 1
+    FLAG_PAUSED = 2
+    def __init__(self, session_file='session.bin'):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.session_path = os.path.join(base_dir, 'config', session_file)
+        self._saved_layout = None
+    def save(self, playlist, player):
+        """Write the current session; returns False if there is nothing to save."""
+        if not playlist.shuffled_tracks:
+            return False
+        flags = 0
+        if player.is_paused:
+            flags |= self.FLAG_PAUSED
+        elif player.is_playing():
+            flags |= self.FLAG_PLAYING
+        position = player.get_position() if player.current_track else 0.0
+        layout = (id(playlist), playlist.order_version, playlist.music_dir)
+        directory = (playlist.music_dir or '').encode('utf-8')
+        count = len(playlist.tracks)
+        header = self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, flags, count, len(playlist.shuffled_tracks),
+                                  playlist.current_index, len(directory), position, player.get_volume())
+        try:
+            if layout == self._saved_layout and os.path.exists(self.session_path):
+                with open(self.session_path, 'r+b') as f:
+                    f.write(header)
+                return True
+            order = array('I', (playlist.index_of(track) for track in playlist.shuffled_tracks))
+            if sys.byteorder == 'big':
+                order.byteswap()
+            paths = '\0'.join(playlist.tracks).encode('utf-8', 'surrogateescape')
+            tmp_path = self.session_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(directory)
+                f.write(order.tobytes())
+                f.write(paths)
+            os.replace(tmp_path, self.session_path)
+            self._saved_layout = layout
+            logger.info(f"Session saved to {self.session_path} ({count} tracks)")
+            return True
+        except (OSError, TypeError) as e:
+            logger.error(f"Error saving session: {e}")
+            return False
+    def load(self):
+        """Read the snapshot through a memory map; returns a Session or None."""
+        if not os.path.exists(self.session_path):
+            return None
+        try:
+            with open(self.session_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                (magic, version, flags, count, order_count, current_index,
+                 dir_len, position, volume) = self.HEADER.unpack_from(mm, 0)
+                if magic != self.MAGIC or version != self.FORMAT_VERSION:
+                    logger.warning(f"Ignoring session file with unknown format: {self.session_path}")
+                    return None
+                offset = self.HEADER.size
+                directory = mm[offset:offset + dir_len].decode('utf-8')
+                offset += dir_len
+                order = array('I')
+                order.frombytes(mm[offset:offset + 4 * order_count])
+                offset += 4 * order_count
+                if sys.byteorder == 'big':
+                    order.byteswap()
+                tracks = mm[offset:].decode('utf-8', 'surrogateescape').split('\0')
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Error loading session: {e}")
+            return None
+        if len(tracks) != count or len(order) != order_count or (order_count and max(order) >= count):
+            logger.warning(f"Ignoring inconsistent session file: {self.session_path}")
+            return None
+        logger.info(f"Session loaded from {self.session_path} ({count} tracks)")
+        return Session(directory or None, tracks, order, current_index, position, volume,
+                       bool(flags & self.FLAG_PLAYING), bool(flags & self.FLAG_PAUSED))
@@ -0,0 +1,3 @@
+from .history import PlayHistory, PLAY, SKIP, PAUSE, track_id
+
+__all__ = ['PlayHistory', 'PLAY', 'SKIP', 'PAUSE', 'track_id']
@@ -0,0 +1,264 @@
+import os
+import time
+import heapq
+import struct
+import hashlib
+import logging
+import threading
+logger = logging.getLogger(__name__)
+PLAY = 1
+SKIP = 2
+PAUSE = 3
+# Buffered events are written and fsync'd once this many wait, or FLUSH_INTERVAL seconds after the oldest
+FLUSH_EVENTS = 32
+FLUSH_INTERVAL = 30.0
+# Events the log may hold before they are folded into the counters file
+COMPACT_EVENTS = 10000
+# Plays a track needs before its skip rate ranks it
+MIN_RATED_PLAYS = 3
+def track_id(path):
+    """64-bit id of a track path, as written to the history files."""
+    digest = hashlib.blake2b(path.encode('utf-8', 'surrogateescape'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+class PlayHistory:
+    """Plays, skips and pauses per track, kept as an append-only event log.
+
+    Every event is a fixed-size record (little endian: timestamp, track id,
+    seconds into the track, kind) appended to history.bin. Events are
+    buffered and written with one fsync per batch of FLUSH_EVENTS, or by
+    flush(), so a crash loses at most one batch. Track ids are hashes of
+    the path; history.names maps each id back to its path once. Per-track
+    counters live in memory and answer all queries. Once the log holds
+    COMPACT_EVENTS events they are written to history.counts as
+    fixed-size records and the log starts over. Both headers carry a
+    generation number, so a crash in between never counts a log twice.
+
+    on_player_event() is an AudioPlayer listener that records a play for
+    each new track, a pause with its position, and a skip when a track
+    is left before it ended.
+    """
+    MAGIC = b'MSHL'
+    NAMES_MAGIC = b'MSHN'
+    COUNTS_MAGIC = b'MSHC'
+    FORMAT_VERSION = 1
+    # Magic, version and the log generation (for counters the last one they include, unused for names)
+    HEADER = struct.Struct('<4sHI')
+    EVENT = struct.Struct('<dQfB3x')
+    NAME = struct.Struct('<QH')
+    COUNTS = struct.Struct('<QIIId')
+    def __init__(self, store_file='history.bin'):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.store_path = os.path.join(base_dir, 'config', store_file)
+        self._lock = threading.RLock()
+        self._loaded = False
+        # Track id -> [plays, skips, pauses, last played]
+        self._counts = {}
+        self._names = {}
+        self._generation = 0
+        self._logged = 0
+        self._buffer = []
+        self._new_names = []
+        self._oldest_buffered = None
+        # (path, seconds into it when last resumed, monotonic time resumed or None while paused)
+        self._listening = None
+    @property
+    def names_path(self):
+        return os.path.splitext(self.store_path)[0] + '.names'
+    @property
+    def counts_path(self):
+        return os.path.splitext(self.store_path)[0] + '.counts'
+    def _read(self, path, magic, what):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, None
+        except OSError as e:
+            logger.error(f"Error reading play history {what}: {e}")
+            return None, None
+        if len(data) < self.HEADER.size or self.HEADER.unpack_from(data)[:2] != (magic, self.FORMAT_VERSION):
+            logger.warning(f"Ignoring play history {what} in an unknown format: {path}")
+            return None, None
+        return data[self.HEADER.size:], self.HEADER.unpack_from(data)[2]
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            data, absorbed = self._read(self.counts_path, self.COUNTS_MAGIC, 'counters')
+            for offset in range(0, len(data or b'') - self.COUNTS.size + 1, self.COUNTS.size):
+                tid, plays, skips, pauses, last_played = self.COUNTS.unpack_from(data, offset)
+                self._counts[tid] = [plays, skips, pauses, last_played]
+            data, _ = self._read(self.names_path, self.NAMES_MAGIC, 'names')
+            offset = 0
+            # A record cut short by a crash ends the file
+            while data and offset + self.NAME.size <= len(data):
+                tid, length = self.NAME.unpack_from(data, offset)
+                offset += self.NAME.size
+                if offset + length > len(data):
+                    break
+                self._names[tid] = data[offset:offset + length].decode('utf-8', 'surrogateescape')
+                offset += length
+            data, generation = self._read(self.store_path, self.MAGIC, 'log')
+            if generation is None:
+                self._generation = (absorbed or 0) + 1
+                return
+            self._generation = generation
+            if absorbed is not None and absorbed >= generation:
+                # Folded into the counters just before a crash
+                self._generation = absorbed + 1
+                self._start_log()
+                return
+            for offset in range(0, len(data) - self.EVENT.size + 1, self.EVENT.size):
+                timestamp, tid, _, kind = self.EVENT.unpack_from(data, offset)
+                self._apply(timestamp, tid, kind)
+                self._logged += 1
+            if self._logged >= COMPACT_EVENTS:
+                self._compact()
+    def _apply(self, timestamp, tid, kind):
+        counts = self._counts.setdefault(tid, [0, 0, 0, 0.0])
+        if kind == PLAY:
+            counts[0] += 1
+            counts[3] = max(counts[3], timestamp)
+        elif kind == SKIP:
+            counts[1] += 1
+        elif kind == PAUSE:
+            counts[2] += 1
+    def record(self, path, kind, position=0.0, timestamp=None):
+        """Count a PLAY, SKIP or PAUSE of ``path`` and queue it for the log."""
+        timestamp = time.time() if timestamp is None else timestamp
+        tid = track_id(path)
+        with self._lock:
+            self._load()
+            if self._names.get(tid) != path:
+                self._names[tid] = path
+                encoded = path.encode('utf-8', 'surrogateescape')
+                self._new_names.append(self.NAME.pack(tid, len(encoded)) + encoded)
+            self._apply(timestamp, tid, kind)
+            self._buffer.append(self.EVENT.pack(timestamp, tid, position, kind))
+            if self._oldest_buffered is None:
+                self._oldest_buffered = time.monotonic()
+            if len(self._buffer) >= FLUSH_EVENTS:
+                self.flush()
+    def flush(self, force=True):
+        """Write and fsync buffered events; with ``force`` False only once FLUSH_INTERVAL has passed.
+
+        Returns False if they could not be written; they stay buffered then.
+        """
+        with self._lock:
+            if not self._buffer:
+                return True
+            if not force and time.monotonic() - self._oldest_buffered < FLUSH_INTERVAL:
+                return True
+            try:
+                os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+                # Names first, so the log never refers to a track without one
+                if self._new_names:
+                    self._append(self.names_path, self.HEADER.pack(self.NAMES_MAGIC, self.FORMAT_VERSION, 0),
+                                 self._new_names)
+                    self._new_names = []
+                self._append(self.store_path, self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, self._generation),
+                             self._buffer)
+            except OSError as e:
+                logger.error(f"Error saving play history: {e}")
+                return False
+            self._logged += len(self._buffer)
+            self._buffer = []
+            self._oldest_buffered = None
+            if self._logged >= COMPACT_EVENTS:
+                self._compact()
+            return True
+    def _append(self, path, header, records):
+        new_file = not os.path.exists(path)
+        with open(path, 'ab') as f:
+            if new_file:
+                f.write(header)
+            f.write(b''.join(records))
+            f.flush()
+            os.fsync(f.fileno())
+    def _compact(self):
+        tmp_path = self.counts_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.COUNTS_MAGIC, self.FORMAT_VERSION, self._generation))
+                f.write(b''.join(self.COUNTS.pack(tid, *counts) for tid, counts in self._counts.items()))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.counts_path)
+        except OSError as e:
+            logger.error(f"Error compacting play history: {e}")
+            return
+        self._generation += 1
+        self._start_log()
+    def _start_log(self):
+        tmp_path = self.store_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, self._generation))
+            os.replace(tmp_path, self.store_path)
+            self._logged = 0
+        except OSError as e:
+            logger.error(f"Error starting a new play history log: {e}")
+    def _position(self):
+        path, offset, resumed = self._listening
+        return offset + (time.monotonic() - resumed if resumed is not None else 0.0)
+    def on_player_event(self, event, player):
+        """AudioPlayer listener turning playback changes into history events."""
+        with self._lock:
+            if event == 'play':
+                path = player.current_path
+                if self._listening is not None and self._listening[0] == path:
+                    # The same track played from another point: a seek
+                    self._listening = (path, player.get_position(), time.monotonic())
+                    return
+                if self._listening is not None:
+                    self.record(self._listening[0], SKIP, self._position())
+                self._listening = (path, player.get_position(), time.monotonic())
+                self.record(path, PLAY, self._listening[1])
+            elif self._listening is None:
+                return
+            elif event == 'pause':
+                position = self._position()
+                self._listening = (self._listening[0], position, None)
+                self.record(self._listening[0], PAUSE, position)
+            elif event == 'unpause':
+                self._listening = (self._listening[0], self._position(), time.monotonic())
+            elif event == 'stop' or (event == 'busy' and not player.is_paused and not player.is_playing()):
+                # Ended on its own or stopped: neither counts as a skip
+                self._listening = None
+    def _entry(self, tid):
+        plays, skips, pauses, last_played = self._counts[tid]
+        path = self._names.get(tid)
+        return {'path': path, 'filename': os.path.basename(path) if path else None, 'plays': plays,
+                'skips': skips, 'pauses': pauses, 'last_played': last_played or None,
+                'skip_rate': round(skips / plays, 3) if plays else None}
+    def top(self, count=10):
+        """The ``count`` most played tracks."""
+        with self._lock:
+            self._load()
+            tids = heapq.nlargest(count, self._counts, key=lambda tid: (self._counts[tid][0], self._counts[tid][3]))
+            return [self._entry(tid) for tid in tids if self._counts[tid][0]]
+    def recent(self, count=10):
+        """The ``count`` tracks played last, latest first."""
+        with self._lock:
+            self._load()
+            tids = heapq.nlargest(count, self._counts, key=lambda tid: self._counts[tid][3])
+            return [self._entry(tid) for tid in tids if self._counts[tid][3]]
+    def most_skipped(self, count=10):
+        """The ``count`` tracks with the highest skip rate among those played MIN_RATED_PLAYS times."""
+        with self._lock:
+            self._load()
+            rated = (tid for tid, counts in self._counts.items() if counts[0] >= MIN_RATED_PLAYS and counts[1])
+            tids = heapq.nlargest(count, rated, key=lambda tid: self._counts[tid][1] / self._counts[tid][0])
+            return [self._entry(tid) for tid in tids]
+    def summary(self):
+        """Totals over all tracks."""
+        with self._lock:
+            self._load()
+            plays = sum(counts[0] for counts in self._counts.values())
+            skips = sum(counts[1] for counts in self._counts.values())
+            return {'tracks': len(self._counts), 'plays': plays, 'skips': skips,
+                    'pauses': sum(counts[2] for counts in self._counts.values()),
+                    'skip_rate': round(skips / plays, 3) if plays else None}
@@ -0,0 +1,3 @@
+from .manager import Job, JobManager, JobCancelled
+
+__all__ = ['Job', 'JobManager', 'JobCancelled']
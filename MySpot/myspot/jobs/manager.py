@@ -0,0 +1,169 @@
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+logger = logging.getLogger(__name__)
+class JobCancelled(Exception):
+    pass
+class Job:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    def __init__(self, kind, func, args=(), kwargs=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.status = self.PENDING
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs or {}
+        self._progress = {}
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+    def cancel(self):
+        self._cancel.set()
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested; call it between work units."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+    def update(self, **counters):
+        with self._lock:
+            self._progress.update(counters)
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._progress[name] = self._progress.get(name, 0) + amount
+    def is_active(self):
+        return self.status in (self.PENDING, self.RUNNING)
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+    def to_dict(self):
+        elapsed = self.elapsed()
+        with self._lock:
+            progress = dict(self._progress)
+        rates = {}
+        if elapsed > 0:
+            # Numeric counters are also reported per second (e.g. dirs_per_second)
+            for name, value in progress.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    rates[f'{name}_per_second'] = round(value / elapsed, 1)
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': progress,
+            'rates': rates,
+            'elapsed': round(elapsed, 3),
+            'result': self.result,
+            'error': self.error
+        }
+    def _run(self):
+        if self._cancel.is_set():
+            self._finish(self.CANCELLED)
+            return
+        self.status = self.RUNNING
+        self.started = time.time()
+        try:
+            self.result = self._func(self, *self._args, **self._kwargs)
+            self._finish(self.CANCELLED if self._cancel.is_set() else self.DONE)
+        except JobCancelled:
+            self._finish(self.CANCELLED)
+        except Exception as e:
+            logger.error(f"Job {self.id} ({self.kind}) failed: {e}")
+            self.error = str(e)
+            self._finish(self.FAILED)
+    def _finish(self, status):
+        self.finished = time.time()
+        self.status = status
+        self._done.set()
+        logger.info(f"Job {self.id} ({self.kind}) {status} after {self.elapsed():.2f}s")
+class JobManager:
+    """Runs long operations on a bounded pool of daemon worker threads.
+
+    Job functions are called as ``func(job, *args, **kwargs)``; they report
+    progress with ``job.update()``/``job.increment()`` and should call
+    ``job.check_cancelled()`` regularly. Whatever they return becomes
+    ``job.result`` and must be JSON-serializable.
+
+    Jobs of ``background_kinds`` (library-wide backfills that may run for
+    hours) get their own ``background_workers`` threads and queue, so they
+    never hold up the jobs a user is waiting for.
+    """
+    def __init__(self, max_workers=2, max_history=100, background_kinds=(), background_workers=1):
+        self.max_workers = max(1, max_workers)
+        self.max_history = max_history
+        self.background_kinds = frozenset(background_kinds)
+        self._queue = queue.Queue()
+        self._background_queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._running = True
+        pools = [(self._queue, 'job', self.max_workers)]
+        if self.background_kinds:
+            pools.append((self._background_queue, 'background', max(1, background_workers)))
+        for jobs, name, count in pools:
+            for i in range(count):
+                worker = threading.Thread(target=self._worker, args=(jobs,), name=f"myspot-{name}-{i}", daemon=True)
+                worker.start()
+                self._workers.append((jobs, worker))
+    def submit(self, kind, func, *args, **kwargs):
+        if not self._running:
+            raise RuntimeError("JobManager has been shut down")
+        job = Job(kind, func, args, kwargs)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        (self._background_queue if kind in self.background_kinds else self._queue).put(job)
+        logger.info(f"Job {job.id} ({kind}) queued")
+        return job
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+    def list(self, kind=None, active_only=False):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs
+                if (kind is None or job.kind == kind) and (not active_only or job.is_active())]
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+    def cancel_all(self, kind=None):
+        for job in self.list(kind=kind, active_only=True):
+            job.cancel()
+    def shutdown(self):
+        self._running = False
+        self.cancel_all()
+        for jobs, _ in self._workers:
+            jobs.put(None)
+    def _prune(self):
+        # Forget the oldest finished jobs once the history is full
+        excess = len(self._jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if not job.is_active()][:excess]:
+            del self._jobs[job_id]
+    def _worker(self, jobs):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            job._run()
@@ -0,0 +1,168 @@
+import os
+import mmap
+import struct
+import hashlib
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from ..config.records import RecordLog
+logger = logging.getLogger(__name__)
+# Bytes read from each end of a file for its quick fingerprint
+EDGE_BYTES = 64 * 1024
+# Slice of the mapped file handed to the hash at a time; hashlib drops the GIL for each
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+QUICK_DIGEST_SIZE = 16
+FULL_DIGEST_SIZE = 32
+def quick_fingerprint(path):
+    """Digest of the first and last EDGE_BYTES of ``path``; the whole file when it is smaller than both."""
+    digest = hashlib.blake2b(digest_size=QUICK_DIGEST_SIZE)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(f.read(EDGE_BYTES))
+        if size > EDGE_BYTES:
+            f.seek(max(EDGE_BYTES, size - EDGE_BYTES))
+            digest.update(f.read(EDGE_BYTES))
+    return digest.digest()
+def full_hash(path):
+    """Digest of the whole of ``path``, read through a memory map in HASH_CHUNK_BYTES slices."""
+    digest = hashlib.blake2b(digest_size=FULL_DIGEST_SIZE)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                for start in range(0, len(mm), HASH_CHUNK_BYTES):
+                    digest.update(view[start:start + HASH_CHUNK_BYTES])
+            finally:
+                view.release()
+    return digest.digest()
+class FingerprintStore(RecordLog):
+    """Quick fingerprints and full hashes per file, valid while its size and mtime are unchanged.
+
+    Kept in a RecordLog whose records hold the quick fingerprint and the
+    full hash, all zero bytes where not computed.
+    """
+    MAGIC = b'MSFP'
+    FORMAT_VERSION = 1
+    RECORD = struct.Struct(f'<HQd{QUICK_DIGEST_SIZE}s{FULL_DIGEST_SIZE}s')
+    DESCRIPTION = 'fingerprint store'
+    NO_QUICK = bytes(QUICK_DIGEST_SIZE)
+    NO_FULL = bytes(FULL_DIGEST_SIZE)
+    def __init__(self, store_file='fingerprints.bin'):
+        super().__init__(store_file)
+    def get(self, path, size, mtime):
+        """(quick fingerprint, full hash) recorded for ``path`` at this size and mtime, None where unknown."""
+        entry = self._load().get(path)
+        if entry is None or entry[0] != size or entry[1] != mtime:
+            return None, None
+        quick, full = entry[2]
+        return (None if quick == self.NO_QUICK else quick), (None if full == self.NO_FULL else full)
+    def put_many(self, records):
+        """Record (path, size, mtime, quick, full) tuples; returns False if they could not be written."""
+        return self._append((path, size, mtime, (quick or self.NO_QUICK, full or self.NO_FULL))
+                            for path, size, mtime, quick, full in records)
+def _hash_paths(function, paths, workers, job):
+    # Yields (path, digest or None) as the pool finishes them, a bounded number in flight
+    pending = set()
+    remaining = iter(paths)
+    with ThreadPoolExecutor(workers) as executor:
+        try:
+            while True:
+                for path in remaining:
+                    pending.add(executor.submit(_hash_safely, function, path))
+                    if len(pending) >= workers * 4:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if job is not None:
+                        job.check_cancelled()
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+def _hash_safely(function, path):
+    try:
+        return path, function(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read {path}: {e}")
+        return path, None
+def find_duplicates(paths, store=None, workers=None, job=None):
+    """Groups of byte-identical files among ``paths``, the copy to keep (shortest path) first.
+
+    Only files sharing a size are read at all: first their quick
+    fingerprints, then full hashes for the ones whose sizes and quick
+    fingerprints still collide (files no larger than both edges are
+    settled by the quick fingerprint, which covered all of them). Hashing
+    runs on a thread pool of ``workers``; results are looked up in and
+    added to ``store`` (a FingerprintStore) when given. ``job`` (a
+    jobs.Job) gets progress counters and is checked for cancellation.
+    """
+    if workers is None:
+        workers = min(8, (os.cpu_count() or 2) + 2)
+    stats = {}
+    by_size = defaultdict(list)
+    for count, path in enumerate(paths, 1):
+        if job is not None and count % 1000 == 0:
+            job.check_cancelled()
+            job.update(stat=count)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stats[path] = (stat.st_size, stat.st_mtime)
+        if stat.st_size:
+            by_size[stat.st_size].append(path)
+    candidates = [path for group in by_size.values() if len(group) > 1 for path in group]
+    quick = _digests(candidates, 0, quick_fingerprint, stats, store, workers, job, 'quick_hashed')
+    groups = defaultdict(list)
+    for path in candidates:
+        if quick.get(path) is not None:
+            groups[stats[path][0], quick[path]].append(path)
+    duplicates = []
+    colliding = []
+    for (size, _), group in groups.items():
+        if len(group) > 1:
+            if size <= 2 * EDGE_BYTES:
+                duplicates.append(sorted(group, key=_keep_order))
+            else:
+                colliding.extend(group)
+    full = _digests(colliding, 1, full_hash, stats, store, workers, job, 'full_hashed')
+    groups = defaultdict(list)
+    for path in colliding:
+        if full.get(path) is not None:
+            groups[stats[path][0], full[path]].append(path)
+    duplicates.extend(sorted(group, key=_keep_order) for group in groups.values() if len(group) > 1)
+    return sorted(duplicates)
+def _keep_order(path):
+    # "Song.mp3" rather than "Song (1).mp3" or "Copy of Song.mp3"
+    return len(path), path
+def _digests(paths, field, function, stats, store, workers, job, counter):
+    # ``field`` picks the quick (0) or full (1) digest out of the store's pair
+    digests = {}
+    missing = []
+    for path in paths:
+        cached = store.get(path, *stats[path])[field] if store is not None else None
+        if cached is None:
+            missing.append(path)
+        else:
+            digests[path] = cached
+    batch = []
+    try:
+        for count, (path, digest) in enumerate(_hash_paths(function, missing, workers, job), 1):
+            digests[path] = digest
+            if digest is not None and store is not None:
+                known = list(store.get(path, *stats[path]))
+                known[field] = digest
+                batch.append((path, *stats[path], *known))
+            if job is not None and count % 100 == 0:
+                job.update(**{counter: count})
+    finally:
+        # Keep what was hashed even when the job is cancelled
+        if store is not None:
+            store.put_many(batch)
+    return digests
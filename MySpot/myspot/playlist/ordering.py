@@ -0,0 +1,53 @@
+import random
+import warnings
+try:
+    import numpy as np
+except ImportError:
+    np = None
+# Columns of the feature rows handed to feature_order()
+FEATURES = ('tempo', 'energy', 'centroid')
+# Modes sorting by one feature, low to high
+SORT_MODES = {'tempo': 0, 'energy': 1, 'brightness': 2}
+ORDER_MODES = ('shuffle', 'smooth') + tuple(SORT_MODES)
+# Noise added to the smooth-mode key, in standard deviations, so each pass differs
+SMOOTH_JITTER = 0.25
+def feature_order(tracks, features, mode):
+    """``tracks`` ordered by their ``features`` rows (NaN where unknown), or None without features.
+
+    Sort modes go from low to high. 'smooth' follows the main axis of
+    variation of the standardized features (tempo on a log scale) up and
+    back down again, so neighbours in the queue sound alike and the queue
+    wraps without a jump; it starts at a random point, and a feature
+    missing for one track (tempo, say) counts as average. Tracks without
+    the features a mode needs follow in random order.
+    """
+    if np is None or mode not in ORDER_MODES or mode == 'shuffle':
+        return None
+    features = np.asarray(features, dtype=np.float64).reshape(len(tracks), len(FEATURES))
+    if mode in SORT_MODES:
+        known = ~np.isnan(features[:, SORT_MODES[mode]])
+    else:
+        known = ~np.isnan(features).all(axis=1)
+    if not known.any():
+        return None
+    rng = np.random.default_rng(random.getrandbits(64))
+    # Shuffled first so equal keys come out in random order from the stable sort
+    indexes = rng.permutation(np.flatnonzero(known))
+    unknown = rng.permutation(np.flatnonzero(~known))
+    values = features[indexes]
+    if mode in SORT_MODES:
+        order = indexes[np.argsort(values[:, SORT_MODES[mode]], kind='stable')]
+    else:
+        values[:, 0] = np.log2(np.maximum(values[:, 0], 1.0))
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            # Columns unknown for every track are all-NaN slices
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean, spread = np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+        values = np.nan_to_num((values - mean) / np.where(spread > 0, spread, 1.0))
+        axis = np.linalg.svd(values, full_matrices=False)[2][0] if len(values) > 1 else np.ones(len(FEATURES))
+        key = values @ axis + rng.normal(0.0, SMOOTH_JITTER, len(values))
+        ranked = indexes[np.argsort(key, kind='stable')]
+        # Every other track on the way up, the rest on the way down
+        order = np.concatenate((ranked[0::2], ranked[1::2][::-1]))
+        order = np.roll(order, -int(rng.integers(len(order))))
+    return [tracks[i] for i in order] + [tracks[i] for i in unknown]
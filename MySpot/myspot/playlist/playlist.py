@@ -1,64 +1,343 @@
-import os
-import random
-from pathlib import Path
-from . import utils
-class PlaylistManager:
-    SUPPORTED_FORMATS = ['.mp3', '.wav', '.flac', '.ogg', '.m4a']
-    def __init__(self, music_dir=None):
-        self.music_dir = music_dir
-        self.current_index = 0
-        self.tracks = []
-        self.shuffled_tracks = []
-        if music_dir:
-            self.scan_directory(music_dir)
-    def scan_directory(self, directory):
-        if not os.path.isdir(directory):
-            return False
-        self.music_dir = directory
-        self.tracks = utils.scan_audio_files(directory, self.SUPPORTED_FORMATS)
-        if not self.tracks:
-            return False
-        self.shuffle()
-        return True
-    def shuffle(self):
-        if not self.tracks:
-            return False
-        self.shuffled_tracks = self.tracks.copy()
-        random.shuffle(self.shuffled_tracks)
-        self.current_index = 0
-        return True
-    def get_current_track(self):
-        if not self.shuffled_tracks or self.current_index < 0:
-            return None
-        return self.shuffled_tracks[self.current_index]
-    def get_current_track_info(self):
-        track = self.get_current_track()
-        if not track:
-            return None
-        try:
-            return {
-                'path': track,
-                'filename': Path(track).name,
-                'index': self.current_index + 1,
-                'total': len(self.shuffled_tracks)
-            }
-        except Exception:
-            return None
-    def next_track(self):
-        if not self.shuffled_tracks:
-            return None
-        if self.current_index >= len(self.shuffled_tracks) - 1:
-            self.current_index = 0
-        else:
-            self.current_index += 1
-        return self.shuffled_tracks[self.current_index]
-    def previous_track(self):
-        if not self.shuffled_tracks:
-            return None
-        if self.current_index <= 0:
-            self.current_index = len(self.shuffled_tracks) - 1
-        else:
-            self.current_index -= 1
-        return self.shuffled_tracks[self.current_index]
-    def total_tracks(self):
+import os
+import random
+import logging
+from pathlib import Path
+from . import utils
+from .ordering import ORDER_MODES, feature_order
+logger = logging.getLogger(__name__)
+class PlaylistManager:
+    SUPPORTED_FORMATS = ['.mp3', '.wav', '.flac', '.ogg', '.m4a']
+    # Similar tracks kept queued after the current one while the radio is on
+    RADIO_LOOKAHEAD = 5
+    def __init__(self, music_dir=None):
+        self._version = 0
+        self._listeners = []
+        self.music_dir = music_dir
+        self._current_index = 0
+        self.library_version = 0
+        self.order_version = 0
+        self._positions = None
+        self.tracks = []
+        self.shuffled_tracks = []
+        # How shuffle() orders the queue; modes other than 'shuffle' need feature_provider
+        self.order_mode = 'shuffle'
+        # Optional callable(tracks) -> rows of (tempo, energy, centroid), NaN where unknown
+        self.feature_provider = None
+        # Optional callable(track, count, exclude) -> tracks most similar to ``track`` first
+        self.neighbour_provider = None
+        # Track the radio plays "more like", or None when it is off
+        self.radio_seed = None
+        self._radio_tracks = set()
+        # Byte-identical copies: redundant path -> the copy that is kept (see set_duplicates)
+        self.duplicates = {}
+        self.collapse_duplicates = False
+        if music_dir:
+            self.scan_directory(music_dir)
+    @property
+    def version(self):
+        """Counter bumped whenever the track list, order or position changes."""
+        return self._version
+    @property
+    def tracks(self):
+        return self._tracks
+    @tracks.setter
+    def tracks(self, tracks):
+        self._tracks = tracks
+        self._positions = None
+        self.library_version += 1
+        self._changed('tracks')
+    @property
+    def current_index(self):
+        return self._current_index
+    @current_index.setter
+    def current_index(self, index):
+        self._current_index = index
+        self._changed('position')
+    def add_listener(self, callback):
+        """Register ``callback(event, playlist)``, called after each state change."""
+        self._listeners.append(callback)
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    def _changed(self, event):
+        self._version += 1
+        if event in ('tracks', 'order'):
+            self.order_version += 1
+        for callback in list(self._listeners):
+            try:
+                callback(event, self)
+            except Exception as e:
+                logger.error(f"Playlist listener failed on {event}: {e}")
+    def scan_directory(self, directory):
+        if not os.path.isdir(directory):
+            return False
+        return self.load_tracks(directory, utils.scan_audio_files(directory, self.SUPPORTED_FORMATS))
+    def load_tracks(self, directory, tracks):
+        """Install the result of a directory scan that ran elsewhere (e.g. in a job)."""
+        self.music_dir = directory
+        self.tracks = tracks
+        if not self.tracks:
+            return False
+        self.shuffle()
+        return True
+    def restore(self, directory, tracks, order, current_index):
+        """Reinstate a saved library and shuffle order (``order`` indexes into ``tracks``)."""
+        self.music_dir = directory
+        self.tracks = tracks
+        self.shuffled_tracks = [tracks[i] for i in order]
+        self._current_index = min(max(current_index, 0), max(len(self.shuffled_tracks) - 1, 0))
+        self._changed('order')
+        return bool(self.shuffled_tracks)
+    def merge_tracks(self, tracks):
+        """Adopt a fresh scan while keeping the current order and track.
+
+        Tracks that disappeared are dropped and new ones are spread at random
+        over the part of the queue that has not been played yet.
+        """
+        if tracks == self.tracks:
+            return bool(self.shuffled_tracks)
+        if not self.shuffled_tracks:
+            self.tracks = tracks
+            return self.shuffle()
+        present = set(tracks)
+        known = set(self.tracks)
+        current = self.get_current_track()
+        order = []
+        index = 0
+        for i, track in enumerate(self.shuffled_tracks):
+            if i == self.current_index:
+                index = len(order)
+            if track in present:
+                order.append(track)
+        if not order:
+            self.tracks = tracks
+            return self.shuffle()
+        if current not in present:
+            index = min(index, len(order) - 1)
+        added = [track for track in tracks if track not in known]
+        random.shuffle(added)
+        upcoming = order[index + 1:]
+        slots = set(random.sample(range(len(upcoming) + len(added)), len(added)))
+        merged = []
+        added_iter = iter(added)
+        upcoming_iter = iter(upcoming)
+        for slot in range(len(upcoming) + len(added)):
+            merged.append(next(added_iter) if slot in slots else next(upcoming_iter))
+        self.tracks = tracks
+        self.shuffled_tracks = order[:index + 1] + merged
+        self._current_index = index
+        self._changed('order')
+        return True
+    def append_tracks(self, tracks):
+        """Add tracks found by a scan that is still running.
+
+        Each new track is swapped into a random slot of the unplayed part of
+        the queue (inside-out Fisher-Yates), so the order stays uniformly
+        shuffled without reshuffling or copying the existing queue.
+        """
+        if not tracks:
+            return False
+        self._tracks.extend(tracks)
+        self._positions = None
+        self.library_version += 1
+        self._scatter(tracks)
+        self._changed('tracks')
+        return True
+    def _scatter(self, tracks):
+        queue = self.shuffled_tracks
+        first_slot = self.current_index + 1 if queue else 0
+        for track in tracks:
+            queue.append(track)
+            slot = random.randint(first_slot, len(queue) - 1)
+            queue[-1], queue[slot] = queue[slot], queue[-1]
+    def shuffle(self, keep_current=False):
+        """Build a new queue in the current order mode; ``keep_current`` leaves the current track current."""
+        if not self.tracks:
+            return False
+        current = self.get_current_track() if keep_current else None
+        order = None
+        if self.order_mode != 'shuffle' and self.feature_provider is not None:
+            try:
+                order = feature_order(self.tracks, self.feature_provider(self.tracks), self.order_mode)
+            except Exception as e:
+                logger.error(f"Cannot order tracks by {self.order_mode}: {e}")
+        if order is None:
+            order = self.tracks.copy()
+            random.shuffle(order)
+        if self.collapse_duplicates and self.duplicates:
+            order = [track for track in order if track not in self.duplicates]
+        self.radio_seed = None
+        self._radio_tracks = set()
+        self.shuffled_tracks = order
+        self._current_index = order.index(current) if current in order else 0
+        self._changed('order')
+        return True
+    def reorder(self):
+        """Rebuild a feature order from the latest features, e.g. after an analysis, keeping the current track.
+
+        Does nothing in shuffle mode or while the radio picks the queue.
+        """
+        if self.order_mode == 'shuffle' or self.radio_seed is not None:
+            return False
+        return self.shuffle(keep_current=True)
+    def set_order_mode(self, mode):
+        """Switch between random and feature-based order and rebuild the queue."""
+        if mode not in ORDER_MODES:
+            return False
+        self.order_mode = mode
+        return self.shuffle()
+    def set_duplicates(self, groups):
+        """Adopt groups of identical files (each with the copy to keep first) from a duplicate scan."""
+        self.duplicates = {path: group[0] for group in groups for path in group[1:]}
+        if self.collapse_duplicates:
+            self._collapse()
+    def set_collapse_duplicates(self, collapse):
+        """Play one copy of each set of identical files, or all of them again.
+
+        Either way the queue keeps its order and current track: redundant
+        copies are dropped from it, or put back into the unplayed part at
+        random.
+        """
+        self.collapse_duplicates = bool(collapse)
+        if self.collapse_duplicates:
+            self._collapse()
+        elif self.shuffled_tracks:
+            queued = set(self.shuffled_tracks)
+            missing = [track for track in self.tracks if track not in queued]
+            if missing:
+                self._scatter(missing)
+                self._changed('order')
+    def _collapse(self):
+        queue = self.shuffled_tracks
+        if not queue or not any(track in self.duplicates for track in queue):
+            return
+        # The current track stays even when it is a redundant copy
+        current = self.current_index
+        order = [track for i, track in enumerate(queue) if i == current or track not in self.duplicates]
+        self._current_index = current - sum(1 for track in queue[:current] if track in self.duplicates)
+        self.shuffled_tracks = order
+        self._changed('order')
+    def start_radio(self, track=None):
+        """Queue the tracks most similar to ``track`` (default: the current one) after the current track.
+
+        Similar tracks are swapped into the upcoming slots, so the queue
+        keeps every track once; next_track() tops the lookahead up again,
+        never repeating a track of the same radio session. Returns False
+        while there are no neighbours to offer.
+        """
+        track = track or self.get_current_track()
+        if track is None or self.neighbour_provider is None:
+            return False
+        self.radio_seed = track
+        self._radio_tracks = {track}
+        if not self._fill_radio():
+            self.radio_seed = None
+            self._radio_tracks = set()
+            return False
+        return True
+    def stop_radio(self):
+        """Leave the queue as it is but stop adding similar tracks to it."""
+        if self.radio_seed is None:
+            return
+        self.radio_seed = None
+        self._radio_tracks = set()
+        self._changed('radio')
+    def _fill_radio(self):
+        queue = self.shuffled_tracks
+        current = self.get_current_track()
+        if current is None:
+            return False
+        self._radio_tracks.add(current)
+        lookahead = min(self.RADIO_LOOKAHEAD, len(queue) - 1)
+        slots = [(self.current_index + offset) % len(queue) for offset in range(1, lookahead + 1)]
+        slots = [slot for slot in slots if queue[slot] not in self._radio_tracks]
+        if not slots:
+            return True
+        try:
+            similar = self.neighbour_provider(self.radio_seed, len(slots), self._radio_tracks)
+        except Exception as e:
+            logger.error(f"Cannot find tracks similar to {self.radio_seed}: {e}")
+            return False
+        if not similar:
+            return False
+        for slot, track in zip(slots, similar):
+            self._radio_tracks.add(track)
+            try:
+                index = queue.index(track)
+            except ValueError:
+                # Not queued: gone from the library, or a collapsed duplicate
+                continue
+            queue[slot], queue[index] = queue[index], queue[slot]
+        self._changed('order')
+        return True
+    def get_current_track(self):
+        if not self.shuffled_tracks or self.current_index < 0:
+            return None
+        return self.shuffled_tracks[self.current_index]
+    def get_current_track_info(self):
+        track = self.get_current_track()
+        if not track:
+            return None
+        try:
+            return {
+                'path': track,
+                'filename': Path(track).name,
+                'index': self.current_index + 1,
+                'total': len(self.shuffled_tracks)
+            }
+        except Exception:
+            return None
+    def next_track(self):
+        if not self.shuffled_tracks:
+            return None
+        if self.current_index >= len(self.shuffled_tracks) - 1:
+            self.current_index = 0
+        else:
+            self.current_index += 1
+        if self.radio_seed is not None:
+            self._fill_radio()
+        return self.shuffled_tracks[self.current_index]
+    def peek_next(self):
+        """The track next_track() would move to, without moving."""
+        if not self.shuffled_tracks:
+            return None
+        return self.shuffled_tracks[(self.current_index + 1) % len(self.shuffled_tracks)]
+    def upcoming(self, count):
+        """Up to ``count`` tracks queued after the current one, wrapping around but never repeating it."""
+        queue = self.shuffled_tracks
+        count = min(count, len(queue) - 1)
+        return [queue[(self.current_index + step) % len(queue)] for step in range(1, count + 1)]
+    def previous_track(self):
+        if not self.shuffled_tracks:
+            return None
+        if self.current_index <= 0:
+            self.current_index = len(self.shuffled_tracks) - 1
+        else:
+            self.current_index -= 1
+        return self.shuffled_tracks[self.current_index]
+    def jump_to(self, index):
+        """Make ``tracks[index]`` the current track of the queue; returns it, or None.
+
+        With duplicates collapsed, a redundant copy stands for the kept one.
+        """
+        if not 0 <= index < len(self.tracks):
+            return None
+        target = self.tracks[index]
+        if self.collapse_duplicates:
+            target = self.duplicates.get(target, target)
+        try:
+            self.current_index = self.shuffled_tracks.index(target)
+        except ValueError:
+            self.shuffle()
+            try:
+                self.current_index = self.shuffled_tracks.index(target)
+            except ValueError:
+                return None
+        return target
+    def index_of(self, track):
+        """Position of ``track`` in ``tracks`` (library order), or None."""
+        if self._positions is None:
+            self._positions = {path: i for i, path in enumerate(self._tracks)}
+        return self._positions.get(track)
+    def total_tracks(self):
         return len(self.tracks)
\ No newline at end of file
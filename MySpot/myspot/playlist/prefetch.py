@@ -0,0 +1,145 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+logger = logging.getLogger(__name__)
+# Bytes read or advised per step; the throttle sleeps between steps
+CHUNK_BYTES = 1024 * 1024
+# Seconds to hold off after a track change, while the new track's own first reads happen
+START_DELAY = 2.0
+# Files remembered as warm, for the hit counters
+WARM_MEMORY = 256
+# Let the kernel read ahead where it can instead of copying the data through userspace
+ADVISE = hasattr(os, 'posix_fadvise')
+class Prefetcher:
+    """Warms the OS page cache for the next ``lookahead`` tracks of a playlist.
+
+    Register on_playlist_event() as a PlaylistManager listener. After each
+    track change it waits START_DELAY seconds, so the track that just
+    started gets the disk to itself, then walks the upcoming files one at a
+    time in CHUNK_BYTES steps, at most ``rate`` bytes per second. Where the
+    OS has posix_fadvise the kernel is asked to read each step ahead
+    (WILLNEED); elsewhere the step is read and thrown away. A track that
+    starts after all of its file was warmed counts as a hit, else as a
+    miss. ``skip`` may be a callable(path) -> bool for files that need no
+    warming, like ones already held in memory; those count as neither.
+    With ``cache`` set (an AudioCache) the first upcoming file is read
+    into it at the same pace instead, when it fits. attach() wires all of
+    this up for a player's cache.
+    """
+    def __init__(self, lookahead=3, rate=8 * 1024 * 1024):
+        self.lookahead = lookahead
+        self.rate = rate
+        self.skip = None
+        self.cache = None
+        self.hits = 0
+        self.misses = 0
+        self.files = 0
+        self.bytes = 0
+        self._queue = deque()
+        self._active = None
+        self._next = None
+        self._cancel = False
+        self._not_before = 0.0
+        self._warm = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+    def attach(self, playlist, cache=None):
+        """Follow ``playlist``, reading its next track into ``cache`` and skipping files already in it."""
+        if cache is not None:
+            self.cache = cache
+            self.skip = lambda path: path in cache
+        playlist.add_listener(self.on_playlist_event)
+    def on_playlist_event(self, event, playlist):
+        """PlaylistManager listener: counts the new track and schedules the ones after it."""
+        if event not in ('position', 'order') or self.lookahead <= 0:
+            return
+        if event == 'position':
+            self.record_play(playlist.get_current_track())
+        self.schedule(playlist.upcoming(self.lookahead))
+    def record_play(self, path):
+        """Count ``path`` starting to play as a prefetch hit or miss."""
+        if not path or (self.skip is not None and self.skip(path)):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        with self._condition:
+            if self._warm.get(path) == (stat.st_size, stat.st_mtime):
+                self.hits += 1
+            else:
+                self.misses += 1
+    def schedule(self, paths):
+        """Replace the files waiting to be warmed with ``paths``, in order."""
+        paths = list(paths)
+        with self._condition:
+            self._next = paths[0] if paths and self.cache is not None else None
+            # A file being warmed that is now next is queued again, to be kept in memory
+            self._queue = deque(path for path in paths if path != self._active or path == self._next)
+            self._cancel = self._active is not None and self._active not in paths
+            self._not_before = time.monotonic() + START_DELAY
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                delay = self._not_before - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                path = self._active = self._queue.popleft()
+                self._cancel = False
+            try:
+                self._prefetch(path)
+            except OSError as e:
+                logger.debug(f"Cannot prefetch {path}: {e}")
+            finally:
+                with self._condition:
+                    self._active = None
+    def _prefetch(self, path):
+        if self.skip is not None and self.skip(path):
+            return
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime)
+        keep = path == self._next and self.cache.fits(stat.st_size)
+        with self._condition:
+            if not keep and self._warm.get(path) == signature:
+                return
+        advise = ADVISE and not keep
+        started = time.monotonic()
+        done = 0
+        with open(path, 'rb', buffering=0) as f:
+            buffer = None if advise else bytearray(stat.st_size if keep else CHUNK_BYTES)
+            while done < stat.st_size:
+                if self._cancel:
+                    return
+                if advise:
+                    os.posix_fadvise(f.fileno(), done, CHUNK_BYTES, os.POSIX_FADV_WILLNEED)
+                    step = min(CHUNK_BYTES, stat.st_size - done)
+                else:
+                    step = f.readinto(memoryview(buffer)[done:done + CHUNK_BYTES] if keep else buffer)
+                    if not step:
+                        break
+                done += step
+                self.bytes += step
+                if self.rate:
+                    time.sleep(max(0.0, started + done / self.rate - time.monotonic()))
+        if keep and done == stat.st_size:
+            self.cache.put(path, stat, bytes(buffer))
+        with self._condition:
+            self.files += 1
+            self._warm[path] = signature
+            self._warm.move_to_end(path)
+            while len(self._warm) > WARM_MEMORY:
+                self._warm.popitem(last=False)
+    def stats(self):
+        """Hit and miss counters and how much was prefetched."""
+        with self._condition:
+            return {'lookahead': self.lookahead, 'hits': self.hits, 'misses': self.misses,
+                    'files': self.files, 'bytes': self.bytes, 'queued': len(self._queue)}
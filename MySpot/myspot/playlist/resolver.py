@@ -0,0 +1,221 @@
+import os
+import re
+import math
+import logging
+import threading
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from .search import WORD_PATTERN
+logger = logging.getLogger(__name__)
+# Words that carry no information about which track is meant
+STOP_WORDS = frozenset(('please', 'song', 'track', 'by', 'the', 'a', 'an', 'from', 'called', 'me', 'some'))
+MIN_SIMILARITY = 0.7
+MIN_SCORE = 0.5
+PRECISION_WEIGHT = 0.1
+# Added per matched word so one bincount yields both the hit count and the score
+HIT = 1024.0
+MAX_FUZZY_CANDIDATES = 25
+EXPANSION_CACHE_SIZE = 256
+COMBINING_MARKS = re.compile('[\u0300-\u036f]')
+def normalize(text):
+    """Lower-case words with accents folded ('Beyoncé' -> ['beyonce'])."""
+    if not text.isascii():
+        text = COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', text))
+    return WORD_PATTERN.findall(text.lower())
+def trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+def edit_distance(a, b, limit):
+    """Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` once it is known to exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+class TrackResolver:
+    """Fuzzy free-text track lookup ('bohemian rapsody', 'queen under pressure').
+
+    Tracks are indexed once as bags of normalized words from their path
+    relative to ``root`` (extension dropped) plus optional tag text, stored
+    as NumPy postings per distinct word. A query word maps to the same
+    word, or, when the library does not contain it, to the words within a
+    small edit distance (found through a trigram index of the vocabulary).
+    Scoring is one weighted bincount over the matched postings: the
+    IDF-weighted share of the query a track covers, plus a small bonus for
+    file names with few unmatched words.
+    """
+    def __init__(self, tracks, root=None, tags=None):
+        if np is None:
+            raise RuntimeError("The track resolver needs numpy (pip install numpy)")
+        self.root = os.path.normpath(root) + os.sep if root else None
+        self.tracks = list(tracks)
+        flat = []
+        sizes = array('I')
+        title_sizes = array('I')
+        for track in self.tracks:
+            folders, _, name = self._searchable_text(track).rpartition(os.sep)
+            title = normalize(name)
+            words = set(title)
+            words.update(normalize(folders))
+            if tags:
+                words.update(normalize(tags.get(track, '')))
+            flat.extend(words)
+            sizes.append(len(words))
+            # Track numbers and filler words do not make a name less specific
+            title_sizes.append(sum(1 for word in set(title) if word not in STOP_WORDS and not word.isdigit()))
+        self.words = list(dict.fromkeys(flat))
+        self.vocabulary = vocabulary = {word: i for i, word in enumerate(self.words)}
+        word_ids = np.fromiter(map(vocabulary.__getitem__, flat), dtype=np.uint32, count=len(flat))
+        track_ids = np.repeat(np.arange(len(self.tracks), dtype=np.uint32), np.frombuffer(sizes, dtype=np.uint32))
+        order = np.argsort(word_ids, kind='stable')
+        self._postings = track_ids[order]
+        counts = np.bincount(word_ids, minlength=len(vocabulary))
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        self._idf = np.log((len(self.tracks) + 1) / (counts + 0.5)).astype(np.float32)
+        self._unknown_idf = math.log((len(self.tracks) + 1) / 0.5)
+        self._title_sizes = np.maximum(np.frombuffer(title_sizes, dtype=np.uint32), 1).astype(np.float32)
+        self._trigrams = None
+        self._expansions = OrderedDict()
+    def __len__(self):
+        return len(self.tracks)
+    def posting(self, word_id):
+        return self._postings[self._offsets[word_id]:self._offsets[word_id + 1]]
+    def expand(self, word):
+        """Library words standing for ``word``: [(word id, similarity)], best last."""
+        cached = self._expansions.get(word)
+        if cached is not None:
+            self._expansions.move_to_end(word)
+            return cached
+        exact = self.vocabulary.get(word)
+        expansions = [(exact, 1.0)] if exact is not None else self._fuzzy(word)
+        self._expansions[word] = expansions
+        if len(self._expansions) > EXPANSION_CACHE_SIZE:
+            self._expansions.popitem(last=False)
+        return expansions
+    def _fuzzy(self, word):
+        if len(word) < 4:
+            return []
+        if self._trigrams is None:
+            # Only built once a query actually needs a fuzzy lookup
+            index = {}
+            for word_id, known in enumerate(self.words):
+                for gram in trigrams(known):
+                    index.setdefault(gram, array('I')).append(word_id)
+            self._trigrams = index
+        limit = max(1, int(len(word) * (1.0 - MIN_SIMILARITY)))
+        shared = Counter()
+        for gram in trigrams(word):
+            shared.update(self._trigrams.get(gram, ()))
+        matches = []
+        for word_id, _ in shared.most_common(MAX_FUZZY_CANDIDATES):
+            candidate = self.words[word_id]
+            distance = edit_distance(word, candidate, limit)
+            similarity = 1.0 - distance / max(len(word), len(candidate))
+            if distance <= limit and similarity >= MIN_SIMILARITY:
+                matches.append((word_id, similarity))
+        return sorted(matches, key=lambda match: match[1])
+    def resolve(self, query, limit=5):
+        """Best matches for ``query`` as [(track, score)], highest first; score is in [0, 1.1]."""
+        words = [word for word in dict.fromkeys(normalize(query)) if word not in STOP_WORDS]
+        if not words or not self.tracks:
+            return []
+        matched = []
+        gains = []
+        total_weight = 0.0
+        for word in words:
+            expansions = self.expand(word)
+            if not expansions:
+                total_weight += self._unknown_idf
+                continue
+            weight = float(self._idf[expansions[-1][0]])
+            total_weight += weight
+            if len(expansions) == 1:
+                word_id, similarity = expansions[0]
+                matched.append(self.posting(word_id))
+                gains.append(np.full(len(matched[-1]), HIT + weight * similarity))
+                continue
+            best = np.zeros(len(self.tracks), dtype=np.float32)
+            # Ascending similarity, so a track keeps the best of its matching words
+            for word_id, similarity in expansions:
+                best[self.posting(word_id)] = similarity
+            matched.append(np.flatnonzero(best))
+            gains.append(HIT + weight * best[matched[-1]])
+        if not matched:
+            return []
+        # One pass over all matched postings instead of a scatter per word
+        totals = np.bincount(np.concatenate(matched), np.concatenate(gains), minlength=len(self.tracks))
+        candidates = np.flatnonzero(totals)
+        totals = totals[candidates]
+        hits = np.floor(totals / HIT)
+        final = (totals - hits * HIT) / total_weight
+        final += PRECISION_WEIGHT * np.minimum(hits / self._title_sizes[candidates], 1.0)
+        limit = min(limit, len(final))
+        top = np.argpartition(-final, limit - 1)[:limit]
+        top = top[np.argsort(-final[top], kind='stable')]
+        return [(self.tracks[candidates[i]], float(final[i])) for i in top]
+    def _searchable_text(self, track):
+        if self.root and track.startswith(self.root):
+            text = track[len(self.root):]
+        else:
+            text = os.sep.join(track.split(os.sep)[-3:])
+        return os.path.splitext(text)[0]
+class PlaylistResolver:
+    """Keeps a TrackResolver in step with a PlaylistManager's library.
+
+    refresh() rebuilds the index when ``playlist.library_version`` moved
+    (first from file names, then again with tag text when a ``tag_reader``
+    is given) and is meant to run in a background job. resolve() never
+    builds: it answers from the last index, or returns None before the
+    first one exists. Matches are track paths, so a slightly stale index
+    still points at the right files.
+    """
+    def __init__(self, playlist, tag_reader=None):
+        self.playlist = playlist
+        self.tag_reader = tag_reader
+        self.index = None
+        self.version = None
+        self._tags = {}
+        self._build_lock = threading.Lock()
+    def is_current(self):
+        return self.index is not None and self.version == self.playlist.library_version
+    def refresh(self, job=None):
+        """Rebuild until the index matches the playlist; returns the number of indexed tracks."""
+        if np is None:
+            logger.error("The track resolver needs numpy (pip install numpy)")
+            return 0
+        with self._build_lock:
+            while not self.is_current():
+                version = self.playlist.library_version
+                tracks = list(self.playlist.tracks)
+                root = self.playlist.music_dir
+                self.index = TrackResolver(tracks, root, self._tags)
+                self.version = version
+                if self.tag_reader is not None and self._read_tags(tracks, job):
+                    self.index = TrackResolver(tracks, root, self._tags)
+                logger.info(f"Indexed {len(tracks)} tracks for text commands")
+            return len(self.index)
+    def _read_tags(self, tracks, job):
+        new = [track for track in tracks if track not in self._tags]
+        for count, track in enumerate(new, 1):
+            if job is not None:
+                job.check_cancelled()
+                if count % 100 == 0:
+                    job.update(tags_read=count, tags_total=len(new))
+            self._tags[track] = self.tag_reader(track)
+        return bool(new)
+    def resolve(self, query, limit=5):
+        index = self.index
+        if index is None:
+            return None
+        return index.resolve(query, limit)
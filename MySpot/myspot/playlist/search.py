@@ -0,0 +1,102 @@
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from itertools import compress, repeat
+from operator import contains
+WORD_PATTERN = re.compile(r'\w+')
+PREFIX_LENGTHS = (1, 2)
+RESULT_CACHE_SIZE = 16
+class _Postings(dict):
+    def __missing__(self, prefix):
+        posting = self[prefix] = array('I')
+        return posting
+def tokenize(text):
+    return WORD_PATTERN.findall(text.lower())
+def result_row(results, index):
+    """Row of track ``index`` within sorted ``results``, or None."""
+    row = bisect_left(results, index)
+    if row < len(results) and results[row] == index:
+        return row
+    return None
+class TrackIndex:
+    """In-memory word-prefix index over track file names and folders.
+
+    Every query token must be the start of a word in the track's path
+    relative to ``root`` (folders included, extension dropped). Tracks
+    are posted under the first one and two letters of each word, so the
+    first keystrokes are a dictionary lookup. Longer tokens refine the
+    smallest known superset (that posting or a cached earlier result) with
+    one substring test per track against a prebuilt ``" word word"`` key.
+    Results are track positions in the order the tracks were added.
+    """
+    def __init__(self, tracks=None, root=None):
+        self.root = os.path.normpath(root) + os.sep if root else None
+        self._keys = []
+        self._postings = _Postings()
+        self._cache = OrderedDict()
+        if tracks:
+            self.extend(tracks)
+    def __len__(self):
+        return len(self._keys)
+    def extend(self, tracks):
+        """Index more tracks; safe to call in chunks while a scan is running."""
+        keys = self._keys
+        get = self._postings.__getitem__
+        append = array.append
+        start = len(keys)
+        for i, track in enumerate(tracks, start):
+            words = tokenize(self._searchable_text(track))
+            keys.append(' ' + ' '.join(words))
+            prefixes = set()
+            for length in PREFIX_LENGTHS:
+                prefixes.update(word[:length] for word in words)
+            # C-level loop: appends i to the posting of each distinct prefix
+            deque(map(append, map(get, prefixes), repeat(i)), maxlen=0)
+        self._cache.clear()
+    def search(self, query):
+        """Positions of the tracks matching every word of ``query``; None if it is empty."""
+        tokens = tuple(sorted(set(tokenize(query)), key=len, reverse=True))
+        if not tokens:
+            return None
+        cached = self._cache.get(tokens)
+        if cached is not None:
+            self._cache.move_to_end(tokens)
+            return cached
+        candidates, verified = self._narrowest(tokens)
+        keys = self._keys
+        for token in tokens:
+            if token in verified:
+                continue
+            needle = ' ' + token
+            candidates = list(compress(candidates, map(contains, map(keys.__getitem__, candidates), repeat(needle))))
+            if not candidates:
+                break
+        if not isinstance(candidates, list):
+            candidates = list(candidates)
+        self._cache[tokens] = candidates
+        if len(self._cache) > RESULT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return candidates
+    def _narrowest(self, tokens):
+        # Start from the smallest set known to contain every match
+        best = range(len(self._keys))
+        verified = ()
+        for token in tokens:
+            posting = self._postings.get(token[:PREFIX_LENGTHS[-1]], ())
+            if len(posting) < len(best):
+                best = posting
+                verified = (token,) if len(token) <= PREFIX_LENGTHS[-1] else ()
+        for previous, result in self._cache.items():
+            # Every earlier token is a prefix of a new one, so its matches are a superset
+            if len(result) < len(best) and all(any(token.startswith(p) for token in tokens) for p in previous):
+                best = result
+                verified = tuple(token for token in tokens if token in previous)
+        return best, verified
+    def _searchable_text(self, track):
+        if self.root and track.startswith(self.root):
+            text = track[len(self.root):]
+        else:
+            text = os.sep.join(track.split(os.sep)[-3:])
+        return os.path.splitext(text)[0]
@@ -1,30 +1,60 @@
-import os
-import logging
-from pathlib import Path
-logger = logging.getLogger(__name__)
-def scan_audio_files(directory, supported_formats):
-    audio_files = []
-    try:
-        abs_directory = os.path.abspath(directory)
-        for root, _, files in os.walk(abs_directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if os.path.splitext(file_path)[1].lower() in supported_formats:
-                    audio_files.append(file_path)
-        logger.info(f"Found {len(audio_files)} audio files in {directory}")
-        return audio_files
-    except Exception as e:
-        logger.error(f"Error scanning directory {directory}: {e}")
-        return []
-def get_file_metadata(file_path):
-    try:
-        path = Path(file_path)
-        return {
-            'filename': path.name,
-            'size': path.stat().st_size,
-            'modified': path.stat().st_mtime,
-            'extension': path.suffix.lower()
-        }
-    except Exception as e:
-        logger.error(f"Error getting metadata for {file_path}: {e}")
-        return None
\ No newline at end of file
+import os
+import logging
+from pathlib import Path
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+logger = logging.getLogger(__name__)
+TAG_FIELDS = ('title', 'artist', 'album')
+def iter_audio_dirs(directory, supported_formats):
+    """Walk ``directory`` yielding (dirpath, audio_paths, file_count) per directory."""
+    formats = {ext.lower() for ext in supported_formats}
+    for root, _, files in os.walk(os.path.abspath(directory)):
+        found = [os.path.join(root, file) for file in files if os.path.splitext(file)[1].lower() in formats]
+        yield root, found, len(files)
+def scan_audio_files(directory, supported_formats):
+    audio_files = []
+    try:
+        for _, found, _ in iter_audio_dirs(directory, supported_formats):
+            audio_files.extend(found)
+        logger.info(f"Found {len(audio_files)} audio files in {directory}")
+        return audio_files
+    except Exception as e:
+        logger.error(f"Error scanning directory {directory}: {e}")
+        return []
+def scan_audio_files_job(job, directory, supported_formats):
+    """Job body for JobManager: scan with progress counters and cancellation."""
+    audio_files = []
+    for _, found, file_count in iter_audio_dirs(directory, supported_formats):
+        job.check_cancelled()
+        audio_files.extend(found)
+        job.increment('dirs')
+        job.increment('files_seen', file_count)
+        job.update(audio_files=len(audio_files))
+    logger.info(f"Found {len(audio_files)} audio files in {directory}")
+    return audio_files
+def get_file_metadata(file_path):
+    try:
+        path = Path(file_path)
+        return {
+            'filename': path.name,
+            'size': path.stat().st_size,
+            'modified': path.stat().st_mtime,
+            'extension': path.suffix.lower()
+        }
+    except Exception as e:
+        logger.error(f"Error getting metadata for {file_path}: {e}")
+        return None
+def read_tags(file_path):
+    """Title, artist and album tags as one string; empty without mutagen or tags."""
+    if mutagen is None:
+        return ''
+    try:
+        audio = mutagen.File(file_path, easy=True)
+    except Exception as e:
+        logger.debug(f"Cannot read tags of {file_path}: {e}")
+        return ''
+    if audio is None or not audio.tags:
+        return ''
+    return ' '.join(value for field in TAG_FIELDS for value in audio.tags.get(field, []))
\ No newline at end of file
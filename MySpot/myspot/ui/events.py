@@ -0,0 +1,55 @@
+import queue
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class UIEventBus:
+    """Delivers engine events from any thread to handlers on the Tk main loop.
+
+    post() only touches a thread-safe queue. The Tk loop drains it at most
+    ``fps`` times per second; events with the same name posted within one
+    frame are coalesced and only the latest payload is dispatched, so a
+    burst of changes costs a single redraw.
+    """
+
+    def __init__(self, root, fps=30):
+        self.root = root
+        self.frame_ms = max(1, int(1000 / fps))
+        self._queue = queue.Queue()
+        self._handlers = {}
+        self._after_id = None
+
+    def subscribe(self, event, handler):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def post(self, event, payload=None):
+        """Thread-safe; may be called from worker or engine threads."""
+        self._queue.put((event, payload))
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.frame_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _drain(self):
+        pending = OrderedDict()
+        while True:
+            try:
+                event, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.pop(event, None)
+            pending[event] = payload
+        for event, payload in pending.items():
+            for handler in self._handlers.get(event, ()):
+                try:
+                    handler(payload)
+                except Exception as e:
+                    logger.error(f"UI handler for {event} failed: {e}")
+        self._after_id = self.root.after(self.frame_ms, self._drain)
@@ -1,501 +1,692 @@
-import os
-import sys
-import threading
-import tkinter as tk
-from tkinter import ttk, filedialog
-from pathlib import Path
-import pygame
-import pygetwindow as gw
-
-from ..audio.player import AudioPlayer
-from ..playlist.playlist import PlaylistManager
-from ..config.config import ConfigManager
-
-class ModernUI:
-    @staticmethod
-    def create_button(parent, text, command, size=12, width=None, hover_color="#333333"):
-        btn = tk.Button(
-            parent,
-            text=text,
-            font=("Segoe UI", size),
-            bg="#3D3D3D",
-            fg="#FFFFFF",
-            activebackground="#444444",
-            activeforeground="#FFFFFF",
-            borderwidth=0,
-            padx=10,
-            pady=5,
-            width=width,
-            cursor="hand2",
-            command=command,
-            relief="raised",
-            highlightthickness=0,
-            bd=0,
-
-            highlightbackground="#3D3D3D",
-            highlightcolor="#3D3D3D",
-        )
-
-        btn.bind("<Enter>", lambda e: btn.config(background=hover_color))
-        btn.bind("<Leave>", lambda e: btn.config(background="#3D3D3D"))
-
-        return btn
-
-class GUIPlayer:
-    def __init__(self, root=None):
-        self.config = ConfigManager()
-        self.player = AudioPlayer(volume=self.config.get('volume', 0.5))
-        self.playlist = PlaylistManager(self.config.get('music_directory'))
-
-        self.root = root or tk.Tk()
-        self.root.title("MySpot Player")
-        self.root.geometry("750x500")
-        self.root.minsize(650, 450)
-
-        self.bg_color = "#1E1E1E"
-        self.fg_color = "#E6E6E6"
-        self.accent_color = "#1DB954"
-        self.button_bg = "#3D3D3D"
-        self.secondary_color = "#333333"
-
-        self.root.configure(bg=self.bg_color)
-
-        self.style = self._setup_styles()
-
-        self._create_ui()
-
-        self.polling = True
-        self.poll_thread = threading.Thread(target=self._poll_playback_status, daemon=True)
-        self.poll_thread.start()
-
-        if not self.playlist.tracks:
-            self.open_directory()
-        else:
-            self.playlist.current_index = 0
-            self._populate_playlist()
-            self._play_current_track()
-
-    def _setup_styles(self):
-        style = ttk.Style()
-        style.configure(
-            "MySpot.Horizontal.TScale",
-            background="#1E1E1E",
-            troughcolor="#333333",
-            sliderwidth=15,
-            sliderlength=15
-        )
-
-        style.configure(
-            "MySpot.Treeview",
-            background="#2D2D2D",
-            foreground="#E6E6E6",
-            fieldbackground="#2D2D2D",
-            rowheight=25
-        )
-
-        style.configure(
-            "MySpot.Treeview.Heading",
-            background="#1E1E1E",
-            foreground="#AAAAAA",
-            relief="flat"
-        )
-
-        style.map(
-            "MySpot.Treeview",
-            background=[("selected", "#1DB954")],
-            foreground=[("selected", "#FFFFFF")]
-        )
-
-        return style
-
-    def _create_ui(self):
-
-        main_frame = tk.Frame(self.root, bg=self.bg_color)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=15)
-
-        header_frame = tk.Frame(main_frame, bg=self.bg_color)
-        header_frame.pack(fill=tk.X, pady=(0, 10))
-
-        title_label = tk.Label(
-            header_frame,
-            text="MySpot",
-            bg=self.bg_color,
-            fg=self.accent_color,
-            font=("Segoe UI", 20, "bold")
-        )
-        title_label.pack(side=tk.LEFT)
-
-        folder_btn = ModernUI.create_button(
-            header_frame,
-            text="📁",
-            command=self.open_directory,
-            size=14
-        )
-        folder_btn.pack(side=tk.RIGHT)
-
-        shuffle_btn = ModernUI.create_button(
-            header_frame,
-            text="🔀",
-            command=self.shuffle_playlist,
-            size=14
-        )
-        shuffle_btn.pack(side=tk.RIGHT, padx=5)
-
-        paned_window = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
-        paned_window.pack(fill=tk.BOTH, expand=True)
-
-        left_pane = tk.Frame(paned_window, bg=self.bg_color)
-        paned_window.add(left_pane, weight=1)
-
-        track_frame = tk.Frame(left_pane, bg=self.secondary_color, padx=15, pady=15)
-        track_frame.pack(fill=tk.X, pady=10)
-
-        now_playing = tk.Label(
-            track_frame,
-            text="NOW PLAYING",
-            bg=self.secondary_color,
-            fg=self.accent_color,
-            font=("Segoe UI", 9),
-            anchor=tk.W
-        )
-        now_playing.pack(fill=tk.X)
-
-        self.track_var = tk.StringVar(value="No track playing")
-        self.track_label = tk.Label(
-            track_frame,
-            textvariable=self.track_var,
-            bg=self.secondary_color,
-            fg=self.fg_color,
-            font=("Segoe UI", 12, "bold"),
-            anchor=tk.W,
-            wraplength=490
-        )
-        self.track_label.pack(fill=tk.X, pady=(5, 10))
-
-        self.track_info_var = tk.StringVar(value="")
-        self.track_info_label = tk.Label(
-            track_frame,
-            textvariable=self.track_info_var,
-            bg=self.secondary_color,
-            fg="#AAAAAA",
-            font=("Segoe UI", 9),
-            anchor=tk.W
-        )
-        self.track_info_label.pack(fill=tk.X)
-
-        control_frame = tk.Frame(left_pane, bg=self.bg_color)
-        control_frame.pack(pady=15)
-
-        self.prev_button = ModernUI.create_button(
-            control_frame,
-            text="⏮",
-            command=self.previous_track,
-            size=16
-        )
-        self.prev_button.pack(side=tk.LEFT, padx=10)
-
-        self.play_button = ModernUI.create_button(
-            control_frame,
-            text="▶",
-            command=self.toggle_play_pause,
-            size=22,
-            hover_color="#2D2D2D"
-        )
-        self.play_button.pack(side=tk.LEFT, padx=15)
-
-        self.next_button = ModernUI.create_button(
-            control_frame,
-            text="⏭",
-            command=self.next_track,
-            size=16
-        )
-        self.next_button.pack(side=tk.LEFT, padx=10)
-
-        volume_frame = tk.Frame(left_pane, bg=self.bg_color)
-        volume_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 10))
-
-        self.mute_button = ModernUI.create_button(
-            volume_frame,
-            text="🔊",
-            command=self.toggle_mute,
-            size=12
-        )
-        self.mute_button.pack(side=tk.LEFT, padx=(0, 10))
-
-        self.volume_var = tk.DoubleVar(value=self.player.get_volume())
-        self.volume_slider = ttk.Scale(
-            volume_frame,
-            from_=0.0,
-            to=1.0,
-            orient=tk.HORIZONTAL,
-            variable=self.volume_var,
-            command=self.set_volume,
-            style="MySpot.Horizontal.TScale"
-        )
-        self.volume_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
-
-        self.volume_label = tk.Label(
-            volume_frame,
-            text=f"{int(self.volume_var.get() * 100)}%",
-            bg=self.bg_color,
-            fg=self.fg_color,
-            font=("Segoe UI", 9)
-        )
-        self.volume_label.pack(side=tk.LEFT, padx=5)
-
-        right_pane = tk.Frame(paned_window, bg=self.bg_color)
-        paned_window.add(right_pane, weight=1)
-
-        playlist_header = tk.Label(
-            right_pane,
-            text="PLAYLIST",
-            bg=self.bg_color,
-            fg=self.accent_color,
-            font=("Segoe UI", 12, "bold"),
-            anchor=tk.W
-        )
-        playlist_header.pack(fill=tk.X, pady=(0, 10))
-
-        playlist_frame = tk.Frame(right_pane, bg=self.bg_color)
-        playlist_frame.pack(fill=tk.BOTH, expand=True)
-
-        scrollbar = ttk.Scrollbar(playlist_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        self.playlist_tree = ttk.Treeview(
-            playlist_frame,
-            style="MySpot.Treeview",
-            selectmode="browse",
-            show="headings",
-            yscrollcommand=scrollbar.set
-        )
-        self.playlist_tree.pack(fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.playlist_tree.yview)
-
-        self.playlist_tree["columns"] = ("Track",)
-
-        self.playlist_tree.column("Track", width=280, anchor=tk.W)
-
-        self.playlist_tree.heading("Track", text="Track", anchor=tk.W)
-
-        self.playlist_tree.bind("<Double-1>", self.play_selected_track)
-
-        status_frame = tk.Frame(self.root, bg="#111111", height=25)
-        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
-
-        self.status_label = tk.Label(
-            status_frame,
-            text="Ready",
-            bg="#111111",
-            fg="#888888",
-            font=("Segoe UI", 8),
-            anchor=tk.W
-        )
-        self.status_label.pack(side=tk.LEFT, padx=10)
-
-        self.root.bind("<space>", lambda e: self.toggle_play_pause())
-        self.root.bind("n", lambda e: self.next_track())
-        self.root.bind("p", lambda e: self.previous_track())
-        self.root.bind("m", lambda e: self.toggle_mute())
-        self.root.bind("q", lambda e: self.on_close())
-        self.root.bind("<plus>", lambda e: self.increase_volume())
-        self.root.bind("<minus>", lambda e: self.decrease_volume())
-        self.root.bind("<o>", lambda e: self.open_directory())
-        self.root.bind("s", lambda e: self.shuffle_playlist())
-
-    def _populate_playlist(self):
-        """Populate the playlist treeview with tracks."""
-
-        for item in self.playlist_tree.get_children():
-            self.playlist_tree.delete(item)
-
-        tracks_to_display = self.playlist.shuffled_tracks if self.playlist.shuffled_tracks else self.playlist.tracks
-
-        for i, track_path in enumerate(tracks_to_display):
-            track_name = Path(track_path).name
-            self.playlist_tree.insert("", "end", iid=str(i), values=(track_name,))
-
-        if self.playlist.current_index >= 0 and self.playlist.current_index < len(tracks_to_display):
-            self.playlist_tree.selection_set(str(self.playlist.current_index))
-            self.playlist_tree.see(str(self.playlist.current_index))
-
-    def play_selected_track(self, event=None):
-        """Play the track selected in the playlist."""
-        selected_items = self.playlist_tree.selection()
-        if not selected_items:
-            return
-
-        try:
-            selected_index = int(selected_items[0])
-
-            self.playlist.current_index = selected_index
-
-            current_track = self.playlist.get_current_track()
-            if current_track:
-                self.player.play(current_track)
-                self.update_ui()
-                self.status_label.config(text=f"Playing: {Path(current_track).name}")
-        except Exception as e:
-            self.status_label.config(text=f"Error playing track: {e}")
-
-    def shuffle_playlist(self):
-        """Shuffle the playlist and update the UI."""
-        if self.playlist.shuffle():
-            self._populate_playlist()
-            self.status_label.config(text="Playlist shuffled")
-
-    def open_directory(self):
-        directory = filedialog.askdirectory(
-            title="Select Music Directory",
-            initialdir=self.config.get('music_directory', os.path.expanduser("~/Music"))
-        )
-
-        if directory:
-            self.status_label.config(text=f"Loading music from {directory}...")
-            self.root.update()
-
-            if self.playlist.scan_directory(directory):
-                self.config.set('music_directory', directory)
-                self.playlist.current_index = 0
-                self._populate_playlist()
-                self._play_current_track()
-                self.update_track_info()
-                self.status_label.config(text=f"Loaded {self.playlist.total_tracks()} tracks")
-            else:
-                self.status_label.config(text="No music files found in selected directory")
-
-    def _play_current_track(self):
-        current = self.playlist.get_current_track()
-        if current:
-            self.player.play(current)
-
-            self.update_ui()
-            if self.playlist.current_index >= 0:
-                self.playlist_tree.selection_set(str(self.playlist.current_index))
-                self.playlist_tree.see(str(self.playlist.current_index))
-            self.status_label.config(text=f"Playing: {Path(current).name}")
-
-    def toggle_play_pause(self):
-        current = self.playlist.get_current_track()
-
-        if not current:
-            return
-
-        status = self.player.toggle_play_pause()
-
-        if status == "playing":
-            self.play_button.config(text="⏸")
-            self.status_label.config(text=f"Playing: {Path(current).name}")
-        else:
-            self.play_button.config(text="▶")
-            self.status_label.config(text=f"Paused: {Path(current).name}")
-
-    def next_track(self):
-        next_track = self.playlist.next_track()
-        if next_track:
-            self.player.play(next_track)
-
-            self.update_ui()
-            self.playlist_tree.selection_set(str(self.playlist.current_index))
-            self.playlist_tree.see(str(self.playlist.current_index))
-            self.status_label.config(text=f"Playing: {Path(next_track).name}")
-
-    def previous_track(self):
-        prev_track = self.playlist.previous_track()
-        if prev_track:
-            self.player.play(prev_track)
-
-            self.update_ui()
-            self.playlist_tree.selection_set(str(self.playlist.current_index))
-            self.playlist_tree.see(str(self.playlist.current_index))
-            self.status_label.config(text=f"Playing: {Path(prev_track).name}")
-
-    def toggle_mute(self):
-        is_muted = self.player.toggle_mute()
-
-        if is_muted:
-            self.mute_button.config(text="🔇")
-        else:
-            self.mute_button.config(text="🔊")
-
-    def set_volume(self, value):
-        try:
-            volume = float(value)
-            self.player.set_volume(volume)
-            self.volume_label.config(text=f"{int(volume * 100)}%")
-            self.config.set('volume', volume)
-        except ValueError:
-            pass
-
-    def increase_volume(self):
-        new_vol = self.player.increase_volume(0.05)
-        self.volume_var.set(new_vol)
-        self.volume_label.config(text=f"{int(new_vol * 100)}%")
-        self.config.set('volume', new_vol)
-
-    def decrease_volume(self):
-        new_vol = self.player.decrease_volume(0.05)
-        self.volume_var.set(new_vol)
-        self.volume_label.config(text=f"{int(new_vol * 100)}%")
-        self.config.set('volume', new_vol)
-
-    def update_track_info(self):
-        track_info = self.playlist.get_current_track_info()
-
-        if not track_info:
-            self.track_var.set("No track playing")
-            self.track_info_var.set("")
-            return
-
-        self.track_var.set(track_info['filename'])
-        self.track_info_var.set(f"Track {track_info['index']} of {track_info['total']}")
-
-    def update_ui(self):
-        self.update_track_info()
-
-        if self.player.is_playing():
-            self.play_button.config(text="⏸")
-        else:
-            self.play_button.config(text="▶")
-
-        if self.player.is_muted():
-            self.mute_button.config(text="🔇")
-        else:
-            self.mute_button.config(text="🔊")
-
-        self.volume_var.set(self.player.get_volume())
-        self.volume_label.config(text=f"{int(self.player.get_volume() * 100)}%")
-
-    def _poll_playback_status(self):
-        import time
-        while self.polling:
-            if self.player.current_track and not self.player.is_playing() and not self.player.is_paused:
-                self.next_track()
-            time.sleep(0.5)
-
-    def on_close(self):
-        self.config.set('volume', self.player.get_volume())
-        current = self.playlist.get_current_track()
-        if current:
-            self.config.set('last_played', current)
-
-        self.polling = False
-        self.player.stop()
-        self.root.destroy()
-
-    def start(self):
-        self.root.mainloop()
-
-def main():
-    try:
-        from ctypes import windll
-        windll.shcore.SetProcessDpiAwareness(1)
-    except:
-        pass
-
-    root = tk.Tk()
-    app = GUIPlayer(root)
-    app.start()
-
-if __name__ == "__main__":
+import os
+import sys
+import time
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog
+from pathlib import Path
+import pygame
+import pygetwindow as gw
+
+from ..audio.player import AudioPlayer
+from ..playlist.playlist import PlaylistManager
+from ..playlist.prefetch import Prefetcher
+from ..playlist import utils as playlist_utils
+from ..playlist.search import TrackIndex, result_row
+from ..config.config import ConfigManager
+from ..jobs import JobManager
+from .widgets import VirtualTrackList
+from .events import UIEventBus
+
+SCAN_BATCH_SIZE = 2000
+SCAN_FLUSH_SECONDS = 0.25
+SCAN_POLL_MS = 100
+INDEX_CHUNK_SIZE = 1000
+
+class ModernUI:
+    @staticmethod
+    def create_button(parent, text, command, size=12, width=None, hover_color="#333333"):
+        btn = tk.Button(
+            parent,
+            text=text,
+            font=("Segoe UI", size),
+            bg="#3D3D3D",
+            fg="#FFFFFF",
+            activebackground="#444444",
+            activeforeground="#FFFFFF",
+            borderwidth=0,
+            padx=10,
+            pady=5,
+            width=width,
+            cursor="hand2",
+            command=command,
+            relief="raised",
+            highlightthickness=0,
+            bd=0,
+
+            highlightbackground="#3D3D3D",
+            highlightcolor="#3D3D3D",
+        )
+
+        btn.bind("<Enter>", lambda e: btn.config(background=hover_color))
+        btn.bind("<Leave>", lambda e: btn.config(background="#3D3D3D"))
+
+        return btn
+
+class GUIPlayer:
+    def __init__(self, root=None):
+        self.config = ConfigManager()
+        self.player = AudioPlayer(volume=self.config.get('volume', 0.5),
+                                  cache_bytes=self.config.get('audio_cache_mb', 256) * 1024 * 1024)
+        self.playlist = PlaylistManager()
+        # The player's cache only holds what the prefetcher reads ahead, paced as in the web server
+        self.prefetcher = Prefetcher(self.config.get('prefetch_tracks', 3),
+                                     self.config.get('prefetch_rate_mb', 8) * 1024 * 1024)
+        self.prefetcher.attach(self.playlist, self.player.cache)
+
+        # Directory scans run on a worker; results come back through scan_queue
+        self.jobs = JobManager(max_workers=1)
+        self.scan_queue = queue.Queue()
+        self.scan_job = None
+        self.scan_directory = None
+        self.scan_loaded = 0
+        self.scan_prompt_if_empty = False
+
+        # Search index over playlist.tracks, filled in chunks on the Tk loop
+        self.track_index = None
+        self.indexed_tracks = None
+        self.index_job = None
+        self.filter_results = None
+
+        self.root = root or tk.Tk()
+        self.root.title("MySpot Player")
+        self.root.geometry("750x500")
+        self.root.minsize(650, 450)
+
+        self.bg_color = "#1E1E1E"
+        self.fg_color = "#E6E6E6"
+        self.accent_color = "#1DB954"
+        self.button_bg = "#3D3D3D"
+        self.secondary_color = "#333333"
+
+        self.root.configure(bg=self.bg_color)
+
+        self.style = self._setup_styles()
+
+        self._create_ui()
+
+        # Engine changes reach the widgets only through the bus, on the Tk thread
+        self.events = UIEventBus(self.root, fps=30)
+        self.events.subscribe('state', self._on_state_changed)
+        self.events.subscribe('state', self._sync_track_index)
+        self.events.subscribe('track_ended', self._on_track_ended)
+        self.player.add_listener(lambda event, player: self.events.post('state'))
+        self.playlist.add_listener(lambda event, playlist: self.events.post('state'))
+        self.events.start()
+
+        self.polling = True
+        self.poll_thread = threading.Thread(target=self._poll_playback_status, daemon=True)
+        self.poll_thread.start()
+
+        music_dir = self.config.get('music_directory')
+        if music_dir and os.path.isdir(music_dir):
+            self.start_scan(music_dir, prompt_if_empty=True)
+        else:
+            self.open_directory()
+
+    def _setup_styles(self):
+        style = ttk.Style()
+        style.configure(
+            "MySpot.Horizontal.TScale",
+            background="#1E1E1E",
+            troughcolor="#333333",
+            sliderwidth=15,
+            sliderlength=15
+        )
+
+        style.configure(
+            "MySpot.Treeview",
+            background="#2D2D2D",
+            foreground="#E6E6E6",
+            fieldbackground="#2D2D2D",
+            rowheight=25
+        )
+
+        style.configure(
+            "MySpot.Treeview.Heading",
+            background="#1E1E1E",
+            foreground="#AAAAAA",
+            relief="flat"
+        )
+
+        style.map(
+            "MySpot.Treeview",
+            background=[("selected", "#1DB954")],
+            foreground=[("selected", "#FFFFFF")]
+        )
+
+        return style
+
+    def _create_ui(self):
+
+        main_frame = tk.Frame(self.root, bg=self.bg_color)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=15)
+
+        header_frame = tk.Frame(main_frame, bg=self.bg_color)
+        header_frame.pack(fill=tk.X, pady=(0, 10))
+
+        title_label = tk.Label(
+            header_frame,
+            text="MySpot",
+            bg=self.bg_color,
+            fg=self.accent_color,
+            font=("Segoe UI", 20, "bold")
+        )
+        title_label.pack(side=tk.LEFT)
+
+        folder_btn = ModernUI.create_button(
+            header_frame,
+            text="📁",
+            command=self.open_directory,
+            size=14
+        )
+        folder_btn.pack(side=tk.RIGHT)
+
+        shuffle_btn = ModernUI.create_button(
+            header_frame,
+            text="🔀",
+            command=self.shuffle_playlist,
+            size=14
+        )
+        shuffle_btn.pack(side=tk.RIGHT, padx=5)
+
+        paned_window = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
+        paned_window.pack(fill=tk.BOTH, expand=True)
+
+        left_pane = tk.Frame(paned_window, bg=self.bg_color)
+        paned_window.add(left_pane, weight=1)
+
+        track_frame = tk.Frame(left_pane, bg=self.secondary_color, padx=15, pady=15)
+        track_frame.pack(fill=tk.X, pady=10)
+
+        now_playing = tk.Label(
+            track_frame,
+            text="NOW PLAYING",
+            bg=self.secondary_color,
+            fg=self.accent_color,
+            font=("Segoe UI", 9),
+            anchor=tk.W
+        )
+        now_playing.pack(fill=tk.X)
+
+        self.track_var = tk.StringVar(value="No track playing")
+        self.track_label = tk.Label(
+            track_frame,
+            textvariable=self.track_var,
+            bg=self.secondary_color,
+            fg=self.fg_color,
+            font=("Segoe UI", 12, "bold"),
+            anchor=tk.W,
+            wraplength=490
+        )
+        self.track_label.pack(fill=tk.X, pady=(5, 10))
+
+        self.track_info_var = tk.StringVar(value="")
+        self.track_info_label = tk.Label(
+            track_frame,
+            textvariable=self.track_info_var,
+            bg=self.secondary_color,
+            fg="#AAAAAA",
+            font=("Segoe UI", 9),
+            anchor=tk.W
+        )
+        self.track_info_label.pack(fill=tk.X)
+
+        control_frame = tk.Frame(left_pane, bg=self.bg_color)
+        control_frame.pack(pady=15)
+
+        self.prev_button = ModernUI.create_button(
+            control_frame,
+            text="⏮",
+            command=self.previous_track,
+            size=16
+        )
+        self.prev_button.pack(side=tk.LEFT, padx=10)
+
+        self.play_button = ModernUI.create_button(
+            control_frame,
+            text="▶",
+            command=self.toggle_play_pause,
+            size=22,
+            hover_color="#2D2D2D"
+        )
+        self.play_button.pack(side=tk.LEFT, padx=15)
+
+        self.next_button = ModernUI.create_button(
+            control_frame,
+            text="⏭",
+            command=self.next_track,
+            size=16
+        )
+        self.next_button.pack(side=tk.LEFT, padx=10)
+
+        volume_frame = tk.Frame(left_pane, bg=self.bg_color)
+        volume_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(0, 10))
+
+        self.mute_button = ModernUI.create_button(
+            volume_frame,
+            text="🔊",
+            command=self.toggle_mute,
+            size=12
+        )
+        self.mute_button.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.volume_var = tk.DoubleVar(value=self.player.get_volume())
+        self.volume_slider = ttk.Scale(
+            volume_frame,
+            from_=0.0,
+            to=1.0,
+            orient=tk.HORIZONTAL,
+            variable=self.volume_var,
+            command=self.set_volume,
+            style="MySpot.Horizontal.TScale"
+        )
+        self.volume_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+
+        self.volume_label = tk.Label(
+            volume_frame,
+            text=f"{int(self.volume_var.get() * 100)}%",
+            bg=self.bg_color,
+            fg=self.fg_color,
+            font=("Segoe UI", 9)
+        )
+        self.volume_label.pack(side=tk.LEFT, padx=5)
+
+        right_pane = tk.Frame(paned_window, bg=self.bg_color)
+        paned_window.add(right_pane, weight=1)
+
+        playlist_header = tk.Label(
+            right_pane,
+            text="PLAYLIST",
+            bg=self.bg_color,
+            fg=self.accent_color,
+            font=("Segoe UI", 12, "bold"),
+            anchor=tk.W
+        )
+        playlist_header.pack(fill=tk.X, pady=(0, 10))
+
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *args: self._apply_filter())
+        self.filter_entry = tk.Entry(
+            right_pane,
+            textvariable=self.filter_var,
+            bg="#2D2D2D",
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            relief=tk.FLAT,
+            font=("Segoe UI", 10)
+        )
+        self.filter_entry.pack(fill=tk.X, pady=(0, 10), ipady=4)
+        # Keep the single-key shortcuts bound on the root from firing while typing
+        self.filter_entry.bindtags((self.filter_entry, "Entry", "all"))
+        self.filter_entry.bind("<Escape>", lambda e: self.clear_filter())
+        self.filter_entry.bind("<Return>", lambda e: self.play_filtered_track())
+        self.filter_entry.bind("<Down>", lambda e: self.track_list.tree.focus_set())
+
+        # Only the rows near the viewport exist, so huge folders load instantly
+        self.track_list = VirtualTrackList(
+            right_pane,
+            style="MySpot.Treeview",
+            row_height=25,
+            on_activate=lambda index: self.play_selected_track(),
+            bg=self.bg_color
+        )
+        self.track_list.pack(fill=tk.BOTH, expand=True)
+        self.playlist_tree = self.track_list.tree
+
+        status_frame = tk.Frame(self.root, bg="#111111", height=25)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.status_label = tk.Label(
+            status_frame,
+            text="Ready",
+            bg="#111111",
+            fg="#888888",
+            font=("Segoe UI", 8),
+            anchor=tk.W
+        )
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
+        self.cancel_scan_button = ModernUI.create_button(
+            status_frame,
+            text="Cancel",
+            command=self.cancel_scan,
+            size=8
+        )
+
+        self.root.bind("<space>", lambda e: self.toggle_play_pause())
+        self.root.bind("n", lambda e: self.next_track())
+        self.root.bind("p", lambda e: self.previous_track())
+        self.root.bind("m", lambda e: self.toggle_mute())
+        self.root.bind("q", lambda e: self.on_close())
+        self.root.bind("<plus>", lambda e: self.increase_volume())
+        self.root.bind("<minus>", lambda e: self.decrease_volume())
+        self.root.bind("<o>", lambda e: self.open_directory())
+        self.root.bind("s", lambda e: self.shuffle_playlist())
+        self.root.bind("/", lambda e: self.filter_entry.focus_set())
+        self.root.bind("<Control-f>", lambda e: self.filter_entry.focus_set())
+
+    def _populate_playlist(self):
+        """Populate the playlist treeview with tracks."""
+        if self.filter_results is not None:
+            self._apply_filter()
+            return
+
+        tracks_to_display = self.playlist.shuffled_tracks if self.playlist.shuffled_tracks else self.playlist.tracks
+        self.track_list.set_items(tracks_to_display)
+
+        if self.playlist.current_index >= 0 and self.playlist.current_index < len(tracks_to_display):
+            self.track_list.set_current(self.playlist.current_index)
+
+    def play_selected_track(self, event=None):
+        """Play the track selected in the playlist."""
+        selected_index = self.track_list.selected_index()
+        if selected_index is None:
+            return
+
+        try:
+            if self.filter_results is not None:
+                # Rows of a filtered view are library positions; jump_to() finds them in the queue
+                # (re-queueing a track a rescan or duplicate collapse dropped) like the web player
+                current_track = self.playlist.jump_to(self.filter_results[selected_index])
+            else:
+                self.playlist.current_index = selected_index
+                current_track = self.playlist.get_current_track()
+            if current_track:
+                self.player.play(current_track)
+                self.status_label.config(text=f"Playing: {Path(current_track).name}")
+            else:
+                self.status_label.config(text="Track is no longer in the playlist")
+        except Exception as e:
+            self.status_label.config(text=f"Error playing track: {e}")
+
+    def shuffle_playlist(self):
+        """Shuffle the playlist and update the UI."""
+        if self.playlist.shuffle():
+            self._populate_playlist()
+            self.status_label.config(text="Playlist shuffled")
+
+    def open_directory(self):
+        directory = filedialog.askdirectory(
+            title="Select Music Directory",
+            initialdir=self.config.get('music_directory', os.path.expanduser("~/Music"))
+        )
+
+        if directory:
+            self.start_scan(directory)
+
+    def start_scan(self, directory, prompt_if_empty=False):
+        """Scan ``directory`` on a worker thread; playback starts with the first batch."""
+        if self.scan_job:
+            self.scan_job.cancel()
+        self.scan_directory = directory
+        self.scan_prompt_if_empty = prompt_if_empty
+        self.scan_loaded = 0
+        self.scan_job = self.jobs.submit('scan', self._scan_worker, directory)
+        self.status_label.config(text=f"Loading music from {directory}...")
+        self.cancel_scan_button.pack(side=tk.RIGHT, padx=5)
+        self.root.after(SCAN_POLL_MS, self._drain_scan_queue, self.scan_job)
+
+    def cancel_scan(self):
+        if self.scan_job:
+            self.scan_job.cancel()
+
+    def _scan_worker(self, job, directory):
+        # Runs on a JobManager thread: never touch Tk or the playlist here
+        batch = []
+        last_flush = time.monotonic()
+        found = 0
+        for _, audio_files, file_count in playlist_utils.iter_audio_dirs(directory, PlaylistManager.SUPPORTED_FORMATS):
+            job.check_cancelled()
+            batch.extend(audio_files)
+            found += len(audio_files)
+            job.increment('files_seen', file_count)
+            job.update(audio_files=found)
+            # Hand over the first tracks right away, then in larger batches
+            if batch and (found == len(batch) or len(batch) >= SCAN_BATCH_SIZE
+                          or time.monotonic() - last_flush >= SCAN_FLUSH_SECONDS):
+                self.scan_queue.put((job, batch))
+                batch = []
+                last_flush = time.monotonic()
+        if batch:
+            self.scan_queue.put((job, batch))
+        return {'directory': directory, 'tracks': found}
+
+    def _drain_scan_queue(self, job):
+        if job is not self.scan_job:
+            # A newer scan took over and runs its own drain loop
+            return
+        while True:
+            try:
+                batch_job, batch = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch_job is not job:
+                continue
+            if self.scan_loaded == 0:
+                self.playlist.load_tracks(self.scan_directory, batch)
+                self._populate_playlist()
+                self._play_current_track()
+            else:
+                self.playlist.append_tracks(batch)
+                if self.filter_results is None:
+                    self.track_list.update_items(self.playlist.shuffled_tracks)
+                self.update_track_info()
+            self.scan_loaded += len(batch)
+
+        if job.is_active():
+            progress = job.to_dict()['progress']
+            self.status_label.config(
+                text=f"Scanning... {progress.get('audio_files', 0)} tracks in "
+                     f"{progress.get('files_seen', 0)} files ({job.elapsed():.1f}s)")
+            self.root.after(SCAN_POLL_MS, self._drain_scan_queue, job)
+            return
+
+        self.scan_job = None
+        self.cancel_scan_button.pack_forget()
+        if job.status == job.DONE and self.scan_loaded:
+            self.config.set('music_directory', self.scan_directory)
+            self.status_label.config(text=f"Loaded {self.playlist.total_tracks()} tracks in {job.elapsed():.1f}s")
+        elif job.status == job.CANCELLED:
+            self.status_label.config(text=f"Scan cancelled, {self.scan_loaded} tracks loaded")
+        elif job.status == job.FAILED:
+            self.status_label.config(text=f"Error scanning directory: {job.error}")
+        else:
+            self.status_label.config(text="No music files found in selected directory")
+            if self.scan_prompt_if_empty:
+                self.open_directory()
+
+    def _sync_track_index(self, payload=None):
+        """Start a new index when the library is replaced and index any new tracks."""
+        if self.playlist.tracks is not self.indexed_tracks:
+            self.indexed_tracks = self.playlist.tracks
+            self.track_index = TrackIndex(root=self.playlist.music_dir)
+            if self.filter_results is not None:
+                self._apply_filter()
+        if self.index_job is None and len(self.track_index) < len(self.indexed_tracks):
+            self.index_job = self.root.after(1, self._index_tracks)
+
+    def _index_tracks(self):
+        # One chunk per tick, so a huge library never blocks the UI for long
+        self.index_job = None
+        done = len(self.track_index)
+        self.track_index.extend(self.indexed_tracks[done:done + INDEX_CHUNK_SIZE])
+        if len(self.track_index) < len(self.indexed_tracks):
+            self.index_job = self.root.after(1, self._index_tracks)
+        elif self.filter_results is not None:
+            self._apply_filter(keep_scroll=True)
+
+    def _apply_filter(self, keep_scroll=False):
+        """Narrow the playlist to the tracks matching the filter box."""
+        query = self.filter_var.get()
+        results = self.track_index.search(query) if self.track_index is not None else None
+        if results is None:
+            if self.filter_results is not None:
+                self.filter_results = None
+                self._populate_playlist()
+                self.status_label.config(text="Ready")
+            return
+
+        self.filter_results = results
+        tracks = self.playlist.tracks
+        items = list(map(tracks.__getitem__, results))
+        if keep_scroll:
+            self.track_list.update_items(items)
+        else:
+            self.track_list.set_items(items)
+        self._mark_current_track(see=False)
+
+        pending = len(self.indexed_tracks) - len(self.track_index)
+        status = f"{len(results)} matching tracks"
+        if pending > 0:
+            status += f" (indexing, {pending} tracks left)"
+        self.status_label.config(text=status)
+
+    def clear_filter(self):
+        self.filter_var.set("")
+        self.track_list.tree.focus_set()
+
+    def play_filtered_track(self):
+        if self.filter_results:
+            if self.track_list.selected_index() is None:
+                self.track_list.select(0)
+            self.play_selected_track()
+
+    def _mark_current_track(self, see=True):
+        index = self.playlist.current_index
+        if self.filter_results is not None:
+            current = self.playlist.get_current_track()
+            library_index = self.playlist.index_of(current) if current else None
+            index = result_row(self.filter_results, library_index) if library_index is not None else None
+        elif not self.playlist.shuffled_tracks:
+            return
+        if index != self.track_list.current_index():
+            self.track_list.set_current(index, see=see)
+
+    def _play_current_track(self):
+        current = self.playlist.get_current_track()
+        if current:
+            self.player.play(current)
+            self.status_label.config(text=f"Playing: {Path(current).name}")
+
+    def toggle_play_pause(self):
+        current = self.playlist.get_current_track()
+
+        if not current:
+            return
+
+        status = self.player.toggle_play_pause()
+
+        if status == "playing":
+            self.play_button.config(text="⏸")
+            self.status_label.config(text=f"Playing: {Path(current).name}")
+        else:
+            self.play_button.config(text="▶")
+            self.status_label.config(text=f"Paused: {Path(current).name}")
+
+    def next_track(self):
+        next_track = self.playlist.next_track()
+        if next_track:
+            self.player.play(next_track)
+            self.status_label.config(text=f"Playing: {Path(next_track).name}")
+
+    def previous_track(self):
+        prev_track = self.playlist.previous_track()
+        if prev_track:
+            self.player.play(prev_track)
+            self.status_label.config(text=f"Playing: {Path(prev_track).name}")
+
+    def toggle_mute(self):
+        is_muted = self.player.toggle_mute()
+
+        if is_muted:
+            self.mute_button.config(text="🔇")
+        else:
+            self.mute_button.config(text="🔊")
+
+    def set_volume(self, value):
+        try:
+            volume = float(value)
+            self.player.set_volume(volume)
+            self.volume_label.config(text=f"{int(volume * 100)}%")
+            self.config.set('volume', volume)
+        except ValueError:
+            pass
+
+    def increase_volume(self):
+        new_vol = self.player.increase_volume(0.05)
+        self.volume_var.set(new_vol)
+        self.volume_label.config(text=f"{int(new_vol * 100)}%")
+        self.config.set('volume', new_vol)
+
+    def decrease_volume(self):
+        new_vol = self.player.decrease_volume(0.05)
+        self.volume_var.set(new_vol)
+        self.volume_label.config(text=f"{int(new_vol * 100)}%")
+        self.config.set('volume', new_vol)
+
+    def update_track_info(self):
+        track_info = self.playlist.get_current_track_info()
+
+        if not track_info:
+            self.track_var.set("No track playing")
+            self.track_info_var.set("")
+            return
+
+        self.track_var.set(track_info['filename'])
+        self.track_info_var.set(f"Track {track_info['index']} of {track_info['total']}")
+
+    def update_ui(self):
+        self.update_track_info()
+
+        if self.player.is_playing():
+            self.play_button.config(text="⏸")
+        else:
+            self.play_button.config(text="▶")
+
+        if self.player.is_muted():
+            self.mute_button.config(text="🔇")
+        else:
+            self.mute_button.config(text="🔊")
+
+        self.volume_var.set(self.player.get_volume())
+        self.volume_label.config(text=f"{int(self.player.get_volume() * 100)}%")
+
+    def _on_state_changed(self, payload=None):
+        """Redraw playback widgets once per frame, however many engine events arrived."""
+        self.update_ui()
+        self._mark_current_track()
+
+    def _on_track_ended(self, payload=None):
+        # Re-check on the Tk thread; the poller may have raced a user action
+        if self.player.current_track and not self.player.is_playing() and not self.player.is_paused:
+            self.next_track()
+
+    def _poll_playback_status(self):
+        # Runs on a background thread: only post events, never touch Tk from here
+        while self.polling:
+            if self.player.current_track and not self.player.is_playing() and not self.player.is_paused:
+                self.events.post('track_ended')
+            time.sleep(0.5)
+
+    def on_close(self):
+        self.config.set('volume', self.player.get_volume())
+        current = self.playlist.get_current_track()
+        if current:
+            self.config.set('last_played', current)
+
+        self.polling = False
+        self.events.stop()
+        if self.index_job is not None:
+            self.root.after_cancel(self.index_job)
+        self.jobs.shutdown()
+        self.player.stop()
+        self.root.destroy()
+
+    def start(self):
+        self.root.mainloop()
+
+def main():
+    try:
+        from ctypes import windll
+        windll.shcore.SetProcessDpiAwareness(1)
+    except:
+        pass
+
+    root = tk.Tk()
+    app = GUIPlayer(root)
+    app.start()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
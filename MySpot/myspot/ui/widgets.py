@@ -0,0 +1,229 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualTrackList(tk.Frame):
+    """Treeview-based track list that only materializes the rows in view.
+
+    The Treeview holds a small pool of rows that is refilled from ``items``
+    whenever the list scrolls, so loading or reshuffling a huge library
+    costs the same as a small one. Display names are computed in chunks
+    scheduled with ``after()`` and on demand for the rows being shown.
+    """
+
+    def __init__(self, parent, style="Treeview", row_height=25, chunk_size=2000,
+                 on_activate=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.row_height = row_height
+        self.chunk_size = chunk_size
+        self.on_activate = on_activate
+
+        self._items = []
+        self._labels = []
+        self._first = 0
+        self._rows = []
+        self._current = None
+        self._selected = None
+        self._label_job = None
+
+        self.scrollbar = ttk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree = ttk.Treeview(
+            self,
+            style=style,
+            selectmode="browse",
+            show="headings",
+            columns=("Track",)
+        )
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.column("Track", width=280, anchor=tk.W)
+        self.tree.heading("Track", text="Track", anchor=tk.W)
+        self.tree.tag_configure("current", foreground="#1DB954")
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.tree.bind("<Return>", lambda e: self._activate(self._selected))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._page_size()))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._page_size()))
+
+    def set_items(self, items):
+        """Show ``items`` (track paths); returns immediately regardless of size."""
+        self._items = items
+        self._labels = [None] * len(items)
+        self._first = 0
+        self._current = None
+        self._selected = None
+        self._render()
+        self._schedule_labels(0)
+
+    def update_items(self, items):
+        """Show a grown or reordered ``items`` list, keeping scroll position and marks."""
+        self._items = items
+        self._labels = [None] * len(items)
+        if self._current is not None and self._current >= len(items):
+            self._current = None
+        if self._selected is not None and self._selected >= len(items):
+            self._selected = None
+        self._render()
+        self._schedule_labels(0)
+
+    def __len__(self):
+        return len(self._items)
+
+    def label(self, index):
+        label = self._labels[index]
+        if label is None:
+            label = os.path.basename(self._items[index])
+            self._labels[index] = label
+        return label
+
+    def set_current(self, index, see=True):
+        """Mark the playing track; only the old and new rows are touched."""
+        previous, self._current = self._current, index
+        self._selected = index
+        if see and index is not None:
+            self.see(index)
+        self._refresh_row(previous)
+        self._refresh_row(index)
+        self._sync_selection()
+
+    def select(self, index):
+        self._selected = index
+        self.see(index)
+        self._sync_selection()
+
+    def current_index(self):
+        return self._current
+
+    def selected_index(self):
+        return self._selected
+
+    def see(self, index):
+        if not self._first <= index < self._first + self._page_size():
+            self._scroll_to(index - self._page_size() // 2)
+
+    def scroll(self, rows):
+        self._scroll_to(self._first + rows)
+
+    def _page_size(self):
+        height = self.tree.winfo_height()
+        return max(1, height // self.row_height - 1) if height > 1 else 20
+
+    def _schedule_labels(self, start):
+        # Fill display names in the background so the UI thread is never blocked for long
+        if self._label_job is not None:
+            self.after_cancel(self._label_job)
+            self._label_job = None
+        if start >= len(self._items):
+            return
+        self._label_job = self.after(1, self._build_labels, start)
+
+    def _build_labels(self, start):
+        self._label_job = None
+        end = min(start + self.chunk_size, len(self._items))
+        labels = self._labels
+        items = self._items
+        for i in range(start, end):
+            if labels[i] is None:
+                labels[i] = os.path.basename(items[i])
+        self._schedule_labels(end)
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, len(self._items) - self._page_size()))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _render(self):
+        page = self._page_size()
+        while len(self._rows) < page:
+            iid = f"row{len(self._rows)}"
+            self.tree.insert("", "end", iid=iid, values=("",))
+            self._rows.append(iid)
+        for slot, iid in enumerate(self._rows):
+            index = self._first + slot
+            if slot < page and index < len(self._items):
+                self.tree.move(iid, "", slot)
+                self._fill_row(iid, index)
+            elif self.tree.exists(iid) and self.tree.parent(iid) == "":
+                self.tree.detach(iid)
+        self._sync_selection()
+        self._update_scrollbar()
+
+    def _fill_row(self, iid, index):
+        tags = ("current",) if index == self._current else ()
+        self.tree.item(iid, values=(self.label(index),), tags=tags)
+
+    def _refresh_row(self, index):
+        if index is None:
+            return
+        slot = index - self._first
+        if 0 <= slot < min(len(self._rows), self._page_size()) and index < len(self._items):
+            self._fill_row(self._rows[slot], index)
+
+    def _update_scrollbar(self):
+        total = len(self._items)
+        if total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self._first / total, min(1.0, (self._first + self._page_size()) / total))
+
+    def _sync_selection(self):
+        slot = None if self._selected is None else self._selected - self._first
+        if slot is not None and 0 <= slot < min(len(self._rows), self._page_size()):
+            self.tree.selection_set(self._rows[slot])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+    def _index_of_row(self, iid):
+        if not iid:
+            return None
+        index = self._first + self._rows.index(iid)
+        return index if index < len(self._items) else None
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self._selected = self._index_of_row(selection[0])
+
+    def _move_selection(self, delta):
+        if not self._items:
+            return "break"
+        index = 0 if self._selected is None else max(0, min(len(self._items) - 1, self._selected + delta))
+        self._selected = index
+        self.see(index)
+        self._sync_selection()
+        return "break"
+
+    def _activate(self, index):
+        if index is not None and self.on_activate:
+            self.on_activate(index)
+
+    def _on_double_click(self, event):
+        index = self._index_of_row(self.tree.identify_row(event.y))
+        if index is not None:
+            self._selected = index
+            self._activate(index)
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self._items)))
+        elif action == "scroll":
+            step = self._page_size() if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_resize(self, event=None):
+        self._scroll_to(self._first)
+        self._render()
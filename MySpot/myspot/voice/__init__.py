@@ -1,3 +1,3 @@
-from .recognizer import VoiceRecognizer
-
+from .recognizer import VoiceRecognizer
+
 __all__ = ['VoiceRecognizer']
\ No newline at end of file
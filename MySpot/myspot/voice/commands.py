@@ -0,0 +1,99 @@
+import os
+import re
+import logging
+from ..playlist.resolver import MIN_SCORE
+logger = logging.getLogger(__name__)
+VOLUME_STEP = 0.1
+PLAY_PATTERN = re.compile(r'^(?:please )?(?:play|put on|listen to) (.+?)(?: please)?$')
+# After "play", these mean "resume" rather than a title
+RESUME_WORDS = frozenset(('music', 'something', 'anything', 'it', 'again', 'on'))
+# Dropped before checking whether the rest of "play ..." is a command of its own
+FILLER_WORDS = frozenset(('the', 'song', 'track', 'one', 'please'))
+# Checked in order, so multi-word phrases come before the words they contain
+PHRASES = [
+    (('volume up', 'louder', 'turn it up'), 'volume_up'),
+    (('volume down', 'quieter', 'turn it down'), 'volume_down'),
+    (('unmute',), 'unmute'),
+    (('mute',), 'mute'),
+    (('next', 'skip'), 'next'),
+    (('previous', 'go back', 'back'), 'previous'),
+    (('pause', 'stop'), 'pause'),
+    (('play', 'resume', 'continue'), 'play'),
+    (('shuffle',), 'shuffle'),
+    (('more like this', 'radio'), 'radio'),
+]
+def parse_command(text):
+    """Map a transcript to an action name, or None if it is not a command."""
+    padded = f" {' '.join(text.lower().split())} "
+    for phrases, action in PHRASES:
+        if any(f" {phrase} " in padded for phrase in phrases):
+            return action
+    return None
+def parse_request(text):
+    """Like parse_command, but "play <title>" gives ('play_query', title); returns (action, query)."""
+    normalized = ' '.join(text.lower().split())
+    match = PLAY_PATTERN.match(normalized)
+    if match is None:
+        return parse_command(normalized), None
+    query = match.group(1)
+    if query in RESUME_WORDS:
+        return 'play', None
+    # "play the next song" is a command, "play stop crying your heart out" a title
+    rest = ' '.join(word for word in query.split() if word not in FILLER_WORDS)
+    for phrases, action in PHRASES:
+        if rest in phrases:
+            return action, None
+    return 'play_query', query
+def execute_request(action, query, player, playlist, resolver=None):
+    """Run a parsed request; returns a JSON-ready result. The caller holds the state lock."""
+    if action != 'play_query':
+        return {'success': bool(execute_command(action, player, playlist)), 'action': action}
+    result = {'success': False, 'action': action, 'query': query}
+    matches = resolver.resolve(query) if resolver is not None else None
+    if matches is None:
+        result['message'] = 'Track search is not ready'
+        return result
+    for track, score in matches:
+        if score < MIN_SCORE:
+            break
+        index = playlist.index_of(track)
+        if index is None:
+            # Removed since the index was built
+            continue
+        track = playlist.jump_to(index)
+        result['success'] = track is not None and player.play(track)
+        result['track'] = os.path.basename(track) if result['success'] else None
+        result['score'] = round(score, 3)
+        return result
+    result['message'] = 'No matching track'
+    return result
+def execute_command(action, player, playlist):
+    """Apply ``action`` to the player; the caller holds whatever lock guards them."""
+    if action == 'next' or action == 'previous':
+        track = playlist.next_track() if action == 'next' else playlist.previous_track()
+        return bool(track) and player.play(track)
+    if action == 'pause':
+        return player.pause()
+    if action == 'play':
+        if player.is_paused:
+            return player.unpause()
+        track = playlist.get_current_track()
+        return bool(track) and player.play(track)
+    if action == 'volume_up':
+        player.increase_volume(VOLUME_STEP)
+        return True
+    if action == 'volume_down':
+        player.decrease_volume(VOLUME_STEP)
+        return True
+    if action == 'mute' or action == 'unmute':
+        if player.is_muted() != (action == 'mute'):
+            player.toggle_mute()
+        return True
+    if action == 'shuffle':
+        if not playlist.shuffle():
+            return False
+        return player.play(playlist.get_current_track())
+    if action == 'radio':
+        return playlist.start_radio()
+    logger.warning(f"Unknown voice command: {action}")
+    return False
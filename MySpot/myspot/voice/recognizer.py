@@ -0,0 +1,269 @@
+import os
+import json
+import wave
+import time
+import logging
+import threading
+try:
+    import numpy as np
+    from .ringbuffer import FrameRingBuffer
+    from .vad import EnergyVAD
+    from .wakeword import WakeWordDetector
+except ImportError:
+    np = None
+from .commands import parse_request, execute_request
+from ..playlist.resolver import PlaylistResolver
+logger = logging.getLogger(__name__)
+def read_wav(path, sample_rate):
+    """Load a PCM WAV file as mono int16 samples at ``sample_rate``."""
+    with wave.open(path, 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        data = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    elif width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32)
+    elif width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 65536.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate and len(samples):
+        # Linear interpolation is plenty for speech recognition input
+        duration = len(samples) / rate
+        target = np.arange(int(duration * sample_rate)) / sample_rate
+        samples = np.interp(target, np.arange(len(samples)) / rate, samples)
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+class VoskEngine:
+    """Speech-to-text for one segment at a time with an offline Vosk model."""
+    def __init__(self, model, sample_rate):
+        import vosk
+        self._recognizer = vosk.KaldiRecognizer(model, sample_rate)
+    def recognize(self, samples):
+        self._recognizer.AcceptWaveform(samples.tobytes())
+        return json.loads(self._recognizer.FinalResult()).get('text', '')
+class VoiceRecognizer:
+    """Offline voice commands: microphone -> ring buffer -> VAD -> recognizer -> command.
+
+    The sounddevice callback only copies frames into a lock-free ring. A
+    worker drains it every POLL_SECONDS, and the energy VAD passes just
+    the speech segments to the recognizer engine, so silence costs one
+    vectorized level computation per batch. process_wav() sends a file
+    through the same ring, VAD and engine, which makes the pipeline
+    testable without a microphone. ``engine`` is any object with
+    ``recognize(int16 samples) -> text``; by default a Vosk model is loaded
+    from the ``voice_model_path`` setting.
+
+    With ``voice_wake_samples`` set (WAV recordings of a wake word, files or
+    directories), a WakeWordDetector sees every batch first and the engine
+    only gets segments that start within ``voice_wake_listen_seconds`` of a
+    detection; executing a command disarms it again.
+
+    "play <title>" is resolved against the library through ``resolver``
+    (a PlaylistResolver, shared with the web text endpoint when given).
+    When its index is out of date the command answers "not ready" and
+    ``schedule_index`` (a callable, e.g. one submitting an index job) is
+    asked to rebuild it; without one a background thread rebuilds it.
+    """
+    FRAME_MS = 30
+    BUFFER_SECONDS = 5
+    POLL_SECONDS = 0.1
+    def __init__(self, player, playlist, config, lock=None, engine=None, wake_word=None, resolver=None):
+        self.player = player
+        self.playlist = playlist
+        self.config = config
+        self.lock = lock or threading.RLock()
+        self.engine = engine
+        self.wake_word = wake_word
+        self.resolver = resolver or PlaylistResolver(playlist)
+        self.schedule_index = None
+        self.model = None
+        self.sample_rate = config.get('voice_sample_rate', 16000)
+        self.frame_size = self.sample_rate * self.FRAME_MS // 1000
+        self.buffer = None
+        self.vad = None
+        self.last_text = None
+        self.listen_frames = int(config.get('voice_wake_listen_seconds', 5) * 1000) // self.FRAME_MS
+        self.stats = {'frames': 0, 'speech_segments': 0, 'skipped_segments': 0, 'wake_detections': 0,
+                      'recognized': 0, 'commands': 0}
+        self._armed_until = -1
+        self._stream = None
+        self._worker = None
+        self._running = False
+    def initialize(self):
+        if self.model is not None:
+            return True
+        if np is None:
+            logger.error("Voice recognition needs numpy (pip install numpy)")
+            return False
+        engine = self.engine or self._load_vosk()
+        if engine is None:
+            return False
+        self.buffer = FrameRingBuffer(self.BUFFER_SECONDS * 1000 // self.FRAME_MS, self.frame_size)
+        self.vad = EnergyVAD(self.sample_rate, self.FRAME_MS,
+                             margin_db=self.config.get('voice_vad_margin_db', 12.0),
+                             min_level_db=self.config.get('voice_vad_min_level_db', -45.0))
+        if self.wake_word is None and self.config.get('voice_wake_samples'):
+            self.wake_word = self._load_wake_word()
+            if self.wake_word is None:
+                return False
+        self.model = engine
+        logger.info("Voice recognizer initialized")
+        return True
+    def _load_vosk(self):
+        try:
+            import vosk
+        except ImportError:
+            logger.error("Voice recognition needs vosk (pip install vosk)")
+            return None
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model')
+        model_path = self.config.get('voice_model_path') or default_path
+        if not os.path.isdir(model_path):
+            logger.error(f"Vosk model not found at {model_path}")
+            return None
+        try:
+            vosk.SetLogLevel(-1)
+            return VoskEngine(vosk.Model(model_path), self.sample_rate)
+        except Exception as e:
+            logger.error(f"Cannot load Vosk model from {model_path}: {e}")
+            return None
+    def _load_wake_word(self):
+        samples = self.config.get('voice_wake_samples')
+        paths = [samples] if isinstance(samples, str) else list(samples)
+        try:
+            detector = WakeWordDetector.from_wavs(paths, self.sample_rate,
+                                                  threshold=self.config.get('voice_wake_threshold'),
+                                                  cpu_budget=self.config.get('voice_wake_cpu_budget', 0.05))
+        except ValueError as e:
+            logger.error(f"Cannot load wake word samples {paths}: {e}")
+            return None
+        logger.info(f"Wake word loaded from {len(detector.templates)} samples "
+                    f"(threshold {detector.threshold:.2f})")
+        return detector
+    def is_armed(self):
+        """True while segments go to the engine (always, without a wake word)."""
+        return self.wake_word is None or self._armed_until >= self.stats['frames']
+    def start(self):
+        if self._running:
+            return True
+        if not self.initialize():
+            return False
+        try:
+            import sounddevice
+        except ImportError:
+            logger.error("Voice recognition needs sounddevice (pip install sounddevice)")
+            return False
+        try:
+            self._stream = sounddevice.InputStream(samplerate=self.sample_rate, channels=1, dtype='int16',
+                                                   blocksize=self.frame_size, callback=self._on_audio,
+                                                   device=self.config.get('voice_input_device'))
+            self._stream.start()
+        except Exception as e:
+            logger.error(f"Cannot open microphone: {e}")
+            self._stream = None
+            return False
+        self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        logger.info("Voice recognition started")
+        return True
+    def stop(self):
+        if not self._running:
+            return True
+        self._running = False
+        try:
+            self._stream.stop()
+            self._stream.close()
+        except Exception as e:
+            logger.error(f"Error closing microphone: {e}")
+        self._stream = None
+        self._worker.join(timeout=2)
+        self._worker = None
+        logger.info("Voice recognition stopped")
+        return True
+    def is_running(self):
+        return self._running
+    def _on_audio(self, indata, frames, time_info, status):
+        # PortAudio thread: must not block, so no locks here
+        self.buffer.push(indata[:, 0])
+    def _run(self):
+        while self._running:
+            time.sleep(self.POLL_SECONDS)
+            try:
+                self._drain()
+            except Exception as e:
+                logger.error(f"Voice pipeline error: {e}")
+        self._drain(final=True)
+    def _drain(self, final=False):
+        frames = self.buffer.pop_all()
+        self.stats['frames'] += len(frames)
+        if self.wake_word is not None and self.wake_word.feed(frames):
+            self.stats['wake_detections'] += 1
+            self._armed_until = self.stats['frames'] + self.listen_frames
+        segments = self.vad.feed(frames)
+        if final:
+            segments.extend(self.vad.flush())
+        texts = []
+        for segment, (start, end) in zip(segments, self.vad.spans):
+            self.stats['speech_segments'] += 1
+            if self.wake_word is not None and start > self._armed_until:
+                # The expensive engine only runs for speech after the wake word
+                self.stats['skipped_segments'] += 1
+                continue
+            text = self.model.recognize(segment)
+            if text:
+                self.stats['recognized'] += 1
+                texts.append(text)
+                if self.handle_text(text):
+                    self._armed_until = -1
+        return texts
+    def handle_text(self, text):
+        """Run the command in a transcript; returns True if one was executed."""
+        self.last_text = text
+        action, query = parse_request(text)
+        if action is None:
+            logger.info(f"Heard '{text}' (no command)")
+            return False
+        logger.info(f"Voice command: {action} ('{text}')")
+        if action == 'play_query' and not self.resolver.is_current():
+            # Building the index can take a while: never on the voice worker
+            if self.schedule_index is not None:
+                self.schedule_index()
+            else:
+                threading.Thread(target=self.resolver.refresh, name='voice-index', daemon=True).start()
+        with self.lock:
+            done = execute_request(action, query, self.player, self.playlist, self.resolver)['success']
+        if done:
+            self.stats['commands'] += 1
+        return done
+    def process_wav(self, path):
+        """Feed a WAV file through the live pipeline; returns the transcripts."""
+        if self._running:
+            # The ring has a single producer and consumer: the microphone and its worker
+            logger.warning("Stop live recognition before processing a WAV file")
+            return []
+        if not self.initialize():
+            return []
+        samples = read_wav(path, self.sample_rate)
+        usable = len(samples) - len(samples) % self.frame_size
+        frames = samples[:usable].reshape(-1, self.frame_size)
+        texts = []
+        # Fill the ring in chunks, draining after each one like the worker does
+        for start in range(0, len(frames), self.buffer.capacity):
+            self.buffer.push_many(frames[start:start + self.buffer.capacity])
+            texts.extend(self._drain())
+        texts.extend(self._drain(final=True))
+        return texts
+    def status(self):
+        info = dict(self.stats)
+        info['dropped_frames'] = self.buffer.dropped if self.buffer else 0
+        info['in_speech'] = bool(self.vad and self.vad.in_speech())
+        info['last_text'] = self.last_text
+        info['armed'] = self.is_armed()
+        if self.wake_word is not None:
+            info['wake_word'] = {'threshold': self.wake_word.threshold, 'last_score': self.wake_word.last_score,
+                                 'stride': self.wake_word.stride, 'cpu_share': self.wake_word.cpu_share()}
+        return info
@@ -0,0 +1,53 @@
+import numpy as np
+class FrameRingBuffer:
+    """Fixed-size ring of audio frames for one producer and one consumer.
+
+    The audio callback pushes frames and the recognizer thread pops them
+    without taking a lock: only the producer advances ``_write`` and only
+    the consumer advances ``_read``, and each index is published after the
+    frame data it covers. When the consumer falls behind, new frames are
+    dropped (and counted) rather than blocking the audio thread.
+    """
+    def __init__(self, capacity, frame_size, dtype=np.int16):
+        self.capacity = capacity
+        self.frame_size = frame_size
+        self._frames = np.zeros((capacity, frame_size), dtype=dtype)
+        self._write = 0
+        self._read = 0
+        self.dropped = 0
+    def __len__(self):
+        return self._write - self._read
+    def push(self, frame):
+        """Producer side: copy one frame in; returns False if the ring is full."""
+        write = self._write
+        if write - self._read >= self.capacity:
+            self.dropped += 1
+            return False
+        self._frames[write % self.capacity] = frame
+        self._write = write + 1
+        return True
+    def push_many(self, frames):
+        """Producer side: copy as many of ``frames`` as fit; returns how many were taken."""
+        write = self._write
+        count = min(len(frames), self.capacity - (write - self._read))
+        self.dropped += len(frames) - count
+        start = write % self.capacity
+        first = min(count, self.capacity - start)
+        self._frames[start:start + first] = frames[:first]
+        self._frames[:count - first] = frames[first:count]
+        self._write = write + count
+        return count
+    def pop_all(self, max_frames=None):
+        """Consumer side: return the buffered frames as one (n, frame_size) array copy."""
+        read = self._read
+        available = self._write - read
+        if max_frames is not None:
+            available = min(available, max_frames)
+        start = read % self.capacity
+        end = start + available
+        if end <= self.capacity:
+            batch = self._frames[start:end].copy()
+        else:
+            batch = np.concatenate((self._frames[start:], self._frames[:end - self.capacity]))
+        self._read = read + available
+        return batch
@@ -0,0 +1,107 @@
+import numpy as np
+class EnergyVAD:
+    """Energy-based voice activity detector working on batches of frames.
+
+    Frame levels (dBFS) are computed for a whole batch at once. A frame is
+    speech when it is ``margin_db`` above the adaptive noise floor and above
+    ``min_level_db``. Speech is held for ``hangover_ms`` after the last loud
+    frame and gets ``pre_roll_ms`` of audio from before its onset. feed()
+    returns finished segments as 1-D int16 arrays; segments with less than
+    ``min_speech_ms`` of loud frames (clicks, bumps) are dropped.
+    ``spans`` holds the (start, end) frame positions of the segments
+    returned since the last feed() began, so flush() adds to it.
+    """
+    def __init__(self, sample_rate=16000, frame_ms=30, margin_db=12.0, min_level_db=-45.0,
+                 hangover_ms=300, pre_roll_ms=150, min_speech_ms=120, max_segment_ms=8000,
+                 noise_adapt=0.05, initial_noise_db=-70.0):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.margin_db = margin_db
+        self.min_level_db = min_level_db
+        self.hangover_frames = hangover_ms // frame_ms
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = max_segment_ms // frame_ms
+        self.noise_adapt = noise_adapt
+        self.noise_floor = initial_noise_db
+        self._frame_count = 0
+        self._last_active = -1
+        self.spans = []
+        self._segment = None
+        self._segment_start = 0
+        self._segment_frames = 0
+        self._segment_active = 0
+        self._pre_roll = np.zeros((0, self.frame_size), dtype=np.int16)
+    @staticmethod
+    def frame_levels(frames):
+        """RMS level of each row of ``frames`` (int16 samples) in dBFS."""
+        samples = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        return 20.0 * np.log10(np.maximum(rms, 1e-10))
+    def threshold(self):
+        return max(self.noise_floor + self.margin_db, self.min_level_db)
+    def in_speech(self):
+        return self._segment is not None
+    def feed(self, frames):
+        """Process a (n, frame_size) batch; returns the speech segments it completed."""
+        n = len(frames)
+        self.spans = []
+        if n == 0:
+            return []
+        levels = self.frame_levels(frames)
+        active = levels > self.threshold()
+        self._adapt_noise_floor(levels[~active])
+        # Hangover: a frame is speech if a loud frame occurred at most hangover_frames before it
+        base = self._frame_count
+        positions = base + np.arange(n)
+        last_active = np.maximum.accumulate(np.where(active, positions, -1))
+        last_active = np.maximum(last_active, self._last_active)
+        speech = (last_active >= 0) & (positions - last_active <= self.hangover_frames)
+        if active.any():
+            self._last_active = int(positions[active][-1])
+        self._frame_count += n
+        segments = []
+        # Only the runs of equal speech state are visited in Python
+        edges = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+        for start, end in zip(np.r_[0, edges], np.r_[edges, n]):
+            if speech[start]:
+                if self._segment is None:
+                    self._segment = [self._pre_roll]
+                    self._segment_start = base + int(start) - len(self._pre_roll)
+                    self._segment_frames = len(self._pre_roll)
+                    self._segment_active = 0
+                self._segment.append(frames[start:end])
+                self._segment_frames += end - start
+                self._segment_active += int(active[start:end].sum())
+                if self._segment_frames >= self.max_segment_frames:
+                    segments.extend(self._close(base + int(end)))
+            else:
+                segments.extend(self._close(base + int(start)))
+                self._remember(frames[start:end])
+        return segments
+    def flush(self):
+        """End any open segment (e.g. at the end of a file); returns it if long enough."""
+        return self._close(self._frame_count)
+    def reset(self):
+        self._segment = None
+        self._last_active = -1
+        self._pre_roll = self._pre_roll[:0]
+    def _close(self, end):
+        if self._segment is None:
+            return []
+        audio = np.concatenate(self._segment).reshape(-1)
+        keep = self._segment_active >= self.min_speech_frames
+        self._segment = None
+        self._pre_roll = self._pre_roll[:0]
+        if not keep:
+            return []
+        self.spans.append((self._segment_start, end))
+        return [audio]
+    def _remember(self, frames):
+        if self.pre_roll_frames:
+            self._pre_roll = np.concatenate((self._pre_roll, frames))[-self.pre_roll_frames:]
+    def _adapt_noise_floor(self, quiet_levels):
+        # Closed form of a per-frame exponential average over this batch's quiet frames
+        if quiet_levels.size:
+            keep = (1.0 - self.noise_adapt) ** quiet_levels.size
+            self.noise_floor = float(quiet_levels.mean() + (self.noise_floor - quiet_levels.mean()) * keep)
@@ -0,0 +1,246 @@
+import os
+import math
+import time
+import logging
+import numpy as np
+from .vad import EnergyVAD
+logger = logging.getLogger(__name__)
+WAV_EXTENSION = '.wav'
+def mel_filterbank(sample_rate, n_fft, n_mels, low_hz=20.0):
+    """Triangular mel filters as an (n_mels, n_fft // 2 + 1) matrix."""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+    edges = to_hz(np.linspace(to_mel(low_hz), to_mel(sample_rate / 2.0), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+def dct_matrix(n_mfcc, n_mels):
+    """Orthonormal DCT-II basis, (n_mels, n_mfcc), so that mfcc = log_mel @ basis."""
+    k = np.arange(n_mfcc)[None, :]
+    n = np.arange(n_mels)[:, None]
+    basis = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+    basis[:, 0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+class MFCC:
+    """Batched MFCC extraction over a continuous stream of int16 samples."""
+    def __init__(self, sample_rate=16000, window_ms=25, hop_ms=10, n_fft=512, n_mels=26, n_mfcc=13,
+                 pre_emphasis=0.97, dynamic_range_db=20.0):
+        self.sample_rate = sample_rate
+        self.window = sample_rate * window_ms // 1000
+        self.hop = sample_rate * hop_ms // 1000
+        self.n_fft = n_fft
+        self.pre_emphasis = pre_emphasis
+        self.dynamic_range = dynamic_range_db * np.log(10.0) / 10.0
+        self._taper = np.hamming(self.window).astype(np.float32)
+        self._mel = mel_filterbank(sample_rate, n_fft, n_mels).T
+        # c0 only tracks loudness, which templates should not depend on
+        self._dct = dct_matrix(n_mfcc, n_mels)[:, 1:]
+        self._tail = np.zeros(0, dtype=np.float32)
+        self._last_sample = 0.0
+    @property
+    def dimensions(self):
+        return self._dct.shape[1]
+    def reset(self):
+        self._tail = self._tail[:0]
+        self._last_sample = 0.0
+    def feed(self, samples):
+        """Features for every full window completed by ``samples``: (n, dimensions)."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1) / 32768.0
+        if samples.size == 0:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        emphasized = np.empty_like(samples)
+        emphasized[0] = samples[0] - self.pre_emphasis * self._last_sample
+        emphasized[1:] = samples[1:] - self.pre_emphasis * samples[:-1]
+        self._last_sample = float(samples[-1])
+        stream = np.concatenate((self._tail, emphasized))
+        count = (len(stream) - self.window) // self.hop + 1 if len(stream) >= self.window else 0
+        self._tail = stream[count * self.hop:]
+        if count == 0:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        windows = np.lib.stride_tricks.sliding_window_view(stream, self.window)[:count * self.hop:self.hop]
+        spectrum = np.fft.rfft(windows * self._taper, n=self.n_fft)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2) / self.n_fft
+        log_mel = np.log(power @ self._mel + 1e-10)
+        # Clamping each frame to a fixed range below its peak keeps background
+        # noise in the spectral valleys from dominating the distance
+        log_mel = np.maximum(log_mel, log_mel.max(axis=1, keepdims=True) - self.dynamic_range)
+        return (log_mel @ self._dct).astype(np.float32)
+    def features(self, samples):
+        """MFCCs of a whole clip, independent of any stream state."""
+        tail, last_sample = self._tail, self._last_sample
+        self.reset()
+        try:
+            return self.feed(samples)
+        finally:
+            self._tail, self._last_sample = tail, last_sample
+def subsequence_dtw(template, window):
+    """Cost of the best alignment of ``template`` ending at each frame of ``window``.
+
+    The match may start anywhere in the window. Returns an array with one
+    cost per window frame, normalized by the template length.
+    """
+    t2 = np.einsum('ij,ij->i', template, template)
+    w2 = np.einsum('ij,ij->i', window, window)
+    cost = np.sqrt(np.maximum(t2[:, None] + w2[None, :] - 2.0 * template @ window.T, 0.0))
+    acc = cost[0].copy()
+    diagonal = np.empty_like(acc)
+    for row in cost[1:]:
+        diagonal[0] = np.inf
+        diagonal[1:] = acc[:-1]
+        # Vertical and diagonal steps are elementwise; the horizontal recurrence
+        # acc[j] = min(step[j], acc[j-1] + row[j]) is a running minimum over a cumsum
+        step = row + np.minimum(acc, diagonal)
+        total = np.cumsum(row)
+        acc = np.minimum.accumulate(step - total) + total
+    return acc / len(template)
+class WakeWordDetector:
+    """Keyword spotter: streaming MFCCs matched against recorded templates with DTW.
+
+    Once a batch is quiet (below ``min_level_db``) for longer than a
+    template, the match state is dropped and further quiet batches cost
+    one level check each, so silence is nearly free. Otherwise the
+    subsequence DTW runs every ``stride`` feature hops, over a window long
+    enough to cover every end position since the previous check, so a
+    larger stride lowers CPU use without missing matches. The stride
+    adapts to keep measured processing under ``cpu_budget`` (a share of
+    one core, relative to real time).
+    """
+    def __init__(self, templates, sample_rate=16000, threshold=None, cpu_budget=0.05, min_level_db=-45.0,
+                 refractory_ms=1000, threshold_margin=2.0, default_threshold=3.0, min_threshold=2.5):
+        if not templates:
+            raise ValueError("At least one wake word template is needed")
+        self.mfcc = MFCC(sample_rate)
+        self.sample_rate = sample_rate
+        self.templates = list(templates)
+        self.cpu_budget = cpu_budget
+        self.min_level_db = min_level_db
+        self.hop_seconds = self.mfcc.hop / sample_rate
+        self.refractory_hops = int(refractory_ms / 1000 / self.hop_seconds)
+        longest = max(len(t) for t in self.templates)
+        self.max_stride = max(1, min(t.shape[0] for t in self.templates) // 2)
+        self.window_hops = int(longest * 1.5) + self.max_stride
+        self.stride = 1
+        if threshold is None:
+            threshold = self._calibrate(threshold_margin, default_threshold, min_threshold)
+        self.threshold = threshold
+        self.last_score = None
+        self.detections = 0
+        self._features = np.zeros((0, self.mfcc.dimensions), dtype=np.float32)
+        self._since_check = 0
+        self._quiet_hops = 0
+        self._cooldown = 0
+        self._busy_seconds = 0.0
+        self._audio_seconds = 0.0
+    @classmethod
+    def from_wavs(cls, paths, sample_rate=16000, **kwargs):
+        """Build templates from WAV recordings of the wake word (files or directories)."""
+        from .recognizer import read_wav
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                    if name.lower().endswith(WAV_EXTENSION)))
+            else:
+                files.append(path)
+        mfcc = MFCC(sample_rate)
+        templates = []
+        for file in files:
+            try:
+                samples = read_wav(file, sample_rate)
+            except (OSError, EOFError, ValueError) as e:
+                logger.error(f"Cannot read wake word sample {file}: {e}")
+                continue
+            features = trim_silence(samples, mfcc, kwargs.get('min_level_db', -45.0))
+            if len(features) >= 4:
+                templates.append(features)
+            else:
+                logger.warning(f"Wake word sample {file} has no usable speech")
+        return cls(templates, sample_rate, **kwargs)
+    def _calibrate(self, margin, default, minimum):
+        # With several recordings, the threshold follows how well they match each other;
+        # near-identical recordings must not make it impossibly strict
+        scores = [float(subsequence_dtw(a, b).min())
+                  for i, a in enumerate(self.templates) for j, b in enumerate(self.templates) if i != j]
+        if not scores:
+            return default
+        return max(float(np.mean(scores)) * margin, minimum)
+    def cpu_share(self):
+        """Processing time per second of audio seen so far."""
+        return self._busy_seconds / self._audio_seconds if self._audio_seconds else 0.0
+    def reset(self):
+        self.mfcc.reset()
+        self._features = self._features[:0]
+        self._since_check = 0
+        self._quiet_hops = 0
+        self._cooldown = 0
+    def feed(self, frames):
+        """Consume a (n, frame_size) batch of int16 frames; returns True on a detection."""
+        self._audio_seconds += frames.size / self.sample_rate
+        if frames.size == 0:
+            return False
+        started = time.perf_counter()
+        detected = False
+        try:
+            # The window only holds window_hops of features, so a long batch (a ring-buffer
+            # drain after a stall) is checked slice by slice to cover every end position
+            rows = max(1, self.window_hops * self.mfcc.hop // max(frames.shape[-1], 1))
+            for start in range(0, len(frames), rows):
+                detected = self._feed(frames[start:start + rows], started) or detected
+            return detected
+        finally:
+            self._busy_seconds += time.perf_counter() - started
+    def _feed(self, frames, started):
+        if EnergyVAD.frame_levels(frames).max() < self.min_level_db:
+            # Short pauses inside the word still need their features
+            self._quiet_hops += frames.size // self.mfcc.hop
+            if not len(self._features) or self._quiet_hops >= self.window_hops:
+                self.reset()
+                return False
+        else:
+            self._quiet_hops = 0
+        features = self.mfcc.feed(frames)
+        self._features = np.concatenate((self._features, features))[-self.window_hops:]
+        self._since_check += len(features)
+        if self._cooldown:
+            self._cooldown = max(0, self._cooldown - len(features))
+            return False
+        if self._since_check < self.stride or len(self._features) < min(len(t) for t in self.templates):
+            return False
+        return self._check(started)
+    def _check(self, started):
+        # No mean normalization: the window mean would shift as silence scrolls in
+        window = self._features
+        # Only end positions reached since the previous check are new
+        recent = min(self._since_check, len(window))
+        self._since_check = 0
+        score = min(float(subsequence_dtw(template, window)[-recent:].min()) for template in self.templates)
+        self.last_score = score
+        self._adapt_stride(time.perf_counter() - started)
+        if score > self.threshold:
+            return False
+        self.detections += 1
+        self._cooldown = self.refractory_hops
+        self._features = self._features[:0]
+        logger.info(f"Wake word detected (score {score:.2f}, threshold {self.threshold:.2f})")
+        return True
+    def _adapt_stride(self, elapsed):
+        if self.cpu_budget <= 0:
+            self.stride = self.max_stride
+            return
+        wanted = math.ceil(elapsed / (self.cpu_budget * self.hop_seconds))
+        self.stride = max(1, min(self.max_stride, wanted))
+def trim_silence(samples, mfcc, min_level_db=-45.0):
+    """MFCCs of the loud part of a recording (leading and trailing silence removed)."""
+    features = mfcc.features(samples)
+    if not len(features):
+        return features
+    usable = (len(samples) - mfcc.window) // mfcc.hop + 1
+    windows = np.lib.stride_tricks.sliding_window_view(samples, mfcc.window)[:usable * mfcc.hop:mfcc.hop]
+    loud = np.flatnonzero(EnergyVAD.frame_levels(windows) >= min_level_db)
+    if not len(loud):
+        return features[:0]
+    return features[loud[0]:loud[-1] + 1]
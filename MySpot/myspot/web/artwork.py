@@ -0,0 +1,221 @@
+import io
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+logger = logging.getLogger(__name__)
+# Edge lengths of the square boxes covers are scaled into
+THUMBNAIL_SIZES = (96, 300, 600)
+DEFAULT_SIZE = 300
+THUMBNAIL_QUALITY = 85
+# Images next to the tracks, in order of preference (matched case-insensitively)
+FOLDER_IMAGES = ('cover.jpg', 'folder.jpg', 'front.jpg', 'albumart.jpg', 'cover.png', 'folder.png', 'front.png')
+# Picture type of the front cover in ID3 APIC frames and FLAC PICTURE blocks
+FRONT_COVER = 3
+MEMORY_ITEMS = 64
+IMAGE_SIGNATURES = ((b'\xff\xd8\xff', '.jpg', 'image/jpeg'), (b'\x89PNG\r\n\x1a\n', '.png', 'image/png'),
+                    (b'GIF8', '.gif', 'image/gif'))
+def image_type(data):
+    """(extension, mimetype) of image bytes, or None when they are not a supported image."""
+    for signature, extension, mimetype in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension, mimetype
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return '.webp', 'image/webp'
+    return None
+def embedded_picture(path):
+    """Bytes of the cover embedded in ``path`` (ID3 APIC, FLAC PICTURE, MP4 covr), or None.
+
+    The front cover wins over other pictures. Needs mutagen.
+    """
+    if mutagen is None:
+        return None
+    try:
+        audio = mutagen.File(path)
+    except Exception as e:
+        logger.debug(f"Cannot read tags of {path}: {e}")
+        return None
+    if audio is None:
+        return None
+    pictures = list(getattr(audio, 'pictures', None) or [])
+    tags = audio.tags
+    if tags is not None and hasattr(tags, 'getall'):
+        pictures.extend(tags.getall('APIC'))
+    if pictures:
+        pictures.sort(key=lambda picture: picture.type != FRONT_COVER)
+        return bytes(pictures[0].data)
+    try:
+        covers = tags['covr'] if tags is not None else None
+    except (KeyError, ValueError, TypeError):
+        covers = None
+    return bytes(covers[0]) if covers else None
+def folder_picture(path):
+    """Bytes of the first of FOLDER_IMAGES in ``path``'s directory, or None."""
+    directory = os.path.dirname(path)
+    try:
+        names = {name.lower(): name for name in os.listdir(directory)}
+    except OSError:
+        return None
+    for candidate in FOLDER_IMAGES:
+        if candidate in names:
+            try:
+                with open(os.path.join(directory, names[candidate]), 'rb') as f:
+                    return f.read()
+            except OSError as e:
+                logger.warning(f"Cannot read cover image in {directory}: {e}")
+    return None
+def make_thumbnails(data):
+    """{size: JPEG bytes} for each of THUMBNAIL_SIZES, or None without Pillow or for an unreadable image."""
+    if Image is None:
+        return None
+    thumbnails = {}
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert('RGB')
+            # Largest first, so each size is scaled down from the one before
+            for size in sorted(THUMBNAIL_SIZES, reverse=True):
+                image.thumbnail((size, size))
+                output = io.BytesIO()
+                image.save(output, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+                thumbnails[size] = output.getvalue()
+    except Exception as e:
+        logger.warning(f"Cannot scale cover image: {e}")
+        return None
+    return thumbnails
+class ArtworkCache:
+    """Cover thumbnails per track, made once and stored by content.
+
+    A track's cover comes from its tags or else an image in its folder.
+    The thumbnails are named after a hash of the source image under
+    config/art/ (<hash>-<size>.jpg), so all tracks of an album share one
+    set of files and no cover is scaled twice. Without Pillow the source
+    image is stored once (<hash>-orig.<ext>) and served for every size.
+    Which hash belongs to which track is remembered in memory per file
+    size and mtime, and the ``memory_items`` most recently served images
+    are kept in memory. ``on_key`` may be a callable(path, key) run when a
+    track's cover key is found or changes (known() answered otherwise).
+    """
+    FORMAT_VERSION = 1
+    def __init__(self, cache_dir='art', memory_items=MEMORY_ITEMS):
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.cache_dir = os.path.join(base_dir, 'config', cache_dir)
+        self.memory_items = memory_items
+        self._tracks = {}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._extracting = {}
+        self.on_key = None
+    @staticmethod
+    def choose_size(requested):
+        """The smallest thumbnail size covering ``requested`` pixels (the largest for more)."""
+        if not requested:
+            return DEFAULT_SIZE
+        for size in sorted(THUMBNAIL_SIZES):
+            if size >= requested:
+                return size
+        return max(THUMBNAIL_SIZES)
+    def known(self, path):
+        """The cover key last found for ``path``, without touching the disk; None when not looked up yet."""
+        entry = self._tracks.get(path)
+        return entry[2] if entry else None
+    def key(self, path):
+        """Content key of ``path``'s cover, extracting it on first use; None when it has none.
+
+        Raises OSError when the track cannot be read. Concurrent requests
+        for the same track share one extraction.
+        """
+        stat = os.stat(path)
+        entry = self._tracks.get(path)
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime):
+            return entry[2]
+        with self._lock:
+            lock = self._extracting.setdefault(path, threading.Lock())
+        try:
+            with lock:
+                entry = self._tracks.get(path)
+                if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime):
+                    return entry[2]
+                key = self._extract(path)
+                self._tracks[path] = (stat.st_size, stat.st_mtime, key)
+        finally:
+            with self._lock:
+                self._extracting.pop(path, None)
+        if self.on_key is not None and key != (entry[2] if entry else None):
+            self.on_key(path, key)
+        return key
+    def _extract(self, path):
+        data = embedded_picture(path) or folder_picture(path)
+        kind = image_type(data) if data else None
+        if kind is None:
+            return None
+        key = hashlib.sha1(f"v{self.FORMAT_VERSION}\0".encode() + data).hexdigest()[:32]
+        if self._files(key):
+            return key
+        thumbnails = make_thumbnails(data)
+        if thumbnails is None:
+            thumbnails = {'orig': data}
+        for size, image in thumbnails.items():
+            extension = kind[0] if size == 'orig' else '.jpg'
+            self._write(os.path.join(self.cache_dir, key[:2], f"{key}-{size}{extension}"), image)
+        return key
+    def _files(self, key):
+        try:
+            return [name for name in os.listdir(os.path.join(self.cache_dir, key[:2])) if name.startswith(key)]
+        except OSError:
+            return []
+    def _write(self, file_path, data):
+        tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logger.error(f"Error caching cover image {file_path}: {e}")
+    def _read(self, key, size):
+        names = self._files(key)
+        name = f"{key}-{size}.jpg"
+        if name not in names:
+            name = next((name for name in names if name.startswith(f"{key}-orig.")), None)
+        if name is None:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, key[:2], name), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        kind = image_type(data)
+        return data, kind[1] if kind else 'application/octet-stream'
+    def thumbnail(self, path, size):
+        """(image bytes, mimetype) of ``path``'s cover at choose_size(size), or None; raises OSError like key()."""
+        key = self.key(path)
+        if key is None:
+            return None
+        size = self.choose_size(size)
+        with self._lock:
+            item = self._memory.get((key, size))
+            if item is not None:
+                self._memory.move_to_end((key, size))
+                return item
+        item = self._read(key, size)
+        if item is None:
+            # Cleared from disk since: extract again
+            self._tracks.pop(path, None)
+            key = self.key(path)
+            item = self._read(key, size) if key else None
+            if item is None:
+                return None
+        with self._lock:
+            self._memory[key, size] = item
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        return item
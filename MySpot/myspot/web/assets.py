@@ -0,0 +1,97 @@
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from werkzeug.security import safe_join
+try:
+    import brotli
+except ImportError:
+    brotli = None
+logger = logging.getLogger(__name__)
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+def supported_encodings():
+    encodings = ['gzip']
+    if brotli is not None:
+        encodings.insert(0, 'br')
+    return encodings
+def choose_encoding(accept_encoding):
+    """Pick the best content coding we support from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        fields = part.strip().split(';')
+        coding = fields[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in fields[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    best = None
+    best_quality = 0.0
+    for coding in supported_encodings():
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+def is_compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+def compress(data, encoding, level=6):
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=min(level, 11))
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return data
+class StaticAsset:
+    def __init__(self, path, data, mtime):
+        self.path = path
+        self.data = data
+        self.mtime = mtime
+        self.digest = hashlib.sha1(data).hexdigest()[:16]
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self._variants = {None: data}
+    def variant(self, encoding):
+        """Return the body for ``encoding``, compressing it once on first use."""
+        if encoding not in self._variants:
+            if not is_compressible(self.mimetype) or len(self.data) < MIN_COMPRESS_SIZE:
+                return None
+            self._variants[encoding] = compress(self.data, encoding, level=9)
+        return self._variants[encoding]
+class AssetCache:
+    """In-memory cache of static files with content hashes and precompressed bodies."""
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self._assets = {}
+        self._lock = threading.Lock()
+    def get(self, filename):
+        path = safe_join(self.static_dir, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            asset = self._assets.get(filename)
+            if asset is None or asset.mtime != mtime:
+                try:
+                    with open(path, 'rb') as f:
+                        asset = StaticAsset(path, f.read(), mtime)
+                except OSError as e:
+                    logger.error(f"Cannot read static asset {path}: {e}")
+                    return None
+                self._assets[filename] = asset
+            return asset
+    def url_for(self, filename):
+        asset = self.get(filename)
+        if asset is None:
+            return f"/static/{filename}"
+        return f"/static/{filename}?v={asset.digest}"
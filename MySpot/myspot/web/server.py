@@ -1,288 +1,968 @@
-from flask import Flask, jsonify, request, render_template, send_from_directory
-import os
-import sys
-import json
-import threading
-import logging
-import argparse
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from ..audio.player import AudioPlayer
-from ..playlist.playlist import PlaylistManager
-from ..config.config import ConfigManager
-# Import the voice recognizer
-from ..voice.recognizer import VoiceRecognizer
-
-logger = logging.getLogger(__name__)
-app = Flask(__name__,
-            static_folder='static',
-            template_folder='templates')
-config = ConfigManager()
-player = AudioPlayer(volume=config.get('volume', 0.5))
-playlist = PlaylistManager(config.get('music_directory'))
-
-# Initialize voice recognizer
-voice_recognizer = VoiceRecognizer(player=player, playlist=playlist, config=config)
-voice_enabled = config.get('voice_enabled', False)
-
-should_poll = True
-def poll_track_ended():
-    import time
-    global should_poll
-    while should_poll:
-        if player.current_track and not player.is_playing() and not player.is_paused:
-            track = playlist.next_track()
-            if track:
-                player.play(track)
-        time.sleep(0.5)
-
-polling_thread = threading.Thread(target=poll_track_ended, daemon=True)
-polling_thread.start()
-
-@app.route('/')
-def index():
-    return render_template('index.html')
-
-@app.route('/favicon.ico')
-def favicon():
-    return send_from_directory(os.path.join(app.root_path), 'favicon.ico')
-
-@app.route('/api/status', methods=['GET'])
-def get_status():
-    track_info = playlist.get_current_track_info()
-    return jsonify({
-        'playing': player.is_playing(),
-        'paused': player.is_paused,
-        'muted': player.is_muted(),
-        'volume': player.get_volume(),
-        'current_track': track_info if track_info else None,
-        'total_tracks': playlist.total_tracks(),
-        'voice_enabled': voice_enabled  # Add voice status
-    })
-
-@app.route('/api/tracks', methods=['GET'])
-def get_tracks():
-    if not playlist.tracks:
-        return jsonify({'tracks': [], 'message': 'No tracks loaded'})
-    tracks_info = []
-    for i, track in enumerate(playlist.tracks):
-        tracks_info.append({
-            'index': i,
-            'path': track,
-            'filename': os.path.basename(track),
-            'is_current': playlist.shuffled_tracks[
-                              playlist.current_index] == track if playlist.shuffled_tracks else False
-        })
-    return jsonify({'tracks': tracks_info})
-
-@app.route('/api/play', methods=['POST'])
-def play_track():
-    data = request.get_json(silent=True) or {}
-    if 'index' in data:
-        try:
-            index = int(data['index'])
-            if 0 <= index < len(playlist.tracks):
-                target_track = playlist.tracks[index]
-                try:
-                    shuffle_index = playlist.shuffled_tracks.index(target_track)
-                    playlist.current_index = shuffle_index
-                except ValueError:
-                    playlist.shuffle()
-                    try:
-                        playlist.current_index = playlist.shuffled_tracks.index(target_track)
-                    except ValueError:
-                        return jsonify({'success': False, 'message': 'Failed to locate track in playlist'})
-                track = playlist.get_current_track()
-                success = player.play(track)
-                return jsonify({'success': success, 'track': os.path.basename(track) if success else None})
-            else:
-                return jsonify({'success': False, 'message': 'Track index out of range'})
-        except ValueError:
-            return jsonify({'success': False, 'message': 'Invalid track index'})
-    else:
-        current_track = playlist.get_current_track()
-        if not current_track:
-            return jsonify({'success': False, 'message': 'No track loaded'})
-        if player.is_paused:
-            player.unpause()
-            return jsonify({'success': True, 'action': 'resumed', 'track': os.path.basename(current_track)})
-        else:
-            success = player.play(current_track)
-            return jsonify(
-                {'success': success, 'action': 'played', 'track': os.path.basename(current_track) if success else None})
-
-@app.route('/api/pause', methods=['POST'])
-def pause_track():
-    if player.pause():
-        return jsonify({'success': True})
-    return jsonify({'success': False, 'message': 'Nothing playing'})
-
-@app.route('/api/toggle', methods=['POST'])
-def toggle_playback():
-    status = player.toggle_play_pause()
-    if status == "paused":
-        return jsonify({'success': True, 'state': 'paused'})
-    elif status == "playing":
-        return jsonify({'success': True, 'state': 'playing'})
-    else:
-        return jsonify({'success': False, 'message': 'No track loaded'})
-
-@app.route('/api/next', methods=['POST'])
-def next_track():
-    track = playlist.next_track()
-    if track:
-        success = player.play(track)
-        return jsonify({'success': success, 'track': os.path.basename(track) if success else None})
-    return jsonify({'success': False, 'message': 'No tracks in playlist'})
-
-@app.route('/api/previous', methods=['POST'])
-def previous_track():
-    track = playlist.previous_track()
-    if track:
-        success = player.play(track)
-        return jsonify({'success': success, 'track': os.path.basename(track) if success else None})
-    return jsonify({'success': False, 'message': 'No tracks in playlist'})
-
-@app.route('/api/volume', methods=['POST'])
-def set_volume():
-    data = request.get_json(silent=True) or {}
-    if 'volume' in data:
-        try:
-            volume = float(data['volume'])
-            volume = max(0.0, min(1.0, volume))
-            player.set_volume(volume)
-            config.set('volume', volume)
-            return jsonify({'success': True, 'volume': volume})
-        except (ValueError, TypeError):
-            return jsonify({'success': False, 'message': 'Invalid volume value'})
-    return jsonify({'success': False, 'message': 'No volume specified'})
-
-@app.route('/api/mute', methods=['POST'])
-def toggle_mute():
-    is_muted = player.toggle_mute()
-    return jsonify({'success': True, 'muted': is_muted})
-
-@app.route('/api/directory', methods=['GET'])
-def get_directory():
-    return jsonify({'directory': config.get('music_directory')})
-
-@app.route('/api/directory', methods=['POST'])
-def set_directory():
-    data = request.get_json(silent=True) or {}
-    if 'directory' in data:
-        directory = data['directory']
-        if not os.path.isdir(directory):
-            return jsonify({'success': False, 'message': 'Directory not found'})
-        if playlist.scan_directory(directory):
-            config.set('music_directory', directory)
-            if not player.is_playing() and not player.is_paused:
-                playlist.current_index = 0
-                track = playlist.get_current_track()
-                if track:
-                    player.play(track)
-            return jsonify({
-                'success': True,
-                'directory': directory,
-                'tracks': playlist.total_tracks()
-            })
-        else:
-            return jsonify({'success': False, 'message': 'No supported audio files found'})
-    return jsonify({'success': False, 'message': 'No directory specified'})
-
-@app.route('/api/shuffle', methods=['POST'])
-def shuffle_playlist():
-    if playlist.shuffle():
-        track = playlist.get_current_track()
-        if track:
-            player.play(track)
-        return jsonify({'success': True, 'total_tracks': playlist.total_tracks()})
-    return jsonify({'success': False, 'message': 'No tracks to shuffle'})
-
-# Voice recognition endpoints
-@app.route('/api/voice/on', methods=['POST'])
-def enable_voice():
-    global voice_enabled
-    if voice_enabled:
-        return jsonify({'success': True, 'status': 'Voice recognition already enabled'})
-    
-    success = voice_recognizer.start()
-    if success:
-        voice_enabled = True
-        config.set('voice_enabled', True)
-        return jsonify({'success': True, 'status': 'Voice recognition enabled'})
-    else:
-        return jsonify({'success': False, 'message': 'Failed to enable voice recognition'})
-
-@app.route('/api/voice/off', methods=['POST'])
-def disable_voice():
-    global voice_enabled
-    if not voice_enabled:
-        return jsonify({'success': True, 'status': 'Voice recognition already disabled'})
-    
-    success = voice_recognizer.stop()
-    if success:
-        voice_enabled = False
-        config.set('voice_enabled', False)
-        return jsonify({'success': True, 'status': 'Voice recognition disabled'})
-    else:
-        return jsonify({'success': False, 'message': 'Failed to disable voice recognition'})
-
-@app.route('/api/voice/status', methods=['GET'])
-def voice_status():
-    return jsonify({
-        'enabled': voice_enabled,
-        'initialized': voice_recognizer.model is not None
-    })
-
-@app.errorhandler(404)
-def not_found(e):
-    logger.error(f"404 error: {request.path}")
-    return jsonify({'error': 'Not found', 'status': 404}), 404
-
-@app.errorhandler(500)
-def server_error(e):
-    logger.error(f"500 error: {str(e)}")
-    return jsonify({'error': 'Server error', 'status': 500}), 500
-
-def main():
-    parser = argparse.ArgumentParser(description='MySpot Web Player')
-    parser.add_argument('--host', default='127.0.0.1', help='Host to run the server on')
-    parser.add_argument('--port', type=int, default=5000, help='Port to run the server on')
-    parser.add_argument('--debug', action='store_true', help='Run in debug mode')
-    parser.add_argument('--voice', action='store_true', help='Enable voice recognition on startup')
-    args = parser.parse_args()
-
-    # Check if we should enable voice recognition at startup
-    global voice_enabled
-    voice_start = args.voice or config.get('voice_enabled', False)
-    
-    if voice_start:
-        logger.info("Initializing voice recognition...")
-        if voice_recognizer.initialize() and voice_recognizer.start():
-            voice_enabled = True
-            logger.info("Voice recognition enabled")
-        else:
-            logger.warning("Failed to initialize voice recognition")
-    
-    if not playlist.tracks and config.get('music_directory'):
-        playlist.scan_directory(config.get('music_directory'))
-    
-    last_played = config.get('last_played')
-    if last_played and os.path.exists(last_played):
-        if last_played in playlist.tracks:
-            if last_played in playlist.shuffled_tracks:
-                playlist.current_index = playlist.shuffled_tracks.index(last_played)
-            else:
-                playlist.shuffle()
-                try:
-                    playlist.current_index = playlist.shuffled_tracks.index(last_played)
-                except ValueError:
-                    playlist.current_index = 0
-                    
-    # Save the current config before starting
-    config.save_config()
-    
-    # Run the app
-    app.run(host=args.host, port=args.port, debug=args.debug)
-
-if __name__ == '__main__':
-    main()
+from flask import Flask, jsonify, request, render_template, send_from_directory, abort
+import os
+import sys
+import json
+import threading
+import time
+import atexit
+import logging
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ..audio.player import AudioPlayer
+from ..playlist.playlist import PlaylistManager
+from ..playlist import utils as playlist_utils
+from ..playlist.resolver import PlaylistResolver
+from ..playlist.ordering import ORDER_MODES
+from ..playlist.dedup import FingerprintStore, find_duplicates
+from ..playlist.prefetch import Prefetcher
+from ..analysis import DecodeError, AnalysisStore, PeaksCache, SimilarityIndex, analyze_paths, track_gain
+from ..analysis.loudness import DEFAULT_TARGET
+from ..jobs import JobManager
+from ..config.config import ConfigManager
+from ..config.session import SessionStore
+from ..history import PlayHistory
+from .assets import AssetCache, choose_encoding, compress, is_compressible, MIN_COMPRESS_SIZE, \
+    IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+from .artwork import ArtworkCache
+# Import the voice recognizer
+from ..voice.recognizer import VoiceRecognizer
+from ..voice.commands import parse_request, execute_request
+
+logger = logging.getLogger(__name__)
+app = Flask(__name__,
+            static_folder='static',
+            template_folder='templates')
+assets = AssetCache(app.static_folder)
+config = ConfigManager()
+session_store = SessionStore()
+history = PlayHistory()
+player = AudioPlayer(volume=config.get('volume', 0.5), cache_bytes=config.get('audio_cache_mb', 256) * 1024 * 1024)
+# The library comes from the session snapshot when possible (see below), so no scan here
+playlist = PlaylistManager()
+# Library-wide backfills run on their own worker so scans and prefetches never queue behind them
+jobs = JobManager(max_workers=config.get('job_workers', 2), background_kinds=('index', 'analysis', 'dedup'),
+                  background_workers=config.get('background_job_workers', 1))
+
+# Serializes every change to player/playlist state so multi-step commands are atomic
+state_lock = threading.RLock()
+MAX_BATCH_COMMANDS = 50
+
+# Library index for "play <title>" requests, shared by /api/command and voice commands
+read_tags = config.get('index_tags', True) and playlist_utils.mutagen is not None
+resolver = PlaylistResolver(playlist, tag_reader=playlist_utils.read_tags if read_tags else None)
+
+# Per-track loudness and silence bounds: the player evens out levels on top of the
+# user's volume and skips leading and trailing silence
+analysis_store = AnalysisStore()
+ANALYSIS_SAVE_BATCH = 50
+# Shorter silences are left alone rather than paying for a seek
+MIN_TRIM_SECONDS = 0.2
+
+def _track_gain(path):
+    if not config.get('replaygain', True):
+        return None
+    analysis = analysis_store.get(path)
+    if analysis is None:
+        return None
+    return track_gain(analysis['loudness'], analysis['peak'], config.get('loudness_target', DEFAULT_TARGET))
+
+def _track_trim(path):
+    if not config.get('trim_silence', True):
+        return None
+    analysis = analysis_store.get(path)
+    if analysis is None or analysis['start'] is None:
+        return None
+    start = analysis['start'] if analysis['start'] >= MIN_TRIM_SECONDS else None
+    end = analysis['end'] if analysis['duration'] - analysis['end'] >= MIN_TRIM_SECONDS else None
+    return start, end
+
+player.gain_provider = _track_gain
+player.trim_provider = _track_trim
+# Tempo, energy and brightness for feature-ordered playback; unanalyzed tracks come last
+playlist.feature_provider = lambda tracks: analysis_store.values(tracks, ('tempo', 'energy', 'centroid'))
+if config.get('order_mode') in ORDER_MODES:
+    playlist.order_mode = config.get('order_mode')
+# Timbre vectors of the same analysis answer "more like this" for the radio
+similarity = SimilarityIndex()
+playlist.neighbour_provider = similarity.nearest
+
+# Initialize voice recognizer; its commands take state_lock like the HTTP ones
+voice_recognizer = VoiceRecognizer(player=player, playlist=playlist, config=config, lock=state_lock,
+                                   resolver=resolver)
+voice_enabled = config.get('voice_enabled', False)
+
+# Status versioning: clients pass ?since=<version>[&wait=<seconds>] to /api/status
+state_changed = threading.Condition()
+server_state_version = 0
+# Versions start at the process start time in microseconds, so a restarted server
+# never repeats a version (or ETag) a page from the previous process still holds
+STATE_EPOCH = time.time_ns() // 1000
+status_cache = None
+MAX_STATUS_WAIT = 60.0
+
+SESSION_SAVE_INTERVAL = 10.0
+
+should_poll = True
+def poll_track_ended():
+    global should_poll
+    last_session_save = time.monotonic()
+    while should_poll:
+        with state_lock:
+            # is_playing() is called on every pass so natural track ends bump the status version
+            if not player.is_playing() and player.current_track and not player.is_paused:
+                track = playlist.next_track()
+                if track:
+                    player.play(track)
+            if time.monotonic() - last_session_save >= SESSION_SAVE_INTERVAL:
+                session_store.save(playlist, player)
+                history.flush(force=False)
+                last_session_save = time.monotonic()
+        # Wakes early when a trimmed track is about to reach its end
+        time.sleep(player.poll_delay(0.5))
+
+def save_session():
+    with state_lock:
+        session_store.save(playlist, player)
+        history.flush()
+
+atexit.register(save_session)
+
+def _rescan_job(job, directory):
+    """Refresh a restored library in the background without touching the play order."""
+    tracks = playlist_utils.scan_audio_files_job(job, directory, PlaylistManager.SUPPORTED_FORMATS)
+    job.check_cancelled()
+    if not tracks:
+        return {'directory': directory, 'tracks': playlist.total_tracks()}
+    with state_lock:
+        playlist.merge_tracks(tracks)
+        return {'directory': directory, 'tracks': playlist.total_tracks()}
+
+def _initial_scan_job(job, directory):
+    """Load the configured library when there is no session to resume, at the last played track."""
+    tracks = playlist_utils.scan_audio_files_job(job, directory, PlaylistManager.SUPPORTED_FORMATS)
+    job.check_cancelled()
+    with state_lock:
+        if tracks:
+            playlist.load_tracks(directory, tracks)
+            index = playlist.index_of(config.get('last_played'))
+            if index is not None:
+                playlist.jump_to(index)
+        return {'directory': directory, 'tracks': playlist.total_tracks()}
+
+# Resume from the session snapshot; without one the configured directory is scanned in a job
+session = session_store.load()
+resume_point = None
+if session and not (session.directory == config.get('music_directory') and
+                    playlist.restore(session.directory, session.tracks, session.order, session.current_index)):
+    session = None
+if session:
+    player.set_volume(session.volume)
+    resume_point = (session.current_track(), session.position)
+    jobs.submit('scan', _rescan_job, session.directory)
+elif config.get('music_directory'):
+    jobs.submit('scan', _initial_scan_job, config.get('music_directory'))
+
+def _take_resume_position(track):
+    """Start offset for ``track`` if it is the track the saved session stopped in."""
+    global resume_point
+    if resume_point is None:
+        return 0.0
+    resume_track, position = resume_point
+    resume_point = None
+    return position if resume_track == track else 0.0
+
+def resume_playback():
+    """Restart the saved track at its saved position if it was playing at shutdown."""
+    with state_lock:
+        if session is None or not session.playing:
+            return False
+        track = playlist.get_current_track()
+        if not track:
+            return False
+        return player.play(track, start=_take_resume_position(track))
+
+polling_thread = threading.Thread(target=poll_track_ended, daemon=True)
+polling_thread.start()
+
+@app.context_processor
+def inject_asset_url():
+    return {'asset_url': assets.url_for}
+
+def serve_static(filename):
+    asset = assets.get(filename)
+    if asset is None:
+        abort(404)
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    body = asset.variant(encoding) if encoding else None
+    if body is None:
+        encoding = None
+        body = asset.data
+    etag = f'{asset.digest}-{encoding}' if encoding else asset.digest
+    # Weak tags count too, like the ETags compress_response() sets elsewhere
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    if request.args.get('v') == asset.digest:
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+# Replace Flask's default static view so assets are served from the in-memory cache
+app.view_functions['static'] = serve_static
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or not is_compressible(response.mimetype)):
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    response.vary.add('Accept-Encoding')
+    if not encoding:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+    response.set_data(compress(data, encoding, level=5))
+    response.headers['Content-Encoding'] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+@app.route('/')
+def index():
+    response = app.make_response(render_template('index.html'))
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/favicon.ico')
+def favicon():
+    return send_from_directory(os.path.join(app.root_path), 'favicon.ico')
+
+def state_version():
+    """Monotonic version of everything reported by /api/status."""
+    return STATE_EPOCH + player.version + playlist.version + server_state_version
+
+def _touch_server_state():
+    global server_state_version
+    server_state_version += 1
+    _notify_state_changed()
+
+def _notify_state_changed(*args):
+    with state_changed:
+        state_changed.notify_all()
+
+player.add_listener(_notify_state_changed)
+playlist.add_listener(_notify_state_changed)
+player.add_listener(history.on_player_event)
+
+def _index_job(job):
+    return {'tracks': resolver.refresh(job)}
+
+def _schedule_index(event, _playlist=None):
+    # One job at a time: refresh() keeps rebuilding until it has caught up
+    if event == 'tracks' and not jobs.list(kind='index', active_only=True):
+        jobs.submit('index', _index_job)
+
+playlist.add_listener(_schedule_index)
+voice_recognizer.schedule_index = lambda: _schedule_index('tracks')
+if playlist.tracks:
+    _schedule_index('tracks')
+
+def _analysis_job(job):
+    """Analyze the tracks the analysis store lacks, starting with the ones coming up next."""
+    analyzed = 0
+    version = None
+    while version != playlist.library_version:
+        with state_lock:
+            version = playlist.library_version
+            start = playlist.current_index
+            order = playlist.shuffled_tracks[start:] + playlist.shuffled_tracks[:start]
+            if len(order) != len(playlist.tracks):
+                order = list(dict.fromkeys(order + playlist.tracks))
+        stale = analysis_store.stale(order)
+        if config.get('radio', True):
+            # Tracks analyzed before vectors were kept, or whose vectors were lost
+            known = set(stale)
+            stale += [path for path in similarity.missing(order) if path not in known]
+        job.update(analyzed=analyzed, total=analyzed + len(stale))
+        batch = []
+        try:
+            for result in analyze_paths(stale, config.get('analysis_workers'), job):
+                batch.append(result)
+                analyzed += 1
+                if len(batch) >= ANALYSIS_SAVE_BATCH:
+                    analysis_store.put_many(batch)
+                    similarity.put_many(batch)
+                    batch = []
+                    job.update(analyzed=analyzed)
+        finally:
+            # Keep what was measured even when the job is cancelled
+            analysis_store.put_many(batch)
+            similarity.put_many(batch)
+            job.update(analyzed=analyzed)
+    if similarity.partitions_stale():
+        similarity.build_partitions(job=job)
+    if analyzed:
+        # A feature order built before these tracks had features left them at random
+        with state_lock:
+            playlist.reorder()
+    return {'analyzed': analyzed, 'tracks': len(analysis_store)}
+
+def _schedule_analysis(event, _playlist=None):
+    # Like the index job, one backfill at a time that catches up with library changes
+    if event != 'tracks':
+        return
+    if not any(config.get(key, True) for key in ('replaygain', 'trim_silence', 'radio')) and \
+            playlist.order_mode == 'shuffle':
+        return
+    if not jobs.list(kind='analysis', active_only=True):
+        jobs.submit('analysis', _analysis_job)
+
+playlist.add_listener(_schedule_analysis)
+if playlist.tracks:
+    _schedule_analysis('tracks')
+
+# Byte-identical copies under different names, collapsed to one when the option is on
+fingerprint_store = FingerprintStore()
+playlist.collapse_duplicates = config.get('collapse_duplicates', False)
+
+def _dedup_job(job):
+    """Find identical files in the library; fingerprints are cached, so rescans only read new files."""
+    version = None
+    groups = []
+    while version != playlist.library_version:
+        with state_lock:
+            version = playlist.library_version
+            tracks = list(playlist.tracks)
+        groups = find_duplicates(tracks, fingerprint_store, config.get('hash_workers'), job)
+        with state_lock:
+            playlist.set_duplicates(groups)
+    return {'groups': len(groups), 'redundant': sum(len(group) - 1 for group in groups)}
+
+def _schedule_dedup(event, _playlist=None):
+    if event == 'tracks' and playlist.collapse_duplicates and not jobs.list(kind='dedup', active_only=True):
+        jobs.submit('dedup', _dedup_job)
+
+playlist.add_listener(_schedule_dedup)
+if playlist.tracks:
+    _schedule_dedup('tracks')
+
+# Waveform peaks for the web seek bar, made on first request and ahead of the next track
+peaks_cache = PeaksCache()
+
+def _peaks_job(job, tracks):
+    generated = 0
+    for track in tracks:
+        job.check_cancelled()
+        if peaks_cache.load(track) is not None:
+            continue
+        try:
+            peaks_cache.get(track)
+            generated += 1
+        except (DecodeError, OSError) as e:
+            logger.warning(f"Cannot compute waveform peaks for {track}: {e}")
+    return {'generated': generated}
+
+def _prefetch_peaks(event, _playlist=None):
+    if event not in ('position', 'order'):
+        return
+    tracks = [track for track in (playlist.get_current_track(), playlist.peek_next()) if track]
+    if tracks:
+        # Skipping through tracks makes older prefetches pointless
+        jobs.cancel_all(kind='peaks')
+        jobs.submit('peaks', _peaks_job, list(dict.fromkeys(tracks)))
+
+playlist.add_listener(_prefetch_peaks)
+
+# Reads the next track into the player's memory cache and warms the OS page cache for the ones
+# after it, paced so the track that just started keeps the disk; files in memory need neither
+prefetcher = Prefetcher(config.get('prefetch_tracks', 3), config.get('prefetch_rate_mb', 8) * 1024 * 1024)
+prefetcher.attach(playlist, player.cache)
+
+# Cover thumbnails, extracted on first request and shared by content
+artwork = ArtworkCache()
+
+def _artwork_learned(path, key):
+    # The status names the current track's cover key, so a key found after it was built is published
+    with state_lock:
+        if path == playlist.get_current_track():
+            _touch_server_state()
+
+artwork.on_key = _artwork_learned
+
+def _status_snapshot():
+    track_info = playlist.get_current_track_info()
+    snapshot = {
+        'playing': player.is_playing(),
+        'paused': player.is_paused,
+        'muted': player.is_muted(),
+        'volume': player.get_volume(),
+        'current_track': track_info if track_info else None,
+        'total_tracks': playlist.total_tracks(),
+        'library_version': playlist.library_version,
+        'voice_enabled': voice_enabled,  # Add voice status
+        'order_mode': playlist.order_mode,
+        'radio': playlist.radio_seed is not None,
+        # Clients extrapolate the position from position_time while playing
+        'position': round(player.get_position(), 3),
+        'position_time': time.time()
+    }
+    if track_info:
+        track_info['library_index'] = playlist.index_of(track_info['path'])
+        # Lets clients ask for the cover by content, cacheable for good (see get_track_art)
+        track_info['art'] = artwork.known(track_info['path'])
+    # Read after building: is_playing() above may itself bump the version
+    snapshot['version'] = state_version()
+    return snapshot
+
+def _status_body():
+    """Return (version, serialized status), rebuilding only after a state change."""
+    global status_cache
+    with state_lock:
+        version = state_version()
+        if status_cache is None or status_cache[0] != version:
+            snapshot = _status_snapshot()
+            status_cache = (snapshot['version'], json.dumps(snapshot).encode('utf-8'))
+        return status_cache
+
+@app.route('/api/status', methods=['GET'])
+def get_status():
+    since = request.args.get('since', type=int)
+    if since is not None and since > state_version():
+        # Seen from another server process (e.g. the clock went back): answer in full
+        since = None
+    wait = min(max(request.args.get('wait', 0, type=float), 0.0), MAX_STATUS_WAIT)
+    if since is not None and wait > 0:
+        # Long-poll: hold the request until the state moves past ``since``
+        deadline = time.monotonic() + wait
+        with state_changed:
+            while state_version() <= since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                state_changed.wait(remaining)
+    version, body = _status_body()
+    etag = f'v{version}'
+    # Weak tags count too: compress_response() weakens the ETag of every body it compresses
+    if (since is not None and version <= since) or request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+@app.route('/api/tracks', methods=['GET'])
+def get_tracks():
+    """List tracks in library order; ?offset=&limit= return a single page."""
+    with state_lock:
+        tracks = playlist.tracks
+        if not tracks:
+            return jsonify({'tracks': [], 'total': 0, 'library_version': playlist.library_version,
+                            'message': 'No tracks loaded'})
+        current = playlist.get_current_track()
+        current_index = playlist.index_of(current) if current else None
+        total = len(tracks)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = request.args.get('limit', type=int)
+        end = total if limit is None else min(total, offset + max(limit, 0))
+        tracks_info = []
+        for i in range(offset, end):
+            track = tracks[i]
+            tracks_info.append({
+                'index': i,
+                'path': track,
+                'filename': os.path.basename(track),
+                'is_current': i == current_index
+            })
+        return jsonify({
+            'tracks': tracks_info,
+            'offset': offset,
+            'total': total,
+            'current_index': current_index,
+            'library_version': playlist.library_version
+        })
+
+@app.route('/api/tracks/<int:track_id>/peaks', methods=['GET'])
+def get_track_peaks(track_id):
+    """Waveform peaks of a library track as raw bytes (layout in PeaksCache)."""
+    with state_lock:
+        if track_id >= len(playlist.tracks):
+            return jsonify({'success': False, 'message': 'Track not found'}), 404
+        track = playlist.tracks[track_id]
+    try:
+        # Track ids follow the library order, so clients revalidate instead of caching blindly
+        etag = peaks_cache.etag(track)
+        # Weak tags count too, as compress_response() sets them
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(peaks_cache.get(track), mimetype='application/octet-stream')
+    except FileNotFoundError:
+        return jsonify({'success': False, 'message': 'Track file not found'}), 404
+    except (DecodeError, OSError) as e:
+        logger.error(f"Cannot compute waveform peaks for {track}: {e}")
+        return jsonify({'success': False, 'message': 'Cannot decode track'}), 422
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+@app.route('/api/tracks/<int:track_id>/art', methods=['GET'])
+def get_track_art(track_id):
+    """Cover of a library track; ?size= picks the nearest thumbnail size, ?v= the cover key."""
+    with state_lock:
+        if track_id >= len(playlist.tracks):
+            return jsonify({'success': False, 'message': 'Track not found'}), 404
+        track = playlist.tracks[track_id]
+    size = artwork.choose_size(request.args.get('size', type=int))
+    try:
+        key = artwork.key(track)
+        if key is None:
+            return jsonify({'success': False, 'message': 'Track has no cover art'}), 404
+        etag = f'{key}-{size}'
+        # Weak tags count too, as compress_response() sets them
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+        else:
+            thumbnail = artwork.thumbnail(track, size)
+            if thumbnail is None:
+                return jsonify({'success': False, 'message': 'Track has no cover art'}), 404
+            response = app.response_class(thumbnail[0], mimetype=thumbnail[1])
+    except OSError:
+        return jsonify({'success': False, 'message': 'Track file not found'}), 404
+    response.set_etag(etag)
+    # Track ids follow the library order; only a URL naming the cover itself can be cached for good
+    if request.args.get('v') == key:
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+# Command helpers shared by the single-action endpoints and /api/batch.
+# They expect state_lock to be held and return the JSON response body.
+def _cmd_play(data):
+    if 'index' in data:
+        try:
+            index = int(data['index'])
+            if 0 <= index < len(playlist.tracks):
+                track = playlist.jump_to(index)
+                if track is None:
+                    return {'success': False, 'message': 'Failed to locate track in playlist'}
+                success = player.play(track)
+                return {'success': success, 'track': os.path.basename(track) if success else None}
+            else:
+                return {'success': False, 'message': 'Track index out of range'}
+        except (ValueError, TypeError):
+            return {'success': False, 'message': 'Invalid track index'}
+    else:
+        current_track = playlist.get_current_track()
+        if not current_track:
+            return {'success': False, 'message': 'No track loaded'}
+        if player.is_paused:
+            player.unpause()
+            return {'success': True, 'action': 'resumed', 'track': os.path.basename(current_track)}
+        else:
+            success = player.play(current_track, start=_take_resume_position(current_track))
+            return {'success': success, 'action': 'played', 'track': os.path.basename(current_track) if success else None}
+
+def _cmd_pause(data):
+    if player.pause():
+        return {'success': True}
+    return {'success': False, 'message': 'Nothing playing'}
+
+def _cmd_toggle(data):
+    status = player.toggle_play_pause()
+    if status == "paused":
+        return {'success': True, 'state': 'paused'}
+    elif status == "playing":
+        return {'success': True, 'state': 'playing'}
+    else:
+        return {'success': False, 'message': 'No track loaded'}
+
+def _cmd_next(data):
+    track = playlist.next_track()
+    if track:
+        success = player.play(track)
+        return {'success': success, 'track': os.path.basename(track) if success else None}
+    return {'success': False, 'message': 'No tracks in playlist'}
+
+def _cmd_previous(data):
+    track = playlist.previous_track()
+    if track:
+        success = player.play(track)
+        return {'success': success, 'track': os.path.basename(track) if success else None}
+    return {'success': False, 'message': 'No tracks in playlist'}
+
+def _cmd_volume(data):
+    if 'volume' in data:
+        try:
+            volume = float(data['volume'])
+            volume = max(0.0, min(1.0, volume))
+            player.set_volume(volume)
+            config.set('volume', volume)
+            return {'success': True, 'volume': volume}
+        except (ValueError, TypeError):
+            return {'success': False, 'message': 'Invalid volume value'}
+    return {'success': False, 'message': 'No volume specified'}
+
+def _cmd_mute(data):
+    is_muted = player.toggle_mute()
+    return {'success': True, 'muted': is_muted}
+
+def _directory_error(data):
+    directory = data.get('directory')
+    if not directory:
+        return {'success': False, 'message': 'No directory specified'}
+    if not isinstance(directory, str) or not os.path.isdir(directory):
+        return {'success': False, 'message': 'Directory not found'}
+    return None
+
+def _cmd_directory(data, tracks=None):
+    """Switch libraries: installs ``tracks`` when /api/batch scanned them already, else starts a scan job."""
+    error = _directory_error(data)
+    if error:
+        return error
+    directory = data['directory']
+    if tracks is not None:
+        if not tracks:
+            return {'success': False, 'message': 'No supported audio files found'}
+        _install_library(directory, tracks)
+        return {'success': True, 'directory': directory, 'tracks': playlist.total_tracks()}
+    # Scans run as jobs (never under state_lock); a newer scan supersedes any still running
+    jobs.cancel_all(kind='scan')
+    job = jobs.submit('scan', _scan_directory_job, directory)
+    return {'success': True, 'directory': directory, 'job': job.to_dict()}
+
+def _cmd_shuffle(data):
+    if playlist.shuffle():
+        track = playlist.get_current_track()
+        if track:
+            player.play(track)
+        return {'success': True, 'total_tracks': playlist.total_tracks()}
+    return {'success': False, 'message': 'No tracks to shuffle'}
+
+def _cmd_order(data):
+    mode = data.get('mode')
+    if mode not in ORDER_MODES:
+        return {'success': False, 'message': f"Unknown order, expected one of: {', '.join(ORDER_MODES)}"}
+    if not playlist.set_order_mode(mode):
+        return {'success': False, 'message': 'No tracks to order'}
+    config.set('order_mode', mode)
+    track = playlist.get_current_track()
+    if track:
+        player.play(track)
+    return {'success': True, 'order_mode': mode, 'total_tracks': playlist.total_tracks()}
+
+def _cmd_radio(data):
+    if not data.get('enabled', True):
+        playlist.stop_radio()
+        return {'success': True, 'radio': False}
+    if not playlist.start_radio():
+        return {'success': False, 'message': 'No similar tracks known yet for this track'}
+    queue = playlist.shuffled_tracks
+    lookahead = min(playlist.RADIO_LOOKAHEAD, len(queue) - 1)
+    upcoming = [os.path.basename(queue[(playlist.current_index + offset) % len(queue)])
+                for offset in range(1, lookahead + 1)]
+    return {'success': True, 'radio': True, 'upcoming': upcoming}
+
+def _cmd_duplicates(data):
+    collapse = bool(data.get('collapse', True))
+    playlist.set_collapse_duplicates(collapse)
+    config.set('collapse_duplicates', collapse)
+    _schedule_dedup('tracks')
+    return {'success': True, 'collapse': collapse, 'duplicates': len(playlist.duplicates)}
+
+def _cmd_seek(data):
+    try:
+        position = max(0.0, float(data['position']))
+    except (KeyError, ValueError, TypeError):
+        return {'success': False, 'message': 'Invalid position'}
+    track = playlist.get_current_track()
+    if not track or not player.current_track:
+        return {'success': False, 'message': 'No track loaded'}
+    paused = player.is_paused
+    success = player.play(track, start=position)
+    if success and paused:
+        player.pause()
+    return {'success': success, 'position': player.get_position() if success else None}
+
+def _cmd_command(data):
+    text = data.get('text')
+    if not isinstance(text, str) or not text.strip():
+        return {'success': False, 'message': 'No command text'}
+    action, query = parse_request(text)
+    if action is None:
+        return {'success': False, 'message': 'Not a command'}
+    if action == 'play_query' and not resolver.is_current():
+        _schedule_index('tracks')
+    return execute_request(action, query, player, playlist, resolver)
+
+COMMANDS = {
+    'play': _cmd_play,
+    'pause': _cmd_pause,
+    'toggle': _cmd_toggle,
+    'next': _cmd_next,
+    'previous': _cmd_previous,
+    'volume': _cmd_volume,
+    'mute': _cmd_mute,
+    'directory': _cmd_directory,
+    'shuffle': _cmd_shuffle,
+    'order': _cmd_order,
+    'radio': _cmd_radio,
+    'duplicates': _cmd_duplicates,
+    'seek': _cmd_seek,
+    'command': _cmd_command,
+}
+
+def _run_command(name):
+    data = request.get_json(silent=True) or {}
+    with state_lock:
+        return jsonify(COMMANDS[name](data))
+
+@app.route('/api/play', methods=['POST'])
+def play_track():
+    return _run_command('play')
+
+@app.route('/api/pause', methods=['POST'])
+def pause_track():
+    return _run_command('pause')
+
+@app.route('/api/toggle', methods=['POST'])
+def toggle_playback():
+    return _run_command('toggle')
+
+@app.route('/api/next', methods=['POST'])
+def next_track():
+    return _run_command('next')
+
+@app.route('/api/previous', methods=['POST'])
+def previous_track():
+    return _run_command('previous')
+
+@app.route('/api/volume', methods=['POST'])
+def set_volume():
+    return _run_command('volume')
+
+@app.route('/api/mute', methods=['POST'])
+def toggle_mute():
+    return _run_command('mute')
+
+@app.route('/api/order', methods=['POST'])
+def set_order():
+    return _run_command('order')
+
+@app.route('/api/radio', methods=['POST'])
+def set_radio():
+    return _run_command('radio')
+
+@app.route('/api/duplicates', methods=['POST'])
+def set_duplicates():
+    return _run_command('duplicates')
+
+@app.route('/api/seek', methods=['POST'])
+def seek_track():
+    return _run_command('seek')
+
+@app.route('/api/directory', methods=['GET'])
+def get_directory():
+    return jsonify({'directory': config.get('music_directory')})
+
+def _scan_directory_job(job, directory):
+    tracks = playlist_utils.scan_audio_files_job(job, directory, PlaylistManager.SUPPORTED_FORMATS)
+    if not tracks:
+        raise ValueError('No supported audio files found')
+    job.check_cancelled()
+    with state_lock:
+        _install_library(directory, tracks)
+        return {'directory': directory, 'tracks': playlist.total_tracks()}
+
+def _install_library(directory, tracks):
+    # Expects state_lock; starts the new library when nothing is playing
+    playlist.load_tracks(directory, tracks)
+    config.set('music_directory', directory)
+    if not player.is_playing() and not player.is_paused:
+        playlist.current_index = 0
+        track = playlist.get_current_track()
+        if track:
+            player.play(track)
+
+@app.route('/api/directory', methods=['POST'])
+def set_directory():
+    """Start a background scan; poll /api/jobs/<id> for progress."""
+    result = _cmd_directory(request.get_json(silent=True) or {})
+    return jsonify(result), 202 if result['success'] else 200
+
+@app.route('/api/shuffle', methods=['POST'])
+def shuffle_playlist():
+    return _run_command('shuffle')
+
+@app.route('/api/command', methods=['POST'])
+def run_text_command():
+    return _run_command('command')
+
+@app.route('/api/batch', methods=['POST'])
+def run_batch():
+    """Run an ordered list of commands while holding the state lock.
+
+    Body: {"commands": [{"action": "shuffle"}, {"action": "volume", "volume": 0.4}],
+    "stop_on_error": true}. Other clients never observe the intermediate states.
+    Directories named by "directory" commands are scanned before the lock is
+    taken, so the commands after one run against the new library.
+    """
+    data = request.get_json(silent=True) or {}
+    commands = data.get('commands')
+    if not isinstance(commands, list) or not commands:
+        return jsonify({'success': False, 'message': 'No commands specified'})
+    if len(commands) > MAX_BATCH_COMMANDS:
+        return jsonify({'success': False, 'message': f'Too many commands (max {MAX_BATCH_COMMANDS})'})
+    stop_on_error = data.get('stop_on_error', True)
+    scans = {}
+    for command in commands:
+        if isinstance(command, dict) and command.get('action') == 'directory' and not _directory_error(command):
+            if not scans:
+                # A scan job finishing later would replace the library this batch sets up
+                jobs.cancel_all(kind='scan')
+            if command['directory'] not in scans:
+                scans[command['directory']] = playlist_utils.scan_audio_files(
+                    command['directory'], PlaylistManager.SUPPORTED_FORMATS)
+    results = []
+    with state_lock:
+        for command in commands:
+            if not isinstance(command, dict) or command.get('action') not in COMMANDS:
+                result = {'success': False, 'message': 'Unknown action'}
+            elif command['action'] == 'directory':
+                result = _cmd_directory(command, scans.get(command.get('directory'), []))
+            else:
+                result = COMMANDS[command['action']](command)
+            results.append(result)
+            if not result.get('success') and stop_on_error:
+                break
+        snapshot = _status_snapshot()
+    return jsonify({
+        'success': len(results) == len(commands) and all(r.get('success') for r in results),
+        'results': results,
+        'status': snapshot
+    })
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    return jsonify({'jobs': [job.to_dict() for job in jobs.list(kind=request.args.get('kind'))]})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    if not jobs.cancel(job_id):
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': jobs.get(job_id).to_dict()})
+
+# Play history and cache statistics
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Play history: totals, most played, recently played and most skipped tracks; ?limit= per list."""
+    limit = min(max(request.args.get('limit', 10, type=int), 0), 100)
+    return jsonify({
+        'summary': history.summary(),
+        'top': history.top(limit),
+        'recent': history.recent(limit),
+        'most_skipped': history.most_skipped(limit)
+    })
+
+@app.route('/api/cache', methods=['GET'])
+def get_cache_stats():
+    """Counters of the in-memory audio cache and the page cache prefetcher."""
+    return jsonify({'audio': player.cache.stats(), 'prefetch': prefetcher.stats()})
+
+# Voice recognition endpoints
+@app.route('/api/voice/on', methods=['POST'])
+def enable_voice():
+    global voice_enabled
+    if voice_enabled:
+        return jsonify({'success': True, 'status': 'Voice recognition already enabled'})
+    
+    success = voice_recognizer.start()
+    if success:
+        voice_enabled = True
+        _touch_server_state()
+        config.set('voice_enabled', True)
+        return jsonify({'success': True, 'status': 'Voice recognition enabled'})
+    else:
+        return jsonify({'success': False, 'message': 'Failed to enable voice recognition'})
+
+@app.route('/api/voice/off', methods=['POST'])
+def disable_voice():
+    global voice_enabled
+    if not voice_enabled:
+        return jsonify({'success': True, 'status': 'Voice recognition already disabled'})
+    
+    success = voice_recognizer.stop()
+    if success:
+        voice_enabled = False
+        _touch_server_state()
+        config.set('voice_enabled', False)
+        return jsonify({'success': True, 'status': 'Voice recognition disabled'})
+    else:
+        return jsonify({'success': False, 'message': 'Failed to disable voice recognition'})
+
+@app.route('/api/voice/status', methods=['GET'])
+def voice_status():
+    return jsonify({
+        'enabled': voice_enabled,
+        'initialized': voice_recognizer.model is not None,
+        'pipeline': voice_recognizer.status()
+    })
+
+@app.errorhandler(404)
+def not_found(e):
+    logger.error(f"404 error: {request.path}")
+    return jsonify({'error': 'Not found', 'status': 404}), 404
+
+@app.errorhandler(500)
+def server_error(e):
+    logger.error(f"500 error: {str(e)}")
+    return jsonify({'error': 'Server error', 'status': 500}), 500
+
+def main():
+    parser = argparse.ArgumentParser(description='MySpot Web Player')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to run the server on')
+    parser.add_argument('--port', type=int, default=5000, help='Port to run the server on')
+    parser.add_argument('--debug', action='store_true', help='Run in debug mode')
+    parser.add_argument('--voice', action='store_true', help='Enable voice recognition on startup')
+    args = parser.parse_args()
+
+    # Check if we should enable voice recognition at startup
+    global voice_enabled
+    voice_start = args.voice or config.get('voice_enabled', False)
+    
+    if voice_start:
+        logger.info("Initializing voice recognition...")
+        if voice_recognizer.initialize() and voice_recognizer.start():
+            voice_enabled = True
+            _touch_server_state()
+            logger.info("Voice recognition enabled")
+        else:
+            logger.warning("Failed to initialize voice recognition")
+    
+    # Save the current config before starting
+    config.save_config()
+    resume_playback()
+    
+    # Run the app
+    app.run(host=args.host, port=args.port, debug=args.debug)
+
+if __name__ == '__main__':
+    main()
@@ -1,399 +1,737 @@
-// MySpot Web Player - Frontend JavaScript
-document.addEventListener('DOMContentLoaded', () => {
-    // DOM Elements
-    const playBtn = document.getElementById('play-btn');
-    const prevBtn = document.getElementById('prev-btn');
-    const nextBtn = document.getElementById('next-btn');
-    const shuffleBtn = document.getElementById('shuffle-btn');
-    const muteBtn = document.getElementById('mute-btn');
-    const volumeSlider = document.getElementById('volume-slider');
-    const volumeDisplay = document.getElementById('volume-display');
-    const trackName = document.getElementById('track-name');
-    const trackInfo = document.getElementById('track-info');
-    const tracksList = document.getElementById('tracks-list');
-    const directoryBtn = document.getElementById('directory-btn');
-    const directoryDisplay = document.getElementById('directory-display');
-    const directoryModal = document.getElementById('directory-modal');
-    const closeModal = document.querySelector('.close-modal');
-    const directoryInput = document.getElementById('directory-input');
-    const confirmDirectory = document.getElementById('confirm-directory');
-    const loadingOverlay = document.getElementById('loading-overlay');
-
-    // Player state
-    let currentState = {
-        playing: false,
-        paused: false,
-        muted: false,
-        volume: 0.5,
-        currentTrack: null,
-        tracks: []
-    };
-
-    // Update interval for status polling
-    const STATUS_UPDATE_INTERVAL = 1000; // 1 second
-
-    // Initialize app
-    init();
-
-    async function init() {
-        // Show loading overlay
-        showLoading('Initializing player...');
-        
-        // Load initial state
-        await fetchStatus();
-        await fetchTracks();
-        await fetchDirectory();
-        
-        // Hide loading overlay
-        hideLoading();
-        
-        // Set up update interval
-        setInterval(updateStatus, STATUS_UPDATE_INTERVAL);
-        
-        // Set up event listeners
-        setupEventListeners();
-    }
-
-    function setupEventListeners() {
-        // Playback controls
-        playBtn.addEventListener('click', togglePlayPause);
-        prevBtn.addEventListener('click', previousTrack);
-        nextBtn.addEventListener('click', nextTrack);
-        shuffleBtn.addEventListener('click', shufflePlaylist);
-        
-        // Volume controls
-        muteBtn.addEventListener('click', toggleMute);
-        volumeSlider.addEventListener('input', handleVolumeChange);
-        
-        // Directory controls
-        directoryBtn.addEventListener('click', () => directoryModal.classList.remove('hidden'));
-        closeModal.addEventListener('click', () => directoryModal.classList.add('hidden'));
-        confirmDirectory.addEventListener('click', changeDirectory);
-        
-        // Close modal if clicking outside content
-        directoryModal.addEventListener('click', (e) => {
-            if (e.target === directoryModal) {
-                directoryModal.classList.add('hidden');
-            }
-        });
-
-        // Keyboard shortcuts
-        document.addEventListener('keydown', (e) => {
-            if (e.code === 'Space') {
-                e.preventDefault();
-                togglePlayPause();
-            } else if (e.key === 'ArrowRight' || e.key === 'n') {
-                nextTrack();
-            } else if (e.key === 'ArrowLeft' || e.key === 'p') {
-                previousTrack();
-            } else if (e.key === 'm') {
-                toggleMute();
-            }
-        });
-    }
-
-    // API Functions
-    async function fetchStatus() {
-        try {
-            const response = await fetch('/api/status');
-            const data = await response.json();
-            
-            updatePlayerState(data);
-            updateUI();
-            
-            return data;
-        } catch (error) {
-            console.error('Error fetching status:', error);
-        }
-    }
-
-    async function fetchTracks() {
-        try {
-            const response = await fetch('/api/tracks');
-            const data = await response.json();
-            
-            if (data.tracks) {
-                currentState.tracks = data.tracks;
-                renderTracksList();
-            }
-            
-            return data;
-        } catch (error) {
-            console.error('Error fetching tracks:', error);
-        }
-    }
-
-    async function fetchDirectory() {
-        try {
-            const response = await fetch('/api/directory');
-            const data = await response.json();
-            
-            if (data.directory) {
-                directoryDisplay.textContent = formatDirectoryPath(data.directory);
-                directoryInput.value = data.directory;
-            }
-            
-            return data;
-        } catch (error) {
-            console.error('Error fetching directory:', error);
-        }
-    }
-
-    async function togglePlayPause() {
-        try {
-            const response = await fetch('/api/toggle', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
-            });
-            
-            await fetchStatus();
-        } catch (error) {
-            console.error('Error toggling playback:', error);
-        }
-    }
-
-    async function nextTrack() {
-        try {
-            showLoading('Loading next track...');
-            
-            const response = await fetch('/api/next', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
-            });
-            
-            await fetchStatus();
-            await fetchTracks();
-            
-            hideLoading();
-        } catch (error) {
-            console.error('Error playing next track:', error);
-            hideLoading();
-        }
-    }
-
-    async function previousTrack() {
-        try {
-            showLoading('Loading previous track...');
-            
-            const response = await fetch('/api/previous', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
-            });
-            
-            await fetchStatus();
-            await fetchTracks();
-            
-            hideLoading();
-        } catch (error) {
-            console.error('Error playing previous track:', error);
-            hideLoading();
-        }
-    }
-
-    async function playTrack(index) {
-        try {
-            showLoading('Loading track...');
-            
-            const response = await fetch('/api/play', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ index })
-            });
-            
-            await fetchStatus();
-            await fetchTracks();
-            
-            hideLoading();
-        } catch (error) {
-            console.error('Error playing track:', error);
-            hideLoading();
-        }
-    }
-
-    async function toggleMute() {
-        try {
-            const response = await fetch('/api/mute', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
-            });
-            
-            const data = await response.json();
-            
-            if (data.success) {
-                currentState.muted = data.muted;
-                updateUI();
-            }
-        } catch (error) {
-            console.error('Error toggling mute:', error);
-        }
-    }
-
-    async function handleVolumeChange() {
-        const volume = volumeSlider.value / 100;
-        volumeDisplay.textContent = `${volumeSlider.value}%`;
-        
-        try {
-            const response = await fetch('/api/volume', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ volume })
-            });
-            
-            const data = await response.json();
-            
-            if (data.success) {
-                currentState.volume = data.volume;
-            }
-        } catch (error) {
-            console.error('Error setting volume:', error);
-        }
-    }
-
-    async function changeDirectory() {
-        const directory = directoryInput.value.trim();
-        
-        if (!directory) return;
-        
-        try {
-            directoryModal.classList.add('hidden');
-            showLoading('Loading music directory...');
-            
-            const response = await fetch('/api/directory', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ directory })
-            });
-            
-            const data = await response.json();
-            
-            if (data.success) {
-                directoryDisplay.textContent = formatDirectoryPath(data.directory);
-                await fetchTracks();
-                await fetchStatus();
-            } else {
-                alert(`Error: ${data.message}`);
-            }
-            
-            hideLoading();
-        } catch (error) {
-            console.error('Error changing directory:', error);
-            hideLoading();
-        }
-    }
-
-    async function shufflePlaylist() {
-        try {
-            showLoading('Shuffling playlist...');
-            
-            const response = await fetch('/api/shuffle', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
-            });
-            
-            await fetchStatus();
-            await fetchTracks();
-            
-            hideLoading();
-        } catch (error) {
-            console.error('Error shuffling playlist:', error);
-            hideLoading();
-        }
-    }
-
-    // UI Update Functions
-    async function updateStatus() {
-        // Only fetch status if not in a loading state
-        if (loadingOverlay.classList.contains('hidden')) {
-            await fetchStatus();
-        }
-    }
-
-    function updatePlayerState(data) {
-        currentState.playing = data.playing;
-        currentState.paused = data.paused;
-        currentState.muted = data.muted;
-        currentState.volume = data.volume;
-        currentState.currentTrack = data.current_track;
-    }
-
-    function updateUI() {
-        // Update play/pause button
-        if (currentState.playing) {
-            playBtn.innerHTML = '<i class="fa-solid fa-pause"></i>';
-        } else {
-            playBtn.innerHTML = '<i class="fa-solid fa-play"></i>';
-        }
-        
-        // Update mute button
-        if (currentState.muted) {
-            muteBtn.innerHTML = '<i class="fa-solid fa-volume-xmark"></i>';
-        } else {
-            muteBtn.innerHTML = '<i class="fa-solid fa-volume-high"></i>';
-        }
-        
-        // Update volume display
-        const volumePercent = Math.round(currentState.volume * 100);
-        volumeSlider.value = volumePercent;
-        volumeDisplay.textContent = `${volumePercent}%`;
-        
-        // Update track info
-        if (currentState.currentTrack) {
-            trackName.textContent = currentState.currentTrack.filename;
-            trackInfo.textContent = `Track ${currentState.currentTrack.index} of ${currentState.currentTrack.total}`;
-        } else {
-            trackName.textContent = 'No track playing';
-            trackInfo.textContent = '';
-        }
-    }
-
-    function renderTracksList() {
-        if (!currentState.tracks || currentState.tracks.length === 0) {
-            tracksList.innerHTML = '<div class="empty-playlist">No tracks loaded. Open a music directory to get started.</div>';
-            return;
-        }
-        
-        let html = '';
-        
-        currentState.tracks.forEach((track, index) => {
-            const isPlaying = track.is_current;
-            
-            html += `
-                <div class="track-item ${isPlaying ? 'playing' : ''}" data-index="${track.index}">
-                    <div class="track-number">${track.index + 1}</div>
-                    <div class="track-info">${track.filename}</div>
-                </div>
-            `;
-        });
-        
-        tracksList.innerHTML = html;
-        
-        // Add click listeners to track items
-        document.querySelectorAll('.track-item').forEach(item => {
-            item.addEventListener('click', () => {
-                const index = parseInt(item.dataset.index);
-                playTrack(index);
-            });
-        });
-    }
-
-    // Helper Functions
-    function showLoading(message) {
-        document.getElementById('loading-message').textContent = message;
-        loadingOverlay.classList.remove('hidden');
-    }
-
-    function hideLoading() {
-        loadingOverlay.classList.add('hidden');
-    }
-
-    function formatDirectoryPath(path) {
-        // Truncate very long paths for display
-        if (path.length > 40) {
-            const parts = path.split(/[\/\\]/);
-            if (parts.length > 4) {
-                return `.../${parts.slice(-3).join('/')}`;
-            }
-        }
-        return path;
-    }
+// MySpot Web Player - Frontend JavaScript
+document.addEventListener('DOMContentLoaded', () => {
+    // DOM Elements
+    const playBtn = document.getElementById('play-btn');
+    const prevBtn = document.getElementById('prev-btn');
+    const nextBtn = document.getElementById('next-btn');
+    const shuffleBtn = document.getElementById('shuffle-btn');
+    const orderSelect = document.getElementById('order-select');
+    const radioBtn = document.getElementById('radio-btn');
+    const muteBtn = document.getElementById('mute-btn');
+    const volumeSlider = document.getElementById('volume-slider');
+    const volumeDisplay = document.getElementById('volume-display');
+    const trackName = document.getElementById('track-name');
+    const trackInfo = document.getElementById('track-info');
+    const coverArt = document.getElementById('cover-art');
+    const tracksList = document.getElementById('tracks-list');
+    const directoryBtn = document.getElementById('directory-btn');
+    const directoryDisplay = document.getElementById('directory-display');
+    const directoryModal = document.getElementById('directory-modal');
+    const closeModal = document.querySelector('.close-modal');
+    const directoryInput = document.getElementById('directory-input');
+    const confirmDirectory = document.getElementById('confirm-directory');
+    const loadingOverlay = document.getElementById('loading-overlay');
+    const waveformCanvas = document.getElementById('waveform');
+    const elapsedTime = document.getElementById('elapsed-time');
+    const totalTime = document.getElementById('total-time');
+
+    // Player state
+    let currentState = {
+        playing: false,
+        paused: false,
+        muted: false,
+        volume: 0.5,
+        orderMode: 'shuffle',
+        radio: false,
+        currentTrack: null,
+        position: 0,
+        positionTime: 0,
+        version: -1
+    };
+
+    // Cover thumbnail edge in CSS pixels, doubled for high-density screens
+    const COVER_SIZE = 96 * Math.min(Math.ceil(window.devicePixelRatio || 1), 2);
+
+    // Waveform of the current track: int8 (min, max) pairs after a 32-byte header
+    const PEAKS_HEADER_SIZE = 32;
+    const WAVEFORM_REFRESH_INTERVAL = 250;
+    let waveform = {
+        libraryIndex: null,
+        libraryVersion: null,
+        peaks: null,
+        duration: 0
+    };
+
+    // Virtual track list: only rows near the viewport exist in the DOM and
+    // pages of track data are fetched from the server on demand
+    const TRACK_ROW_HEIGHT = 45;
+    const TRACK_PAGE_SIZE = 200;
+    const TRACK_OVERSCAN = 10;
+    let trackList = {
+        total: 0,
+        libraryVersion: null,
+        currentIndex: null,
+        pages: new Map(),
+        pendingPages: new Set(),
+        rows: new Map(),
+        viewport: null,
+        renderQueued: false
+    };
+
+    // Update interval for status polling
+    const STATUS_UPDATE_INTERVAL = 1000; // 1 second
+    const JOB_POLL_INTERVAL = 500;
+
+    // Initialize app
+    init();
+
+    async function init() {
+        // Show loading overlay
+        showLoading('Initializing player...');
+        
+        // Load initial state
+        await fetchStatus();
+        await fetchTracks();
+        await fetchDirectory();
+        
+        // Hide loading overlay
+        hideLoading();
+        
+        // Set up update interval
+        setInterval(updateStatus, STATUS_UPDATE_INTERVAL);
+        setInterval(drawWaveform, WAVEFORM_REFRESH_INTERVAL);
+        
+        // Set up event listeners
+        setupEventListeners();
+    }
+
+    function setupEventListeners() {
+        // Playback controls
+        playBtn.addEventListener('click', togglePlayPause);
+        prevBtn.addEventListener('click', previousTrack);
+        nextBtn.addEventListener('click', nextTrack);
+        shuffleBtn.addEventListener('click', shufflePlaylist);
+        orderSelect.addEventListener('change', () => setOrderMode(orderSelect.value));
+        radioBtn.addEventListener('click', toggleRadio);
+        
+        // Tracks without a cover answer 404: hide the image until the next one loads
+        coverArt.addEventListener('load', () => coverArt.classList.remove('hidden'));
+        coverArt.addEventListener('error', () => coverArt.classList.add('hidden'));
+        
+        // Track list: one delegated click handler and a throttled scroll handler
+        tracksList.addEventListener('click', (e) => {
+            const item = e.target.closest('.track-item');
+            if (item) {
+                playTrack(parseInt(item.dataset.index));
+            }
+        });
+        tracksList.addEventListener('scroll', scheduleRender, { passive: true });
+        window.addEventListener('resize', scheduleRender);
+        
+        // Volume controls
+        muteBtn.addEventListener('click', toggleMute);
+        volumeSlider.addEventListener('input', handleVolumeChange);
+        
+        // Seek by clicking the waveform
+        waveformCanvas.addEventListener('click', seekToClick);
+        window.addEventListener('resize', drawWaveform);
+        
+        // Directory controls
+        directoryBtn.addEventListener('click', () => directoryModal.classList.remove('hidden'));
+        closeModal.addEventListener('click', () => directoryModal.classList.add('hidden'));
+        confirmDirectory.addEventListener('click', changeDirectory);
+        
+        // Close modal if clicking outside content
+        directoryModal.addEventListener('click', (e) => {
+            if (e.target === directoryModal) {
+                directoryModal.classList.add('hidden');
+            }
+        });
+
+        // Keyboard shortcuts
+        document.addEventListener('keydown', (e) => {
+            if (e.code === 'Space') {
+                e.preventDefault();
+                togglePlayPause();
+            } else if (e.key === 'ArrowRight' || e.key === 'n') {
+                nextTrack();
+            } else if (e.key === 'ArrowLeft' || e.key === 'p') {
+                previousTrack();
+            } else if (e.key === 'm') {
+                toggleMute();
+            }
+        });
+    }
+
+    // API Functions
+    async function fetchStatus() {
+        try {
+            // The server answers 304 while the state version is unchanged
+            const response = await fetch(`/api/status?since=${currentState.version}`);
+            if (response.status === 304) {
+                return null;
+            }
+            
+            const data = await response.json();
+            
+            updatePlayerState(data);
+            updateUI();
+            
+            return data;
+        } catch (error) {
+            console.error('Error fetching status:', error);
+        }
+    }
+
+    async function fetchTracks() {
+        // Reset the virtual list and load the first page
+        trackList.pages.clear();
+        trackList.pendingPages.clear();
+        trackList.libraryVersion = null;
+        const data = await fetchTrackPage(0);
+        
+        if (data) {
+            trackList.total = data.total || 0;
+            trackList.libraryVersion = data.library_version;
+            trackList.currentIndex = data.current_index ?? null;
+            renderTracksList();
+        }
+        
+        return data;
+    }
+
+    async function fetchTrackPage(page) {
+        if (trackList.pendingPages.has(page)) return null;
+        trackList.pendingPages.add(page);
+        
+        try {
+            const offset = page * TRACK_PAGE_SIZE;
+            const response = await fetch(`/api/tracks?offset=${offset}&limit=${TRACK_PAGE_SIZE}`);
+            const data = await response.json();
+            
+            if (data.library_version !== undefined && trackList.libraryVersion !== null
+                    && data.library_version !== trackList.libraryVersion) {
+                // The library changed while scrolling; start over
+                trackList.pendingPages.delete(page);
+                await fetchTracks();
+                return null;
+            }
+            
+            trackList.pages.set(page, data.tracks || []);
+            return data;
+        } catch (error) {
+            console.error('Error fetching tracks:', error);
+            return null;
+        } finally {
+            trackList.pendingPages.delete(page);
+        }
+    }
+
+    async function fetchDirectory() {
+        try {
+            const response = await fetch('/api/directory');
+            const data = await response.json();
+            
+            if (data.directory) {
+                directoryDisplay.textContent = formatDirectoryPath(data.directory);
+                directoryInput.value = data.directory;
+            }
+            
+            return data;
+        } catch (error) {
+            console.error('Error fetching directory:', error);
+        }
+    }
+
+    // Runs several commands in one round-trip and applies the returned state snapshot
+    async function runCommands(commands) {
+        const response = await fetch('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ commands })
+        });
+        
+        const data = await response.json();
+        
+        if (data.status) {
+            updatePlayerState(data.status);
+            updateUI();
+        }
+        
+        return data;
+    }
+
+    async function fetchWaveform(libraryIndex, libraryVersion) {
+        waveform = { libraryIndex, libraryVersion, peaks: null, duration: 0 };
+        drawWaveform();
+        if (libraryIndex === null || libraryIndex === undefined) return;
+        
+        try {
+            const response = await fetch(`/api/tracks/${libraryIndex}/peaks`);
+            // Skip answers that arrive after the track changed again
+            if (!response.ok || waveform.libraryIndex !== libraryIndex) return;
+            
+            const buffer = await response.arrayBuffer();
+            const header = new DataView(buffer, 0, PEAKS_HEADER_SIZE);
+            const buckets = header.getUint32(8, true);
+            waveform.duration = header.getFloat32(12, true);
+            waveform.peaks = new Int8Array(buffer, PEAKS_HEADER_SIZE, buckets * 2);
+            drawWaveform();
+        } catch (error) {
+            console.error('Error fetching waveform:', error);
+        }
+    }
+
+    function currentPosition() {
+        let position = currentState.position;
+        if (currentState.playing) {
+            position += Date.now() / 1000 - currentState.positionTime;
+        }
+        return waveform.duration ? Math.min(position, waveform.duration) : position;
+    }
+
+    function drawWaveform() {
+        const width = waveformCanvas.clientWidth;
+        const height = waveformCanvas.clientHeight;
+        if (waveformCanvas.width !== width || waveformCanvas.height !== height) {
+            waveformCanvas.width = width;
+            waveformCanvas.height = height;
+        }
+        
+        const context = waveformCanvas.getContext('2d');
+        context.clearRect(0, 0, width, height);
+        
+        const position = currentPosition();
+        elapsedTime.textContent = formatTime(position);
+        totalTime.textContent = formatTime(waveform.duration);
+        
+        const styles = getComputedStyle(document.documentElement);
+        const playedX = waveform.duration ? position / waveform.duration * width : 0;
+        const peaks = waveform.peaks;
+        if (!peaks || peaks.length === 0) {
+            context.fillStyle = styles.getPropertyValue('--button-bg');
+            context.fillRect(0, height / 2 - 1, width, 2);
+            return;
+        }
+        
+        // One bar per pixel column, covering the buckets that fall into it
+        const buckets = peaks.length / 2;
+        const middle = height / 2;
+        for (let x = 0; x < width; x++) {
+            const first = Math.floor(x * buckets / width);
+            const last = Math.max(first + 1, Math.floor((x + 1) * buckets / width));
+            let low = 127;
+            let high = -127;
+            for (let i = first; i < last; i++) {
+                low = Math.min(low, peaks[2 * i]);
+                high = Math.max(high, peaks[2 * i + 1]);
+            }
+            context.fillStyle = styles.getPropertyValue(x < playedX ? '--accent-color' : '--secondary-text');
+            const top = middle - high / 127 * middle;
+            context.fillRect(x, top, 1, Math.max(1, (high - low) / 127 * middle));
+        }
+    }
+
+    async function seekToClick(e) {
+        if (!waveform.duration || !currentState.currentTrack) return;
+        
+        const rect = waveformCanvas.getBoundingClientRect();
+        const position = (e.clientX - rect.left) / rect.width * waveform.duration;
+        try {
+            const data = await runCommands([{ action: 'seek', position }]);
+            const result = data.results && data.results[0];
+            if (result && result.success) {
+                currentState.position = result.position;
+                currentState.positionTime = Date.now() / 1000;
+                drawWaveform();
+            }
+        } catch (error) {
+            console.error('Error seeking:', error);
+        }
+    }
+
+    async function togglePlayPause() {
+        try {
+            await runCommands([{ action: 'toggle' }]);
+        } catch (error) {
+            console.error('Error toggling playback:', error);
+        }
+    }
+
+    async function nextTrack() {
+        try {
+            showLoading('Loading next track...');
+            
+            await runCommands([{ action: 'next' }]);
+            
+            hideLoading();
+        } catch (error) {
+            console.error('Error playing next track:', error);
+            hideLoading();
+        }
+    }
+
+    async function previousTrack() {
+        try {
+            showLoading('Loading previous track...');
+            
+            await runCommands([{ action: 'previous' }]);
+            
+            hideLoading();
+        } catch (error) {
+            console.error('Error playing previous track:', error);
+            hideLoading();
+        }
+    }
+
+    async function playTrack(index) {
+        try {
+            showLoading('Loading track...');
+            
+            await runCommands([{ action: 'play', index }]);
+            
+            hideLoading();
+        } catch (error) {
+            console.error('Error playing track:', error);
+            hideLoading();
+        }
+    }
+
+    async function toggleMute() {
+        try {
+            const response = await fetch('/api/mute', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' }
+            });
+            
+            const data = await response.json();
+            
+            if (data.success) {
+                currentState.muted = data.muted;
+                updateUI();
+            }
+        } catch (error) {
+            console.error('Error toggling mute:', error);
+        }
+    }
+
+    async function handleVolumeChange() {
+        const volume = volumeSlider.value / 100;
+        volumeDisplay.textContent = `${volumeSlider.value}%`;
+        
+        try {
+            const response = await fetch('/api/volume', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ volume })
+            });
+            
+            const data = await response.json();
+            
+            if (data.success) {
+                currentState.volume = data.volume;
+            }
+        } catch (error) {
+            console.error('Error setting volume:', error);
+        }
+    }
+
+    async function changeDirectory() {
+        const directory = directoryInput.value.trim();
+        
+        if (!directory) return;
+        
+        try {
+            directoryModal.classList.add('hidden');
+            showLoading('Loading music directory...');
+            
+            const response = await fetch('/api/directory', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ directory })
+            });
+            
+            const data = await response.json();
+            
+            if (data.success) {
+                // The scan runs as a background job on the server
+                const job = await waitForJob(data.job.id, (progress) => {
+                    const found = progress.progress.audio_files || 0;
+                    const rate = progress.rates.dirs_per_second || 0;
+                    showLoading(`Scanning... ${found} tracks found (${rate} folders/s)`);
+                });
+                
+                if (job.status === 'done') {
+                    directoryDisplay.textContent = formatDirectoryPath(data.directory);
+                    await fetchTracks();
+                    await fetchStatus();
+                } else if (job.status === 'failed') {
+                    alert(`Error: ${job.error}`);
+                }
+            } else {
+                alert(`Error: ${data.message}`);
+            }
+            
+            hideLoading();
+        } catch (error) {
+            console.error('Error changing directory:', error);
+            hideLoading();
+        }
+    }
+
+    async function waitForJob(jobId, onProgress) {
+        while (true) {
+            const response = await fetch(`/api/jobs/${jobId}`);
+            const job = await response.json();
+            
+            if (job.status !== 'pending' && job.status !== 'running') {
+                return job;
+            }
+            if (onProgress) onProgress(job);
+            
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+        }
+    }
+
+    async function shufflePlaylist() {
+        try {
+            showLoading('Shuffling playlist...');
+            
+            await runCommands([{ action: 'shuffle' }]);
+            
+            hideLoading();
+        } catch (error) {
+            console.error('Error shuffling playlist:', error);
+            hideLoading();
+        }
+    }
+
+    async function setOrderMode(mode) {
+        try {
+            showLoading('Reordering playlist...');
+            
+            await runCommands([{ action: 'order', mode }]);
+            
+            hideLoading();
+        } catch (error) {
+            console.error('Error reordering playlist:', error);
+            hideLoading();
+        }
+    }
+
+    async function toggleRadio() {
+        try {
+            const data = await runCommands([{ action: 'radio', enabled: !currentState.radio }]);
+            if (data && !data.success && data.results && data.results[0]) {
+                console.warn(data.results[0].message);
+            }
+        } catch (error) {
+            console.error('Error toggling radio:', error);
+        }
+    }
+
+    // UI Update Functions
+    async function updateStatus() {
+        // Only fetch status if not in a loading state
+        if (loadingOverlay.classList.contains('hidden')) {
+            await fetchStatus();
+        }
+    }
+
+    function updatePlayerState(data) {
+        currentState.playing = data.playing;
+        currentState.paused = data.paused;
+        currentState.muted = data.muted;
+        currentState.volume = data.volume;
+        currentState.orderMode = data.order_mode || 'shuffle';
+        currentState.radio = Boolean(data.radio);
+        currentState.currentTrack = data.current_track;
+        currentState.position = data.position || 0;
+        currentState.positionTime = data.position_time || Date.now() / 1000;
+        currentState.version = data.version;
+        
+        const libraryIndex = data.current_track ? data.current_track.library_index : null;
+        if (libraryIndex !== waveform.libraryIndex || data.library_version !== waveform.libraryVersion) {
+            fetchWaveform(libraryIndex, data.library_version);
+        }
+        showCoverArt(libraryIndex, data.current_track ? data.current_track.art : null);
+        
+        if (trackList.libraryVersion !== null && data.library_version !== trackList.libraryVersion) {
+            fetchTracks();
+        } else {
+            setCurrentTrackRow(data.current_track ? data.current_track.library_index : null);
+        }
+    }
+
+    function showCoverArt(libraryIndex, art) {
+        if (libraryIndex === null || libraryIndex === undefined) {
+            coverArt.removeAttribute('src');
+            coverArt.classList.add('hidden');
+            return;
+        }
+        // With the cover key in the URL the browser may keep the image for good
+        let src = `/api/tracks/${libraryIndex}/art?size=${COVER_SIZE}`;
+        if (art) src += `&v=${art}`;
+        if (coverArt.getAttribute('src') !== src) {
+            coverArt.setAttribute('src', src);
+        }
+    }
+
+    function updateUI() {
+        // Update play/pause button
+        if (currentState.playing) {
+            playBtn.innerHTML = '<i class="fa-solid fa-pause"></i>';
+        } else {
+            playBtn.innerHTML = '<i class="fa-solid fa-play"></i>';
+        }
+        
+        // Update mute button
+        if (currentState.muted) {
+            muteBtn.innerHTML = '<i class="fa-solid fa-volume-xmark"></i>';
+        } else {
+            muteBtn.innerHTML = '<i class="fa-solid fa-volume-high"></i>';
+        }
+        
+        // Update volume display
+        const volumePercent = Math.round(currentState.volume * 100);
+        volumeSlider.value = volumePercent;
+        volumeDisplay.textContent = `${volumePercent}%`;
+        orderSelect.value = currentState.orderMode;
+        radioBtn.classList.toggle('active', currentState.radio);
+        
+        // Update track info
+        if (currentState.currentTrack) {
+            trackName.textContent = currentState.currentTrack.filename;
+            trackInfo.textContent = `Track ${currentState.currentTrack.index} of ${currentState.currentTrack.total}`;
+        } else {
+            trackName.textContent = 'No track playing';
+            trackInfo.textContent = '';
+        }
+    }
+
+    function renderTracksList() {
+        trackList.rows.clear();
+        
+        if (trackList.total === 0) {
+            trackList.viewport = null;
+            tracksList.innerHTML = '<div class="empty-playlist">No tracks loaded. Open a music directory to get started.</div>';
+            return;
+        }
+        
+        // A spacer sized for every track gives the scrollbar its full range
+        tracksList.innerHTML = '';
+        trackList.viewport = document.createElement('div');
+        trackList.viewport.className = 'tracks-viewport';
+        trackList.viewport.style.height = `${trackList.total * TRACK_ROW_HEIGHT}px`;
+        tracksList.appendChild(trackList.viewport);
+        
+        renderVisibleRows();
+    }
+
+    function scheduleRender() {
+        if (trackList.renderQueued) return;
+        trackList.renderQueued = true;
+        requestAnimationFrame(() => {
+            trackList.renderQueued = false;
+            renderVisibleRows();
+        });
+    }
+
+    function renderVisibleRows() {
+        if (!trackList.viewport) return;
+        
+        const first = Math.max(0, Math.floor(tracksList.scrollTop / TRACK_ROW_HEIGHT) - TRACK_OVERSCAN);
+        const last = Math.min(trackList.total - 1,
+            Math.ceil((tracksList.scrollTop + tracksList.clientHeight) / TRACK_ROW_HEIGHT) + TRACK_OVERSCAN);
+        
+        // Drop rows that scrolled out of the window
+        for (const [index, row] of trackList.rows) {
+            if (index < first || index > last) {
+                row.remove();
+                trackList.rows.delete(index);
+            }
+        }
+        
+        const missingPages = new Set();
+        for (let index = first; index <= last; index++) {
+            const page = Math.floor(index / TRACK_PAGE_SIZE);
+            const tracks = trackList.pages.get(page);
+            const track = tracks ? tracks[index - page * TRACK_PAGE_SIZE] : null;
+            let row = trackList.rows.get(index);
+            
+            if (!track) {
+                missingPages.add(page);
+            }
+            if (row && (row.dataset.loaded === 'true' || !track)) {
+                continue;
+            }
+            if (!row) {
+                row = createTrackRow(index);
+                trackList.viewport.appendChild(row);
+                trackList.rows.set(index, row);
+            }
+            if (track) {
+                row.querySelector('.track-info').textContent = track.filename;
+                row.title = track.path;
+                row.dataset.loaded = 'true';
+            }
+        }
+        
+        missingPages.forEach(async page => {
+            if (await fetchTrackPage(page)) {
+                scheduleRender();
+            }
+        });
+    }
+
+    function createTrackRow(index) {
+        const row = document.createElement('div');
+        row.className = 'track-item';
+        row.dataset.index = index;
+        row.dataset.loaded = 'false';
+        row.style.top = `${index * TRACK_ROW_HEIGHT}px`;
+        if (index === trackList.currentIndex) {
+            row.classList.add('playing');
+        }
+        
+        const number = document.createElement('div');
+        number.className = 'track-number';
+        number.textContent = index + 1;
+        
+        const info = document.createElement('div');
+        info.className = 'track-info';
+        info.textContent = 'Loading...';
+        
+        row.appendChild(number);
+        row.appendChild(info);
+        return row;
+    }
+
+    function setCurrentTrackRow(index) {
+        if (index === undefined || index === trackList.currentIndex) return;
+        
+        // Only the previous and the new row are touched
+        const previous = trackList.rows.get(trackList.currentIndex);
+        if (previous) previous.classList.remove('playing');
+        
+        trackList.currentIndex = index;
+        const current = trackList.rows.get(index);
+        if (current) current.classList.add('playing');
+    }
+
+    // Helper Functions
+    function showLoading(message) {
+        document.getElementById('loading-message').textContent = message;
+        loadingOverlay.classList.remove('hidden');
+    }
+
+    function hideLoading() {
+        loadingOverlay.classList.add('hidden');
+    }
+
+    function formatTime(seconds) {
+        const total = Math.max(0, Math.floor(seconds || 0));
+        return `${Math.floor(total / 60)}:${String(total % 60).padStart(2, '0')}`;
+    }
+
+    function formatDirectoryPath(path) {
+        // Truncate very long paths for display
+        if (path.length > 40) {
+            const parts = path.split(/[\/\\]/);
+            if (parts.length > 4) {
+                return `.../${parts.slice(-3).join('/')}`;
+            }
+        }
+        return path;
+    }
 });
\ No newline at end of file
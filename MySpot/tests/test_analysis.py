@@ -0,0 +1,325 @@
+import os
+import sys
+import wave
+import shutil
+import unittest
+import tempfile
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.analysis import AnalysisStore, FeatureMeter, PeaksCache, SilenceMeter, SimilarityIndex, analyze_track, \
+    analyze_paths, compute_peaks, track_gain
+from myspot.analysis.features import TIMBRE_BANDS, TIMBRE_HIGH, TIMBRE_LOW
+from myspot.analysis.similarity import DIMENSIONS
+from myspot.analysis.decoder import iter_chunks
+
+
+def write_sine(path, amplitude, seconds=3.0, sample_rate=44100, channels=2, frequency=1000.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    samples = np.repeat((amplitude * np.sin(2 * np.pi * frequency * t))[:, None], channels, axis=1)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((samples * 32767).astype('<i2').tobytes())
+
+
+class TestLoudness(unittest.TestCase):
+    """Test cases for loudness measurement."""
+
+    def setUp(self):
+        """Set up a directory for test tracks."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_decoder_chunks(self):
+        """Test that chunked WAV decoding covers the whole file."""
+        path = os.path.join(self.temp_dir, 'sine.wav')
+        write_sine(path, 0.5, seconds=2.5)
+        chunks = list(iter_chunks(path, chunk_seconds=1.0))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(len(chunk) for _, chunk in chunks), int(44100 * 2.5))
+        self.assertEqual(chunks[0][1].shape[1], 2)
+
+    def test_reference_sine(self):
+        """Test the EBU Tech 3341 reference: a stereo 1 kHz sine at -23 dBFS reads -23 LUFS."""
+        for sample_rate in (44100, 48000):
+            path = os.path.join(self.temp_dir, f'ref-{sample_rate}.wav')
+            write_sine(path, 10 ** (-23 / 20), sample_rate=sample_rate)
+            _, size, _, analysis = analyze_track(path)
+            self.assertEqual(size, os.path.getsize(path))
+            self.assertAlmostEqual(analysis['loudness'], -23.0, delta=0.1)
+            self.assertAlmostEqual(analysis['peak'], 10 ** (-23 / 20), places=3)
+
+    def test_gating(self):
+        """Test that silence is gated out and pure silence has no loudness."""
+        path = os.path.join(self.temp_dir, 'silence.wav')
+        write_sine(path, 0.0)
+        self.assertIsNone(analyze_track(path)[3]['loudness'])
+        # Silence doubling the length barely moves the result: only blocks straddling the edge count
+        loud = os.path.join(self.temp_dir, 'loud.wav')
+        write_sine(loud, 0.1)
+        with wave.open(loud, 'rb') as f:
+            frames = f.readframes(f.getnframes())
+        with wave.open(loud, 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(44100)
+            f.writeframes(frames + bytes(len(frames)))
+        self.assertAlmostEqual(analyze_track(loud)[3]['loudness'], -20.0, delta=0.3)
+
+    def test_track_gain(self):
+        """Test gain towards the target level, limited by the peak."""
+        self.assertAlmostEqual(track_gain(-12.0, 0.1, target=-18.0), 10 ** (-6 / 20))
+        self.assertAlmostEqual(track_gain(-24.0, 0.5, target=-18.0), 10 ** (6 / 20))
+        self.assertAlmostEqual(track_gain(-24.0, 0.9, target=-18.0), 1 / 0.9)
+        self.assertIsNone(track_gain(None, 0.0))
+
+    def test_analyze_paths(self):
+        """Test pooled analysis, including files that cannot be decoded."""
+        paths = []
+        for i in range(4):
+            paths.append(os.path.join(self.temp_dir, f'{i}.wav'))
+            write_sine(paths[-1], 0.05 * (i + 1), seconds=1.0)
+        broken = os.path.join(self.temp_dir, 'broken.wav')
+        with open(broken, 'wb') as f:
+            f.write(b'not audio')
+        # Workers leave logging to the parent process
+        with self.assertLogs('myspot.analysis.pipeline', 'WARNING') as logs:
+            results = {result[0]: result for result in analyze_paths(paths + [broken], workers=2)}
+        self.assertIn(broken, logs.output[0])
+        self.assertEqual(set(results), set(paths + [broken]))
+        self.assertEqual(results[broken][3], {})
+        self.assertLess(results[paths[0]][3]['loudness'], results[paths[3]][3]['loudness'])
+
+    def test_silence_bounds(self):
+        """Test finding the audible part across chunk boundaries."""
+        meter = SilenceMeter(100)
+        chunk = np.zeros((50, 2), dtype=np.float32)
+        meter.feed(chunk)
+        self.assertEqual(meter.bounds(), (None, None))
+        chunk[30, 1] = 0.5
+        meter.feed(chunk)
+        chunk[30, 1] = 0.0
+        chunk[45, 0] = -0.5
+        meter.feed(chunk)
+        meter.feed(np.zeros((50, 2), dtype=np.float32))
+        self.assertEqual(meter.bounds(), (0.8, 1.46))
+
+        # A track padded with silence on both ends
+        path = os.path.join(self.temp_dir, 'padded.wav')
+        write_sine(path, 0.1, seconds=1.0)
+        with wave.open(path, 'rb') as f:
+            frames = f.readframes(f.getnframes())
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(44100)
+            f.writeframes(bytes(4 * 22050) + frames + bytes(4 * 44100))
+        analysis = analyze_track(path)[3]
+        self.assertAlmostEqual(analysis['duration'], 2.5, places=3)
+        self.assertAlmostEqual(analysis['start'], 0.5, places=3)
+        self.assertAlmostEqual(analysis['end'], 1.5, places=3)
+
+    def test_features(self):
+        """Test tempo, energy and centroid on a click track and a sine."""
+        sample_rate = 44100
+        for bpm in (90, 120, 150):
+            clicks = np.zeros((sample_rate * 20, 1), dtype=np.float32)
+            period = 60.0 / bpm
+            for beat in np.arange(0, 20 - 0.05, period):
+                start = int(beat * sample_rate)
+                clicks[start:start + 441, 0] = np.random.default_rng(bpm).uniform(-0.5, 0.5, 441)
+            meter = FeatureMeter(sample_rate)
+            for start in range(0, len(clicks), sample_rate * 3):
+                meter.feed(clicks[start:start + sample_rate * 3])
+            self.assertAlmostEqual(meter.tempo(), bpm, delta=2)
+
+        path = os.path.join(self.temp_dir, 'sine.wav')
+        write_sine(path, 0.5, seconds=2.0, frequency=2000.0)
+        analysis = analyze_track(path)[3]
+        self.assertAlmostEqual(analysis['energy'], 20 * np.log10(0.5 / np.sqrt(2)), delta=0.1)
+        self.assertAlmostEqual(analysis['centroid'], 2000.0, delta=100)
+        self.assertEqual(len(analysis['timbre']), TIMBRE_BANDS)
+        band = np.searchsorted(np.geomspace(TIMBRE_LOW, TIMBRE_HIGH, TIMBRE_BANDS + 1), 2000.0) - 1
+        self.assertEqual(int(np.argmax(analysis['timbre'])), band)
+
+
+class TestAnalysisStore(unittest.TestCase):
+    """Test cases for the persistent analysis store."""
+
+    def setUp(self):
+        """Set up a store in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.track = os.path.join(self.temp_dir, 'track.wav')
+        write_sine(self.track, 0.1, seconds=1.0)
+        self.store = self._store()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _store(self):
+        store = AnalysisStore()
+        store.store_path = os.path.join(self.temp_dir, 'analysis.bin')
+        return store
+
+    def test_round_trip(self):
+        """Test that results survive a reload and go stale when the file changes."""
+        self.assertEqual(self.store.stale([self.track]), [self.track])
+        self.assertTrue(self.store.put_many([analyze_track(self.track)]))
+        self.assertEqual(self.store.stale([self.track]), [])
+
+        store = self._store()
+        analysis = store.get(self.track)
+        self.assertAlmostEqual(analysis['loudness'], -20.0, delta=0.1)
+        self.assertAlmostEqual(analysis['end'], 1.0, places=3)
+        self.assertEqual(len(store), 1)
+
+        stat = os.stat(self.track)
+        os.utime(self.track, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNone(store.get(self.track))
+        self.assertEqual(store.stale([self.track]), [self.track])
+
+    def test_values(self):
+        """Test reading feature columns for many tracks at once."""
+        self.store.put_many([('/music/a.mp3', 1, 1.0, {'tempo': 120.0, 'energy': -12.0}),
+                             ('/music/b.mp3', 1, 1.0, {'tempo': 90.0})])
+        values = self._store().values(['/music/b.mp3', '/music/c.mp3', '/music/a.mp3'], ('tempo', 'energy'))
+        self.assertEqual(values.shape, (3, 2))
+        self.assertEqual(values[2].tolist(), [120.0, -12.0])
+        self.assertEqual(values[0, 0], 90.0)
+        self.assertTrue(np.isnan(values[0, 1]) and np.isnan(values[1]).all())
+
+    def test_unmeasurable_and_truncated(self):
+        """Test that failed tracks are remembered and a cut-off record is ignored."""
+        stat = os.stat(self.track)
+        self.store.put_many([(self.track, stat.st_size, stat.st_mtime, {})])
+        self.assertEqual(set(self.store.get(self.track).values()), {None})
+        self.assertEqual(self.store.stale([self.track]), [])
+
+        self.store.put_many([('/music/other.mp3', 1, 1.0, {'loudness': -10.0, 'peak': 1.0})])
+        with open(self.store.store_path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.store.store_path) - 3)
+        store = self._store()
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.stale([self.track]), [])
+
+
+
+class TestSimilarity(unittest.TestCase):
+    """Test cases for the nearest-neighbour index."""
+
+    def setUp(self):
+        """Set up an index in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.index = self._index()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _index(self):
+        index = SimilarityIndex()
+        index.store_path = os.path.join(self.temp_dir, 'vectors.bin')
+        return index
+
+    def _results(self, count, seed=0):
+        # Three clusters of spectral shapes; track i belongs to cluster i % 3
+        rng = np.random.default_rng(seed)
+        centers = rng.normal(0, 6, (3, TIMBRE_BANDS))
+        return [(f'/music/{i}.mp3', 1, 1.0, {'timbre': centers[i % 3] + rng.normal(0, 0.5, TIMBRE_BANDS),
+                                             'tempo': 120.0, 'energy': -15.0, 'centroid': 1500.0})
+                for i in range(count)]
+
+    def test_nearest(self):
+        """Test that neighbours come from the same cluster, closest first, minus exclusions."""
+        self.assertTrue(self.index.put_many(self._results(30) + [('/music/broken.mp3', 1, 1.0, {})]))
+        similar = self.index.nearest('/music/0.mp3', 5, exclude={'/music/3.mp3'})
+        self.assertEqual(len(similar), 5)
+        self.assertTrue(all(int(os.path.basename(path)[:-4]) % 3 == 0 for path in similar))
+        self.assertNotIn('/music/3.mp3', similar)
+        self.assertNotIn('/music/0.mp3', similar)
+        self.assertEqual(len(self.index.nearest('/music/0.mp3', 100)), 29)
+
+        # Failed tracks are known but never offered or queried
+        self.assertIn('/music/broken.mp3', self.index)
+        self.assertEqual(self.index.nearest('/music/broken.mp3', 5), [])
+        self.assertEqual(self.index.missing(['/music/1.mp3', '/music/new.mp3']), ['/music/new.mp3'])
+
+    def test_reload_and_compact(self):
+        """Test that rows survive a reload and replaced rows are compacted away."""
+        for seed in range(4):
+            self.index.put_many(self._results(60, seed))
+        self.assertEqual(os.path.getsize(self.index.store_path), 8 + 240 * 4 * DIMENSIONS)
+        index = self._index()
+        self.assertEqual(len(index), 60)
+        self.assertEqual(os.path.getsize(index.store_path), 8 + 60 * 4 * DIMENSIONS)
+        self.assertEqual(index.nearest('/music/0.mp3', 3), self.index.nearest('/music/0.mp3', 3))
+
+    def test_partitions(self):
+        """Test that partitioned queries find the same cluster, including rows added later."""
+        self.index.put_many(self._results(300))
+        self.assertFalse(self.index.build_partitions())
+        self.assertTrue(self.index.partitions_stale(min_tracks=100))
+        self.assertTrue(self.index.build_partitions(min_tracks=100))
+        self.assertFalse(self.index.partitions_stale(min_tracks=100))
+        similar = self.index.nearest('/music/0.mp3', 10)
+        self.assertTrue(all(int(os.path.basename(path)[:-4]) % 3 == 0 for path in similar))
+
+        self.index.put_many([('/music/new.mp3', 1, 1.0, self._results(1)[0][3])])
+        self.assertEqual(self.index.nearest('/music/new.mp3', 1), ['/music/0.mp3'])
+
+
+class TestPeaks(unittest.TestCase):
+    """Test cases for waveform peaks."""
+
+    def setUp(self):
+        """Set up a track and a cache in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.track = os.path.join(self.temp_dir, 'track.wav')
+        write_sine(self.track, 0.5, seconds=2.0)
+        self.cache = PeaksCache(buckets=100)
+        self.cache.cache_dir = os.path.join(self.temp_dir, 'peaks')
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_compute_peaks(self):
+        """Test min/max buckets over the whole track."""
+        duration, mins, maxs = compute_peaks(self.track, buckets=100)
+        self.assertAlmostEqual(duration, 2.0, places=3)
+        self.assertEqual(len(mins), 100)
+        np.testing.assert_allclose(maxs, 0.5, atol=0.01)
+        np.testing.assert_allclose(mins, -0.5, atol=0.01)
+        # Fewer blocks than buckets leaves one bucket per block
+        short = os.path.join(self.temp_dir, 'short.wav')
+        write_sine(short, 0.5, seconds=0.05)
+        self.assertEqual(len(compute_peaks(short, buckets=100)[1]), 5)
+
+    def test_cache(self):
+        """Test the binary layout, reuse and invalidation of cached peaks."""
+        self.assertIsNone(self.cache.load(self.track))
+        data = self.cache.get(self.track)
+        magic, _, _, buckets, duration, size, _ = PeaksCache.HEADER.unpack_from(data)
+        self.assertEqual((magic, buckets, size), (b'MSPK', 100, os.path.getsize(self.track)))
+        self.assertAlmostEqual(duration, 2.0, places=3)
+        pairs = np.frombuffer(data, dtype=np.int8, offset=PeaksCache.HEADER.size)
+        self.assertAlmostEqual(int(pairs[1::2].max()), 64, delta=1)
+        self.assertEqual(self.cache.load(self.track), data)
+
+        etag = self.cache.etag(self.track)
+        stat = os.stat(self.track)
+        os.utime(self.track, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNone(self.cache.load(self.track))
+        self.assertNotEqual(self.cache.etag(self.track), etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
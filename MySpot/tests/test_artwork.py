@@ -0,0 +1,111 @@
+import os
+import sys
+import shutil
+import unittest
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.web import artwork
+from myspot.web.artwork import ArtworkCache, THUMBNAIL_SIZES, folder_picture, image_type
+
+# Smallest valid PNG: a single transparent pixel
+PNG = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6300010000000500010d0a2db40000'
+    '000049454e44ae426082')
+
+
+class TestArtwork(unittest.TestCase):
+    """Test cases for the cover art cache."""
+
+    def setUp(self):
+        """Create an album with a folder image and one without."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.album = os.path.join(self.temp_dir, 'album')
+        self.bare = os.path.join(self.temp_dir, 'bare')
+        os.makedirs(self.album)
+        os.makedirs(self.bare)
+        with open(os.path.join(self.album, 'Folder.PNG'), 'wb') as f:
+            f.write(PNG)
+        self.tracks = []
+        for directory in (self.album, self.album, self.bare):
+            path = os.path.join(directory, f'track{len(self.tracks)}.mp3')
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 100)
+            self.tracks.append(path)
+        self.cache = ArtworkCache(memory_items=2)
+        self.cache.cache_dir = os.path.join(self.temp_dir, 'art')
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_folder_picture(self):
+        """Test that folder images are found regardless of case and tracks share one cover."""
+        self.assertEqual(folder_picture(self.tracks[0]), PNG)
+        self.assertIsNone(folder_picture(self.tracks[2]))
+        self.assertEqual(image_type(PNG), ('.png', 'image/png'))
+        self.assertIsNone(image_type(b'not an image'))
+
+        key = self.cache.key(self.tracks[0])
+        self.assertEqual(self.cache.key(self.tracks[1]), key)
+        self.assertIsNone(self.cache.key(self.tracks[2]))
+        self.assertEqual(self.cache.known(self.tracks[0]), key)
+        data, mimetype = self.cache.thumbnail(self.tracks[0], 96)
+        if artwork.Image is None:
+            self.assertEqual((data, mimetype), (PNG, 'image/png'))
+        else:
+            self.assertEqual(mimetype, 'image/jpeg')
+
+    def test_extracted_once(self):
+        """Test that covers and missing covers are looked up once per file version."""
+        self.cache.on_key = MagicMock()
+        with patch.object(artwork, 'folder_picture', wraps=artwork.folder_picture) as lookup:
+            key = self.cache.key(self.tracks[0])
+            self.cache.key(self.tracks[0])
+            self.cache.key(self.tracks[2])
+            self.cache.key(self.tracks[2])
+            self.assertEqual(lookup.call_count, 2)
+
+            # A fresh cache (as after a restart) finds the stored files by content
+            cache = ArtworkCache()
+            cache.cache_dir = self.cache.cache_dir
+            with patch.object(artwork, 'make_thumbnails', side_effect=AssertionError):
+                self.assertEqual(cache.key(self.tracks[0]), key)
+
+            os.utime(self.tracks[2], (1, 1))
+            self.cache.key(self.tracks[2])
+            self.assertEqual(lookup.call_count, 4)
+        # Only a newly found cover is announced
+        self.cache.on_key.assert_called_once_with(self.tracks[0], key)
+
+    def test_memory_tier(self):
+        """Test that recent thumbnails are served from memory and old ones evicted."""
+        self.cache.thumbnail(self.tracks[0], 96)
+        with patch.object(self.cache, '_read', wraps=self.cache._read) as read:
+            self.cache.thumbnail(self.tracks[1], 96)
+            self.assertEqual(read.call_count, 0)
+            for size in THUMBNAIL_SIZES:
+                self.cache.thumbnail(self.tracks[0], size)
+            self.cache.thumbnail(self.tracks[0], 96)
+            # 300 and 600 were new, and 600 pushed 96 out of the two-item tier
+            self.assertEqual(read.call_count, 3)
+
+        # Files removed from disk are made again
+        shutil.rmtree(self.cache.cache_dir)
+        self.cache._memory.clear()
+        self.assertIsNotNone(self.cache.thumbnail(self.tracks[0], 600))
+
+    def test_choose_size(self):
+        """Test that requests map to the smallest covering thumbnail size."""
+        self.assertEqual(ArtworkCache.choose_size(None), artwork.DEFAULT_SIZE)
+        self.assertEqual(ArtworkCache.choose_size(50), min(THUMBNAIL_SIZES))
+        self.assertEqual(ArtworkCache.choose_size(97), sorted(THUMBNAIL_SIZES)[1])
+        self.assertEqual(ArtworkCache.choose_size(5000), max(THUMBNAIL_SIZES))
+
+
+if __name__ == "__main__":
+    unittest.main()
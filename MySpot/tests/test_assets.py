@@ -0,0 +1,80 @@
+import os
+import sys
+import gzip
+import unittest
+import tempfile
+import shutil
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.web import assets
+from myspot.web.assets import AssetCache, choose_encoding
+
+
+class TestChooseEncoding(unittest.TestCase):
+    """Test cases for Accept-Encoding negotiation."""
+
+    def test_no_header(self):
+        """Test that a missing header disables compression."""
+        self.assertIsNone(choose_encoding(None))
+        self.assertIsNone(choose_encoding(''))
+
+    def test_gzip(self):
+        """Test picking gzip from a browser header."""
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('deflate, gzip;q=0.8'), 'gzip')
+
+    def test_rejected(self):
+        """Test that q=0 and unknown codings are not chosen."""
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertIsNone(choose_encoding('identity, deflate'))
+
+    def test_brotli_preferred_when_available(self):
+        """Test that brotli wins over gzip only if the module is installed."""
+        expected = 'br' if assets.brotli is not None else 'gzip'
+        self.assertEqual(choose_encoding('gzip, br'), expected)
+
+
+class TestAssetCache(unittest.TestCase):
+    """Test cases for the static asset cache."""
+
+    def setUp(self):
+        """Create a temporary static folder."""
+        self.static_dir = tempfile.mkdtemp()
+        self.js_path = os.path.join(self.static_dir, 'app.js')
+        with open(self.js_path, 'w') as f:
+            f.write("console.log('MySpot');\n" * 100)
+        self.cache = AssetCache(self.static_dir)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.static_dir)
+
+    def test_content_hashed_url(self):
+        """Test that asset URLs change when the file content changes."""
+        url = self.cache.url_for('app.js')
+        self.assertTrue(url.startswith('/static/app.js?v='))
+
+        with open(self.js_path, 'w') as f:
+            f.write("console.log('changed');\n" * 100)
+        os.utime(self.js_path, (0, 12345))
+        self.assertNotEqual(url, self.cache.url_for('app.js'))
+
+    def test_precompressed_variant(self):
+        """Test that the gzip body is produced once and decompresses to the file."""
+        asset = self.cache.get('app.js')
+        body = asset.variant('gzip')
+        self.assertIs(body, asset.variant('gzip'))
+        self.assertEqual(gzip.decompress(body), asset.data)
+        self.assertLess(len(body), len(asset.data))
+
+    def test_missing_and_traversal(self):
+        """Test that unknown files and paths outside the folder are rejected."""
+        self.assertIsNone(self.cache.get('missing.js'))
+        self.assertIsNone(self.cache.get('../secret.txt'))
+        self.assertEqual(self.cache.url_for('missing.js'), '/static/missing.js')
+
+
+if __name__ == "__main__":
+    unittest.main()
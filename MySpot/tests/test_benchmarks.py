@@ -0,0 +1,157 @@
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import harness
+from benchmarks.harness import Case, SkipCase
+from benchmarks.load_test import Recorder, StandInMusic, percentile, summarize
+from benchmarks.synthetic import generate_tree, synthetic_paths
+from myspot.playlist import utils
+from myspot.playlist.playlist import PlaylistManager
+
+try:
+    from benchmarks import wakeword
+except ImportError:
+    wakeword = None
+
+
+class TestSynthetic(unittest.TestCase):
+    """Test cases for the synthetic library generator."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+
+    def test_generate_tree(self):
+        """Test that the scanner finds exactly the generated audio files."""
+        root = os.path.join(self.test_dir, 'tree')
+        audio_files = generate_tree(root, 300, depth=2, fanout=3)
+        self.assertEqual(len(utils.scan_audio_files(root, PlaylistManager.SUPPORTED_FORMATS)), audio_files)
+        self.assertLess(audio_files, 300)
+
+        # Same parameters reuse the tree, different ones are refused
+        self.assertEqual(generate_tree(root, 300, depth=2, fanout=3), audio_files)
+        with self.assertRaises(ValueError):
+            generate_tree(root, 400, depth=2, fanout=3)
+
+    def test_synthetic_paths(self):
+        """Test that in-memory libraries are deterministic and unique."""
+        paths = synthetic_paths(1000, depth=2, fanout=4)
+        self.assertEqual(paths, synthetic_paths(1000, depth=2, fanout=4))
+        self.assertEqual(len(set(paths)), 1000)
+
+
+class TestHarness(unittest.TestCase):
+    """Test cases for measuring and comparing runs."""
+
+    def test_measure(self):
+        """Test the metrics recorded for a case."""
+        case = Case('sum', lambda size: list(range(size)), lambda state: [x * 2 for x in state], ops=10)
+        result = harness.measure(case, 1000, repeat=3)
+        self.assertEqual(result['case'], 'sum')
+        self.assertEqual(result['size'], 1000)
+        self.assertGreater(result['median_seconds'], 0)
+        self.assertAlmostEqual(result['per_op_seconds'], result['median_seconds'] / 10)
+        self.assertGreater(result['alloc_peak_bytes'], 0)
+
+    def test_skipped_case(self):
+        """Test that a case whose setup cannot run is recorded as skipped."""
+        def setup(size):
+            raise SkipCase("not here")
+
+        result = harness.measure(Case('skip', setup, None), 10)
+        self.assertEqual(result['skipped'], "not here")
+
+    def test_compare(self):
+        """Test that only changes above the threshold are flagged."""
+        baseline = {'results': [
+            {'case': 'scan', 'size': 10, 'median_seconds': 1.0, 'peak_rss_bytes': 0, 'alloc_peak_bytes': 1000},
+            {'case': 'shuffle', 'size': 10, 'median_seconds': 1.0, 'peak_rss_bytes': None, 'alloc_peak_bytes': 10 ** 7},
+        ]}
+        current = {'results': [
+            {'case': 'scan', 'size': 10, 'median_seconds': 1.05, 'peak_rss_bytes': 4096, 'alloc_peak_bytes': 2000},
+            {'case': 'shuffle', 'size': 10, 'median_seconds': 1.5, 'peak_rss_bytes': 100, 'alloc_peak_bytes': 2 * 10 ** 7},
+            {'case': 'new', 'size': 10, 'median_seconds': 1.0},
+        ]}
+        rows, regressions = harness.compare(baseline, current, threshold=0.10)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual([(r[0], r[2]) for r in regressions],
+                         [('shuffle', 'median_seconds'), ('shuffle', 'alloc_peak_bytes')])
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test cases for the load test helpers."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_summarize(self):
+        """Test per-endpoint throughput and error counts."""
+        recorder = Recorder()
+        for i in range(10):
+            recorder.record('GET /api/status', 0.001 * (i + 1), True)
+        recorder.record('POST /api/batch (next)', 1.0, False)
+        results = {r['case']: r for r in summarize(recorder, 2.0, clients=5)}
+        self.assertEqual(results['GET /api/status']['requests'], 10)
+        self.assertEqual(results['GET /api/status']['throughput'], 5.0)
+        self.assertAlmostEqual(results['GET /api/status']['median_seconds'], 0.005)
+        self.assertEqual(results['POST /api/batch (next)']['errors'], 1)
+        self.assertIsNone(results['POST /api/batch (next)']['median_seconds'])
+
+    def test_stand_in_music(self):
+        """Test that the stand-in mixer tracks play state like pygame."""
+        music = StandInMusic()
+        self.assertFalse(music.get_busy())
+        self.assertEqual(music.get_pos(), -1)
+        music.load('track.mp3')
+        music.play(start=10.0)
+        self.assertTrue(music.get_busy())
+        self.assertGreaterEqual(music.get_pos(), 10000)
+        music.pause()
+        self.assertFalse(music.get_busy())
+        music.unpause()
+        self.assertTrue(music.get_busy())
+        music.stop()
+        self.assertFalse(music.get_busy())
+
+
+@unittest.skipIf(wakeword is None, "numpy is not installed")
+class TestWakeWordBenchmark(unittest.TestCase):
+    """Test cases for the wake-word benchmark."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+
+    def test_synthetic_fixtures(self):
+        """Test a run over a small generated fixture set."""
+        root = wakeword.generate_fixtures(self.test_dir, templates=2, positives=3, negatives=3)
+        self.assertEqual(len(wakeword.wav_files(os.path.join(root, 'positive'))), 3)
+        result = wakeword.run_budget(root, 0.05)
+        self.assertEqual(result['size'], 0.05)
+        self.assertGreater(result['detection_rate'], 0)
+        self.assertEqual(result['false_alarms'], 0)
+        self.assertGreater(result['cpu_share'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
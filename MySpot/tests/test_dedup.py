@@ -0,0 +1,96 @@
+import os
+import sys
+import shutil
+import unittest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.playlist import dedup
+from myspot.playlist.dedup import EDGE_BYTES, FingerprintStore, find_duplicates
+from myspot.playlist.playlist import PlaylistManager
+
+
+class TestDuplicates(unittest.TestCase):
+    """Test cases for duplicate-track detection."""
+
+    def setUp(self):
+        """Create a library with identical and near-identical files."""
+        self.temp_dir = tempfile.mkdtemp()
+        big = os.urandom(3 * EDGE_BYTES)
+        # Same size, head and tail as ``big`` but one byte different in the middle
+        near = big[:EDGE_BYTES + 10] + bytes([big[EDGE_BYTES + 10] ^ 1]) + big[EDGE_BYTES + 11:]
+        small = os.urandom(1000)
+        self.files = {
+            'a.mp3': big, 'copy of a.mp3': big, 'near a.mp3': near,
+            'b.flac': small, 'b (1).flac': small,
+            'c.ogg': os.urandom(1000), 'empty.wav': b'', 'empty2.wav': b'',
+        }
+        for name, data in self.files.items():
+            with open(self._path(name), 'wb') as f:
+                f.write(data)
+        self.paths = [self._path(name) for name in self.files]
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+    def _store(self):
+        store = FingerprintStore()
+        store.store_path = os.path.join(self.temp_dir, 'fingerprints.bin')
+        return store
+
+    def test_find_duplicates(self):
+        """Test that only byte-identical files are grouped, the kept copy first."""
+        groups = find_duplicates(self.paths + [self._path('missing.mp3')], workers=2)
+        self.assertEqual(groups, [[self._path('a.mp3'), self._path('copy of a.mp3')],
+                                  [self._path('b.flac'), self._path('b (1).flac')]])
+
+    def test_cached_hashes(self):
+        """Test that a second scan reads nothing and a changed copy leaves its group."""
+        store = self._store()
+        expected = find_duplicates(self.paths, store, workers=2)
+        # Only files sharing their size were read
+        self.assertEqual(len(store), 6)
+
+        store = self._store()
+        with patch.object(dedup, 'full_hash', side_effect=AssertionError), \
+                patch.object(dedup, 'quick_fingerprint', side_effect=AssertionError):
+            self.assertEqual(find_duplicates(self.paths, store, workers=2), expected)
+
+        with open(self._path('copy of a.mp3'), 'ab') as f:
+            f.write(b'tag')
+        with patch.object(dedup, 'full_hash', wraps=dedup.full_hash) as full_hash:
+            groups = find_duplicates(self.paths, store, workers=2)
+        self.assertEqual(full_hash.call_count, 0)
+        self.assertEqual(groups, [[self._path('b.flac'), self._path('b (1).flac')]])
+
+    def test_collapse(self):
+        """Test that collapsing keeps one copy in the queue and the current track in place."""
+        playlist = PlaylistManager()
+        playlist.load_tracks(self.temp_dir, self.paths)
+        current = playlist.shuffled_tracks[2]
+        playlist.current_index = 2
+        playlist.set_duplicates(find_duplicates(self.paths, workers=2))
+        self.assertEqual(len(playlist.shuffled_tracks), len(self.paths))
+
+        playlist.set_collapse_duplicates(True)
+        self.assertEqual(playlist.get_current_track(), current)
+        queued = set(playlist.shuffled_tracks) - {current}
+        self.assertFalse(queued & {self._path('copy of a.mp3'), self._path('b (1).flac')})
+        self.assertEqual(len(playlist.shuffled_tracks), len(self.paths) - 2 + (current in playlist.duplicates))
+        self.assertEqual(playlist.jump_to(self.paths.index(self._path('b (1).flac'))), self._path('b.flac'))
+        playlist.shuffle()
+        self.assertEqual(len(playlist.shuffled_tracks), len(self.paths) - 2)
+
+        playlist.set_collapse_duplicates(False)
+        self.assertEqual(sorted(playlist.shuffled_tracks), sorted(self.paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+import threading
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.ui.events import UIEventBus
+
+
+class TestUIEventBus(unittest.TestCase):
+    """Test cases for the Tk event bus (with a stand-in root)."""
+
+    def setUp(self):
+        """Create a bus whose after() calls are recorded, not scheduled."""
+        self.root = MagicMock()
+        self.bus = UIEventBus(self.root, fps=50)
+
+    def test_frame_rate(self):
+        """Test that draining is scheduled at the requested frame rate."""
+        self.bus.start()
+        self.root.after.assert_called_once_with(20, self.bus._drain)
+
+    def test_coalescing(self):
+        """Test that repeated events in one frame are delivered once with the last payload."""
+        received = []
+        self.bus.subscribe('state', received.append)
+        self.bus.subscribe('other', received.append)
+
+        threads = [threading.Thread(target=self.bus.post, args=('state', i)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.bus.post('other', 'x')
+        self.bus.post('state', 'last')
+
+        self.bus._drain()
+        self.assertEqual(received, ['x', 'last'])
+
+        # Nothing new: the next frame dispatches nothing
+        self.bus._drain()
+        self.assertEqual(len(received), 2)
+
+    def test_handler_errors(self):
+        """Test that a failing handler does not stop the others."""
+        received = []
+        self.bus.subscribe('state', lambda payload: 1 / 0)
+        self.bus.subscribe('state', received.append)
+        self.bus.post('state', 1)
+        self.bus._drain()
+        self.assertEqual(received, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
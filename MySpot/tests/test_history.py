@@ -0,0 +1,129 @@
+import os
+import sys
+import shutil
+import unittest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.history import history as history_module
+from myspot.history import PlayHistory, PLAY, SKIP, PAUSE
+
+
+class StandInPlayer:
+    """The parts of AudioPlayer the history listener reads."""
+
+    def __init__(self):
+        self.current_path = None
+        self.is_paused = False
+        self.playing = False
+        self.position = 0.0
+
+    def get_position(self):
+        return self.position
+
+    def is_playing(self):
+        return self.playing
+
+
+class TestPlayHistory(unittest.TestCase):
+    """Test cases for the play history log."""
+
+    def setUp(self):
+        """Create a history in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.history = self._history()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _history(self):
+        history = PlayHistory()
+        history.store_path = os.path.join(self.temp_dir, 'history.bin')
+        return history
+
+    def test_player_events(self):
+        """Test that new tracks, pauses and tracks left early are recorded, seeks and ends are not."""
+        player = StandInPlayer()
+
+        def play(path, position=0.0):
+            player.current_path, player.position, player.playing = path, position, True
+            self.history.on_player_event('play', player)
+
+        play('/music/a.mp3')
+        play('/music/a.mp3', 60.0)
+        player.is_paused = True
+        self.history.on_player_event('pause', player)
+        player.is_paused = False
+        self.history.on_player_event('unpause', player)
+        play('/music/b.mp3')
+        player.playing = False
+        self.history.on_player_event('busy', player)
+        play('/music/a.mp3')
+
+        top = self.history.top()
+        self.assertEqual([entry['filename'] for entry in top], ['a.mp3', 'b.mp3'])
+        self.assertEqual((top[0]['plays'], top[0]['skips'], top[0]['pauses']), (2, 1, 1))
+        self.assertEqual((top[1]['plays'], top[1]['skips']), (1, 0))
+        self.assertEqual(self.history.recent(1)[0]['path'], '/music/a.mp3')
+        self.assertEqual(self.history.summary(), {'tracks': 2, 'plays': 3, 'skips': 1, 'pauses': 1,
+                                                  'skip_rate': 0.333})
+
+    def test_batched_log(self):
+        """Test that events reach the disk in batches and survive a restart."""
+        with patch.object(history_module, 'FLUSH_EVENTS', 3):
+            self.history.record('/music/a.mp3', PLAY, timestamp=100.0)
+            self.history.record('/music/a.mp3', SKIP, 12.5, timestamp=110.0)
+            self.assertFalse(os.path.exists(self.history.store_path))
+            self.history.record('/music/b.mp3', PLAY, timestamp=120.0)
+        size = PlayHistory.HEADER.size + 3 * PlayHistory.EVENT.size
+        self.assertEqual(os.path.getsize(self.history.store_path), size)
+
+        self.history.record('/music/b.mp3', PAUSE, 30.0, timestamp=130.0)
+        self.assertTrue(self.history.flush(force=False))
+        self.assertEqual(os.path.getsize(self.history.store_path), size)
+        self.history.flush()
+
+        restarted = self._history()
+        self.assertEqual(restarted.summary(), self.history.summary())
+        self.assertEqual([entry['filename'] for entry in restarted.recent()], ['b.mp3', 'a.mp3'])
+        self.assertEqual(restarted.recent()[1]['last_played'], 100.0)
+
+    def test_compaction(self):
+        """Test that a full log is folded into the counters and never counted twice."""
+        with patch.object(history_module, 'COMPACT_EVENTS', 4):
+            for i in range(5):
+                self.history.record(f'/music/{i % 2}.mp3', PLAY, timestamp=float(i))
+                self.history.flush()
+        self.assertEqual(os.path.getsize(self.history.store_path),
+                         PlayHistory.HEADER.size + PlayHistory.EVENT.size)
+        self.assertEqual(self._history().summary()['plays'], 5)
+
+        # A crash after writing the counters but before starting the new log
+        with open(self.history.store_path, 'rb') as f:
+            log = f.read()
+        with patch.object(history_module, 'COMPACT_EVENTS', 1):
+            history = self._history()
+            history.record('/music/2.mp3', PLAY)
+            history.flush()
+        with open(self.history.store_path, 'wb') as f:
+            f.write(log)
+        self.assertEqual(self._history().summary()['plays'], 6)
+
+    def test_most_skipped(self):
+        """Test that only tracks played often enough are ranked by skip rate."""
+        for path, plays, skips in (('/a.mp3', 4, 3), ('/b.mp3', 2, 2), ('/c.mp3', 3, 1), ('/d.mp3', 5, 0)):
+            for i in range(plays):
+                self.history.record(path, PLAY)
+                if i < skips:
+                    self.history.record(path, SKIP, 10.0)
+        ranked = self.history.most_skipped()
+        self.assertEqual([(entry['path'], entry['skip_rate']) for entry in ranked],
+                         [('/a.mp3', 0.75), ('/c.mp3', 0.333)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+import threading
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.jobs import Job, JobManager
+from myspot.playlist import utils
+
+
+class TestJobManager(unittest.TestCase):
+    """Test cases for the background job manager."""
+
+    def setUp(self):
+        """Start a small worker pool."""
+        self.jobs = JobManager(max_workers=2)
+
+    def tearDown(self):
+        """Stop the workers."""
+        self.jobs.shutdown()
+
+    def test_result_and_progress(self):
+        """Test that a job reports its counters and result."""
+        def work(job, count):
+            for _ in range(count):
+                job.increment('items')
+            return {'count': count}
+
+        job = self.jobs.submit('count', work, 5)
+        self.assertTrue(job.wait(5))
+        info = job.to_dict()
+        self.assertEqual(info['status'], Job.DONE)
+        self.assertEqual(info['progress']['items'], 5)
+        self.assertEqual(info['result'], {'count': 5})
+        self.assertIs(self.jobs.get(job.id), job)
+
+    def test_failure(self):
+        """Test that exceptions mark the job as failed."""
+        def work(job):
+            raise ValueError("boom")
+
+        job = self.jobs.submit('fail', work)
+        job.wait(5)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, "boom")
+
+    def test_cancel(self):
+        """Test cancelling a running job."""
+        started = threading.Event()
+
+        def work(job):
+            started.set()
+            while True:
+                job.check_cancelled()
+                job.increment('loops')
+
+        job = self.jobs.submit('loop', work)
+        self.assertTrue(started.wait(5))
+        self.assertTrue(self.jobs.cancel(job.id))
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.status, Job.CANCELLED)
+        self.assertFalse(self.jobs.cancel('missing'))
+
+    def test_background_kinds(self):
+        """Test that a long backfill does not hold up other jobs."""
+        jobs = JobManager(max_workers=1, background_kinds=('backfill',))
+        self.addCleanup(jobs.shutdown)
+        started, release = threading.Event(), threading.Event()
+
+        def backfill(job):
+            started.set()
+            while not release.wait(0.01):
+                job.check_cancelled()
+
+        slow = [jobs.submit('backfill', backfill) for _ in range(2)]
+        self.assertTrue(started.wait(5))
+        scan = jobs.submit('scan', lambda job: 'scanned')
+        self.assertTrue(scan.wait(5))
+        self.assertEqual(scan.result, 'scanned')
+        self.assertEqual([job.status for job in slow], [Job.RUNNING, Job.PENDING])
+        release.set()
+        self.assertTrue(slow[1].wait(5))
+
+
+class TestScanJob(unittest.TestCase):
+    """Test cases for the scan job body."""
+
+    def setUp(self):
+        """Create a small music tree."""
+        self.test_dir = tempfile.mkdtemp()
+        for d in range(3):
+            sub_dir = os.path.join(self.test_dir, f"album{d}")
+            os.makedirs(sub_dir)
+            for i in range(4):
+                ext = '.mp3' if i % 2 == 0 else '.txt'
+                with open(os.path.join(sub_dir, f"track{i}{ext}"), 'w') as f:
+                    f.write("mock audio data")
+        self.jobs = JobManager(max_workers=1)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        self.jobs.shutdown()
+        shutil.rmtree(self.test_dir)
+
+    def test_scan_progress(self):
+        """Test that the scan counts directories and files."""
+        job = self.jobs.submit('scan', utils.scan_audio_files_job, self.test_dir, ['.mp3'])
+        job.wait(5)
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(len(job.result), 6)
+        progress = job.to_dict()['progress']
+        self.assertEqual(progress['dirs'], 4)
+        self.assertEqual(progress['files_seen'], 12)
+        self.assertEqual(progress['audio_files'], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,139 +1,231 @@
-import os
-import sys
-import unittest
-import tempfile
-import pygame
-from unittest.mock import patch, MagicMock
-
-# Add parent directory to path to import modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from myspot.audio.player import AudioPlayer
-
-class TestAudioPlayer(unittest.TestCase):
-    """Test cases for the AudioPlayer class."""
-    
-    def setUp(self):
-        """Set up test environment."""
-        pygame.mixer.init = MagicMock()
-        pygame.mixer.music = MagicMock()
-        self.player = AudioPlayer(volume=0.7)
-        
-        # Create a temporary test audio file
-        self.temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-        self.temp_file.close()
-    
-    def tearDown(self):
-        """Clean up after tests."""
-        try:
-            os.unlink(self.temp_file.name)
-        except:
-            pass
-    
-    def test_init(self):
-        """Test player initialization."""
-        self.assertEqual(self.player._volume, 0.7)
-        self.assertFalse(self.player._is_muted)
-        pygame.mixer.init.assert_called_once()
-    
-    def test_play(self):
-        """Test playing a file."""
-        pygame.mixer.music.load = MagicMock()
-        pygame.mixer.music.play = MagicMock()
-        
-        # Test with valid file
-        result = self.player.play(self.temp_file.name)
-        self.assertTrue(result)
-        pygame.mixer.music.load.assert_called_with(self.temp_file.name)
-        pygame.mixer.music.play.assert_called_once()
-        
-        # Test with invalid file
-        result = self.player.play("nonexistent_file.mp3")
-        self.assertFalse(result)
-    
-    def test_pause_unpause(self):
-        """Test pause and unpause functionality."""
-        pygame.mixer.music.pause = MagicMock()
-        pygame.mixer.music.unpause = MagicMock()
-        pygame.mixer.music.get_busy = MagicMock(return_value=True)
-        
-        # Test pause
-        result = self.player.pause()
-        self.assertTrue(result)
-        pygame.mixer.music.pause.assert_called_once()
-        
-        # Test unpause
-        result = self.player.unpause()
-        self.assertTrue(result)
-        pygame.mixer.music.unpause.assert_called_once()
-    
-    def test_toggle_play_pause(self):
-        """Test toggling between play and pause."""
-        self.player.pause = MagicMock(return_value=True)
-        self.player.unpause = MagicMock(return_value=True)
-        
-        # When playing
-        pygame.mixer.music.get_busy = MagicMock(return_value=True)
-        result = self.player.toggle_play_pause()
-        self.assertEqual(result, "paused")
-        self.player.pause.assert_called_once()
-        
-        # When paused
-        pygame.mixer.music.get_busy = MagicMock(return_value=False)
-        result = self.player.toggle_play_pause()
-        self.assertEqual(result, "playing")
-        self.player.unpause.assert_called_once()
-    
-    def test_stop(self):
-        """Test stopping playback."""
-        pygame.mixer.music.stop = MagicMock()
-        self.player.stop()
-        pygame.mixer.music.stop.assert_called_once()
-    
-    def test_volume_control(self):
-        """Test volume control functions."""
-        pygame.mixer.music.set_volume = MagicMock()
-        
-        # Test set volume
-        volume = self.player.set_volume(0.8)
-        self.assertEqual(volume, 0.8)
-        pygame.mixer.music.set_volume.assert_called_with(0.8)
-        
-        # Test increase volume
-        self.player._volume = 0.5
-        volume = self.player.increase_volume(0.1)
-        self.assertEqual(volume, 0.6)
-        
-        # Test decrease volume
-        volume = self.player.decrease_volume(0.2)
-        self.assertEqual(volume, 0.4)
-        
-        # Test volume limits
-        volume = self.player.set_volume(1.5)
-        self.assertEqual(volume, 1.0)
-        
-        volume = self.player.set_volume(-0.5)
-        self.assertEqual(volume, 0.0)
-    
-    def test_mute(self):
-        """Test mute functionality."""
-        pygame.mixer.music.set_volume = MagicMock()
-        self.player._volume = 0.6
-        
-        # Test mute
-        is_muted = self.player.toggle_mute()
-        self.assertTrue(is_muted)
-        self.assertTrue(self.player._is_muted)
-        pygame.mixer.music.set_volume.assert_called_with(0)
-        
-        # Test unmute
-        is_muted = self.player.toggle_mute()
-        self.assertFalse(is_muted)
-        self.assertFalse(self.player._is_muted)
-        pygame.mixer.music.set_volume.assert_called_with(0.6)
-
-
-if __name__ == "__main__":
-    unittest.main()
-    
+import os
+import sys
+import unittest
+import tempfile
+import pygame
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.audio.player import AudioPlayer
+
+class TestAudioPlayer(unittest.TestCase):
+    """Test cases for the AudioPlayer class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        pygame.mixer.init = MagicMock()
+        pygame.mixer.music = MagicMock()
+        self.player = AudioPlayer(volume=0.7)
+        
+        # Create a temporary test audio file
+        self.temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
+        self.temp_file.close()
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        try:
+            os.unlink(self.temp_file.name)
+        except:
+            pass
+    
+    def test_init(self):
+        """Test player initialization."""
+        self.assertEqual(self.player._volume, 0.7)
+        self.assertFalse(self.player._is_muted)
+        pygame.mixer.init.assert_called_once()
+    
+    def test_play(self):
+        """Test playing a file."""
+        pygame.mixer.music.load = MagicMock()
+        pygame.mixer.music.play = MagicMock()
+        
+        # Test with valid file
+        result = self.player.play(self.temp_file.name)
+        self.assertTrue(result)
+        pygame.mixer.music.load.assert_called_with(self.temp_file.name)
+        pygame.mixer.music.play.assert_called_once()
+        
+        # Test with invalid file
+        result = self.player.play("nonexistent_file.mp3")
+        self.assertFalse(result)
+    
+    def test_pause_unpause(self):
+        """Test pause and unpause functionality."""
+        pygame.mixer.music.pause = MagicMock()
+        pygame.mixer.music.unpause = MagicMock()
+        pygame.mixer.music.get_busy = MagicMock(return_value=True)
+        
+        # Test pause
+        result = self.player.pause()
+        self.assertTrue(result)
+        pygame.mixer.music.pause.assert_called_once()
+        
+        # Test unpause
+        result = self.player.unpause()
+        self.assertTrue(result)
+        pygame.mixer.music.unpause.assert_called_once()
+    
+    def test_toggle_play_pause(self):
+        """Test toggling between play and pause."""
+        self.player.pause = MagicMock(return_value=True)
+        self.player.unpause = MagicMock(return_value=True)
+        
+        # When playing
+        pygame.mixer.music.get_busy = MagicMock(return_value=True)
+        result = self.player.toggle_play_pause()
+        self.assertEqual(result, "paused")
+        self.player.pause.assert_called_once()
+        
+        # When paused
+        pygame.mixer.music.get_busy = MagicMock(return_value=False)
+        result = self.player.toggle_play_pause()
+        self.assertEqual(result, "playing")
+        self.player.unpause.assert_called_once()
+    
+    def test_stop(self):
+        """Test stopping playback."""
+        pygame.mixer.music.stop = MagicMock()
+        self.player.stop()
+        pygame.mixer.music.stop.assert_called_once()
+    
+    def test_volume_control(self):
+        """Test volume control functions."""
+        pygame.mixer.music.set_volume = MagicMock()
+        
+        # Test set volume
+        volume = self.player.set_volume(0.8)
+        self.assertEqual(volume, 0.8)
+        pygame.mixer.music.set_volume.assert_called_with(0.8)
+        
+        # Test increase volume
+        self.player._volume = 0.5
+        volume = self.player.increase_volume(0.1)
+        self.assertEqual(volume, 0.6)
+        
+        # Test decrease volume
+        volume = self.player.decrease_volume(0.2)
+        self.assertEqual(volume, 0.4)
+        
+        # Test volume limits
+        volume = self.player.set_volume(1.5)
+        self.assertEqual(volume, 1.0)
+        
+        volume = self.player.set_volume(-0.5)
+        self.assertEqual(volume, 0.0)
+    
+    def test_mute(self):
+        """Test mute functionality."""
+        pygame.mixer.music.set_volume = MagicMock()
+        self.player._volume = 0.6
+        
+        # Test mute
+        is_muted = self.player.toggle_mute()
+        self.assertTrue(is_muted)
+        self.assertTrue(self.player._is_muted)
+        pygame.mixer.music.set_volume.assert_called_with(0)
+        
+        # Test unmute
+        is_muted = self.player.toggle_mute()
+        self.assertFalse(is_muted)
+        self.assertFalse(self.player._is_muted)
+        pygame.mixer.music.set_volume.assert_called_with(0.6)
+
+    
+    def test_track_gain(self):
+        """Test that the per-track gain scales the volume without changing it."""
+        pygame.mixer.music.set_volume = MagicMock()
+        self.player.set_volume(0.6)
+        self.player.gain_provider = lambda path: 0.5
+        self.assertTrue(self.player.play(self.temp_file.name))
+        pygame.mixer.music.set_volume.assert_called_with(0.3)
+        self.assertEqual(self.player.get_volume(), 0.6)
+        
+        # Boosts stop at full scale, unknown tracks play at the plain volume
+        self.player.gain_provider = lambda path: 2.0
+        self.player.play(self.temp_file.name)
+        pygame.mixer.music.set_volume.assert_called_with(1.0)
+        self.player.gain_provider = lambda path: None
+        self.player.play(self.temp_file.name)
+        pygame.mixer.music.set_volume.assert_called_with(0.6)
+        self.assertEqual(self.player.get_gain(), 1.0)
+    
+    def test_trim_silence(self):
+        """Test starting after leading silence and ending before trailing silence."""
+        pygame.mixer.music.get_busy = MagicMock(return_value=True)
+        pygame.mixer.music.get_pos = MagicMock(return_value=0)
+        self.player.trim_provider = lambda path: (1.5, 100.0)
+        self.player.play(self.temp_file.name)
+        pygame.mixer.music.play.assert_called_with(start=1.5)
+        self.assertEqual(self.player.poll_delay(0.5), 0.5)
+        
+        # A resume position wins over the trimmed start
+        self.player.play(self.temp_file.name, start=30.0)
+        pygame.mixer.music.play.assert_called_with(start=30.0)
+        
+        pygame.mixer.music.get_pos = MagicMock(return_value=69800)
+        self.assertAlmostEqual(self.player.poll_delay(0.5), 0.2)
+        self.assertTrue(self.player.is_playing())
+        pygame.mixer.music.get_pos = MagicMock(return_value=70000)
+        self.assertFalse(self.player.is_playing())
+        pygame.mixer.music.stop.assert_called()
+    
+    def test_version_and_listeners(self):
+        """Test that state changes bump the version and notify listeners."""
+        events = []
+        self.player.add_listener(lambda event, player: events.append(event))
+        version = self.player.version
+        
+        self.player.set_volume(0.3)
+        self.player.toggle_mute()
+        self.assertEqual(events, ['volume', 'mute'])
+        self.assertEqual(self.player.version, version + 2)
+        
+        # A track ending on its own is picked up by is_playing()
+        self.player._busy = True
+        pygame.mixer.music.get_busy = MagicMock(return_value=False)
+        self.assertFalse(self.player.is_playing())
+        self.assertEqual(events[-1], 'busy')
+        version = self.player.version
+        self.player.is_playing()
+        self.assertEqual(self.player.version, version)
+    
+    def test_audio_cache(self):
+        """Test that cached tracks play from memory and the budget evicts the oldest."""
+        paths = []
+        for name in ('a', 'b', 'c'):
+            path = os.path.join(tempfile.gettempdir(), f'myspot_cache_{name}.mp3')
+            with open(path, 'wb') as f:
+                f.write(name.encode() * 400)
+            self.addCleanup(os.unlink, path)
+            paths.append(path)
+        player = AudioPlayer(cache_bytes=1000)
+        
+        # A miss plays from disk without reading the file a second time
+        player.play(paths[0])
+        pygame.mixer.music.load.assert_called_with(paths[0])
+        self.assertNotIn(paths[0], player.cache)
+        player.cache.load(paths[0])
+        player.play(paths[0])
+        buffer = pygame.mixer.music.load.call_args[0][0]
+        self.assertEqual(buffer.read(), b'a' * 400)
+        
+        player.cache.load(paths[1])
+        player.cache.get(paths[0])
+        player.cache.load(paths[2])
+        self.assertEqual([path in player.cache for path in paths], [True, False, True])
+        self.assertEqual(player.cache.stats()['bytes'], 800)
+        
+        # Changed files are read again
+        with open(paths[0], 'ab') as f:
+            f.write(b'!')
+        self.assertIsNone(player.cache.get(paths[0]))
+        stats = player.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
+    
 input()
\ No newline at end of file
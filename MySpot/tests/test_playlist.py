@@ -1,203 +1,362 @@
-import os
-import sys
-import unittest
-import tempfile
-import shutil
-from unittest.mock import patch, MagicMock
-
-# Add parent directory to path to import modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from myspot.playlist.playlist import PlaylistManager
-from myspot.playlist import utils
-
-class TestPlaylistManager(unittest.TestCase):
-    """Test cases for the PlaylistManager class."""
-    
-    def setUp(self):
-        """Set up test environment with mock audio files."""
-        # Create a temporary directory
-        self.test_dir = tempfile.mkdtemp()
-        
-        # Create some mock audio files
-        self.audio_files = []
-        for i in range(5):
-            ext = '.mp3' if i % 2 == 0 else '.flac'
-            file_path = os.path.join(self.test_dir, f"test{i}{ext}")
-            with open(file_path, 'w') as f:
-                f.write("mock audio data")
-            self.audio_files.append(file_path)
-        
-        # Create a non-audio file too
-        self.non_audio = os.path.join(self.test_dir, "test.txt")
-        with open(self.non_audio, 'w') as f:
-            f.write("this is not audio")
-        
-        # Set up playlist manager
-        self.playlist = PlaylistManager()
-    
-    def tearDown(self):
-        """Clean up after tests."""
-        shutil.rmtree(self.test_dir)
-    
-    def test_scan_directory(self):
-        """Test scanning a directory for audio files."""
-        # Test with valid directory
-        result = self.playlist.scan_directory(self.test_dir)
-        self.assertTrue(result)
-        self.assertEqual(len(self.playlist.tracks), 5)
-        
-        # Test with invalid directory
-        result = self.playlist.scan_directory("/nonexistent/directory")
-        self.assertFalse(result)
-    
-    def test_shuffle(self):
-        """Test shuffling the playlist."""
-        # Can't shuffle empty playlist
-        self.assertFalse(self.playlist.shuffle())
-        
-        # Shuffle with tracks
-        self.playlist.tracks = self.audio_files
-        self.assertTrue(self.playlist.shuffle())
-        
-        # Check if shuffled list contains all tracks
-        self.assertEqual(sorted(self.playlist.tracks), sorted(self.playlist.shuffled_tracks))
-        
-        # Check that current index is set
-        self.assertEqual(self.playlist.current_index, 0)
-    
-    def test_get_current_track(self):
-        """Test getting the current track."""
-        # No tracks
-        self.assertIsNone(self.playlist.get_current_track())
-        
-        # With tracks
-        self.playlist.tracks = self.audio_files
-        self.playlist.shuffle()
-        
-        current = self.playlist.get_current_track()
-        self.assertIn(current, self.audio_files)
-    
-    def test_next_track(self):
-        """Test moving to the next track."""
-        # No tracks
-        self.assertIsNone(self.playlist.next_track())
-        
-        # With tracks
-        self.playlist.tracks = self.audio_files
-        self.playlist.shuffle()
-        
-        # Save initial position
-        initial_index = self.playlist.current_index
-        initial_track = self.playlist.get_current_track()
-        
-        # Move to next track
-        next_track = self.playlist.next_track()
-        self.assertNotEqual(initial_track, next_track)
-        self.assertEqual(self.playlist.current_index, initial_index + 1)
-    
-    def test_previous_track(self):
-        """Test moving to the previous track."""
-        # No tracks
-        self.assertIsNone(self.playlist.previous_track())
-        
-        # With tracks
-        self.playlist.tracks = self.audio_files
-        self.playlist.shuffle()
-        
-        # Move to a middle position
-        self.playlist.current_index = 2
-        current = self.playlist.get_current_track()
-        
-        # Get previous track
-        prev = self.playlist.previous_track()
-        self.assertNotEqual(current, prev)
-        self.assertEqual(self.playlist.current_index, 1)
-    
-    def test_wraparound(self):
-        """Test that next/previous track wraps around."""
-        self.playlist.tracks = self.audio_files
-        self.playlist.shuffle()
-        
-        # Test wraparound for next
-        self.playlist.current_index = len(self.playlist.shuffled_tracks) - 1
-        next_track = self.playlist.next_track()
-        self.assertEqual(self.playlist.current_index, 0)
-        
-        # Test wraparound for previous
-        prev_track = self.playlist.previous_track()
-        self.assertEqual(self.playlist.current_index, len(self.playlist.shuffled_tracks) - 1)
-
-
-class TestPlaylistUtils(unittest.TestCase):
-    """Test cases for playlist utility functions."""
-    
-    def setUp(self):
-        """Set up test environment with mock audio files."""
-        # Create a temporary directory
-        self.test_dir = tempfile.mkdtemp()
-        
-        # Create some mock audio files
-        self.audio_files = []
-        for i in range(3):
-            for ext in ['.mp3', '.wav', '.flac']:
-                file_path = os.path.join(self.test_dir, f"test{i}{ext}")
-                with open(file_path, 'w') as f:
-                    f.write("mock audio data")
-                self.audio_files.append(file_path)
-        
-        # Create a subdirectory with more files
-        self.sub_dir = os.path.join(self.test_dir, "subdir")
-        os.makedirs(self.sub_dir)
-        for i in range(2):
-            file_path = os.path.join(self.sub_dir, f"subtest{i}.mp3")
-            with open(file_path, 'w') as f:
-                f.write("mock audio data")
-            self.audio_files.append(file_path)
-        
-        # Create non-audio files
-        self.non_audio = []
-        for ext in ['.txt', '.jpg', '.png']:
-            file_path = os.path.join(self.test_dir, f"test{ext}")
-            with open(file_path, 'w') as f:
-                f.write("non-audio data")
-            self.non_audio.append(file_path)
-    
-    def tearDown(self):
-        """Clean up after tests."""
-        shutil.rmtree(self.test_dir)
-    
-    def test_scan_audio_files(self):
-        """Test scanning for audio files."""
-        supported = ['.mp3', '.wav', '.flac']
-        found = utils.scan_audio_files(self.test_dir, supported)
-        
-        # Should find all audio files including in subdirectory
-        self.assertEqual(len(found), 11)  # 9 in main dir + 2 in subdir
-        
-        # All files should be audio files
-        for file in found:
-            self.assertTrue(os.path.splitext(file)[1].lower() in supported)
-        
-        # Non-audio files should not be included
-        for file in self.non_audio:
-            self.assertNotIn(file, found)
-    
-    def test_get_file_metadata(self):
-        """Test getting file metadata."""
-        test_file = self.audio_files[0]
-        metadata = utils.get_file_metadata(test_file)
-        
-        self.assertIsNotNone(metadata)
-        self.assertEqual(metadata['filename'], os.path.basename(test_file))
-        self.assertTrue('size' in metadata)
-        self.assertTrue('modified' in metadata)
-        self.assertEqual(metadata['extension'], os.path.splitext(test_file)[1].lower())
-        
-        # Test with nonexistent file
-        metadata = utils.get_file_metadata("/nonexistent/file.mp3")
-        self.assertIsNone(metadata)
-
-
-if __name__ == "__main__":
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.playlist.playlist import PlaylistManager
+from myspot.playlist import utils
+from myspot.playlist.ordering import feature_order
+
+class TestPlaylistManager(unittest.TestCase):
+    """Test cases for the PlaylistManager class."""
+    
+    def setUp(self):
+        """Set up test environment with mock audio files."""
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+        
+        # Create some mock audio files
+        self.audio_files = []
+        for i in range(5):
+            ext = '.mp3' if i % 2 == 0 else '.flac'
+            file_path = os.path.join(self.test_dir, f"test{i}{ext}")
+            with open(file_path, 'w') as f:
+                f.write("mock audio data")
+            self.audio_files.append(file_path)
+        
+        # Create a non-audio file too
+        self.non_audio = os.path.join(self.test_dir, "test.txt")
+        with open(self.non_audio, 'w') as f:
+            f.write("this is not audio")
+        
+        # Set up playlist manager
+        self.playlist = PlaylistManager()
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+    
+    def test_scan_directory(self):
+        """Test scanning a directory for audio files."""
+        # Test with valid directory
+        result = self.playlist.scan_directory(self.test_dir)
+        self.assertTrue(result)
+        self.assertEqual(len(self.playlist.tracks), 5)
+        
+        # Test with invalid directory
+        result = self.playlist.scan_directory("/nonexistent/directory")
+        self.assertFalse(result)
+    
+    def test_shuffle(self):
+        """Test shuffling the playlist."""
+        # Can't shuffle empty playlist
+        self.assertFalse(self.playlist.shuffle())
+        
+        # Shuffle with tracks
+        self.playlist.tracks = self.audio_files
+        self.assertTrue(self.playlist.shuffle())
+        
+        # Check if shuffled list contains all tracks
+        self.assertEqual(sorted(self.playlist.tracks), sorted(self.playlist.shuffled_tracks))
+        
+        # Check that current index is set
+        self.assertEqual(self.playlist.current_index, 0)
+    
+    def test_get_current_track(self):
+        """Test getting the current track."""
+        # No tracks
+        self.assertIsNone(self.playlist.get_current_track())
+        
+        # With tracks
+        self.playlist.tracks = self.audio_files
+        self.playlist.shuffle()
+        
+        current = self.playlist.get_current_track()
+        self.assertIn(current, self.audio_files)
+    
+    def test_next_track(self):
+        """Test moving to the next track."""
+        # No tracks
+        self.assertIsNone(self.playlist.next_track())
+        
+        # With tracks
+        self.playlist.tracks = self.audio_files
+        self.playlist.shuffle()
+        
+        # Save initial position
+        initial_index = self.playlist.current_index
+        initial_track = self.playlist.get_current_track()
+        
+        # Move to next track
+        next_track = self.playlist.next_track()
+        self.assertNotEqual(initial_track, next_track)
+        self.assertEqual(self.playlist.current_index, initial_index + 1)
+    
+    def test_previous_track(self):
+        """Test moving to the previous track."""
+        # No tracks
+        self.assertIsNone(self.playlist.previous_track())
+        
+        # With tracks
+        self.playlist.tracks = self.audio_files
+        self.playlist.shuffle()
+        
+        # Move to a middle position
+        self.playlist.current_index = 2
+        current = self.playlist.get_current_track()
+        
+        # Get previous track
+        prev = self.playlist.previous_track()
+        self.assertNotEqual(current, prev)
+        self.assertEqual(self.playlist.current_index, 1)
+    
+    def test_wraparound(self):
+        """Test that next/previous track wraps around."""
+        self.playlist.tracks = self.audio_files
+        self.playlist.shuffle()
+        
+        # Test wraparound for next
+        self.playlist.current_index = len(self.playlist.shuffled_tracks) - 1
+        next_track = self.playlist.next_track()
+        self.assertEqual(self.playlist.current_index, 0)
+        
+        # Test wraparound for previous
+        prev_track = self.playlist.previous_track()
+        self.assertEqual(self.playlist.current_index, len(self.playlist.shuffled_tracks) - 1)
+
+    
+    def test_version(self):
+        """Test that order and position changes bump the version."""
+        events = []
+        self.playlist.add_listener(lambda event, playlist: events.append(event))
+        self.playlist.tracks = self.audio_files
+        
+        version = self.playlist.version
+        self.playlist.shuffle()
+        self.playlist.next_track()
+        self.playlist.current_index = 3
+        self.assertEqual(events, ['tracks', 'order', 'position', 'position'])
+        self.assertEqual(self.playlist.version, version + 3)
+        
+        # Reads don't change the version
+        self.playlist.get_current_track_info()
+        self.assertEqual(self.playlist.version, version + 3)
+    
+    def test_index_of(self):
+        """Test looking up library positions."""
+        self.playlist.tracks = self.audio_files
+        self.assertEqual(self.playlist.index_of(self.audio_files[3]), 3)
+        self.assertIsNone(self.playlist.index_of("/nonexistent/file.mp3"))
+        
+        # Replacing the track list invalidates the lookup table
+        self.playlist.tracks = self.audio_files[::-1]
+        self.assertEqual(self.playlist.index_of(self.audio_files[3]), 1)
+
+    def test_jump_to(self):
+        """Test making a library track the current one."""
+        self.playlist.load_tracks(self.test_dir, self.audio_files)
+        self.assertEqual(self.playlist.jump_to(2), self.audio_files[2])
+        self.assertEqual(self.playlist.get_current_track(), self.audio_files[2])
+        self.assertIsNone(self.playlist.jump_to(len(self.audio_files)))
+        self.assertEqual(self.playlist.get_current_track(), self.audio_files[2])
+
+    def test_peek_next(self):
+        """Test looking ahead without moving, wrapping at the end."""
+        self.assertIsNone(self.playlist.peek_next())
+        self.playlist.load_tracks(self.test_dir, self.audio_files)
+        order = self.playlist.shuffled_tracks
+        self.assertEqual(self.playlist.peek_next(), order[1])
+        self.assertEqual(self.playlist.current_index, 0)
+        self.playlist.current_index = len(order) - 1
+        self.assertEqual(self.playlist.peek_next(), order[0])
+
+    def test_upcoming(self):
+        """Test listing the tracks after the current one, wrapping without repeats."""
+        self.assertEqual(self.playlist.upcoming(3), [])
+        self.playlist.load_tracks(self.test_dir, self.audio_files)
+        order = self.playlist.shuffled_tracks
+        self.playlist.current_index = 3
+        self.assertEqual(self.playlist.upcoming(3), [order[4], order[0], order[1]])
+        self.assertEqual(self.playlist.upcoming(10), order[4:] + order[:3])
+
+    def test_order_modes(self):
+        """Test ordering the queue by track features."""
+        nan = float('nan')
+        features = {self.audio_files[0]: (140.0, -10.0, 3000.0), self.audio_files[1]: (80.0, -20.0, 1000.0),
+                    self.audio_files[2]: (120.0, -15.0, 2000.0), self.audio_files[3]: (nan, -12.0, 2500.0),
+                    self.audio_files[4]: (100.0, -18.0, 1500.0)}
+        self.playlist.feature_provider = lambda tracks: [features[t] for t in tracks]
+        self.playlist.load_tracks(self.test_dir, self.audio_files)
+        self.assertFalse(self.playlist.set_order_mode('loudest'))
+        
+        self.assertTrue(self.playlist.set_order_mode('tempo'))
+        self.assertEqual(self.playlist.shuffled_tracks, [self.audio_files[i] for i in (1, 4, 2, 0, 3)])
+        
+        # Tracks missing only the tempo still have a brightness
+        self.assertTrue(self.playlist.set_order_mode('brightness'))
+        self.assertEqual(self.playlist.shuffled_tracks, [self.audio_files[i] for i in (1, 4, 2, 3, 0)])
+        
+        self.assertTrue(self.playlist.set_order_mode('smooth'))
+        self.assertEqual(sorted(self.playlist.shuffled_tracks), sorted(self.audio_files))
+        
+        self.assertIsNone(feature_order(self.audio_files, [(nan, nan, nan)] * 5, 'tempo'))
+        self.assertTrue(self.playlist.set_order_mode('shuffle'))
+        self.assertEqual(sorted(self.playlist.shuffled_tracks), sorted(self.audio_files))
+    
+    def test_reorder_keeps_current_track(self):
+        """Test that features learned later reorder the queue around the playing track."""
+        features = {}
+        self.playlist.feature_provider = lambda tracks: [features.get(t, (float('nan'),) * 3) for t in tracks]
+        self.playlist.load_tracks(self.test_dir, self.audio_files)
+        self.assertFalse(self.playlist.reorder())
+        self.playlist.set_order_mode('tempo')
+        self.playlist.current_index = 2
+        current = self.playlist.get_current_track()
+        
+        features.update({track: (60.0 + 10 * i, -10.0, 1000.0) for i, track in enumerate(reversed(self.audio_files))})
+        self.assertTrue(self.playlist.reorder())
+        self.assertEqual(self.playlist.shuffled_tracks, self.audio_files[::-1])
+        self.assertEqual(self.playlist.get_current_track(), current)
+
+    def test_radio(self):
+        """Test that the radio queues similar tracks after the current one and never repeats them."""
+        tracks = [f"/music/{i:02d}.mp3" for i in range(20)]
+        # Neighbours of a track are the ones with the same parity, nearest numbers first
+        def neighbours(track, count, exclude):
+            seed = int(track[-6:-4])
+            similar = sorted((t for t in tracks if int(t[-6:-4]) % 2 == seed % 2 and t not in exclude and t != track),
+                             key=lambda t: abs(int(t[-6:-4]) - seed))
+            return similar[:count]
+        self.playlist.load_tracks('/music', list(tracks))
+        self.assertFalse(self.playlist.start_radio())
+        self.playlist.neighbour_provider = neighbours
+        self.playlist.current_index = 3
+        seed = self.playlist.get_current_track()
+        self.assertTrue(self.playlist.start_radio())
+        self.assertEqual(self.playlist.radio_seed, seed)
+        
+        played = [seed]
+        for _ in range(8):
+            played.append(self.playlist.next_track())
+        self.assertEqual(len(set(played)), 9)
+        self.assertTrue(all(int(t[-6:-4]) % 2 == int(seed[-6:-4]) % 2 for t in played))
+        self.assertEqual(sorted(self.playlist.shuffled_tracks), tracks)
+        
+        # Out of similar tracks: the rest of the queue plays on
+        self.assertIsNotNone(self.playlist.next_track())
+        self.playlist.stop_radio()
+        self.assertIsNone(self.playlist.radio_seed)
+        self.playlist.start_radio()
+        self.playlist.shuffle()
+        self.assertIsNone(self.playlist.radio_seed)
+
+    
+    def test_merge_tracks(self):
+        """Test that a rescan keeps the current track and the played part of the order."""
+        self.playlist.tracks = self.audio_files[:4]
+        self.playlist.shuffle()
+        self.playlist.current_index = 2
+        played = self.playlist.shuffled_tracks[:3]
+        
+        removed = self.playlist.shuffled_tracks[3]
+        new_tracks = [t for t in self.audio_files if t != removed]
+        self.playlist.merge_tracks(new_tracks)
+        
+        self.assertEqual(self.playlist.shuffled_tracks[:3], played)
+        self.assertEqual(self.playlist.get_current_track(), played[2])
+        self.assertEqual(sorted(self.playlist.shuffled_tracks), sorted(new_tracks))
+        self.assertEqual(self.playlist.shuffled_tracks[3], self.audio_files[4])
+
+    
+    def test_append_tracks(self):
+        """Test that tracks found later go after the current track."""
+        self.playlist.load_tracks(self.test_dir, self.audio_files[:2])
+        self.playlist.current_index = 1
+        current = self.playlist.get_current_track()
+        played = self.playlist.shuffled_tracks[:2]
+        
+        self.assertTrue(self.playlist.append_tracks(self.audio_files[2:]))
+        self.assertEqual(self.playlist.shuffled_tracks[:2], played)
+        self.assertEqual(self.playlist.get_current_track(), current)
+        self.assertEqual(sorted(self.playlist.shuffled_tracks), sorted(self.audio_files))
+        self.assertEqual(self.playlist.total_tracks(), 5)
+        self.assertEqual(self.playlist.index_of(self.audio_files[4]), 4)
+
+
+class TestPlaylistUtils(unittest.TestCase):
+    """Test cases for playlist utility functions."""
+    
+    def setUp(self):
+        """Set up test environment with mock audio files."""
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+        
+        # Create some mock audio files
+        self.audio_files = []
+        for i in range(3):
+            for ext in ['.mp3', '.wav', '.flac']:
+                file_path = os.path.join(self.test_dir, f"test{i}{ext}")
+                with open(file_path, 'w') as f:
+                    f.write("mock audio data")
+                self.audio_files.append(file_path)
+        
+        # Create a subdirectory with more files
+        self.sub_dir = os.path.join(self.test_dir, "subdir")
+        os.makedirs(self.sub_dir)
+        for i in range(2):
+            file_path = os.path.join(self.sub_dir, f"subtest{i}.mp3")
+            with open(file_path, 'w') as f:
+                f.write("mock audio data")
+            self.audio_files.append(file_path)
+        
+        # Create non-audio files
+        self.non_audio = []
+        for ext in ['.txt', '.jpg', '.png']:
+            file_path = os.path.join(self.test_dir, f"test{ext}")
+            with open(file_path, 'w') as f:
+                f.write("non-audio data")
+            self.non_audio.append(file_path)
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+    
+    def test_scan_audio_files(self):
+        """Test scanning for audio files."""
+        supported = ['.mp3', '.wav', '.flac']
+        found = utils.scan_audio_files(self.test_dir, supported)
+        
+        # Should find all audio files including in subdirectory
+        self.assertEqual(len(found), 11)  # 9 in main dir + 2 in subdir
+        
+        # All files should be audio files
+        for file in found:
+            self.assertTrue(os.path.splitext(file)[1].lower() in supported)
+        
+        # Non-audio files should not be included
+        for file in self.non_audio:
+            self.assertNotIn(file, found)
+    
+    def test_get_file_metadata(self):
+        """Test getting file metadata."""
+        test_file = self.audio_files[0]
+        metadata = utils.get_file_metadata(test_file)
+        
+        self.assertIsNotNone(metadata)
+        self.assertEqual(metadata['filename'], os.path.basename(test_file))
+        self.assertTrue('size' in metadata)
+        self.assertTrue('modified' in metadata)
+        self.assertEqual(metadata['extension'], os.path.splitext(test_file)[1].lower())
+        
+        # Test with nonexistent file
+        metadata = utils.get_file_metadata("/nonexistent/file.mp3")
+        self.assertIsNone(metadata)
+
+
+if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import shutil
+import unittest
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.audio.cache import AudioCache
+from myspot.playlist import prefetch
+from myspot.playlist.playlist import PlaylistManager
+from myspot.playlist.prefetch import Prefetcher
+
+
+class TestPrefetcher(unittest.TestCase):
+    """Test cases for the page cache prefetcher."""
+
+    def setUp(self):
+        """Create a small library and a prefetcher without start delay."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.tracks = []
+        for i in range(5):
+            path = os.path.join(self.temp_dir, f'track{i}.mp3')
+            with open(path, 'wb') as f:
+                f.write(os.urandom(3 * prefetch.CHUNK_BYTES // 2))
+            self.tracks.append(path)
+        self.playlist = PlaylistManager()
+        self.playlist.load_tracks(self.temp_dir, self.tracks)
+        self.prefetcher = Prefetcher(lookahead=2, rate=0)
+        patcher = patch.object(prefetch, 'START_DELAY', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _wait(self, files):
+        deadline = time.monotonic() + 5
+        while self.prefetcher.stats()['files'] < files and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_lookahead_and_hits(self):
+        """Test that the next tracks are warmed and count as hits when they play."""
+        self.playlist.add_listener(self.prefetcher.on_playlist_event)
+        self.playlist.current_index = 0
+        self._wait(2)
+        self.assertEqual(self.prefetcher.stats()['bytes'], 3 * prefetch.CHUNK_BYTES)
+
+        self.playlist.next_track()
+        self._wait(3)
+        self.playlist.next_track()
+        stats = self.prefetcher.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['files']), (2, 1, 3))
+
+        # Files that need no warming are neither read nor counted
+        self.prefetcher.skip = lambda path: True
+        self.playlist.next_track()
+        time.sleep(0.05)
+        self.assertEqual(self.prefetcher.stats()['files'], 3)
+        self.assertEqual(self.prefetcher.stats()['hits'], 2)
+
+    def test_next_track_into_cache(self):
+        """Test that the next track is read into the audio cache and the ones after it only warmed."""
+        cache = AudioCache(4 * prefetch.CHUNK_BYTES)
+        self.prefetcher.attach(self.playlist, cache)
+        self.prefetcher.schedule(self.tracks[1:3])
+        self._wait(2)
+        self.assertEqual([path in cache for path in self.tracks[1:3]], [True, False])
+        with open(self.tracks[1], 'rb') as f:
+            self.assertEqual(cache.get(self.tracks[1]), f.read())
+
+        # Files larger than the cache are only warmed
+        cache.set_budget(prefetch.CHUNK_BYTES)
+        self.prefetcher.schedule(self.tracks[3:4])
+        self._wait(3)
+        self.assertNotIn(self.tracks[3], cache)
+
+    def test_without_fadvise(self):
+        """Test that files are read through where posix_fadvise is missing."""
+        with patch.object(prefetch, 'ADVISE', False):
+            self.prefetcher.schedule(self.tracks[:1])
+            self._wait(1)
+        self.assertEqual(self.prefetcher.stats()['bytes'], 3 * prefetch.CHUNK_BYTES // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.playlist import resolver
+from myspot.playlist.resolver import TrackResolver, PlaylistResolver, edit_distance, normalize
+from myspot.playlist.playlist import PlaylistManager
+from myspot.voice.commands import execute_request
+
+
+class TestNormalize(unittest.TestCase):
+    """Test cases for query and name normalization."""
+
+    def test_normalize(self):
+        """Test case folding, accents and punctuation."""
+        self.assertEqual(normalize("Beyoncé - Halo (Live)"), ['beyonce', 'halo', 'live'])
+        self.assertEqual(normalize("Sigur Rós/Hoppípolla"), ['sigur', 'ros', 'hoppipolla'])
+
+    def test_edit_distance(self):
+        """Test bounded Levenshtein distance."""
+        self.assertEqual(edit_distance('rhapsody', 'rapsody', 2), 1)
+        self.assertEqual(edit_distance('kitten', 'sitting', 3), 3)
+        self.assertEqual(edit_distance('kitten', 'sitting', 1), 2)
+        self.assertEqual(edit_distance('a', 'abcdef', 2), 3)
+
+
+@unittest.skipIf(resolver.np is None, "numpy is not installed")
+class TestTrackResolver(unittest.TestCase):
+    """Test cases for fuzzy track resolution."""
+
+    def setUp(self):
+        """Index a small library."""
+        self.root = os.path.join(os.sep, 'music')
+        self.tracks = [
+            os.path.join(self.root, 'Queen', 'A Night at the Opera', '11 Bohemian Rhapsody.mp3'),
+            os.path.join(self.root, 'Queen', 'Live', 'Bohemian Rhapsody (Live at Wembley 1986).mp3'),
+            os.path.join(self.root, 'Queen', 'Hot Space', '11 Under Pressure.mp3'),
+            os.path.join(self.root, 'Beyoncé', 'I Am', '01 Halo.flac'),
+            os.path.join(self.root, 'Various', 'Night Drive', '03 Midnight City.ogg'),
+        ]
+        self.resolver = TrackResolver(self.tracks, root=self.root)
+
+    def best(self, query):
+        matches = self.resolver.resolve(query, limit=1)
+        return matches[0][0] if matches else None
+
+    def test_exact_words(self):
+        """Test that the shortest full match wins and folders count."""
+        self.assertEqual(self.best('bohemian rhapsody'), self.tracks[0])
+        self.assertEqual(self.best('bohemian rhapsody live'), self.tracks[1])
+        self.assertEqual(self.best('queen under pressure'), self.tracks[2])
+        self.assertEqual(self.best('the Halo song by beyonce'), self.tracks[3])
+
+    def test_fuzzy_words(self):
+        """Test that misheard or misspelled words still resolve."""
+        self.assertEqual(self.best('bohemien rapsody'), self.tracks[0])
+        self.assertEqual(self.best('midnite city'), self.tracks[4])
+        score = self.resolver.resolve('bohemien rapsody')[0][1]
+        self.assertGreater(score, resolver.MIN_SCORE)
+        self.assertLess(score, self.resolver.resolve('bohemian rhapsody')[0][1])
+
+    def test_no_match(self):
+        """Test queries with nothing in common with the library."""
+        self.assertEqual(self.resolver.resolve('xyzzy'), [])
+        self.assertEqual(self.resolver.resolve('the'), [])
+        matches = self.resolver.resolve('city of stars and rockets')
+        self.assertLess(matches[0][1], resolver.MIN_SCORE)
+
+    def test_ranking_limit(self):
+        """Test that results are ordered and limited."""
+        matches = self.resolver.resolve('queen', limit=2)
+        self.assertEqual(len(matches), 2)
+        self.assertGreaterEqual(matches[0][1], matches[1][1])
+        self.assertTrue(all('Queen' in track for track, _ in matches))
+
+
+@unittest.skipIf(resolver.np is None, "numpy is not installed")
+class TestPlaylistResolver(unittest.TestCase):
+    """Test cases for resolving requests against a live playlist."""
+
+    def setUp(self):
+        """Create a playlist, a mock player and a resolver with tags."""
+        self.root = os.path.join(os.sep, 'music')
+        self.tracks = [os.path.join(self.root, f"track{i:02d}.mp3") for i in range(20)]
+        self.playlist = PlaylistManager()
+        self.playlist.load_tracks(self.root, self.tracks)
+        self.player = MagicMock()
+        self.player.play.return_value = True
+        tags = {self.tracks[7]: 'Clair de Lune Debussy'}
+        self.resolver = PlaylistResolver(self.playlist, tag_reader=lambda track: tags.get(track, ''))
+
+    def test_refresh_follows_library(self):
+        """Test that the index is built on refresh and rebuilt after changes."""
+        self.assertIsNone(self.resolver.resolve('debussy'))
+        self.assertEqual(self.resolver.refresh(), 20)
+        self.assertTrue(self.resolver.is_current())
+        self.assertEqual(self.resolver.resolve('debussy')[0][0], self.tracks[7])
+
+        self.playlist.append_tracks([os.path.join(self.root, 'Gymnopedie.mp3')])
+        self.assertFalse(self.resolver.is_current())
+        self.assertEqual(self.resolver.refresh(), 21)
+
+    def test_execute_play_query(self):
+        """Test that a resolved request jumps playback to the match."""
+        self.resolver.refresh()
+        result = execute_request('play_query', 'clair de lune', self.player, self.playlist, self.resolver)
+        self.assertTrue(result['success'])
+        self.assertEqual(result['track'], 'track07.mp3')
+        self.assertEqual(self.playlist.get_current_track(), self.tracks[7])
+        self.player.play.assert_called_once_with(self.tracks[7])
+
+        result = execute_request('play_query', 'nothing like this', self.player, self.playlist, self.resolver)
+        self.assertFalse(result['success'])
+        self.assertEqual(self.player.play.call_count, 1)
+
+    def test_stale_index(self):
+        """Test that tracks removed since the last refresh are skipped."""
+        self.resolver.refresh()
+        self.playlist.tracks = [track for track in self.tracks if track != self.tracks[7]]
+        result = execute_request('play_query', 'debussy', self.player, self.playlist, self.resolver)
+        self.assertFalse(result['success'])
+        self.player.play.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.playlist.search import TrackIndex, result_row
+
+
+class TestTrackIndex(unittest.TestCase):
+    """Test cases for the playlist search index."""
+
+    def setUp(self):
+        """Index a small library."""
+        self.root = os.path.join(os.sep, 'music')
+        self.tracks = [
+            os.path.join(self.root, 'Daft Punk', 'Discovery', '01 One More Time.mp3'),
+            os.path.join(self.root, 'Daft Punk', 'Discovery', '02 Aerodynamic.mp3'),
+            os.path.join(self.root, 'Air', 'Moon Safari', '01 La Femme d Argent.flac'),
+            os.path.join(self.root, 'Air', 'Moon Safari', '02 Sexy Boy.flac'),
+        ]
+        self.index = TrackIndex(self.tracks[:2], root=self.root)
+        self.index.extend(self.tracks[2:])
+
+    def test_empty_query(self):
+        """Test that a blank filter means no filtering."""
+        self.assertIsNone(self.index.search(''))
+        self.assertIsNone(self.index.search('  - '))
+
+    def test_word_prefixes(self):
+        """Test matching names and folders by word prefix, case-insensitively."""
+        self.assertEqual(self.index.search('a'), [1, 2, 3])
+        self.assertEqual(self.index.search('AIR'), [2, 3])
+        self.assertEqual(self.index.search('disc'), [0, 1])
+        self.assertEqual(self.index.search('moon boy'), [3])
+        self.assertEqual(self.index.search('dynamic'), [])
+        self.assertEqual(self.index.search('mp3'), [])
+
+    def test_refinement(self):
+        """Test that typing, deleting and retyping gives consistent results."""
+        for query in ['d', 'da', 'daf', 'daft', 'daft o', 'daft on', 'daft o', 'daft', 'd']:
+            expected = [i for i, track in enumerate(self.tracks)
+                        if all(any(word.lower().startswith(token) for word in
+                                   os.path.splitext(track[len(self.root) + 1:])[0].replace(os.sep, ' ').split())
+                               for token in query.split())]
+            self.assertEqual(self.index.search(query), expected, query)
+
+    def test_extend_invalidates_results(self):
+        """Test that tracks added later show up in repeated searches."""
+        self.assertEqual(self.index.search('sexy'), [3])
+        self.index.extend([os.path.join(self.root, 'Other', 'Sexy Sadie.mp3')])
+        self.assertEqual(self.index.search('sexy'), [3, 4])
+
+    def test_result_row(self):
+        """Test locating a track within a result list."""
+        self.assertEqual(result_row([1, 4, 9], 4), 1)
+        self.assertIsNone(result_row([1, 4, 9], 5))
+        self.assertIsNone(result_row([], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import wave
+import atexit
+import shutil
+import unittest
+import threading
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.cases import load_server, WORKDIR_ENV
+from benchmarks.load_test import StandInPygame
+from myspot.audio import player as player_module
+
+
+class TestServer(unittest.TestCase):
+    """Test cases for the web API, played through a stand-in mixer."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Import the server with the stand-in mixer and its files in a temporary directory."""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.patchers = [patch.object(player_module, 'pygame', StandInPygame()),
+                        patch.dict(os.environ, {WORKDIR_ENV: cls.temp_dir})]
+        for patcher in cls.patchers:
+            patcher.start()
+        from myspot.web import server
+        cls.server = server
+        server.peaks_cache.cache_dir = os.path.join(cls.temp_dir, 'peaks')
+        server.artwork.cache_dir = os.path.join(cls.temp_dir, 'art')
+        cls.client = server.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Stop background work and clean up."""
+        cls.server.jobs.cancel_all()
+        # The session would be saved through the real mixer, into a directory that is gone
+        atexit.unregister(cls.server.save_session)
+        for patcher in reversed(cls.patchers):
+            patcher.stop()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def setUp(self):
+        """Load a small library with nothing playing, unmuted."""
+        self.server.player.stop()
+        if self.server.player.is_muted():
+            self.server.player.toggle_mute()
+        self.library = self._library('library', 5)
+        load_server(self.server, os.path.dirname(self.library[0]), self.library)
+
+    def tearDown(self):
+        """Cancel the jobs a test started."""
+        self.server.jobs.cancel_all()
+
+    def _library(self, name, count):
+        directory = os.path.join(self.temp_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        tracks = []
+        for i in range(count):
+            tracks.append(os.path.join(directory, f'{name}{i}.mp3'))
+            with open(tracks[-1], 'wb') as f:
+                f.write(b'\0' * 100)
+        return tracks
+
+    def _batch(self, commands, **options):
+        return self.client.post('/api/batch', json=dict(options, commands=commands)).get_json()
+
+    def test_batch_order_and_snapshot(self):
+        """Test that batch commands run in order and the snapshot shows their combined result."""
+        result = self._batch([{'action': 'play', 'index': 3}, {'action': 'volume', 'volume': 0.4},
+                              {'action': 'next'}, {'action': 'pause'}])
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['results']), 4)
+        self.assertTrue(all(r['success'] for r in result['results']))
+        status = result['status']
+        self.assertEqual(status['current_track']['path'], self.server.playlist.get_current_track())
+        self.assertNotEqual(status['current_track']['library_index'], 3)
+        self.assertEqual(status['volume'], 0.4)
+        self.assertTrue(status['paused'])
+        self.assertEqual(status['version'], self.client.get('/api/status').get_json()['version'])
+
+    def test_batch_errors(self):
+        """Test unknown actions, stop_on_error and the command limit."""
+        result = self._batch([{'action': 'volume', 'volume': 0.6}, {'action': 'explode'}, {'action': 'mute'}])
+        self.assertFalse(result['success'])
+        self.assertEqual(len(result['results']), 2)
+        self.assertEqual(result['results'][1], {'success': False, 'message': 'Unknown action'})
+        self.assertFalse(result['status']['muted'])
+
+        result = self._batch([{'action': 'explode'}, 'mute', {'action': 'mute'}], stop_on_error=False)
+        self.assertFalse(result['success'])
+        self.assertEqual([r['success'] for r in result['results']], [False, False, True])
+        self.assertTrue(result['status']['muted'])
+
+        too_many = [{'action': 'mute'}] * (self.server.MAX_BATCH_COMMANDS + 1)
+        result = self._batch(too_many)
+        self.assertFalse(result['success'])
+        self.assertIn('Too many commands', result['message'])
+        self.assertTrue(self.server.player.is_muted())
+        self.assertFalse(self._batch([])['success'])
+
+    def test_batch_with_directory(self):
+        """Test that the commands after "directory" in a batch run against the new library."""
+        new_library = self._library('new', 3)
+        result = self._batch([{'action': 'directory', 'directory': os.path.dirname(new_library[0])},
+                              {'action': 'play', 'index': 2}, {'action': 'volume', 'volume': 0.3}])
+        self.assertTrue(result['success'])
+        self.assertEqual(result['results'][0]['tracks'], 3)
+        self.assertEqual(result['status']['current_track']['path'], new_library[2])
+        self.assertEqual(result['status']['volume'], 0.3)
+        self.assertEqual(self.server.jobs.list(kind='scan', active_only=True), [])
+        self.assertEqual(self.server.config.get('music_directory'), os.path.dirname(new_library[0]))
+
+        result = self._batch([{'action': 'directory', 'directory': os.path.join(self.temp_dir, 'missing')},
+                              {'action': 'next'}])
+        self.assertFalse(result['success'])
+        self.assertEqual(result['results'], [{'success': False, 'message': 'Directory not found'}])
+        self.assertEqual(self.server.playlist.total_tracks(), 3)
+
+    def test_status_since(self):
+        """Test that a client up to date with ``since`` gets 304 and a newer version gets the body."""
+        status = self.client.get('/api/status').get_json()
+        response = self.client.get(f"/api/status?since={status['version']}")
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(f"/api/status?since={status['version'] - 1}")
+        self.assertEqual(response.get_json()['version'], status['version'])
+
+    def test_status_wait(self):
+        """Test that a long poll returns as soon as the state changes."""
+        version = self.client.get('/api/status').get_json()['version']
+        timer = threading.Timer(0.2, lambda: self._batch([{'action': 'volume', 'volume': 0.2}]))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        started = time.monotonic()
+        response = self.client.get(f'/api/status?since={version}&wait=10')
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.get_json()['version'], version)
+        self.assertEqual(response.get_json()['volume'], 0.2)
+
+    def test_status_etag_after_compression(self):
+        """Test that the weak ETag of a compressed status revalidates to 304."""
+        # However short the status is, compress it
+        with patch.object(self.server, 'MIN_COMPRESS_SIZE', 0):
+            response = self.client.get('/api/status', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        response = self.client.get('/api/status', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_peaks_revalidation(self):
+        """Test that peaks answer 304 to their ETag in strong or weak form."""
+        path = os.path.join(self.temp_dir, 'library', 'silence.wav')
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(bytes(16000))
+        load_server(self.server, os.path.dirname(path), [path])
+        response = self.client.get('/api/tracks/0/peaks')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        for tag in (etag, f'W/{etag}'):
+            response = self.client.get('/api/tracks/0/peaks', headers={'If-None-Match': tag})
+            self.assertEqual(response.status_code, 304)
+
+    def test_art_revalidation(self):
+        """Test that a cover answers 304 to its ETag in strong or weak form."""
+        with open(os.path.join(os.path.dirname(self.library[0]), 'cover.png'), 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n' + bytes(64))
+        response = self.client.get('/api/tracks/0/art')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        for tag in (etag, f'W/{etag}'):
+            response = self.client.get('/api/tracks/0/art', headers={'If-None-Match': tag})
+            self.assertEqual(response.status_code, 304)
+
+    def test_static_revalidation(self):
+        """Test that static assets answer 304 to their ETag in strong or weak form."""
+        response = self.client.get('/static/app.js', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        for tag in (etag, f'W/{etag}'):
+            response = self.client.get('/static/app.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': tag})
+            self.assertEqual(response.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.config.session import SessionStore
+from myspot.playlist.playlist import PlaylistManager
+
+
+class TestSessionStore(unittest.TestCase):
+    """Test cases for the binary session snapshot."""
+
+    def setUp(self):
+        """Set up a playlist, a stand-in player and a temporary session file."""
+        self.test_dir = tempfile.mkdtemp()
+        self.store = SessionStore()
+        self.store.session_path = os.path.join(self.test_dir, 'session.bin')
+
+        self.playlist = PlaylistManager()
+        self.playlist.load_tracks('/music', [f"/music/track{i}.mp3" for i in range(50)] + ["/music/café.flac"])
+        self.playlist.current_index = 7
+
+        self.player = MagicMock()
+        self.player.is_paused = False
+        self.player.is_playing.return_value = True
+        self.player.current_track = 'track.mp3'
+        self.player.get_position.return_value = 42.5
+        self.player.get_volume.return_value = 0.25
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trip(self):
+        """Test that order, position and volume survive a save and load."""
+        self.assertTrue(self.store.save(self.playlist, self.player))
+        session = self.store.load()
+
+        self.assertEqual(session.directory, '/music')
+        self.assertEqual(session.tracks, self.playlist.tracks)
+        self.assertEqual([session.tracks[i] for i in session.order], self.playlist.shuffled_tracks)
+        self.assertEqual(session.current_index, 7)
+        self.assertEqual(session.current_track(), self.playlist.get_current_track())
+        self.assertAlmostEqual(session.position, 42.5)
+        self.assertAlmostEqual(session.volume, 0.25)
+        self.assertTrue(session.playing)
+        self.assertFalse(session.paused)
+
+        restored = PlaylistManager()
+        restored.restore(session.directory, session.tracks, session.order, session.current_index)
+        self.assertEqual(restored.shuffled_tracks, self.playlist.shuffled_tracks)
+        self.assertEqual(restored.get_current_track(), self.playlist.get_current_track())
+
+    def test_header_only_update(self):
+        """Test that position changes rewrite the header in place."""
+        self.store.save(self.playlist, self.player)
+        size = os.path.getsize(self.store.session_path)
+
+        self.playlist.next_track()
+        self.player.get_position.return_value = 3.0
+        self.store.save(self.playlist, self.player)
+        self.assertEqual(os.path.getsize(self.store.session_path), size)
+
+        session = self.store.load()
+        self.assertEqual(session.current_index, 8)
+        self.assertAlmostEqual(session.position, 3.0)
+
+    def test_invalid_file(self):
+        """Test that missing or foreign files are ignored."""
+        self.assertIsNone(self.store.load())
+        with open(self.store.session_path, 'wb') as f:
+            f.write(b'not a session file at all, just some bytes')
+        self.assertIsNone(self.store.load())
+
+
+if __name__ == "__main__":
+    unittest.main()
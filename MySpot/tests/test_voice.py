@@ -0,0 +1,276 @@
+import os
+import sys
+import wave
+import unittest
+import tempfile
+import shutil
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from myspot.voice import recognizer
+from myspot.voice.recognizer import VoiceRecognizer
+from myspot.voice.commands import parse_command, parse_request
+from myspot.playlist.playlist import PlaylistManager
+
+np = recognizer.np
+if np is not None:
+    from myspot.voice.ringbuffer import FrameRingBuffer
+    from myspot.voice.vad import EnergyVAD
+    from myspot.voice.wakeword import WakeWordDetector, subsequence_dtw
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=0.3, freq=220.0):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def silence(seconds, noise=0.0):
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * RATE)) * noise * 32767).astype(np.int16)
+
+
+def write_wav(path, samples, rate=RATE):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.astype('<i2').tobytes())
+
+
+def wake_word(tempo=1.0):
+    return np.concatenate([tone(0.15 * tempo, freq=300), tone(0.15 * tempo, freq=1200), tone(0.15 * tempo, freq=600)])
+
+
+class StubEngine:
+    """Stands in for Vosk: returns a canned transcript per speech segment."""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.segments = []
+
+    def recognize(self, samples):
+        self.segments.append(len(samples))
+        return self.texts.pop(0) if self.texts else ''
+
+
+class TestCommands(unittest.TestCase):
+    """Test cases for transcript parsing."""
+
+    def test_parse(self):
+        """Test mapping phrases to actions."""
+        self.assertEqual(parse_command("next song please"), 'next')
+        self.assertEqual(parse_command("Volume UP"), 'volume_up')
+        self.assertEqual(parse_command("unmute"), 'unmute')
+        self.assertEqual(parse_command("go back"), 'previous')
+        self.assertIsNone(parse_command("what a nice day"))
+        self.assertIsNone(parse_command("playground"))
+
+    def test_parse_request(self):
+        """Test telling "play <title>" apart from commands that start with play."""
+        self.assertEqual(parse_request("Play Bohemian Rhapsody"), ('play_query', 'bohemian rhapsody'))
+        self.assertEqual(parse_request("please play stop crying your heart out"),
+                         ('play_query', 'stop crying your heart out'))
+        self.assertEqual(parse_request("play the next song"), ('next', None))
+        self.assertEqual(parse_request("play music"), ('play', None))
+        self.assertEqual(parse_request("play more like this"), ('radio', None))
+        self.assertEqual(parse_request("play radio gaga"), ('play_query', 'radio gaga'))
+        self.assertEqual(parse_request("play"), ('play', None))
+        self.assertEqual(parse_request("louder"), ('volume_up', None))
+        self.assertEqual(parse_request("nice weather"), (None, None))
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFrameRingBuffer(unittest.TestCase):
+    """Test cases for the audio frame ring."""
+
+    def test_wraparound(self):
+        """Test that frames come out in order across the end of the ring."""
+        ring = FrameRingBuffer(4, 2)
+        for i in range(3):
+            self.assertTrue(ring.push([i, i]))
+        self.assertEqual(ring.pop_all(max_frames=2)[:, 0].tolist(), [0, 1])
+        self.assertEqual(ring.push_many(np.array([[3, 3], [4, 4], [5, 5]])), 3)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.pop_all()[:, 0].tolist(), [2, 3, 4, 5])
+        self.assertEqual(len(ring.pop_all()), 0)
+
+    def test_overflow_drops(self):
+        """Test that a full ring drops new frames instead of blocking."""
+        ring = FrameRingBuffer(2, 1)
+        self.assertTrue(ring.push([1]))
+        self.assertTrue(ring.push([2]))
+        self.assertFalse(ring.push([3]))
+        self.assertEqual(ring.push_many(np.array([[4], [5]])), 0)
+        self.assertEqual(ring.dropped, 3)
+        self.assertEqual(ring.pop_all()[:, 0].tolist(), [1, 2])
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestEnergyVAD(unittest.TestCase):
+    """Test cases for speech gating."""
+
+    def frames(self, samples, vad):
+        usable = len(samples) - len(samples) % vad.frame_size
+        return samples[:usable].reshape(-1, vad.frame_size)
+
+    def test_segments(self):
+        """Test that two bursts in noise become two segments with pre-roll and hangover."""
+        vad = EnergyVAD(RATE)
+        audio = np.concatenate([silence(1, 0.001), tone(0.6), silence(1, 0.001), tone(0.9), silence(1, 0.001)])
+        frames = self.frames(audio, vad)
+        segments = []
+        # Uneven batches: the result must not depend on how frames are grouped
+        for start, end in [(0, 7), (7, 40), (40, 41), (41, len(frames))]:
+            segments.extend(vad.feed(frames[start:end]))
+        segments.extend(vad.flush())
+        self.assertEqual(len(segments), 2)
+        expected = [(0.6 + 0.15 + 0.3) * RATE, (0.9 + 0.15 + 0.3) * RATE]
+        for segment, length in zip(segments, expected):
+            self.assertAlmostEqual(len(segment), length, delta=2 * vad.frame_size)
+
+    def test_ignores_silence_and_clicks(self):
+        """Test that noise and very short bursts never open a segment."""
+        vad = EnergyVAD(RATE)
+        audio = np.concatenate([silence(2, 0.002), tone(0.03), silence(2, 0.002)])
+        self.assertEqual(vad.feed(self.frames(audio, vad)) + vad.flush(), [])
+        self.assertLess(vad.noise_floor, vad.min_level_db)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestWakeWord(unittest.TestCase):
+    """Test cases for the keyword-spotting stage."""
+
+    def setUp(self):
+        """Record two wake word templates."""
+        self.test_dir = tempfile.mkdtemp()
+        for i, tempo in enumerate((0.9, 1.1)):
+            write_wav(os.path.join(self.test_dir, f"wake{i}.wav"),
+                      np.concatenate([silence(0.3), wake_word(tempo), silence(0.3)]))
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+
+    def feed(self, detector, audio, batch=3):
+        frames = audio[:len(audio) - len(audio) % 480].reshape(-1, 480)
+        return sum(bool(detector.feed(frames[i:i + batch])) for i in range(0, len(frames), batch))
+
+    def test_dtw_aligns_stretched_template(self):
+        """Test that a time-stretched copy matches at the frame where it ends."""
+        rng = np.random.default_rng(1)
+        template = rng.standard_normal((20, 12)).astype(np.float32)
+        window = np.concatenate([rng.standard_normal((15, 12)), np.repeat(template, 2, axis=0),
+                                 rng.standard_normal((10, 12))]).astype(np.float32)
+        costs = subsequence_dtw(template, window)
+        self.assertAlmostEqual(float(costs[15 + 40 - 1]), 0.0, places=2)
+        self.assertGreater(float(costs[:15 + 30].min()), 0.5)
+
+    def test_detects_only_the_wake_word(self):
+        """Test detection in a stream and no detection for other sounds."""
+        detector = WakeWordDetector.from_wavs([self.test_dir], RATE, cpu_budget=0.01)
+        self.assertEqual(len(detector.templates), 2)
+        self.assertEqual(self.feed(detector, np.concatenate([silence(1, 0.001), wake_word(), silence(1, 0.001)])), 1)
+        other = np.concatenate([tone(0.15, freq=600), tone(0.15, freq=1200), tone(0.15, freq=300)])
+        self.assertEqual(self.feed(detector, np.concatenate([silence(2, 0.001), other, tone(0.5, freq=2000),
+                                                             silence(1, 0.001)])), 0)
+        self.assertLessEqual(detector.stride, detector.max_stride)
+
+    def test_batch_size(self):
+        """Test that a wake word is found however large the batches it arrives in."""
+        audio = np.concatenate([silence(0.5, 0.001), wake_word(), silence(2, 0.001)])
+        for batch in (3, 33, 150):
+            detector = WakeWordDetector.from_wavs([self.test_dir], RATE, cpu_budget=0.01)
+            self.assertEqual(self.feed(detector, audio, batch), 1, f"batch of {batch} frames")
+
+    def test_gates_the_recognizer(self):
+        """Test that only speech after the wake word reaches the engine."""
+        config = MagicMock()
+        config.get.side_effect = lambda key, default=None: self.test_dir if key == 'voice_wake_samples' else default
+        playlist = PlaylistManager()
+        playlist.load_tracks(self.test_dir, [os.path.join(self.test_dir, f"t{i}.mp3") for i in range(3)])
+        player = MagicMock()
+        player.play.return_value = True
+        engine = StubEngine("my spot", "next")
+        voice = VoiceRecognizer(player, playlist, config, engine=engine)
+        # Kept apart from the wake word samples, which are all read as templates
+        session_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, session_dir)
+        path = os.path.join(session_dir, 'session.wav')
+        write_wav(path, np.concatenate([silence(0.5), tone(0.5, freq=2000), silence(1), wake_word(), silence(1),
+                                        tone(0.5, freq=2000), silence(1), tone(0.5, freq=2000), silence(0.5)]))
+
+        self.assertEqual(voice.process_wav(path), ["my spot", "next"])
+        status = voice.status()
+        self.assertEqual(status['wake_detections'], 1)
+        self.assertEqual(status['skipped_segments'], 2)
+        self.assertEqual(status['commands'], 1)
+        self.assertFalse(status['armed'])
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestVoiceRecognizer(unittest.TestCase):
+    """Test cases for the WAV-driven voice pipeline."""
+
+    def setUp(self):
+        """Create a recognizer over a small playlist with mock playback."""
+        self.test_dir = tempfile.mkdtemp()
+        self.playlist = PlaylistManager()
+        self.playlist.load_tracks(self.test_dir, [os.path.join(self.test_dir, f"t{i}.mp3") for i in range(3)])
+        self.player = MagicMock()
+        self.player.play.return_value = True
+        self.config = MagicMock()
+        self.config.get.side_effect = lambda key, default=None: default
+
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.test_dir)
+
+    def test_process_wav_runs_commands(self):
+        """Test that each spoken segment is recognized once and executed."""
+        path = os.path.join(self.test_dir, 'commands.wav')
+        audio = np.concatenate([silence(0.5), tone(0.5), silence(1), tone(0.5), silence(0.2)])
+        write_wav(path, np.repeat(audio, 2), rate=RATE * 2)
+        engine = StubEngine("next", "volume down")
+        voice = VoiceRecognizer(self.player, self.playlist, self.config, engine=engine)
+
+        self.assertEqual(voice.process_wav(path), ["next", "volume down"])
+        self.assertEqual(len(engine.segments), 2)
+        self.assertEqual(self.playlist.current_index, 1)
+        self.player.play.assert_called_once_with(self.playlist.get_current_track())
+        self.player.decrease_volume.assert_called_once()
+        self.assertEqual(voice.status()['commands'], 2)
+
+    def test_silence_skips_engine(self):
+        """Test that the recognizer engine never runs on silence."""
+        path = os.path.join(self.test_dir, 'silence.wav')
+        write_wav(path, silence(5, 0.002))
+        engine = StubEngine("next")
+        voice = VoiceRecognizer(self.player, self.playlist, self.config, engine=engine)
+        self.assertEqual(voice.process_wav(path), [])
+        self.assertEqual(engine.segments, [])
+        self.assertEqual(voice.status()['frames'], 5 * 1000 // VoiceRecognizer.FRAME_MS)
+
+    def test_stale_index_is_scheduled(self):
+        """Test that "play <title>" with an outdated index answers not ready and asks for a rebuild."""
+        voice = VoiceRecognizer(self.player, self.playlist, self.config, engine=StubEngine())
+        voice.schedule_index = MagicMock()
+        self.assertFalse(voice.handle_text("play t1"))
+        voice.schedule_index.assert_called_once_with()
+        self.assertIsNone(voice.resolver.index)
+        self.player.play.assert_not_called()
+
+    def test_unavailable_engine(self):
+        """Test that start() fails cleanly without a speech model."""
+        self.config.get.side_effect = lambda key, default=None: (
+            os.path.join(self.test_dir, 'missing') if key == 'voice_model_path' else default)
+        voice = VoiceRecognizer(self.player, self.playlist, self.config)
+        self.assertFalse(voice.start())
+        self.assertIsNone(voice.model)
+
+
+if __name__ == "__main__":
+    unittest.main()